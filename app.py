@@ -1,35 +1,84 @@
-from laptopPrice.exception import LaptopException
-from flask import Flask, render_template, request, jsonify
-from laptopPrice.pipeline.prediction_pipeline import CustomData , PredictPipeline
-
-
-app = Flask(__name__)
-
-@app.route('/', methods=['GET', 'POST'])
-def predict():
-    # Initial GET request: render index.html without prediction
-    if request.method == "GET":
-        return render_template('index.html')
-    
-    # POST request: Get the data and make prediction
-    if request.method == "POST":
-        try:
-            # Get the JSON data from the request
-            data = request.get_json()
-            
-            customData = CustomData(data_dict = data)             
-            
-            # Make prediction
-            prediction_pipeline = PredictPipeline()
-            predictions_dict = prediction_pipeline.predict(custom_data = customData)
-            
-            # Return the prediction as JSON
-            return jsonify(predictions_dict)
-            
-        except Exception as e:
-            print("Error during prediction:", str(e))
-            return jsonify({"error": str(e)}), 500
-
-     
-if __name__ == '__main__':
-    app.run(debug = True)
\ No newline at end of file
+from laptopPrice.exception import LaptopException
+from laptopPrice.logger import get_logger
+from flask import Flask, Response, render_template, request, jsonify
+from laptopPrice.constants import PREDICTION_BATCH_MAX_RECORDS
+from laptopPrice.entity.config_entity import MicroBatchConfig
+from laptopPrice.pipeline.prediction_pipeline import CustomData , CustomDataBatch , PredictPipeline , render_serving_metrics
+from laptopPrice.pipeline.micro_batcher import MicroBatcher
+from laptopPrice.pipeline.prediction_cache import get_prediction_cache
+
+
+app = Flask(__name__)
+logger = get_logger(__name__)
+
+# when enabled, concurrent single record requests are predicted together
+micro_batch_config = MicroBatchConfig()
+micro_batcher = MicroBatcher(micro_batch_config = micro_batch_config) if micro_batch_config.enabled else None
+
+@app.route('/', methods=['GET', 'POST'])
+def predict():
+    # Initial GET request: render index.html without prediction
+    if request.method == "GET":
+        return render_template('index.html')
+    
+    # POST request: Get the data and make prediction
+    if request.method == "POST":
+        try:
+            # Get the JSON data from the request
+            data = request.get_json()
+            
+            customData = CustomData(data_dict = data)             
+            
+            # Make prediction
+            if micro_batcher is not None:
+                predictions_dict = micro_batcher.predict(custom_data = customData)
+            else:
+                prediction_pipeline = PredictPipeline()
+                predictions_dict = prediction_pipeline.predict(custom_data = customData)
+            
+            # Return the prediction as JSON
+            return jsonify(predictions_dict)
+            
+        except Exception as e:
+            logger.info("Error during prediction: %s" , e)
+            return jsonify({"error": str(e)}), 500
+
+
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    # accepts a list of records or {"records": [...]}
+    data = request.get_json()
+    records = data.get("records") if isinstance(data , dict) else data
+    
+    if not isinstance(records , list) or len(records) == 0 or not all(isinstance(record , dict) for record in records):
+        return jsonify({"error": "Request body must be a non empty list of records"}), 400
+    if len(records) > PREDICTION_BATCH_MAX_RECORDS:
+        return jsonify({"error": f"At most {PREDICTION_BATCH_MAX_RECORDS} records are allowed per request"}), 413
+    
+    try:
+        prediction_pipeline = PredictPipeline()
+        predictions_dict = prediction_pipeline.predict_batch(custom_data_batch = CustomDataBatch(records = records))
+        return jsonify(predictions_dict)
+    
+    except Exception as e:
+        logger.info("Error during batch prediction: %s" , e)
+        return jsonify({"error": str(e)}), 500
+
+
+@app.route('/predict/cache', methods=['GET'])
+def prediction_cache_stats():
+    # hit rate and counters of the prediction cache of this worker process
+    prediction_cache = get_prediction_cache()
+    if prediction_cache is None:
+        return jsonify({"enabled": False})
+    return jsonify({"enabled": True , **prediction_cache.get_stats()})
+
+
+@app.route('/metrics', methods=['GET'])
+def metrics():
+    # prometheus text of the prediction timings , model registry and cache counters of this worker process
+    return Response(render_serving_metrics() , mimetype = "text/plain; version=0.0.4")
+
+     
+if __name__ == '__main__':
+    app.run(debug = True)
@@ -0,0 +1,98 @@
+from contextlib import asynccontextmanager
+
+import uvicorn
+from jinja2 import pass_context
+from fastapi import FastAPI, Request
+from fastapi.exceptions import RequestValidationError
+from fastapi.responses import JSONResponse, PlainTextResponse
+from fastapi.staticfiles import StaticFiles
+from fastapi.templating import Jinja2Templates
+
+from laptopPrice.logger import logging
+from laptopPrice.entity.config_entity import AsgiServingConfig
+from laptopPrice.entity.prediction_request import LaptopPriceRequest
+from laptopPrice.pipeline.prediction_pool import PredictionWorkerPool, PredictionPoolFull
+from laptopPrice.pipeline.prediction_cache import get_prediction_cache
+from laptopPrice.pipeline.prediction_pipeline import render_serving_metrics
+
+
+serving_config = AsgiServingConfig()
+prediction_pool = PredictionWorkerPool(serving_config = serving_config)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # runs once in every uvicorn worker process, so the model is loaded before the first request
+    prediction_pool.start()
+    yield
+    prediction_pool.shutdown()
+
+
+app = FastAPI(lifespan = lifespan)
+app.mount("/static" , StaticFiles(directory = "static") , name = "static")
+templates = Jinja2Templates(directory = "templates")
+
+
+@pass_context
+def url_for(context: dict , name: str , **path_params) -> str:
+    # index.html is shared with the flask app, which calls url_for('static', filename=...)
+    if "filename" in path_params:
+        path_params["path"] = path_params.pop("filename")
+    return str(context["request"].url_for(name , **path_params))
+
+templates.env.globals["url_for"] = url_for
+
+
+@app.exception_handler(RequestValidationError)
+async def validation_exception_handler(request: Request , exc: RequestValidationError):
+    # same {"error": ...} body as the other failures
+    return JSONResponse(status_code = 422 , content = {"error": str(exc.errors())})
+
+
+@app.get("/")
+async def index(request: Request):
+    # Initial GET request: render index.html without prediction
+    return templates.TemplateResponse(request , "index.html")
+
+
+@app.post("/")
+async def predict(laptop: LaptopPriceRequest):
+    try:
+        predictions_dict = await prediction_pool.predict(laptop.model_dump())
+        return predictions_dict
+
+    except PredictionPoolFull as e:
+        # backpressure: tell the client to come back instead of queueing without limit
+        logging.info(f"Prediction request rejected: {e}")
+        return JSONResponse(
+            status_code = 503,
+            content = {"error": "Server is busy, please retry"},
+            headers = {"Retry-After": str(serving_config.retry_after_seconds)}
+        )
+    except Exception as e:
+        logging.info(f"Error during prediction: {e}")
+        return JSONResponse(status_code = 500 , content = {"error": str(e)})
+
+
+@app.get("/predict/cache")
+async def prediction_cache_stats():
+    # counters of this process. with a process pool the predictions(and their counters) are in the worker processes
+    prediction_cache = get_prediction_cache()
+    if prediction_cache is None:
+        return {"enabled": False}
+    return {"enabled": True , **prediction_cache.get_stats()}
+
+
+@app.get("/metrics")
+async def metrics():
+    # prometheus text of this process. like the cache counters, with a process pool the prediction timings are in the worker processes
+    return PlainTextResponse(render_serving_metrics() , media_type = "text/plain; version=0.0.4")
+
+
+if __name__ == '__main__':
+    uvicorn.run(
+        "asgi_app:app",
+        host = serving_config.host,
+        port = serving_config.port,
+        workers = serving_config.workers
+    )
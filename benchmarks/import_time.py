@@ -0,0 +1,146 @@
+"""
+Import time guard of the serving path.
+
+Runs the serving imports(and optionally loads the model and predicts one record) in a fresh interpreter
+with `python -X importtime`, prints the slowest imports and fails if a training only / unused library
+is imported or the import time is above the budget.
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py --model-file-path Model/estimator --max-import-ms 500
+"""
+import os
+import sys
+import json
+import argparse
+import subprocess
+
+
+# modules the serving path must not import
+FORBIDDEN_MODULES = (
+    "pandera",
+    "pymongo",
+    "laptopPrice.components",
+    "laptopPrice.data_access",
+    "laptopPrice.pipeline.training_pipeline",
+    "xgboost",
+    "lightgbm",
+    "catboost",
+)
+
+SERVING_MODULE = "laptopPrice.pipeline.prediction_pipeline"
+
+SAMPLE_RECORD = {
+    "Company": "Apple", "TypeName": "Ultrabook", "Ram": 8, "OpSys": "macOS", "Weight": 1.37, "ppi": 226.98,
+    "is_ips": 1, "is_touchscreen": 0, "Cpu_name": "Intel Core i5", "CPU_Speed_GHz": 2.3, "SSD_GB": 128,
+    "HDD_GB": 0, "gpu_brand": "Intel",
+}
+
+START_MARKER = "### serving imports start"
+
+# runs in the child interpreter, the report is the last line of stdout
+CHILD_SCRIPT = """
+import sys, time, json
+print({start_marker!r} , file = sys.stderr , flush = True)
+start = time.perf_counter()
+from {serving_module} import PredictPipeline, CustomData
+from laptopPrice.entity.config_entity import LaptopPricePredictionConfig
+report = {{"import_seconds": time.perf_counter() - start}}
+model_file_path = {model_file_path!r}
+if model_file_path:
+    start = time.perf_counter()
+    pipeline = PredictPipeline(prediction_config = LaptopPricePredictionConfig(model_file_path = model_file_path))
+    report["load_seconds"] = time.perf_counter() - start
+    start = time.perf_counter()
+    pipeline.predict(CustomData(data_dict = {sample_record!r}))
+    report["first_prediction_seconds"] = time.perf_counter() - start
+report["modules"] = sorted(sys.modules)
+print(json.dumps(report))
+"""
+
+
+def parse_import_times(stderr: str) -> list:
+    """
+    Parse the `-X importtime` lines written after the start marker.
+
+    Returns:
+        list: (self us , cumulative us , depth , module name) of every import
+    """
+    import_times = []
+    started = False
+    for line in stderr.splitlines():
+        if line.startswith(START_MARKER):
+            started = True
+            continue
+        if not started or not line.startswith("import time:") or "[us]" in line:
+            continue
+        self_us , cumulative_us , name = line[len("import time:"):].split("|")
+        # nested imports are indented by 2 spaces per level
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        import_times.append((int(self_us) , int(cumulative_us) , depth , name.strip()))
+    return import_times
+
+
+def run_import_time(model_file_path: str = None) -> dict:
+    """
+    Run the serving imports in a fresh interpreter with -X importtime.
+
+    Returns:
+        dict: import / load / first prediction seconds , imported modules and the parsed import times
+    """
+    child_script = CHILD_SCRIPT.format(
+        start_marker = START_MARKER,
+        serving_module = SERVING_MODULE,
+        model_file_path = model_file_path,
+        sample_record = SAMPLE_RECORD
+    )
+    project_dir = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ , PYTHONPATH = os.pathsep.join(filter(None , [project_dir , os.environ.get("PYTHONPATH")])))
+    completed = subprocess.run(
+        [sys.executable , "-X" , "importtime" , "-c" , child_script],
+        capture_output = True , text = True , env = env
+    )
+    if completed.returncode != 0:
+        raise RuntimeError(f"serving imports failed:\n{completed.stderr[-5000:]}")
+
+    report = json.loads(completed.stdout.strip().splitlines()[-1])
+    report["import_times"] = parse_import_times(completed.stderr)
+    return report
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description = "Import time guard of the serving path")
+    parser.add_argument("--model-file-path" , default = None , help = "also load this estimator and predict one record")
+    parser.add_argument("--max-import-ms" , type = float , default = None , help = "fail above this import time")
+    parser.add_argument("--top" , type = int , default = 15 , help = "number of slowest imports printed")
+    args = parser.parse_args()
+
+    report = run_import_time(model_file_path = args.model_file_path)
+
+    top_level = [import_time for import_time in report["import_times"] if import_time[2] == 0]
+    total_import_ms = sum(cumulative_us for _ , cumulative_us , _ , _ in top_level) / 1000
+    print(f"serving import time: {total_import_ms:.1f} ms (wall {report['import_seconds'] * 1000:.1f} ms)")
+    if "load_seconds" in report:
+        print(f"model load: {report['load_seconds'] * 1000:.1f} ms , first prediction: {report['first_prediction_seconds'] * 1000:.1f} ms")
+
+    print(f"slowest {args.top} imports(cumulative ms):")
+    slowest = sorted(report["import_times"] , key = lambda import_time: import_time[1] , reverse = True)[: args.top]
+    for self_us , cumulative_us , depth , name in slowest:
+        print(f"  {cumulative_us / 1000:9.1f}  {'  ' * depth}{name}")
+
+    failures = []
+    imported = set(report["modules"])
+    for module in FORBIDDEN_MODULES:
+        found = sorted(name for name in imported if name == module or name.startswith(f"{module}."))
+        if found:
+            failures.append(f"forbidden module imported by the serving path: {found[0]}")
+    if args.max_import_ms is not None and total_import_ms > args.max_import_ms:
+        failures.append(f"serving import time {total_import_ms:.1f} ms is above the budget of {args.max_import_ms} ms")
+
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,467 @@
+"""
+End to end benchmarks of the training and serving hot paths.
+
+Every (case , rows) runs in a fresh interpreter, so the peak RSS and the first call time(lazy loads , lookup tables)
+belong to that case only. The input rows are synthetic, sampled from notebooks/laptop_data.csv(see synthetic_data.py).
+Results are printed as a table and can be saved as JSON(--output). With --baseline the median latency and peak RSS
+of every case are compared with a saved result, and the script fails when one is above --max-regression.
+
+Cases:
+    feature_engineer_transform      FeatureEngineer.transform of raw rows
+    mean_encoder_transform          MeanEncoder.transform of feature engineered rows
+    predict_dataframe               LaptopPriceEstimator.predict_dataframe of raw rows
+    predict_user_info               LaptopPriceEstimator.predict_user_info of feature engineered rows
+    predict_pipeline_construction   PredictPipeline() , the first call loads the model
+    flask_predict                   Flask round trip , 1 row: POST / , more rows: POST /predict/batch
+    model_factory                   ModelFactory.run_model_factory on a reduced search space of config/params.yaml
+
+Usage:
+    python benchmarks/run_benchmarks.py --model-file-path Model/estimator --output benchmarks/results.json
+    python benchmarks/run_benchmarks.py --cases predict_user_info flask_predict --sizes 1 100 --baseline benchmarks/results.json
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+from datetime import datetime
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0 , PROJECT_DIR)
+
+DATA_SIZES = (1 , 100 , 10_000 , 1_000_000)
+
+CASES = {
+    # case name -> default sizes(rows of a call , training rows of model_factory)
+    "feature_engineer_transform" : DATA_SIZES,
+    "mean_encoder_transform" : DATA_SIZES,
+    "predict_dataframe" : DATA_SIZES,
+    "predict_user_info" : DATA_SIZES,
+    "predict_pipeline_construction" : (1 ,),
+    "flask_predict" : (1 , 100),
+    "model_factory" : (2000 ,),
+}
+
+# model searches of the model_factory case
+MODEL_FACTORY_MODELS = ("XGB" , "LGBM")
+
+PACKAGES = ("numpy" , "pandas" , "scikit-learn" , "xgboost" , "lightgbm" , "catboost" , "flask" , "dill")
+
+RESULT_MARKER = "### benchmark result: "
+
+
+class SkipCase(Exception):
+    """
+    The case can't run in this environment(e.g. no model file).
+    """
+
+
+def get_peak_rss_mb() -> float:
+    # peak resident set size of this process , None where the resource module doesn't exist(windows)
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # kilobytes on linux , bytes on macOS
+    return peak_rss / (1024 * 1024) if sys.platform == "darwin" else peak_rss / 1024
+
+
+def measure(func , time_budget: float , min_repeats: int = 3 , max_repeats: int = 10000 , warmup: bool = True) -> dict:
+    """
+    Call func until time_budget seconds are spent(at least min_repeats times) and summarize the latencies.
+    The first call(lazy loads , caches) is timed separately when warmup is set.
+    """
+    import numpy as np
+
+    first_call_seconds = None
+    if warmup:
+        start = time.perf_counter()
+        func()
+        first_call_seconds = time.perf_counter() - start
+
+    latencies = []
+    start = time.perf_counter()
+    while len(latencies) < max_repeats and (len(latencies) < min_repeats or time.perf_counter() - start < time_budget):
+        call_start = time.perf_counter()
+        func()
+        latencies.append(time.perf_counter() - call_start)
+
+    latencies_ms = np.array(latencies) * 1000
+    p50 , p90 , p99 = np.percentile(latencies_ms , [50 , 90 , 99])
+    return {
+        "repeats" : len(latencies),
+        "total_seconds" : float(latencies_ms.sum() / 1000),
+        "first_call_ms" : first_call_seconds * 1000 if first_call_seconds is not None else None,
+        "latency_ms" : {
+            "mean" : float(latencies_ms.mean()) , "min" : float(latencies_ms.min()) , "max" : float(latencies_ms.max()),
+            "p50" : float(p50) , "p90" : float(p90) , "p99" : float(p99),
+        },
+    }
+
+
+class BenchmarkContext:
+    """
+    Objects shared by the cases of one child process: the estimator(if any) and its components.
+    Without a model file the FeatureEngineer and MeanEncoder are fitted on the reference data.
+    """
+    def __init__(self , model_file_path: str , seed: int):
+        self.model_file_path = model_file_path
+        self.seed = seed
+        self._estimator = None
+        self._components = None
+
+    @property
+    def has_model(self) -> bool:
+        return bool(self.model_file_path) and os.path.exists(self.model_file_path)
+
+    @property
+    def estimator(self) -> object:
+        if not self.has_model:
+            raise SkipCase(f"model file not found: {self.model_file_path}")
+        if self._estimator is None:
+            from laptopPrice.entity.model_bundle import load_estimator
+            self._estimator = load_estimator(file_path = self.model_file_path)
+        return self._estimator
+
+    def raw_rows(self , n_rows: int):
+        from benchmarks.synthetic_data import generate_raw_rows
+        return generate_raw_rows(n_rows = n_rows , seed = self.seed).drop(columns = ["Price"])
+
+    def fitted_components(self) -> tuple:
+        # (FeatureEngineer , MeanEncoder) of the estimator , or fitted on the reference data
+        if self.has_model:
+            return self.estimator.feature_engineering_object , self.estimator.preprocessing_object.steps[0][1]
+        if self._components is not None:
+            return self._components
+
+        import numpy as np
+        from benchmarks.synthetic_data import read_reference_data
+        from laptopPrice.feature_engineering.feature_engineer import FeatureEngineer
+        from laptopPrice.feature_engineering.mean_encoder import MeanEncoder
+
+        reference = read_reference_data()
+        feature_engineer = FeatureEngineer()
+        features = feature_engineer.fit_transform(reference.drop(columns = ["Price"]) , reference["Price"])
+        mean_encoder = MeanEncoder().fit(features , np.log(reference["Price"]))
+        self._components = (feature_engineer , mean_encoder)
+        return self._components
+
+    def feature_rows(self , n_rows: int):
+        feature_engineer , _ = self.fitted_components()
+        features = feature_engineer.transform(self.raw_rows(n_rows))
+        if self.has_model:
+            features = features[self.estimator.get_expected_features()]
+        return features
+
+
+def setup_feature_engineer_transform(context: BenchmarkContext , n_rows: int):
+    feature_engineer , _ = context.fitted_components()
+    rows = context.raw_rows(n_rows)
+    return lambda: feature_engineer.transform(rows)
+
+
+def setup_mean_encoder_transform(context: BenchmarkContext , n_rows: int):
+    _ , mean_encoder = context.fitted_components()
+    rows = context.feature_rows(n_rows)
+    return lambda: mean_encoder.transform(rows)
+
+
+def setup_predict_dataframe(context: BenchmarkContext , n_rows: int):
+    estimator = context.estimator
+    rows = context.raw_rows(n_rows)
+    return lambda: estimator.predict_dataframe(rows)
+
+
+def setup_predict_user_info(context: BenchmarkContext , n_rows: int):
+    estimator = context.estimator
+    rows = context.feature_rows(n_rows)
+    return lambda: estimator.predict_user_info(rows)
+
+
+def setup_predict_pipeline_construction(context: BenchmarkContext , n_rows: int):
+    if not context.has_model:
+        raise SkipCase(f"model file not found: {context.model_file_path}")
+    from laptopPrice.entity.config_entity import LaptopPricePredictionConfig
+    from laptopPrice.pipeline.prediction_pipeline import PredictPipeline
+
+    prediction_config = LaptopPricePredictionConfig(model_file_path = context.model_file_path)
+    return lambda: PredictPipeline(prediction_config = prediction_config)
+
+
+def setup_flask_predict(context: BenchmarkContext , n_rows: int):
+    from itertools import cycle
+    from laptopPrice.constants import PRODUCTION_MODEL_PATH
+    from laptopPrice.entity.model_bundle import get_model_path
+
+    served_model_path = get_model_path(PRODUCTION_MODEL_PATH)
+    if not context.has_model or os.path.abspath(context.model_file_path) != os.path.abspath(served_model_path):
+        raise SkipCase(f"the flask app serves {served_model_path} , run from the project directory with that model file")
+
+    from app import app
+    client = app.test_client()
+    records = context.feature_rows(max(n_rows , 1000)).to_dict("records")
+    if n_rows == 1:
+        requests = cycle([("/" , record) for record in records])
+    else:
+        requests = cycle([("/predict/batch" , records[start : start + n_rows]) for start in range(0 , len(records) - n_rows + 1 , n_rows)])
+
+    def round_trip():
+        url , body = next(requests)
+        response = client.post(url , json = body)
+        if response.status_code != 200:
+            raise RuntimeError(f"{url} returned {response.status_code}: {response.get_data(as_text = True)[:500]}")
+    return round_trip
+
+
+def get_reduced_model_config(model_config: dict , model_names: tuple = MODEL_FACTORY_MODELS , n_values: int = 2) -> dict:
+    """
+    Copy of the model config with only model_names , the first n_values of every search parameter,
+    no ensembles and a small search(cv 3 , 3 candidates).
+    """
+    import copy
+
+    model_config = copy.deepcopy(model_config)
+    model_config["model_selection"] = {
+        name : model_info for name , model_info in model_config.get("model_selection" , {}).items() if name in model_names
+    }
+    for model_info in model_config["model_selection"].values():
+        model_info["search_param_distributions"] = {
+            name : values[:n_values] for name , values in (model_info.get("search_param_distributions") or {}).items()
+        }
+    model_config.pop("ensemble_models" , None)
+
+    search_config = model_config.setdefault(model_config.get("search_strategy" , "random_search") , {})
+    search_params = search_config.setdefault("params" , {})
+    search_params.update({"cv" : 3 , "verbose" : 0})
+    for name in ("n_iter" , "n_candidates"):
+        if name in search_params:
+            search_params[name] = 3
+    return model_config
+
+
+def setup_model_factory(context: BenchmarkContext , n_rows: int):
+    import tempfile
+    import numpy as np
+    from benchmarks.synthetic_data import generate_raw_rows
+    from laptopPrice.constants import MODEL_TRAINER_MODEL_CONFIG_FILE_PATH
+    from laptopPrice.components.data_transformation import DataTransformation
+    from laptopPrice.entity.config_entity import DataTransformationConfig
+    from laptopPrice.feature_engineering.feature_engineer import FeatureEngineer
+    from laptopPrice.utils.common_utils import read_yaml_file , save_yaml_file
+    from laptopPrice.utils.model_factory import ModelFactory
+
+    # train / test arrays made the same way as the training pipeline
+    rows = generate_raw_rows(n_rows = n_rows , seed = context.seed)
+    n_train = int(n_rows * 0.8)
+    X , y = rows.drop(columns = ["Price"]) , rows["Price"]
+    feature_engineer = FeatureEngineer()
+    X_train = feature_engineer.fit_transform(X.iloc[:n_train] , y.iloc[:n_train])
+    X_test = feature_engineer.transform(X.iloc[n_train:])
+    preprocessor = DataTransformation(
+        data_transformation_config = DataTransformationConfig() , data_validation_artifact = None
+    ).get_data_transformation_object()
+    X_train = preprocessor.fit_transform(X_train , y.iloc[:n_train])
+    X_test = preprocessor.transform(X_test)
+    y_train , y_test = np.log(y.iloc[:n_train]).to_numpy() , np.log(y.iloc[n_train:]).to_numpy()
+
+    work_dir = tempfile.mkdtemp(prefix = "model_factory_benchmark_")
+    model_config_path = os.path.join(work_dir , "params.yaml")
+    save_yaml_file(file_path = model_config_path , data = get_reduced_model_config(read_yaml_file(MODEL_TRAINER_MODEL_CONFIG_FILE_PATH)))
+
+    def run_model_factory():
+        model_factory = ModelFactory(
+            model_config_path = model_config_path , tuned_model_report_path = os.path.join(work_dir , "report.yaml")
+        )
+        model_factory.run_model_factory(X_train = X_train , y_train = y_train , X_test = X_test , y_test = y_test)
+    return run_model_factory
+
+
+def run_case(case_name: str , n_rows: int , model_file_path: str , seed: int , time_budget: float) -> dict:
+    """
+    Run one case in this process(the child) and return its result.
+    """
+    import logging
+    # the logs of every call would be part of the timing
+    logging.disable(logging.INFO)
+
+    result = {"case" : case_name , "rows" : n_rows}
+    context = BenchmarkContext(model_file_path = model_file_path , seed = seed)
+    try:
+        func = globals()[f"setup_{case_name}"](context , n_rows)
+    except SkipCase as e:
+        return dict(result , status = "skipped" , reason = str(e))
+
+    result["setup_peak_rss_mb"] = get_peak_rss_mb()
+    if case_name == "model_factory":
+        measured = measure(func , time_budget = 0 , min_repeats = 1 , max_repeats = 1 , warmup = False)
+    else:
+        measured = measure(func , time_budget = time_budget)
+    result.update(measured)
+    result["rows_per_second"] = n_rows * measured["repeats"] / measured["total_seconds"] if measured["total_seconds"] else None
+    result["peak_rss_mb"] = get_peak_rss_mb()
+    result["status"] = "ok"
+    return result
+
+
+def run_case_in_child(case_name: str , n_rows: int , args: argparse.Namespace) -> dict:
+    command = [
+        sys.executable , os.path.abspath(__file__) , "--child-case" , case_name , "--child-rows" , str(n_rows),
+        "--seed" , str(args.seed) , "--time-budget" , str(args.time_budget),
+    ]
+    if args.model_file_path:
+        command += ["--model-file-path" , args.model_file_path]
+    env = dict(os.environ , PYTHONPATH = os.pathsep.join(filter(None , [PROJECT_DIR , os.environ.get("PYTHONPATH")])))
+    # every prediction is computed , a cached prediction would only measure the cache
+    env["PREDICTION_CACHE_ENABLED"] = "false"
+    completed = subprocess.run(command , capture_output = True , text = True , env = env)
+
+    for line in reversed(completed.stdout.splitlines()):
+        if line.startswith(RESULT_MARKER):
+            return json.loads(line[len(RESULT_MARKER):])
+    return {"case" : case_name , "rows" : n_rows , "status" : "failed" , "reason" : completed.stderr[-2000:]}
+
+
+def get_metadata(model_file_path: str) -> dict:
+    from importlib import metadata
+
+    versions = {}
+    for package in PACKAGES:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+
+    model_sha256 = None
+    if model_file_path and os.path.exists(model_file_path):
+        from laptopPrice.utils.common_utils import get_file_hash
+        from laptopPrice.entity.model_bundle import MODEL_BUNDLE_MANIFEST_FILE_NAME , is_model_bundle
+        # the manifest of a bundle has the sha256 of every file of it
+        version_file_path = model_file_path
+        if is_model_bundle(model_file_path):
+            version_file_path = os.path.join(model_file_path , MODEL_BUNDLE_MANIFEST_FILE_NAME)
+        model_sha256 = get_file_hash(version_file_path)
+
+    try:
+        git_commit = subprocess.run(
+            ["git" , "rev-parse" , "HEAD"] , capture_output = True , text = True , cwd = PROJECT_DIR
+        ).stdout.strip() or None
+    except OSError:
+        git_commit = None
+
+    return {
+        "created_at" : datetime.now().isoformat(),
+        "python" : platform.python_version(),
+        "platform" : platform.platform(),
+        "cpu_count" : os.cpu_count(),
+        "packages" : versions,
+        "git_commit" : git_commit,
+        "model_file_path" : model_file_path,
+        "model_sha256" : model_sha256,
+    }
+
+
+def compare_with_baseline(results: list , baseline: dict , max_regression: float) -> list:
+    """
+    Compare the median latency and the peak RSS of every case with the baseline.
+
+    Returns:
+        list: messages of the regressions above max_regression(e.g. 0.2 means 20% slower / larger)
+    """
+    baseline_results = {
+        (result["case"] , result["rows"]) : result for result in baseline.get("results" , []) if result.get("status") == "ok"
+    }
+    regressions = []
+    print(f"\ncompared with the baseline of {baseline.get('metadata' , {}).get('created_at')}:")
+    for result in results:
+        baseline_result = baseline_results.get((result["case"] , result["rows"]))
+        if result.get("status") != "ok" or baseline_result is None:
+            continue
+        for metric , current , previous in (
+            ("p50 latency" , result["latency_ms"]["p50"] , baseline_result["latency_ms"]["p50"]),
+            ("peak rss" , result.get("peak_rss_mb") , baseline_result.get("peak_rss_mb")),
+        ):
+            if not current or not previous:
+                continue
+            change = current / previous - 1
+            print(f"  {result['case']:<30} {result['rows']:>9} {metric:<12} {previous:12.3f} -> {current:12.3f} ({change:+.1%})")
+            if change > max_regression:
+                regressions.append(f"{result['case']} rows={result['rows']} {metric} is {change:+.1%} of the baseline")
+    return regressions
+
+
+def print_result(result: dict) -> None:
+    if result.get("status") != "ok":
+        print(f"{result['case']:<30} {result['rows']:>9} {result['status']}: {result.get('reason' , '').strip()[-300:]}")
+        return
+    first_call_ms = result["first_call_ms"]
+    print(
+        f"{result['case']:<30} {result['rows']:>9} {result['latency_ms']['p50']:>10.3f} {result['latency_ms']['p99']:>10.3f} "
+        f"{first_call_ms if first_call_ms is not None else float('nan'):>10.3f} {result['rows_per_second']:>12.1f} "
+        f"{result['peak_rss_mb'] or float('nan'):>12.1f}"
+    )
+
+
+def main() -> int:
+    from laptopPrice.constants import PRODUCTION_MODEL_PATH
+
+    parser = argparse.ArgumentParser(description = "Benchmarks of the training and serving hot paths")
+    parser.add_argument("--model-file-path" , default = PRODUCTION_MODEL_PATH , help = "estimator of the model cases")
+    parser.add_argument("--cases" , nargs = "+" , choices = sorted(CASES) , default = list(CASES) , help = "cases to run")
+    parser.add_argument("--sizes" , nargs = "+" , type = int , default = None , help = "rows of the cases(default: per case)")
+    parser.add_argument("--time-budget" , type = float , default = 2.0 , help = "seconds spent on the timed calls of a case")
+    parser.add_argument("--seed" , type = int , default = 42 , help = "seed of the synthetic rows")
+    parser.add_argument("--output" , default = None , help = "save the results as JSON(can be used as a baseline later)")
+    parser.add_argument("--baseline" , default = None , help = "JSON result to compare with")
+    parser.add_argument("--max-regression" , type = float , default = 0.2 , help = "allowed slow down / growth vs the baseline")
+    parser.add_argument("--child-case" , default = None , help = argparse.SUPPRESS)
+    parser.add_argument("--child-rows" , type = int , default = None , help = argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.model_file_path:
+        from laptopPrice.entity.model_bundle import get_model_path
+        # Model/estimator.pkl until the first model bundle is pushed
+        args.model_file_path = get_model_path(args.model_file_path)
+
+    if args.child_case:
+        result = run_case(
+            case_name = args.child_case , n_rows = args.child_rows , model_file_path = args.model_file_path ,
+            seed = args.seed , time_budget = args.time_budget
+        )
+        print(RESULT_MARKER + json.dumps(result))
+        return 0
+
+    results = []
+    print(f"{'case':<30} {'rows':>9} {'p50 ms':>10} {'p99 ms':>10} {'first ms':>10} {'rows/s':>12} {'peak rss mb':>12}")
+    for case_name in args.cases:
+        default_sizes = CASES[case_name]
+        # the sizes of --sizes are used for the row based cases , flask and the model factory keep theirs
+        sizes = args.sizes if args.sizes and default_sizes == DATA_SIZES else default_sizes
+        for n_rows in sizes:
+            result = run_case_in_child(case_name = case_name , n_rows = n_rows , args = args)
+            results.append(result)
+            print_result(result)
+
+    report = {"metadata" : get_metadata(args.model_file_path) , "results" : results}
+    if args.output:
+        output_dir = os.path.dirname(args.output)
+        if output_dir:
+            os.makedirs(output_dir , exist_ok = True)
+        with open(args.output , "w") as output_file:
+            json.dump(report , output_file , indent = 2)
+        print(f"results saved to {args.output}")
+
+    failures = [f"{result['case']} rows={result['rows']} failed" for result in results if result["status"] == "failed"]
+    if args.baseline:
+        with open(args.baseline , "r") as baseline_file:
+            failures += compare_with_baseline(results , json.load(baseline_file) , args.max_regression)
+
+    for failure in failures:
+        print(f"FAILED: {failure}")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,51 @@
+"""
+Synthetic laptop rows for the benchmarks, generated from the distributions of notebooks/laptop_data.csv.
+
+Rows are sampled from the reference data with replacement(so the columns keep their joint distribution and the
+categories / raw strings keep their frequencies), and the numerical columns(Inches , Price) get a small
+multiplicative noise so the numbers are not just copies of the reference rows. The raw strings(e.g. Weight "1.37kg")
+are kept as they are, serving sees the same small set of distinct strings.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+REFERENCE_DATA_FILE_PATH = os.path.join(PROJECT_DIR , "notebooks" , "laptop_data.csv")
+
+# relative standard deviation of the noise of the continuous columns
+NOISE_COLUMNS = {"Inches" : 0.01 , "Price" : 0.05}
+
+
+def read_reference_data(file_path: str = REFERENCE_DATA_FILE_PATH) -> pd.DataFrame:
+    return pd.read_csv(file_path)
+
+
+def generate_raw_rows(n_rows: int , seed: int = 42 , reference: pd.DataFrame = None) -> pd.DataFrame:
+    """
+    Raw rows(same columns as the ingested data , including Price).
+
+    Args:
+        n_rows (int): number of rows.
+        seed (int, optional): seed of the sampling and the noise. Defaults to 42.
+        reference (pd.DataFrame, optional): reference data. Defaults to notebooks/laptop_data.csv.
+    """
+    if reference is None:
+        reference = read_reference_data()
+    rng = np.random.default_rng(seed)
+
+    rows = reference.iloc[rng.integers(0 , len(reference) , size = n_rows)].reset_index(drop = True)
+    for column , noise in NOISE_COLUMNS.items():
+        if column in rows.columns:
+            rows[column] = (rows[column] * rng.normal(1.0 , noise , size = n_rows)).round(2)
+    return rows
+
+
+def generate_records(n_rows: int , seed: int = 42 , reference: pd.DataFrame = None) -> list:
+    """
+    Raw rows as list of dict(without Price), like the records of a batch request.
+    """
+    rows = generate_raw_rows(n_rows = n_rows , seed = seed , reference = reference)
+    return rows.drop(columns = ["Price"] , errors = "ignore").to_dict("records")
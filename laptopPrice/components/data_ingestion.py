@@ -1,119 +1,240 @@
-import os 
-import sys 
-
-from pandas import DataFrame
-from sklearn.model_selection import train_test_split
-
-from laptopPrice.logger import logging
-from laptopPrice.exception import LaptopException
-from laptopPrice.entity.config_entity import DataIngestionConfig
-from laptopPrice.entity.artifact_entity import DataIngestionArtifact
-from laptopPrice.data_access import LaptopData
-from laptopPrice.utils.common_utils import save_csv_file
-
-class DataIngestion:
-    def __init__(self , data_ingestion_config : DataIngestionConfig = DataIngestionConfig()):
-        self.data_ingestion_config = data_ingestion_config
-    
-    def export_data_into_feature_store(self) -> DataFrame:
-        """ 
-        This method exports data from the database and save as a csv file(raw data file)
-        """
-        try:
-            logging.info("Entered into export_data_into_feature_store method.")
-            
-            laptop_data_obj = LaptopData()
-            dataframe = laptop_data_obj.export_collection_data_as_dataframe(
-                collection_name = self.data_ingestion_config.collection_name
-            )
-            
-            logging.info("Data conversion from Collection to DataFrame successful")
-            logging.info(f"Shape of the dataframe: {dataframe.shape}")
-            
-            # save the full raw dataset into feature store
-            feature_store_file_path = self.data_ingestion_config.feature_store_file_path
-            # feature_store_dir_name = os.path.dirname(feature_store_file_path)
-            
-            # make the directory
-            # os.makedirs(feature_store_dir_name , exist_ok = True)
-            
-            logging.info(f"Saving exported data into feature store file path: {feature_store_file_path}")
-            # dataframe.to_csv(feature_store_file_path , index = False , header = True)
-            
-            save_csv_file(
-                file_path = feature_store_file_path , data = dataframe
-            )
-            
-            return dataframe
-             
-        except Exception as e:
-            raise LaptopException(e , sys)
-    
-    
-    def split_data_as_train_test_validation_set(self , dataframe: DataFrame) -> None:
-        """
-        This method splits the dataframe into train set , test set and validation set based on split ratio.
-        Then save the train , test and validation set as csv file inside ingested directory.
-        """ 
-        
-        logging.info("Entered split_data_as_train_test method of data_ingestion")
-        
-        try:
-            # step-1: split test set
-            train_validation_data , test_set = train_test_split(
-                dataframe , test_size = self.data_ingestion_config.test_size , random_state = 42
-            )
-            # Step 2: Calculate validation proportion relative to remaining train + val
-            val_relative_size = self.data_ingestion_config.validation_size / (1 - self.data_ingestion_config.test_size)
-            # step-3: split train and validation set
-            train_set , validation_set = train_test_split(
-                train_validation_data , test_size = val_relative_size , random_state = 42
-            )
-            
-            logging.info("Data Splited into 3 parts. Train , Test and validation")
-            logging.info(f"Train shape:[{train_set.shape}]. Test shape:[{test_set.shape}]. Validation shape:[{validation_set.shape}]")
-            
-            # now save these 3 data sets.
-            save_csv_file(
-                file_path = self.data_ingestion_config.training_file_path , data = train_set
-            )
-            save_csv_file(
-                file_path = self.data_ingestion_config.testing_file_path , data = test_set
-            )
-            save_csv_file(
-                file_path = self.data_ingestion_config.validation_file_path , data = validation_set
-            )
-            
-            logging.info("Saved train , test and validation data as csv file")
-        except Exception as e:
-            raise LaptopException(e , sys)
-    
-    
-    def initiate_data_ingestion(self) -> DataIngestionArtifact:
-        """This method initiates the data ingestion components of training pipeline.
-           Merge to method export_data_into_feature_store and split_data_as_train_test_validation_set.
-           
-        Returns:
-            DataIngestionArtifact: DataIngestionArtifact object 
-        """
-        
-        try:
-            # step-01: Get the full data
-            dataframe = self.export_data_into_feature_store() 
-            logging.info("from initiate_data_ingestion: Got the data from mongodb as Dataframe")
-            
-            # 2. do the train validation test set split
-            self.split_data_as_train_test_validation_set(dataframe = dataframe)
-            
-            # 3. make the data ingestion artifact
-            data_ingestion_artifact = DataIngestionArtifact(
-                train_file_path = self.data_ingestion_config.training_file_path,
-                test_file_path = self.data_ingestion_config.testing_file_path,
-                validation_file_path = self.data_ingestion_config.validation_file_path
-            )
-            logging.info("Returning data_ingestion_artifact object from initiate_data_ingestion method")
-            return data_ingestion_artifact
-
-        except Exception as e:
-            raise LaptopException(e , sys)
+import os 
+import sys 
+import hashlib
+from datetime import datetime , timedelta
+
+import numpy as np
+from pandas import DataFrame
+from sklearn.model_selection import train_test_split
+
+from laptopPrice.logger import logging
+from laptopPrice.exception import LaptopException
+from laptopPrice.entity.config_entity import DataIngestionConfig
+from laptopPrice.entity.artifact_entity import DataIngestionArtifact
+from laptopPrice.data_access import LaptopData
+from laptopPrice.data_access.feature_store import IncrementalFeatureStore
+from laptopPrice.configuration.schema_config import get_schema_config
+from laptopPrice.utils.common_utils import save_dataframe , read_dataframe
+
+
+def get_hash_fractions(ids) -> np.ndarray:
+    """
+    md5 of every document id as a number in [0 , 1). The same id always gets the same number,
+    so the split of a document doesn't change when other documents are added.
+    """
+    return np.array(
+        [int.from_bytes(hashlib.md5(str(doc_id).encode("utf-8")).digest()[:8] , "big") / 2 ** 64 for doc_id in ids],
+        dtype = np.float64
+    )
+
+
+class DataIngestion:
+    def __init__(self , data_ingestion_config : DataIngestionConfig = DataIngestionConfig()):
+        self.data_ingestion_config = data_ingestion_config
+    
+    def export_data_into_feature_store(self) -> DataFrame:
+        """ 
+        This method exports data from the database and save as a csv / parquet / feather file(raw data file)
+        """
+        try:
+            logging.info("Entered into export_data_into_feature_store method.")
+            
+            if self.data_ingestion_config.incremental_export:
+                return self.export_incremental_data_into_feature_store()
+            
+            laptop_data_obj = LaptopData()
+            
+            if self.data_ingestion_config.streaming_export:
+                # write the collection into the feature store chunk by chunk, then read the file once
+                feature_store_file_path = self.data_ingestion_config.feature_store_file_path
+                n_rows = laptop_data_obj.export_collection_to_file(
+                    collection_name = self.data_ingestion_config.collection_name,
+                    file_path = feature_store_file_path,
+                    batch_size = self.data_ingestion_config.export_batch_size,
+                    chunk_size = self.data_ingestion_config.export_chunk_size,
+                    compression = self.data_ingestion_config.file_compression,
+                    dtypes = get_schema_config().dtypes
+                )
+                logging.info(f"Streamed {n_rows} rows into feature store file path: {feature_store_file_path}")
+                return read_dataframe(file_path = feature_store_file_path)
+            
+            dataframe = laptop_data_obj.export_collection_data_as_dataframe(
+                collection_name = self.data_ingestion_config.collection_name
+            )
+            
+            logging.info("Data conversion from Collection to DataFrame successful")
+            logging.info(f"Shape of the dataframe: {dataframe.shape}")
+            
+            # save the full raw dataset into feature store
+            feature_store_file_path = self.data_ingestion_config.feature_store_file_path
+            # feature_store_dir_name = os.path.dirname(feature_store_file_path)
+            
+            # make the directory
+            # os.makedirs(feature_store_dir_name , exist_ok = True)
+            
+            logging.info(f"Saving exported data into feature store file path: {feature_store_file_path}")
+            # dataframe.to_csv(feature_store_file_path , index = False , header = True)
+            
+            save_dataframe(
+                file_path = feature_store_file_path , data = dataframe , compression = self.data_ingestion_config.file_compression
+            )
+            
+            return dataframe
+             
+        except Exception as e:
+            raise LaptopException(e , sys)
+    
+    
+    def export_incremental_data_into_feature_store(self) -> DataFrame:
+        """ 
+        This method exports only the documents added / changed after the watermark of the last run,
+        appends them to the incremental feature store and returns the merged feature store(with the document id column).
+        
+        The watermark is the last update time field of the documents. Documents updated up to watermark_lag_seconds
+        before the watermark are pulled again, so late writes are not missed(the store keeps the last version of a document).
+        Deleted documents stay in the store: delete incremental_store_dir to rebuild it from the whole collection.
+        """
+        try:
+            logging.info("Entered into export_incremental_data_into_feature_store method.")
+            
+            if self.data_ingestion_config.watermark_field == "_id":
+                raise ValueError(
+                    "Incremental export needs a last update time field as watermark_field(DATA_INGESTION_WATERMARK_FIELD). "
+                    "With _id updated documents are never pulled again"
+                )
+            
+            feature_store = IncrementalFeatureStore(
+                store_dir = self.data_ingestion_config.incremental_store_dir,
+                id_column = self.data_ingestion_config.id_column,
+                watermark_field = self.data_ingestion_config.watermark_field,
+                file_format = self.data_ingestion_config.file_format,
+                compression = self.data_ingestion_config.file_compression,
+                max_parts = self.data_ingestion_config.incremental_store_max_parts
+            )
+            watermark = feature_store.watermark
+            logging.info(f"Watermark of [{self.data_ingestion_config.collection_name}]: {watermark}")
+            if isinstance(watermark , datetime):
+                watermark = watermark - timedelta(seconds = self.data_ingestion_config.watermark_lag_seconds)
+            
+            # 1. pull the delta into the next part file
+            delta_file_path = feature_store.get_new_part_file_path()
+            n_rows , new_watermark = LaptopData().export_collection_delta_to_file(
+                collection_name = self.data_ingestion_config.collection_name,
+                file_path = delta_file_path,
+                watermark_field = self.data_ingestion_config.watermark_field,
+                watermark = watermark,
+                batch_size = self.data_ingestion_config.export_batch_size,
+                chunk_size = self.data_ingestion_config.export_chunk_size,
+                compression = self.data_ingestion_config.file_compression,
+                dtypes = get_schema_config().dtypes
+            )
+            
+            # 2. add it to the store, nothing is written when there is no new document
+            # the watermark never moves back(the lag pulls documents older than the stored watermark)
+            if feature_store.watermark is not None and (new_watermark is None or new_watermark < feature_store.watermark):
+                new_watermark = feature_store.watermark
+            if n_rows > 0:
+                feature_store.commit_part(file_path = delta_file_path , n_rows = n_rows , watermark = new_watermark)
+            logging.info(f"Pulled {n_rows} new / changed rows. New watermark: {new_watermark}")
+            
+            # 3. merged store, the last version of every document
+            return feature_store.read_dataframe()
+        except Exception as e:
+            raise LaptopException(e , sys)
+    
+    
+    def split_data_by_document_id(self , dataframe: DataFrame) -> tuple:
+        """
+        Deterministic train , test and validation split by the hash of the document id.
+        A document keeps its set across runs as long as test_size and validation_size don't change.
+        Rows are ordered by the hash inside every set, so the order is shuffled but the same in every run.
+        """
+        id_column = self.data_ingestion_config.id_column
+        fractions = get_hash_fractions(dataframe[id_column])
+        test_size = self.data_ingestion_config.test_size
+        validation_size = self.data_ingestion_config.validation_size
+        
+        # the document id and the update time field are not features
+        dataframe = dataframe.drop(
+            columns = [column for column in (id_column , self.data_ingestion_config.watermark_field) if column in dataframe.columns]
+        )
+        order = np.argsort(fractions , kind = "stable")
+        dataframe , fractions = dataframe.iloc[order] , fractions[order]
+        
+        test_set = dataframe[fractions < test_size]
+        validation_set = dataframe[(fractions >= test_size) & (fractions < test_size + validation_size)]
+        train_set = dataframe[fractions >= test_size + validation_size]
+        return train_set , test_set , validation_set
+    
+    
+    def split_data_as_train_test_validation_set(self , dataframe: DataFrame) -> None:
+        """
+        This method splits the dataframe into train set , test set and validation set based on split ratio.
+        Then save the train , test and validation set as csv / parquet / feather file inside ingested directory.
+        """ 
+        
+        logging.info("Entered split_data_as_train_test method of data_ingestion")
+        
+        try:
+            if self.data_ingestion_config.id_column in dataframe.columns:
+                # incremental feature store: existing documents keep their set
+                train_set , test_set , validation_set = self.split_data_by_document_id(dataframe = dataframe)
+            else:
+                # step-1: split test set
+                train_validation_data , test_set = train_test_split(
+                    dataframe , test_size = self.data_ingestion_config.test_size , random_state = 42
+                )
+                # Step 2: Calculate validation proportion relative to remaining train + val
+                val_relative_size = self.data_ingestion_config.validation_size / (1 - self.data_ingestion_config.test_size)
+                # step-3: split train and validation set
+                train_set , validation_set = train_test_split(
+                    train_validation_data , test_size = val_relative_size , random_state = 42
+                )
+            
+            logging.info("Data Splited into 3 parts. Train , Test and validation")
+            logging.info(f"Train shape:[{train_set.shape}]. Test shape:[{test_set.shape}]. Validation shape:[{validation_set.shape}]")
+            
+            # now save these 3 data sets.
+            save_dataframe(
+                file_path = self.data_ingestion_config.training_file_path , data = train_set , compression = self.data_ingestion_config.file_compression
+            )
+            save_dataframe(
+                file_path = self.data_ingestion_config.testing_file_path , data = test_set , compression = self.data_ingestion_config.file_compression
+            )
+            save_dataframe(
+                file_path = self.data_ingestion_config.validation_file_path , data = validation_set , compression = self.data_ingestion_config.file_compression
+            )
+            
+            logging.info(f"Saved train , test and validation data as {self.data_ingestion_config.file_format} file")
+        except Exception as e:
+            raise LaptopException(e , sys)
+    
+    
+    def initiate_data_ingestion(self) -> DataIngestionArtifact:
+        """This method initiates the data ingestion components of training pipeline.
+           Merge to method export_data_into_feature_store and split_data_as_train_test_validation_set.
+           
+        Returns:
+            DataIngestionArtifact: DataIngestionArtifact object 
+        """
+        
+        try:
+            # step-01: Get the full data
+            dataframe = self.export_data_into_feature_store() 
+            logging.info("from initiate_data_ingestion: Got the data from mongodb as Dataframe")
+            
+            # 2. do the train validation test set split
+            self.split_data_as_train_test_validation_set(dataframe = dataframe)
+            
+            # 3. make the data ingestion artifact
+            data_ingestion_artifact = DataIngestionArtifact(
+                train_file_path = self.data_ingestion_config.training_file_path,
+                test_file_path = self.data_ingestion_config.testing_file_path,
+                validation_file_path = self.data_ingestion_config.validation_file_path
+            )
+            logging.info("Returning data_ingestion_artifact object from initiate_data_ingestion method")
+            return data_ingestion_artifact
+
+        except Exception as e:
+            raise LaptopException(e , sys)
         
\ No newline at end of file
@@ -0,0 +1,104 @@
+import os
+import sys
+import threading
+from dataclasses import dataclass
+from types import MappingProxyType
+from typing import Dict, FrozenSet, Mapping, Tuple
+
+from laptopPrice.logger import logging
+from laptopPrice.exception import LaptopException
+from laptopPrice.constants import SCHEMA_FILE_PATH
+from laptopPrice.utils.common_utils import read_yaml_file
+
+
+def _freeze(value: object) -> object:
+    # read only view of the parsed yaml: dict -> MappingProxyType , list -> tuple
+    if isinstance(value , dict):
+        return MappingProxyType({key : _freeze(item) for key , item in value.items()})
+    if isinstance(value , list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+@dataclass(frozen = True)
+class SchemaConfig:
+    """
+    Immutable parsed config/schema.yaml with the structures derived from it.
+
+    Use get_schema_config to get it, the file is parsed once per (path , modification time) and the same
+    object is shared by FeatureEngineer, LaptopPriceEstimator, DataValidation and DataTransformation.
+    """
+    file_path : str
+    columns : Tuple[str , ...]
+    numerical_columns : Tuple[str , ...]
+    categorical_columns : Tuple[str , ...]
+    drop_columns : Tuple[str , ...]
+    pandera_columns : Mapping[str , Mapping]
+    # derived structures
+    column_set : FrozenSet[str]
+    numerical_column_set : FrozenSet[str]
+    categorical_column_set : FrozenSet[str]
+    allowed_values : Mapping[str , FrozenSet]  # column -> allowed values , only the columns which have them
+    dtypes : Mapping[str , str]  # column -> pandera dtype , only the columns which have it
+
+    @classmethod
+    def from_dict(cls , schema: dict , file_path: str = None) -> "SchemaConfig":
+        """
+        Build the schema config from the parsed yaml dict.
+        """
+        pandera_columns = _freeze(schema.get("pandera_columns") or {})
+        columns = tuple(schema.get("columns") or ())
+        numerical_columns = tuple(schema.get("numerical_columns") or ())
+        categorical_columns = tuple(schema.get("categorical_columns") or ())
+        return cls(
+            file_path = file_path,
+            columns = columns,
+            numerical_columns = numerical_columns,
+            categorical_columns = categorical_columns,
+            drop_columns = tuple(schema.get("drop_columns") or ()),
+            pandera_columns = pandera_columns,
+            column_set = frozenset(columns),
+            numerical_column_set = frozenset(numerical_columns),
+            categorical_column_set = frozenset(categorical_columns),
+            allowed_values = MappingProxyType({
+                column : frozenset(props["allowed_values"])
+                for column , props in pandera_columns.items() if "allowed_values" in props
+            }),
+            dtypes = MappingProxyType({
+                column : props["dtype"] for column , props in pandera_columns.items() if "dtype" in props
+            })
+        )
+
+
+# (absolute path , modification time , size) -> SchemaConfig
+_schema_configs : Dict[tuple , SchemaConfig] = {}
+_lock = threading.Lock()
+
+
+def get_schema_config(file_path: str = SCHEMA_FILE_PATH) -> SchemaConfig:
+    """
+    Returns the SchemaConfig of the schema file, parsed only when the file is new or was modified.
+
+    Args:
+        file_path (str, optional): Path of the schema yaml. Defaults to SCHEMA_FILE_PATH.
+
+    Raises:
+        LaptopException: If the schema file can't be read.
+    """
+    try:
+        absolute_path = os.path.abspath(file_path)
+        file_stat = os.stat(absolute_path)
+        key = (absolute_path , file_stat.st_mtime_ns , file_stat.st_size)
+
+        with _lock:
+            schema_config = _schema_configs.get(key)
+            if schema_config is None:
+                schema_config = SchemaConfig.from_dict(read_yaml_file(file_path = absolute_path) , file_path = absolute_path)
+                # an older version of the same file is never used again
+                for old_key in [old_key for old_key in _schema_configs if old_key[0] == absolute_path]:
+                    del _schema_configs[old_key]
+                _schema_configs[key] = schema_config
+                logging.info(f"Schema config loaded from: {absolute_path}")
+        return schema_config
+    except Exception as e:
+        raise LaptopException(e , sys)
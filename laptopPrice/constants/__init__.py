@@ -1,69 +1,185 @@
-import os 
-from dotenv import load_dotenv 
-
-load_dotenv()
-
-
-# database related constants
-DATABASE_CONNECTION_URL = os.getenv("mongo_connection_url")
-DATABASE_NAME = "laptop_price"
-COLLECTION_NAME = "laptop_price_collection"
-
-FILE_NAME = "laptop.csv" # Raw data file name
-
-PIPELINE_NAME : str = "laptop_price"
-
-ARTIFACT_DIR : str = "artifacts"
-
-TRAIN_FILE_NAME = "train.csv"
-TEST_FILE_NAME = "test.csv"
-VALIDATION_FILE_NAME = "validation.csv"
-
-PREPROCESSOR_OBJECT_FILE_NAME = "preprocessor.pkl"
-FEATURE_ENGINEERING_FILE_NAME = "feature_engineering_object.pkl"
-MODEL_FILE_NAME = "model.pkl"
-
-TARGET_COLUMN : str = "Price"
-SCHEMA_FILE_PATH = os.path.join("config" , "schema.yaml")
-
-
-
-
-# Data Ingestion related constants
-DATA_INGESTION_COLLECTION_NAME : str = COLLECTION_NAME # mongo collection name
-DATA_INGESTION_DIR_NAME : str = "data_ingestion"
-DATA_INGESTION_FEATURE_STORE_DIR : str = "feature_store"
-DATA_INGESTION_INGESTED_DIR : str = "ingested"
-DATA_INGESTION_TEST_SIZE : float = 0.15 # test set size
-DATA_INGESTION_VALIDATION_SIZE : float = 0.15 # Validation set size
-
-
-# Data validation Constants
-DATA_VALIDATION_DIR_NAME : str = "data_validation"
-DATA_VALIDATION_DRIFT_REPORT_DIR : str = "drift_report"
-DATA_VALIDATION_DRIFT_REPORT_FILE_NAME : str = "report.yaml"
-
-
-# Data Transformation Constants
-DATA_TRANSFORMATION_DIR_NAME : str = "data_transformation"
-DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR : str = "transformed_data"
-DATA_TRANSFORMATION_PREPROCESSOR_OBJECT_DIR : str = "transformed_object"
-
-
-# Model Trainer realted contant start with MODEL_TRAINER
-MODEL_TRAINER_DIR_NAME : str = "model_trainer"
-# trained model path
-MODEL_TRAINER_TRAINED_MODEL_DIR : str = "trained_model"
-MODEL_TRAINER_TRAINED_MODEL_NAME : str = "recent_trained_model.pkl"
-# Path to model.yaml
-MODEL_TRAINER_MODEL_CONFIG_FILE_PATH : str = os.path.join("config" , "params.yaml")
-MODEL_TRAINER_EXPECTED_SCORE : float = 0.75 # minimal r2 score
-# Reports directory for tuned models
-MODEL_TRAINER_ALL_MODEL_REPORT_DIR: str = "all_model_report"
-# File path where all tuned models' details will be saved
-MODEL_TRAINER_ALL_TUNED_MODEL_REPORT_FILE_PATH: str = "all_tuned_model_report.yaml"
-MODEL_TRAINER_ESTIMATOR_OBJECT_FILE_NAME : str = "estimator.pkl"
-
-
-# Model Evaluation related constants
-PRODUCTION_MODEL_PATH : str = os.path.join("Model" , "estimator.pkl")
\ No newline at end of file
+import os 
+
+
+def __getattr__(name: str):
+    # the .env file is only read when the database url is used(training), not when serving imports the constants
+    if name == "DATABASE_CONNECTION_URL":
+        from dotenv import load_dotenv
+        load_dotenv()
+        return os.getenv("mongo_connection_url")
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+# Logging related constants
+LOGGING_LEVEL : str = os.getenv("LOGGING_LEVEL" , "INFO").upper()
+# log records are put into a queue and written by a listener thread instead of by the caller(opt-in)
+LOGGING_ASYNC_ENABLED : bool = os.getenv("LOGGING_ASYNC_ENABLED" , "false").lower() == "true"
+# records above this many waiting in the queue are dropped, logging never blocks a request
+LOGGING_QUEUE_MAX_SIZE : int = int(os.getenv("LOGGING_QUEUE_MAX_SIZE" , 10000))
+# level per subsystem(logger name prefix), e.g. "laptopPrice.pipeline=WARNING,laptopPrice.components=DEBUG"
+LOGGING_SUBSYSTEM_LEVELS : str = os.getenv("LOGGING_SUBSYSTEM_LEVELS" , "")
+# fraction of the INFO / DEBUG records kept per subsystem, e.g. "laptopPrice.pipeline.prediction_pipeline=0.01"
+LOGGING_SAMPLE_RATES : str = os.getenv("LOGGING_SAMPLE_RATES" , "")
+
+
+# database related constants
+DATABASE_NAME = "laptop_price"
+COLLECTION_NAME = "laptop_price_collection"
+
+FILE_NAME = "laptop.csv" # Raw data file name
+
+PIPELINE_NAME : str = "laptop_price"
+
+ARTIFACT_DIR : str = "artifacts"
+
+TRAIN_FILE_NAME = "train.csv"
+TEST_FILE_NAME = "test.csv"
+VALIDATION_FILE_NAME = "validation.csv"
+
+PREPROCESSOR_OBJECT_FILE_NAME = "preprocessor.pkl"
+FEATURE_ENGINEERING_FILE_NAME = "feature_engineering_object.pkl"
+MODEL_FILE_NAME = "model.pkl"
+
+TARGET_COLUMN : str = "Price"
+SCHEMA_FILE_PATH = os.path.join("config" , "schema.yaml")
+
+
+
+
+# Data Ingestion related constants
+DATA_INGESTION_COLLECTION_NAME : str = COLLECTION_NAME # mongo collection name
+DATA_INGESTION_DIR_NAME : str = "data_ingestion"
+DATA_INGESTION_FEATURE_STORE_DIR : str = "feature_store"
+DATA_INGESTION_INGESTED_DIR : str = "ingested"
+DATA_INGESTION_TEST_SIZE : float = 0.15 # test set size
+DATA_INGESTION_VALIDATION_SIZE : float = 0.15 # Validation set size
+# stream the collection into the feature store file instead of loading it as one dataframe(opt-in)
+DATA_INGESTION_STREAMING_EXPORT : bool = os.getenv("DATA_INGESTION_STREAMING_EXPORT" , "false").lower() == "true"
+DATA_INGESTION_EXPORT_BATCH_SIZE : int = 1000 # documents per mongo round trip
+DATA_INGESTION_EXPORT_CHUNK_SIZE : int = 10000 # rows written to the feature store at a time
+# file format of feature store and train/test/validation files: csv | parquet | feather(parquet / feather are opt-in)
+DATA_INGESTION_FILE_FORMAT : str = os.getenv("DATA_INGESTION_FILE_FORMAT" , "csv").lower()
+DATA_INGESTION_FILE_COMPRESSION : str = "zstd" # used by parquet and feather
+# pull only the documents added / changed since the last run into a feature store kept across runs(artifacts/feature_store/<collection>)
+# opt-in: the documents need a last update time field, and the train / test / validation split is by the hash of the document id
+# deleted documents stay in the store, delete the store directory to rebuild it from the whole collection in the next run
+DATA_INGESTION_INCREMENTAL_EXPORT : bool = os.getenv("DATA_INGESTION_INCREMENTAL_EXPORT" , "false").lower() == "true"
+DATA_INGESTION_INCREMENTAL_STORE_DIR : str = os.path.join(ARTIFACT_DIR , "feature_store")
+# last update time field of the documents(set on every insert and update). "_id" only finds new documents and is rejected
+DATA_INGESTION_WATERMARK_FIELD : str = os.getenv("DATA_INGESTION_WATERMARK_FIELD" , "updated_at")
+# documents updated up to this many seconds before the watermark are pulled again(late writes with an older update time)
+DATA_INGESTION_WATERMARK_LAG_SECONDS : float = float(os.getenv("DATA_INGESTION_WATERMARK_LAG_SECONDS" , 300))
+DATA_INGESTION_ID_COLUMN : str = "_id" # document id column of the incremental feature store
+DATA_INGESTION_INCREMENTAL_STORE_MAX_PARTS : int = 20 # delta files kept before they are compacted into one
+
+
+# Data validation Constants
+DATA_VALIDATION_DIR_NAME : str = "data_validation"
+DATA_VALIDATION_DRIFT_REPORT_DIR : str = "drift_report"
+DATA_VALIDATION_DRIFT_REPORT_FILE_NAME : str = "report.yaml"
+
+
+# Data Transformation Constants
+DATA_TRANSFORMATION_DIR_NAME : str = "data_transformation"
+DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR : str = "transformed_data"
+DATA_TRANSFORMATION_PREPROCESSOR_OBJECT_DIR : str = "transformed_object"
+# features and target are saved as separate .npy files so they can be memory mapped
+DATA_TRANSFORMATION_FEATURES_FILE_SUFFIX : str = "_features.npy"
+DATA_TRANSFORMATION_TARGET_FILE_SUFFIX : str = "_target.npy"
+# dtype of the feature arrays: float32 | float64. tree models work on float32, so float32 avoids a copy while fitting
+DATA_TRANSFORMATION_FEATURES_DTYPE : str = "float32"
+
+
+# Model Trainer realted contant start with MODEL_TRAINER
+MODEL_TRAINER_DIR_NAME : str = "model_trainer"
+# trained model path
+MODEL_TRAINER_TRAINED_MODEL_DIR : str = "trained_model"
+MODEL_TRAINER_TRAINED_MODEL_NAME : str = "recent_trained_model.pkl"
+# Path to model.yaml
+MODEL_TRAINER_MODEL_CONFIG_FILE_PATH : str = os.path.join("config" , "params.yaml")
+MODEL_TRAINER_EXPECTED_SCORE : float = 0.75 # minimal r2 score
+# Reports directory for tuned models
+MODEL_TRAINER_ALL_MODEL_REPORT_DIR: str = "all_model_report"
+# File path where all tuned models' details will be saved
+MODEL_TRAINER_ALL_TUNED_MODEL_REPORT_FILE_PATH: str = "all_tuned_model_report.yaml"
+MODEL_TRAINER_ESTIMATOR_OBJECT_FILE_NAME : str = "estimator.pkl"
+# export the best tree model into packed numpy arrays used for the predictions
+MODEL_TRAINER_COMPILE_TREE_ENSEMBLE : bool = True
+# max absolute difference allowed between the compiled and the library predictions on the validation data
+MODEL_TRAINER_TREE_ENSEMBLE_TOLERANCE : float = 1e-6
+
+
+# Training pipeline stage cache related constants
+# reuse the outputs of a previous run for the stages whose inputs , config and code didn't change(opt-in)
+TRAINING_PIPELINE_STAGE_CACHE_ENABLED : bool = os.getenv("TRAINING_PIPELINE_STAGE_CACHE_ENABLED" , "false").lower() == "true"
+TRAINING_PIPELINE_STAGE_CACHE_DIR : str = os.path.join(ARTIFACT_DIR , "stage_cache")
+# versions of these packages are part of the stage fingerprints
+TRAINING_PIPELINE_STAGE_CACHE_PACKAGES : tuple = (
+    "numpy" , "pandas" , "scikit-learn" , "xgboost" , "lightgbm" , "catboost" , "pandera" , "pyarrow" , "dill"
+)
+
+# json report of the stage timings , written into the artifact directory of the run
+TRAINING_PIPELINE_RUN_REPORT_FILE_NAME : str = "run_report.json"
+
+
+# Instrumentation related constants
+# wall time , cpu time and peak memory of the training stages and the prediction steps
+INSTRUMENTATION_ENABLED : bool = os.getenv("INSTRUMENTATION_ENABLED" , "true").lower() == "true"
+# metric names on /metrics are <prefix>_span_seconds , <prefix>_span_cpu_seconds_total , ...
+INSTRUMENTATION_METRICS_PREFIX : str = "laptop_price"
+# upper bounds(seconds) of the wall time histogram buckets
+INSTRUMENTATION_HISTOGRAM_BUCKETS : tuple = (
+    0.0005 , 0.001 , 0.0025 , 0.005 , 0.01 , 0.025 , 0.05 , 0.1 , 0.25 , 0.5 , 1.0 , 2.5 , 5.0 , 10.0 , 30.0 , 60.0 , 300.0 , 1800.0
+)
+
+
+# Model Evaluation related constants
+# production estimator as a model bundle directory(manifest + npy + native model files) or as a single dill
+# pickle(MODEL_BUNDLE_ENABLED=false). Until the first bundle is pushed, Model/estimator.pkl is loaded instead
+# of the missing Model/estimator directory
+MODEL_BUNDLE_ENABLED : bool = os.getenv("MODEL_BUNDLE_ENABLED" , "true").lower() == "true"
+PRODUCTION_MODEL_PATH : str = os.path.join("Model" , "estimator") if MODEL_BUNDLE_ENABLED else os.path.join("Model" , "estimator.pkl")
+
+
+# Prediction related constants
+# max number of records accepted by the /predict/batch endpoint
+PREDICTION_BATCH_MAX_RECORDS : int = int(os.getenv("PREDICTION_BATCH_MAX_RECORDS" , 1000))
+# micro batching of single record requests(disabled by default)
+PREDICTION_MICRO_BATCHING_ENABLED : bool = os.getenv("PREDICTION_MICRO_BATCHING_ENABLED" , "false").lower() == "true"
+PREDICTION_MICRO_BATCH_MAX_SIZE : int = int(os.getenv("PREDICTION_MICRO_BATCH_MAX_SIZE" , 32))
+PREDICTION_MICRO_BATCH_MAX_WAIT_MS : float = float(os.getenv("PREDICTION_MICRO_BATCH_MAX_WAIT_MS" , 5))
+PREDICTION_MICRO_BATCH_REQUEST_TIMEOUT_SECONDS : float = 30.0
+# shared model serving(disabled by default): the large arrays of the estimator are saved once per model version
+# into Model/shared/<version>/ and memory mapped read only by every worker, so their pages are shared by the workers
+SERVING_SHARED_MODEL_ENABLED : bool = os.getenv("SERVING_SHARED_MODEL_ENABLED" , "false").lower() == "true"
+SERVING_SHARED_MODEL_DIR : str = os.getenv("SERVING_SHARED_MODEL_DIR" , os.path.join("Model" , "shared"))
+# numpy arrays / bytes smaller than this stay in the pickle
+SERVING_SHARED_MODEL_MIN_BYTES : int = 4096
+# cache of the predictions of single records, invalidated when the production model changes(opt-in)
+PREDICTION_CACHE_ENABLED : bool = os.getenv("PREDICTION_CACHE_ENABLED" , "false").lower() == "true"
+# "memory"(per worker process) or "sqlite"(shared by the worker processes of a host)
+PREDICTION_CACHE_BACKEND : str = os.getenv("PREDICTION_CACHE_BACKEND" , "memory")
+PREDICTION_CACHE_MAX_SIZE : int = int(os.getenv("PREDICTION_CACHE_MAX_SIZE" , 10000))
+PREDICTION_CACHE_TTL_SECONDS : float = float(os.getenv("PREDICTION_CACHE_TTL_SECONDS" , 3600))
+PREDICTION_CACHE_SQLITE_PATH : str = os.getenv("PREDICTION_CACHE_SQLITE_PATH" , os.path.join("prediction_cache" , "predictions.sqlite3"))
+
+# Batch scoring related constants
+# rows read , sent to a worker and written at once
+BATCH_SCORING_CHUNK_SIZE : int = int(os.getenv("BATCH_SCORING_CHUNK_SIZE" , 50000))
+# worker processes, each loads the estimator once. 1 scores in the main process
+BATCH_SCORING_WORKERS : int = int(os.getenv("BATCH_SCORING_WORKERS" , os.cpu_count() or 1))
+# chunks read ahead per worker, bounds the memory of the chunks waiting for their predictions
+BATCH_SCORING_MAX_PENDING_CHUNKS_PER_WORKER : int = 2
+BATCH_SCORING_PREDICTION_COLUMN : str = "predicted_price"
+
+# ASGI(uvicorn) serving related constants
+ASGI_HOST : str = os.getenv("ASGI_HOST" , "0.0.0.0")
+ASGI_PORT : int = int(os.getenv("ASGI_PORT" , 8000))
+# uvicorn worker processes, every worker preloads the model at startup
+ASGI_WORKERS : int = int(os.getenv("ASGI_WORKERS" , 1))
+# predictions run in a "thread" or "process" pool of each worker
+ASGI_PREDICTION_POOL_KIND : str = os.getenv("ASGI_PREDICTION_POOL_KIND" , "thread")
+ASGI_PREDICTION_POOL_SIZE : int = int(os.getenv("ASGI_PREDICTION_POOL_SIZE" , os.cpu_count() or 1))
+# requests waiting for or running in the pool, above this the request gets 503
+ASGI_PREDICTION_MAX_PENDING : int = int(os.getenv("ASGI_PREDICTION_MAX_PENDING" , 64))
+ASGI_RETRY_AFTER_SECONDS : int = 1
\ No newline at end of file
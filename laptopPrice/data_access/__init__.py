@@ -1,53 +1,182 @@
-import sys 
-import os 
-import pandas as pd 
-import numpy as np 
-
-from laptopPrice.logger import logging
-from laptopPrice.exception import LaptopException
-from laptopPrice.configuration.mongo_connection import MongoDbClient
-
-
-class LaptopData:
-    """ 
-    This class helps to export entire mongo db record as pandas dataframe
-    """
-    
-    def __init__(self):
-        # get the database connection
-        try:
-            self.mongo_client = MongoDbClient() 
-        except Exception as e:
-            raise LaptopException(e , sys)
-    
-    def export_collection_data_as_dataframe(self , collection_name: str) -> pd.DataFrame:
-        """Get all the data from the database collection as dict.
-        Convert the dict into dataframe.
-        Drop the mongodb default _id value.
-
-        Args:
-            collection_name (str): from which collection we want to export the data.
-
-        Returns:
-            pd.DataFrame: dataframe object.
-        """
-        
-        try:
-            collection = self.mongo_client.database[collection_name]
-            
-            # get all the data and convert them into dataframe
-            df = pd.DataFrame(list(collection.find()))
-            logging.info(f"Got the dataframe from mongoDb. Shape: [{df.shape}]")
-            
-            # remove the _id column
-            if '_id' in df.columns.to_list():
-                df.drop(columns = ['_id'] , axis = 1 , inplace = True) 
-            
-            logging.info(f"After dropping _id column dataframe shape: [{df.shape}]")
-            
-            # replace na with NaN
-            df.replace({"na" : np.nan} , inplace = True)
-            
-            return df 
-        except Exception as e:
-            raise LaptopException(e , sys)
\ No newline at end of file
+import sys 
+import os 
+from typing import Iterator , Tuple
+import pandas as pd 
+import numpy as np 
+
+from laptopPrice.logger import logging
+from laptopPrice.exception import LaptopException
+from laptopPrice.configuration.mongo_connection import MongoDbClient
+from laptopPrice.utils.common_utils import DataFrameFileWriter
+
+
+class LaptopData:
+    """ 
+    This class helps to export entire mongo db record as pandas dataframe
+    """
+    
+    def __init__(self):
+        # get the database connection
+        try:
+            self.mongo_client = MongoDbClient() 
+        except Exception as e:
+            raise LaptopException(e , sys)
+    
+    def export_collection_data_as_dataframe(self , collection_name: str) -> pd.DataFrame:
+        """Get all the data from the database collection as dict.
+        Convert the dict into dataframe.
+        Drop the mongodb default _id value.
+
+        Args:
+            collection_name (str): from which collection we want to export the data.
+
+        Returns:
+            pd.DataFrame: dataframe object.
+        """
+        
+        try:
+            collection = self.mongo_client.database[collection_name]
+            
+            # get all the data and convert them into dataframe
+            df = pd.DataFrame(list(collection.find()))
+            logging.info(f"Got the dataframe from mongoDb. Shape: [{df.shape}]")
+            
+            # remove the _id column
+            if '_id' in df.columns.to_list():
+                df.drop(columns = ['_id'] , axis = 1 , inplace = True) 
+            
+            logging.info(f"After dropping _id column dataframe shape: [{df.shape}]")
+            
+            # replace na with NaN
+            df.replace({"na" : np.nan} , inplace = True)
+            
+            return df 
+        except Exception as e:
+            raise LaptopException(e , sys)
+    
+    def iterate_collection_chunks(self , collection_name: str , batch_size: int = 1000 , chunk_size: int = 10000 ,
+                                  query: dict = None , include_id: bool = False) -> Iterator[pd.DataFrame]:
+        """Stream the collection as dataframe chunks without holding the whole collection in memory.
+        _id is excluded on the server with a projection and "na" values become NaN while the columns are built.
+        The dtypes of a column are inferred per chunk and may differ between chunks(e.g. int64 / float64 when some values are missing),
+        DataFrameFileWriter fixes them with the dtypes of the schema.
+
+        Args:
+            collection_name (str): from which collection we want to export the data.
+            batch_size (int, optional): number of documents fetched from the server per round trip. Defaults to 1000.
+            chunk_size (int, optional): number of rows of each yielded dataframe. Defaults to 10000.
+            query (dict, optional): mongo filter of the documents. Defaults to None(all documents).
+            include_id (bool, optional): keep _id as a string column. Defaults to False.
+
+        Yields:
+            pd.DataFrame: chunk of the collection
+        """
+        try:
+            collection = self.mongo_client.database[collection_name]
+            cursor = collection.find(query or {} , None if include_id else {"_id" : 0} , batch_size = batch_size)
+            
+            columns = {} # column name -> list of values of current chunk
+            n_rows = 0
+            for document in cursor:
+                if include_id:
+                    document["_id"] = str(document["_id"])
+                for key , value in document.items():
+                    if key not in columns:
+                        columns[key] = [np.nan] * n_rows # column first seen in the middle of the chunk
+                    columns[key].append(np.nan if isinstance(value , str) and value == "na" else value)
+                n_rows += 1
+                
+                # documents without some of the columns
+                for values in columns.values():
+                    if len(values) < n_rows:
+                        values.append(np.nan)
+                
+                if n_rows == chunk_size:
+                    yield pd.DataFrame(columns)
+                    columns = {key : [] for key in columns}
+                    n_rows = 0
+            
+            if n_rows > 0:
+                yield pd.DataFrame(columns)
+        except Exception as e:
+            raise LaptopException(e , sys)
+    
+    def export_collection_to_file(self , collection_name: str , file_path: str , batch_size: int = 1000 , chunk_size: int = 10000 ,
+                                  compression: str = None , dtypes: dict = None) -> int:
+        """Stream the collection straight into a csv / parquet / feather file(by extension) chunk by chunk.
+        Every chunk is written with the same dtypes, a column that first appears after the first chunk raises an error.
+
+        Args:
+            collection_name (str): from which collection we want to export the data.
+            file_path (str): feature store file path.
+            batch_size (int, optional): number of documents fetched from the server per round trip. Defaults to 1000.
+            chunk_size (int, optional): number of rows written at a time. Defaults to 10000.
+            compression (str, optional): compression codec of parquet / feather files. Defaults to None.
+            dtypes (dict, optional): column -> schema.yaml dtype(e.g. SchemaConfig.dtypes). Defaults to None(dtypes of the first chunk).
+
+        Returns:
+            int: number of exported rows
+        """
+        try:
+            with DataFrameFileWriter(file_path = file_path , compression = compression , dtypes = dtypes) as writer:
+                for chunk in self.iterate_collection_chunks(collection_name = collection_name , batch_size = batch_size , chunk_size = chunk_size):
+                    writer.write(chunk)
+                    logging.info(f"Exported {writer.n_rows} rows from [{collection_name}] into {file_path}")
+            
+            return writer.n_rows
+        except Exception as e:
+            raise LaptopException(e , sys)
+    
+    def export_collection_delta_to_file(self , collection_name: str , file_path: str , watermark_field: str = "_id" , watermark: object = None ,
+                                        batch_size: int = 1000 , chunk_size: int = 10000 , compression: str = None , dtypes: dict = None) -> Tuple[int , object]:
+        """Stream the documents added / changed after the watermark into a csv / parquet / feather file.
+        The _id of the documents is kept as a string column so the delta can be merged by document id.
+
+        With watermark_field "_id" only new documents are found(the ObjectId holds the creation time).
+        With a last update time field(e.g. updated_at) changed documents are found as well. That field should be indexed,
+        and documents with exactly the watermark time are pulled again because a later write can have the same time.
+
+        Args:
+            collection_name (str): from which collection we want to export the data.
+            file_path (str): delta file path.
+            watermark_field (str, optional): "_id" or a last update time field. Defaults to "_id".
+            watermark (object, optional): max watermark field value of the previous export. Defaults to None(all documents).
+            batch_size (int, optional): number of documents fetched from the server per round trip. Defaults to 1000.
+            chunk_size (int, optional): number of rows written at a time. Defaults to 10000.
+            compression (str, optional): compression codec of parquet / feather files. Defaults to None.
+            dtypes (dict, optional): column -> schema.yaml dtype(e.g. SchemaConfig.dtypes). Defaults to None(dtypes of the first chunk).
+
+        Returns:
+            Tuple[int , object]: number of exported rows and the new watermark(None if nothing was exported)
+        """
+        try:
+            query = {}
+            if watermark is not None:
+                query = {watermark_field : {"$gt" if watermark_field == "_id" else "$gte" : watermark}}
+            
+            new_watermark = None
+            dtypes = {**(dtypes or {}) , "_id" : "str"}
+            with DataFrameFileWriter(file_path = file_path , compression = compression , dtypes = dtypes) as writer:
+                chunks = self.iterate_collection_chunks(
+                    collection_name = collection_name , batch_size = batch_size , chunk_size = chunk_size ,
+                    query = query , include_id = True
+                )
+                for chunk in chunks:
+                    # ObjectId hex strings have a fixed length, so their max is the max ObjectId
+                    chunk_watermark = chunk[watermark_field].max() if watermark_field in chunk.columns else None
+                    if not pd.isna(chunk_watermark) and (new_watermark is None or chunk_watermark > new_watermark):
+                        new_watermark = chunk_watermark
+                    writer.write(chunk)
+                    logging.info(f"Exported {writer.n_rows} new / changed rows from [{collection_name}] into {file_path}")
+            
+            if writer.n_rows == 0 or new_watermark is None:
+                return writer.n_rows , watermark
+            
+            if watermark_field == "_id":
+                from bson import ObjectId
+                new_watermark = ObjectId(new_watermark)
+            elif isinstance(new_watermark , pd.Timestamp):
+                new_watermark = new_watermark.to_pydatetime()
+            return writer.n_rows , new_watermark
+        except Exception as e:
+            raise LaptopException(e , sys)
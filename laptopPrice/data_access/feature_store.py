@@ -0,0 +1,175 @@
+import os
+import sys
+import json
+from datetime import datetime
+from typing import Optional
+
+import pandas as pd
+
+from laptopPrice.logger import logging
+from laptopPrice.exception import LaptopException
+from laptopPrice.utils.common_utils import read_dataframe , save_dataframe , change_file_format
+
+
+STATE_FILE_NAME = "state.json"
+
+
+def _encode_watermark(watermark: object) -> Optional[dict]:
+    # json value of the watermark with its type , ObjectId is kept as its hex string
+    if watermark is None:
+        return None
+    if isinstance(watermark , datetime):
+        return {"type" : "datetime" , "value" : watermark.isoformat()}
+    if type(watermark).__name__ == "ObjectId":
+        return {"type" : "objectid" , "value" : str(watermark)}
+    if hasattr(watermark , "item"): # numpy scalar
+        watermark = watermark.item()
+    return {"type" : "value" , "value" : watermark}
+
+
+def _decode_watermark(encoded: Optional[dict]) -> object:
+    if encoded is None:
+        return None
+    if encoded["type"] == "datetime":
+        return datetime.fromisoformat(encoded["value"])
+    if encoded["type"] == "objectid":
+        from bson import ObjectId
+        return ObjectId(encoded["value"])
+    return encoded["value"]
+
+
+class IncrementalFeatureStore:
+    """
+    Local append-only feature store of one mongo collection.
+
+    Every ingestion appends the new / changed documents as a part file and moves the watermark
+    (max value of the watermark field seen so far) forward. The state(watermark and the parts) is saved
+    in state.json of the store directory and only after the part file is complete, so a failed run leaves
+    the store as it was. Reading the store concatenates the parts and keeps the last version of every document id.
+    When there are more than max_parts parts they are compacted into one part.
+
+    Deleted documents are not seen by a watermark query, they stay in the store until it is rebuilt.
+    """
+    def __init__(self , store_dir: str , id_column: str = "_id" , watermark_field: str = "_id" ,
+                 file_format: str = "parquet" , compression: str = None , max_parts: int = 20):
+        """
+        Args:
+            store_dir (str): directory of the store, one directory per collection.
+            id_column (str, optional): column with the document id(as string). Defaults to "_id".
+            watermark_field (str, optional): "_id" or a last update time field of the documents. Defaults to "_id".
+            file_format (str, optional): csv , parquet or feather. Defaults to "parquet".
+            compression (str, optional): compression codec of parquet / feather parts. Defaults to None.
+            max_parts (int, optional): number of parts above which the store is compacted. Defaults to 20.
+        """
+        self.store_dir = store_dir
+        self.id_column = id_column
+        self.watermark_field = watermark_field
+        self.file_format = file_format
+        self.compression = compression
+        self.max_parts = max_parts
+        self.state_file_path = os.path.join(store_dir , STATE_FILE_NAME)
+        self.state = self._load_state()
+
+    def _load_state(self) -> dict:
+        empty_state = {"watermark_field" : self.watermark_field , "watermark" : None , "next_part_id" : 0 , "parts" : []}
+        if not os.path.exists(self.state_file_path):
+            return empty_state
+
+        with open(self.state_file_path , "r") as state_file:
+            state = json.load(state_file)
+        if state.get("watermark_field") != self.watermark_field:
+            # the old watermark can't be compared with the new field, pull everything once and merge by id
+            logging.info(
+                f"Watermark field changed from {state.get('watermark_field')} to {self.watermark_field} , "
+                f"the next ingestion pulls the whole collection"
+            )
+            state["watermark_field"] = self.watermark_field
+            state["watermark"] = None
+        return state
+
+    def _save_state(self) -> None:
+        # write and rename, the state file is always complete
+        os.makedirs(self.store_dir , exist_ok = True)
+        self.state["updated_at"] = datetime.now().isoformat()
+        temp_file_path = f"{self.state_file_path}.tmp"
+        with open(temp_file_path , "w") as state_file:
+            json.dump(self.state , state_file , indent = 2)
+        os.replace(temp_file_path , self.state_file_path)
+
+    @property
+    def watermark(self) -> object:
+        """
+        Max value of the watermark field of the ingested documents, None for an empty store.
+        """
+        return _decode_watermark(self.state["watermark"])
+
+    @property
+    def n_parts(self) -> int:
+        return len(self.state["parts"])
+
+    def get_new_part_file_path(self) -> str:
+        """
+        Path of the next part file. It is part of the store only after commit_part.
+        """
+        part_file_name = change_file_format(f"part-{self.state['next_part_id']:05d}.csv" , self.file_format)
+        return os.path.join(self.store_dir , part_file_name)
+
+    def commit_part(self , file_path: str , n_rows: int , watermark: object) -> None:
+        """
+        Add a written part file to the store and move the watermark forward.
+
+        Args:
+            file_path (str): part file from get_new_part_file_path.
+            n_rows (int): number of rows of the part.
+            watermark (object): max value of the watermark field in the part.
+        """
+        try:
+            self.state["parts"].append({"file_name" : os.path.basename(file_path) , "n_rows" : int(n_rows)})
+            self.state["next_part_id"] += 1
+            if watermark is not None:
+                self.state["watermark"] = _encode_watermark(watermark)
+            self._save_state()
+            logging.info(f"Committed part {file_path} with {n_rows} rows , watermark: {self.state['watermark']}")
+
+            if self.n_parts > self.max_parts:
+                self.compact()
+        except Exception as e:
+            raise LaptopException(e , sys)
+
+    def read_dataframe(self) -> pd.DataFrame:
+        """
+        Merged store: the parts in order, with only the last version of every document id.
+        """
+        try:
+            if not self.state["parts"]:
+                return pd.DataFrame(columns = [self.id_column])
+
+            parts = [
+                read_dataframe(file_path = os.path.join(self.store_dir , part["file_name"])) for part in self.state["parts"]
+            ]
+            dataframe = pd.concat(parts , ignore_index = True) if len(parts) > 1 else parts[0]
+            dataframe = dataframe.drop_duplicates(subset = [self.id_column] , keep = "last" , ignore_index = True)
+            logging.info(f"Read {len(parts)} parts from feature store {self.store_dir}. Shape: [{dataframe.shape}]")
+            return dataframe
+        except Exception as e:
+            raise LaptopException(e , sys)
+
+    def compact(self) -> None:
+        """
+        Rewrite the merged store as a single part and remove the old parts.
+        """
+        try:
+            old_parts = list(self.state["parts"])
+            dataframe = self.read_dataframe()
+            file_path = self.get_new_part_file_path()
+            save_dataframe(file_path = file_path , data = dataframe , compression = self.compression)
+
+            # the new state points to the compacted part before the old parts are removed
+            self.state["parts"] = [{"file_name" : os.path.basename(file_path) , "n_rows" : len(dataframe)}]
+            self.state["next_part_id"] += 1
+            self._save_state()
+            for part in old_parts:
+                os.remove(os.path.join(self.store_dir , part["file_name"]))
+            logging.info(f"Compacted {len(old_parts)} parts of feature store {self.store_dir} into {file_path}")
+        except Exception as e:
+            raise LaptopException(e , sys)
@@ -1,100 +1,185 @@
-import os 
-from laptopPrice.constants import *
-from dataclasses import dataclass
-from datetime import datetime
-
-TIMESTAMP : str = datetime.now().strftime("%m_%d_%Y_%H_%M_%S")
-
-@dataclass
-class TrainingPipelineConfig:
-    pipeline_name : str = PIPELINE_NAME
-    artifact_dir : str = os.path.join(ARTIFACT_DIR , TIMESTAMP)
-    timestamp = TIMESTAMP
-
-training_pipeline_config : TrainingPipelineConfig = TrainingPipelineConfig()
-
-@dataclass
-class DataIngestionConfig:
-    data_ingestion_dir : str = os.path.join(training_pipeline_config.artifact_dir , DATA_INGESTION_DIR_NAME)
-    feature_store_file_path : str = os.path.join(data_ingestion_dir , DATA_INGESTION_FEATURE_STORE_DIR , FILE_NAME)
-    training_file_path : str = os.path.join(data_ingestion_dir , DATA_INGESTION_INGESTED_DIR , TRAIN_FILE_NAME)
-    testing_file_path : str = os.path.join(data_ingestion_dir , DATA_INGESTION_INGESTED_DIR , TEST_FILE_NAME)
-    validation_file_path : str = os.path.join(data_ingestion_dir , DATA_INGESTION_INGESTED_DIR , VALIDATION_FILE_NAME)
-    test_size : float = DATA_INGESTION_TEST_SIZE
-    validation_size : float = DATA_INGESTION_VALIDATION_SIZE
-    collection_name : str = DATA_INGESTION_COLLECTION_NAME
-    
-
-@dataclass
-class DataValidationConfig:
-    # artifact/timestamp/data_validation/
-    data_validation_dir : str = os.path.join(training_pipeline_config.artifact_dir , DATA_VALIDATION_DIR_NAME)
-    # artifact/timestamp/data_validation/drift_report/report.yaml
-    data_drift_file_path : str = os.path.join(data_validation_dir , DATA_VALIDATION_DRIFT_REPORT_DIR , DATA_VALIDATION_DRIFT_REPORT_FILE_NAME)
-    # schema file path
-    schema_file_path : str = SCHEMA_FILE_PATH
-
-
-@dataclass
-class DataTransformationConfig:
-    # artifact/timestamp/data_transformation/
-    data_transformation_dir : str = os.path.join(training_pipeline_config.artifact_dir , DATA_TRANSFORMATION_DIR_NAME)
-    # artifact/timestamp/data_transformation/transformed_data/train.npy
-    transformed_train_data_file_path : str = os.path.join(
-        data_transformation_dir , DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR , 
-        TRAIN_FILE_NAME.replace("csv" , "npy")
-    )
-    # artifact/timestamp/data_transformation/transformed_data/validation.npy
-    transformed_validation_data_file_path : str = os.path.join(
-        data_transformation_dir , DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR , 
-        VALIDATION_FILE_NAME.replace("csv" , "npy")
-    )
-    # artifact/timestamp/data_transformation/transformed_object/preprocessor.pkl
-    transformed_object_file_path : str = os.path.join(
-        data_transformation_dir , DATA_TRANSFORMATION_PREPROCESSOR_OBJECT_DIR , PREPROCESSOR_OBJECT_FILE_NAME 
-    )
-    # artifact/timestamp/data_transformation/transformed_object/feature_engineering_object.pkl
-    feature_engineering_object_file_path : str = os.path.join(
-        data_transformation_dir , DATA_TRANSFORMATION_PREPROCESSOR_OBJECT_DIR , FEATURE_ENGINEERING_FILE_NAME 
-    )
-
-
-@dataclass
-class ModelTrainerConfig:
-    # artifact/timestamp/model_trainer
-    model_trainer_dir : str = os.path.join(training_pipeline_config.artifact_dir , MODEL_TRAINER_DIR_NAME)
-    # artifact/timestamp/model_trainer/trained_model/model.pkl
-    trained_model_file_path : str = os.path.join(
-        model_trainer_dir , MODEL_TRAINER_TRAINED_MODEL_DIR , MODEL_TRAINER_TRAINED_MODEL_NAME
-    )
-    expected_accuracy : float = MODEL_TRAINER_EXPECTED_SCORE
-    model_config_file_path : str = MODEL_TRAINER_MODEL_CONFIG_FILE_PATH
-    
-    # directory to store all tuned model reports
-    # artifact/timestamp/model_trainer/"all_model_report"/"all_tuned_model_report.yaml" 
-    all_models_report_file_path : str = os.path.join(
-        model_trainer_dir , MODEL_TRAINER_ALL_MODEL_REPORT_DIR , MODEL_TRAINER_ALL_TUNED_MODEL_REPORT_FILE_PATH
-    )
-    trained_estimator_object_file_path : str = os.path.join(
-        model_trainer_dir , MODEL_TRAINER_TRAINED_MODEL_DIR , MODEL_TRAINER_ESTIMATOR_OBJECT_FILE_NAME
-    )
-
-
-# production model 
-@dataclass
-class ModelEvaluationConfig:
-    # production/model.pkl
-    production_model_path : str = PRODUCTION_MODEL_PATH
-    # at least this much improvement is required to accept a model
-    model_evaluation_threshold : float = 0.01
-
-
-@dataclass
-class ModelPusherConfig:
-    production_model_path : str = PRODUCTION_MODEL_PATH
-
-
-@dataclass
-class LaptopPricePredictionConfig:
-    model_file_path : str = PRODUCTION_MODEL_PATH
-    
\ No newline at end of file
+import os 
+from laptopPrice.constants import *
+from laptopPrice.utils.common_utils import change_file_format
+from dataclasses import dataclass
+from datetime import datetime
+
+TIMESTAMP : str = datetime.now().strftime("%m_%d_%Y_%H_%M_%S")
+
+@dataclass
+class TrainingPipelineConfig:
+    pipeline_name : str = PIPELINE_NAME
+    artifact_dir : str = os.path.join(ARTIFACT_DIR , TIMESTAMP)
+    timestamp = TIMESTAMP
+    # artifact/timestamp/run_report.json , timings of the stages of the run
+    run_report_file_path : str = os.path.join(artifact_dir , TRAINING_PIPELINE_RUN_REPORT_FILE_NAME)
+
+training_pipeline_config : TrainingPipelineConfig = TrainingPipelineConfig()
+
+@dataclass
+class DataIngestionConfig:
+    data_ingestion_dir : str = os.path.join(training_pipeline_config.artifact_dir , DATA_INGESTION_DIR_NAME)
+    file_format : str = DATA_INGESTION_FILE_FORMAT
+    file_compression : str = DATA_INGESTION_FILE_COMPRESSION
+    feature_store_file_path : str = os.path.join(data_ingestion_dir , DATA_INGESTION_FEATURE_STORE_DIR , change_file_format(FILE_NAME , file_format))
+    training_file_path : str = os.path.join(data_ingestion_dir , DATA_INGESTION_INGESTED_DIR , change_file_format(TRAIN_FILE_NAME , file_format))
+    testing_file_path : str = os.path.join(data_ingestion_dir , DATA_INGESTION_INGESTED_DIR , change_file_format(TEST_FILE_NAME , file_format))
+    validation_file_path : str = os.path.join(data_ingestion_dir , DATA_INGESTION_INGESTED_DIR , change_file_format(VALIDATION_FILE_NAME , file_format))
+    test_size : float = DATA_INGESTION_TEST_SIZE
+    validation_size : float = DATA_INGESTION_VALIDATION_SIZE
+    collection_name : str = DATA_INGESTION_COLLECTION_NAME
+    streaming_export : bool = DATA_INGESTION_STREAMING_EXPORT
+    export_batch_size : int = DATA_INGESTION_EXPORT_BATCH_SIZE
+    export_chunk_size : int = DATA_INGESTION_EXPORT_CHUNK_SIZE
+    incremental_export : bool = DATA_INGESTION_INCREMENTAL_EXPORT
+    # artifacts/feature_store/laptop_price_collection/ , not inside the timestamp directory
+    incremental_store_dir : str = os.path.join(DATA_INGESTION_INCREMENTAL_STORE_DIR , DATA_INGESTION_COLLECTION_NAME)
+    watermark_field : str = DATA_INGESTION_WATERMARK_FIELD
+    watermark_lag_seconds : float = DATA_INGESTION_WATERMARK_LAG_SECONDS
+    id_column : str = DATA_INGESTION_ID_COLUMN
+    incremental_store_max_parts : int = DATA_INGESTION_INCREMENTAL_STORE_MAX_PARTS
+    
+
+@dataclass
+class DataValidationConfig:
+    # artifact/timestamp/data_validation/
+    data_validation_dir : str = os.path.join(training_pipeline_config.artifact_dir , DATA_VALIDATION_DIR_NAME)
+    # artifact/timestamp/data_validation/drift_report/report.yaml
+    data_drift_file_path : str = os.path.join(data_validation_dir , DATA_VALIDATION_DRIFT_REPORT_DIR , DATA_VALIDATION_DRIFT_REPORT_FILE_NAME)
+    # schema file path
+    schema_file_path : str = SCHEMA_FILE_PATH
+
+
+@dataclass
+class DataTransformationConfig:
+    # artifact/timestamp/data_transformation/
+    data_transformation_dir : str = os.path.join(training_pipeline_config.artifact_dir , DATA_TRANSFORMATION_DIR_NAME)
+    # artifact/timestamp/data_transformation/transformed_data/train_features.npy
+    transformed_train_features_file_path : str = os.path.join(
+        data_transformation_dir , DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR , 
+        TRAIN_FILE_NAME.replace(".csv" , DATA_TRANSFORMATION_FEATURES_FILE_SUFFIX)
+    )
+    # artifact/timestamp/data_transformation/transformed_data/train_target.npy
+    transformed_train_target_file_path : str = os.path.join(
+        data_transformation_dir , DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR , 
+        TRAIN_FILE_NAME.replace(".csv" , DATA_TRANSFORMATION_TARGET_FILE_SUFFIX)
+    )
+    # artifact/timestamp/data_transformation/transformed_data/validation_features.npy
+    transformed_validation_features_file_path : str = os.path.join(
+        data_transformation_dir , DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR , 
+        VALIDATION_FILE_NAME.replace(".csv" , DATA_TRANSFORMATION_FEATURES_FILE_SUFFIX)
+    )
+    # artifact/timestamp/data_transformation/transformed_data/validation_target.npy
+    transformed_validation_target_file_path : str = os.path.join(
+        data_transformation_dir , DATA_TRANSFORMATION_TRANSFORMED_DATA_DIR , 
+        VALIDATION_FILE_NAME.replace(".csv" , DATA_TRANSFORMATION_TARGET_FILE_SUFFIX)
+    )
+    features_dtype : str = DATA_TRANSFORMATION_FEATURES_DTYPE
+    # artifact/timestamp/data_transformation/transformed_object/preprocessor.pkl
+    transformed_object_file_path : str = os.path.join(
+        data_transformation_dir , DATA_TRANSFORMATION_PREPROCESSOR_OBJECT_DIR , PREPROCESSOR_OBJECT_FILE_NAME 
+    )
+    # artifact/timestamp/data_transformation/transformed_object/feature_engineering_object.pkl
+    feature_engineering_object_file_path : str = os.path.join(
+        data_transformation_dir , DATA_TRANSFORMATION_PREPROCESSOR_OBJECT_DIR , FEATURE_ENGINEERING_FILE_NAME 
+    )
+
+
+@dataclass
+class ModelTrainerConfig:
+    # artifact/timestamp/model_trainer
+    model_trainer_dir : str = os.path.join(training_pipeline_config.artifact_dir , MODEL_TRAINER_DIR_NAME)
+    # artifact/timestamp/model_trainer/trained_model/model.pkl
+    trained_model_file_path : str = os.path.join(
+        model_trainer_dir , MODEL_TRAINER_TRAINED_MODEL_DIR , MODEL_TRAINER_TRAINED_MODEL_NAME
+    )
+    expected_accuracy : float = MODEL_TRAINER_EXPECTED_SCORE
+    model_config_file_path : str = MODEL_TRAINER_MODEL_CONFIG_FILE_PATH
+    
+    # directory to store all tuned model reports
+    # artifact/timestamp/model_trainer/"all_model_report"/"all_tuned_model_report.yaml" 
+    all_models_report_file_path : str = os.path.join(
+        model_trainer_dir , MODEL_TRAINER_ALL_MODEL_REPORT_DIR , MODEL_TRAINER_ALL_TUNED_MODEL_REPORT_FILE_PATH
+    )
+    trained_estimator_object_file_path : str = os.path.join(
+        model_trainer_dir , MODEL_TRAINER_TRAINED_MODEL_DIR , MODEL_TRAINER_ESTIMATOR_OBJECT_FILE_NAME
+    )
+    compile_tree_ensemble : bool = MODEL_TRAINER_COMPILE_TREE_ENSEMBLE
+    tree_ensemble_tolerance : float = MODEL_TRAINER_TREE_ENSEMBLE_TOLERANCE
+
+
+@dataclass
+class StageCacheConfig:
+    enabled : bool = TRAINING_PIPELINE_STAGE_CACHE_ENABLED
+    # artifacts/stage_cache/<stage name>/<fingerprint>.pkl , kept across runs
+    cache_dir : str = TRAINING_PIPELINE_STAGE_CACHE_DIR
+    packages : tuple = TRAINING_PIPELINE_STAGE_CACHE_PACKAGES
+
+
+# production model 
+@dataclass
+class ModelEvaluationConfig:
+    # production/model.pkl
+    production_model_path : str = PRODUCTION_MODEL_PATH
+    # at least this much improvement is required to accept a model
+    model_evaluation_threshold : float = 0.01
+
+
+@dataclass
+class ModelPusherConfig:
+    production_model_path : str = PRODUCTION_MODEL_PATH
+    # push the estimator as a model bundle directory instead of copying its pickle
+    model_bundle_enabled : bool = MODEL_BUNDLE_ENABLED
+
+
+@dataclass
+class LaptopPricePredictionConfig:
+    model_file_path : str = PRODUCTION_MODEL_PATH
+    # directory of the memory mapped estimators , None loads the pickle into every worker
+    shared_model_dir : str = SERVING_SHARED_MODEL_DIR if SERVING_SHARED_MODEL_ENABLED else None
+
+
+@dataclass
+class MicroBatchConfig:
+    enabled : bool = PREDICTION_MICRO_BATCHING_ENABLED
+    # a batch is sent to the model when it has max_batch_size records or max_wait_ms is passed since its first record
+    max_batch_size : int = PREDICTION_MICRO_BATCH_MAX_SIZE
+    max_wait_ms : float = PREDICTION_MICRO_BATCH_MAX_WAIT_MS
+    request_timeout_seconds : float = PREDICTION_MICRO_BATCH_REQUEST_TIMEOUT_SECONDS
+
+
+@dataclass
+class PredictionCacheConfig:
+    enabled : bool = PREDICTION_CACHE_ENABLED
+    backend : str = PREDICTION_CACHE_BACKEND
+    max_size : int = PREDICTION_CACHE_MAX_SIZE
+    # 0 means the entries don't expire
+    ttl_seconds : float = PREDICTION_CACHE_TTL_SECONDS
+    sqlite_path : str = PREDICTION_CACHE_SQLITE_PATH
+
+
+@dataclass
+class BatchScoringConfig:
+    # raw listings(csv / parquet / feather) in the column format of config/schema.yaml
+    input_file_path : str
+    # input columns + the prediction column , csv / parquet / feather by the extension
+    output_file_path : str
+    model_file_path : str = PRODUCTION_MODEL_PATH
+    chunk_size : int = BATCH_SCORING_CHUNK_SIZE
+    n_workers : int = BATCH_SCORING_WORKERS
+    max_pending_chunks_per_worker : int = BATCH_SCORING_MAX_PENDING_CHUNKS_PER_WORKER
+    prediction_column : str = BATCH_SCORING_PREDICTION_COLUMN
+    # compression codec of parquet / feather output(e.g. zstd , snappy)
+    compression : str = None
+
+
+@dataclass
+class AsgiServingConfig:
+    host : str = ASGI_HOST
+    port : int = ASGI_PORT
+    workers : int = ASGI_WORKERS
+    pool_kind : str = ASGI_PREDICTION_POOL_KIND
+    pool_size : int = ASGI_PREDICTION_POOL_SIZE
+    # requests above max_pending are rejected with 503 instead of waiting in an unbounded queue
+    max_pending : int = ASGI_PREDICTION_MAX_PENDING
+    retry_after_seconds : int = ASGI_RETRY_AFTER_SECONDS
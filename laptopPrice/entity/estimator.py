@@ -1,122 +1,341 @@
-import sys 
-import warnings
-warnings.filterwarnings("ignore")
-
-import numpy as np
-from pandas import DataFrame
-from sklearn.pipeline import Pipeline
-
-from laptopPrice.logger import logging
-from laptopPrice.exception import LaptopException
-from laptopPrice.constants import SCHEMA_FILE_PATH , TARGET_COLUMN
-from laptopPrice.utils.common_utils import save_object , save_numpy_array_data , read_csv , read_yaml_file , drop_columns
-
-
-class TargetValueMapping:
-    def __init__(self):
-        # mapping for actual log target value (can be extended)
-        self.actual_price = {0: "Below 50K", 1: "50K-100K", 2: "Above 100K"}  
-    
-    def get_price(self, price: float) -> float:
-        """Convert log to actual price"""
-        return np.exp(price)
-
-
-class LaptopPriceEstimator:
-    def __init__(self , feature_engineering_object: object , preprocessing_object: Pipeline , trained_model_object: object):
-        """This class is responsible to combine preprocessor and sklearn model.
-           Also to do prediction for new data.
-
-        Args:
-            feature_engineering_object (object): _description_
-            preprocessing_object (Pipeline): _description_
-            trained_model_object (object): _description_
-        """
-        self.feature_engineering_object = feature_engineering_object
-        self.preprocessing_object = preprocessing_object
-        self.trained_model_object = trained_model_object
-        self._schema_config = read_yaml_file(file_path = SCHEMA_FILE_PATH)
-        self.drop_cols = self._schema_config["drop_columns"]
-    
-    
-    def predict_transformed_array(self , transformed_array : np.ndarray) -> np.ndarray:
-        """
-        Predict using already transformed feature array.
-        """
-        logging.info("Entered predict_array method of LaptopPriceEstimator class")
-        
-        try:
-            predictions = self.trained_model_object.predict(transformed_array)
-            logging.info(f"Prediction completed on transformed array, shape={predictions.shape}")
-            return predictions 
-        
-        except Exception as e:
-            raise LaptopException(e , sys)
-    
-    def predict_dataframe(self , input_df: DataFrame , acutal_price: bool = True) -> np.ndarray:
-        """
-        Transform raw input DataFrame and predict in one step.
-        Expects input_df to have a single row or multiple rows with same feature columns.
-        """
-        logging.info(f"Entered predict_dataframe method with input shape: {input_df.shape}")
-        try:
-            df = input_df.copy()
-            
-            # Drop columns that were dropped in training
-            # df = df.drop(columns = [col for col in self.drop_cols if col in df.columns] , errors = "ignore" , axis = 1)
-            
-            df = self.feature_engineering_object.transform(df)
-            logging.info(f"df features after feature engineering: {df.columns}")
-            # logging.info(f"Gpu: {df['Gpu']}")
-            # Align columns with the training schema
-            expected_features = getattr(self.preprocessing_object, "feature_names_in_", None)
-            if expected_features is not None:
-                missing_cols = [c for c in expected_features if c not in df.columns]
-                logging.info(f"from LaptopPriceEstimator missing columns are:{missing_cols}")
-                for c in missing_cols:
-                    df[c] = 0
-                df = df[expected_features]
-            
-            # transform using preprocessing_object
-            transformed_data = self.preprocessing_object.transform(df)
-            
-            # predict
-            predictions = self.trained_model_object.predict(transformed_data)
-            
-            # do the mapping
-            if acutal_price:
-                mapper = TargetValueMapping()
-                predictions = [mapper.get_price(p) for p in predictions]
-            
-            return predictions
-            
-        except Exception as e:
-            raise LaptopException(e , sys)
-    
-    def predict_user_info(self , input_df: DataFrame , acutal_price: bool = True) -> np.ndarray:
-        """
-        Transform raw input DataFrame and predict in one step.
-        Expects input_df to have a single row or multiple rows with same feature columns.
-        """
-        logging.info(f"Entered predict_dataframe method with input shape: {input_df.shape}")
-        try:
-            # transform using preprocessing_object
-            transformed_data = self.preprocessing_object.transform(input_df)
-            
-            # predict
-            predictions = self.trained_model_object.predict(transformed_data)
-            
-            # do the mapping
-            if acutal_price:
-                mapper = TargetValueMapping()
-                predictions = [mapper.get_price(p) for p in predictions]
-            
-            return predictions
-        except Exception as e:
-            raise LaptopException(e , sys)
-    
-    def __repr__(self):
-        return f"{type(self.trained_model_object).__name__}()"
-
-    def __str__(self):
-        return f"{type(self.trained_model_object).__name__}()"
+import sys 
+import warnings
+from typing import TYPE_CHECKING, Callable
+warnings.filterwarnings("ignore")
+
+import dill
+import numpy as np
+
+from laptopPrice.logger import get_logger
+from laptopPrice.exception import LaptopException
+from laptopPrice.constants import SCHEMA_FILE_PATH
+from laptopPrice.configuration.schema_config import SchemaConfig , get_schema_config
+from laptopPrice.entity.inference_plan import CompiledPreprocessingPlan
+from laptopPrice.entity.tree_ensemble import CompiledTreeEnsemble
+from laptopPrice.utils.instrumentation import span
+
+# pandas and sklearn are imported only by the DataFrame paths, records are predicted with numpy alone
+if TYPE_CHECKING:
+    from pandas import DataFrame
+    from sklearn.pipeline import Pipeline
+
+logger = get_logger(__name__)
+
+
+class TargetValueMapping:
+    def __init__(self):
+        # mapping for actual log target value (can be extended)
+        self.actual_price = {0: "Below 50K", 1: "50K-100K", 2: "Above 100K"}  
+    
+    def get_price(self, price: float) -> float:
+        """Convert log to actual price"""
+        return np.exp(price)
+
+
+class LazyObject:
+    """
+    Attribute of LaptopPriceEstimator kept as dill bytes in the pickle(or as a loader function of a model
+    bundle) and loaded on first access.
+
+    Loading the estimator then does not import the libraries of the deferred object(sklearn , pandas ,
+    xgboost , ...) until a prediction path really uses it.
+    """
+    def __set_name__(self , owner: type , name: str):
+        self.object_key = f"_{name}"
+        self.bytes_key = f"_{name}_bytes"
+        self.loader_key = f"_{name}_loader"
+
+    def __get__(self , instance: object , owner: type = None) -> object:
+        if instance is None:
+            return self
+        state = instance.__dict__
+        if state.get(self.object_key) is None:
+            if state.get(self.bytes_key) is not None:
+                state[self.object_key] = dill.loads(state.pop(self.bytes_key))
+            elif state.get(self.loader_key) is not None:
+                state[self.object_key] = state.pop(self.loader_key)()
+        return state.get(self.object_key)
+
+    def __set__(self , instance: object , value: object) -> None:
+        instance.__dict__[self.object_key] = value
+        instance.__dict__.pop(self.bytes_key , None)
+        instance.__dict__.pop(self.loader_key , None)
+
+    def set_loader(self , instance: object , loader: Callable[[] , object]) -> None:
+        """Load the object with loader() on first access."""
+        instance.__dict__[self.object_key] = None
+        instance.__dict__[self.loader_key] = loader
+
+    def load(self , state: dict) -> None:
+        # load a not yet loaded bundle object in a __getstate__ dict, the pickle can't refer to the bundle files
+        if state.get(self.object_key) is None and state.get(self.loader_key) is not None:
+            state[self.object_key] = state.pop(self.loader_key)()
+
+    def defer(self , state: dict) -> None:
+        # replace the object with its dill bytes in a __getstate__ dict
+        if state.get(self.object_key) is not None:
+            state[self.bytes_key] = dill.dumps(state.pop(self.object_key))
+
+
+class LaptopPriceEstimator:
+    # the library objects are only needed by the paths the compiled plan / tree ensemble don't cover
+    feature_engineering_object = LazyObject()
+    preprocessing_object = LazyObject()
+    trained_model_object = LazyObject()
+    
+    def __init__(self , feature_engineering_object: object , preprocessing_object: "Pipeline" , trained_model_object: object ,
+                 schema_config: SchemaConfig = None):
+        """This class is responsible to combine preprocessor and sklearn model.
+           Also to do prediction for new data.
+
+        Args:
+            feature_engineering_object (object): _description_
+            preprocessing_object (Pipeline): _description_
+            trained_model_object (object): _description_
+            schema_config (SchemaConfig, optional): shared schema config. Defaults to the one of SCHEMA_FILE_PATH.
+        """
+        self.feature_engineering_object = feature_engineering_object
+        self.preprocessing_object = preprocessing_object
+        self.trained_model_object = trained_model_object
+        self.trained_model_name = type(trained_model_object).__name__
+        # packed numpy version of the trained tree ensemble, set by compile_tree_ensemble
+        self.tree_ensemble = None
+        schema_config = schema_config or get_schema_config(SCHEMA_FILE_PATH)
+        # only the drop list is kept(and pickled), not the whole schema
+        self.drop_cols = list(schema_config.drop_columns)
+    
+    def __getstate__(self) -> dict:
+        state = self.__dict__.copy()
+        for lazy_object in (LaptopPriceEstimator.feature_engineering_object , LaptopPriceEstimator.preprocessing_object ,
+                            LaptopPriceEstimator.trained_model_object):
+            lazy_object.load(state)
+        # records are predicted with the compiled plan and tree ensemble, loading the estimator for serving
+        # then doesn't import sklearn / pandas / xgboost / lightgbm / catboost
+        if state.get("_inference_plan") is not None:
+            LaptopPriceEstimator.feature_engineering_object.defer(state)
+            LaptopPriceEstimator.preprocessing_object.defer(state)
+        if state.get("tree_ensemble") is not None:
+            LaptopPriceEstimator.trained_model_object.defer(state)
+        return state
+    
+    def __setstate__(self , state: dict) -> None:
+        # objects saved before the lazy attributes existed
+        for name in ("feature_engineering_object" , "preprocessing_object" , "trained_model_object"):
+            if name in state:
+                state[f"_{name}"] = state.pop(name)
+        if "_trained_model_bytes" in state:
+            state["_trained_model_object_bytes"] = state.pop("_trained_model_bytes")
+        state.setdefault("tree_ensemble" , None)
+        state.pop("_schema_config" , None)
+        if "trained_model_name" not in state:
+            state["trained_model_name"] = type(state["_trained_model_object"]).__name__
+        self.__dict__.update(state)
+    
+    def _predict(self , transformed_array: np.ndarray) -> np.ndarray:
+        """Predict transformed features with the compiled tree ensemble, or the library model if there is none."""
+        if self.tree_ensemble is not None:
+            return self.tree_ensemble.predict(transformed_array)
+        return self.trained_model_object.predict(transformed_array)
+    
+    def compile_tree_ensemble(self , validation_array: np.ndarray = None , tolerance: float = 1e-6) -> CompiledTreeEnsemble:
+        """
+        Export the trained tree ensemble into packed numpy arrays and use it for the predictions.
+        
+        Args:
+            validation_array (np.ndarray, optional): transformed features, the compiled predictions must match the
+                library predictions on it. Defaults to None.
+            tolerance (float, optional): max absolute difference allowed on validation_array. Defaults to 1e-6.
+        
+        Returns:
+            CompiledTreeEnsemble: None if the model can't be compiled or does not match, then the library model is used.
+        """
+        try:
+            tree_ensemble = CompiledTreeEnsemble.from_model(self.trained_model_object)
+        except Exception as e:
+            logger.info("Trained model can't be compiled, using the library model for predictions: %s" , e)
+            self.tree_ensemble = None
+            return self.tree_ensemble
+        
+        try:
+            if validation_array is not None:
+                max_difference = float(np.max(np.abs(
+                    tree_ensemble.predict(validation_array) - self.trained_model_object.predict(validation_array)
+                )))
+                if max_difference > tolerance:
+                    raise ValueError(f"compiled predictions differ by {max_difference} (tolerance {tolerance})")
+                logger.info("Compiled tree ensemble matches the library predictions. max difference: %s" , max_difference)
+        except Exception as e:
+            # a supported model which doesn't match is a bug of the compiled ensemble
+            logger.warning(
+                "Compiled tree ensemble of [%s] doesn't match the library model, using the library model for predictions: %s" ,
+                self.trained_model_name , e
+            )
+            self.tree_ensemble = None
+            return self.tree_ensemble
+        
+        self.tree_ensemble = tree_ensemble
+        logger.info(
+            "Compiled [%s] into a tree ensemble. trees: %s , nodes: %s , max depth: %s" ,
+            self.trained_model_name , tree_ensemble.n_trees , tree_ensemble.n_nodes , tree_ensemble.max_depth
+        )
+        return self.tree_ensemble
+    
+    
+    def get_expected_features(self) -> list:
+        """
+        Returns the feature engineered column names in the order the preprocessing object was fitted with.
+        MeanEncoder don't store feature names, so the first step which has them is used.
+        """
+        from sklearn.pipeline import Pipeline
+        
+        expected_features = getattr(self.preprocessing_object , "feature_names_in_" , None)
+        if expected_features is None and isinstance(self.preprocessing_object , Pipeline):
+            for _ , step in self.preprocessing_object.steps:
+                expected_features = getattr(step , "feature_names_in_" , None)
+                if expected_features is not None:
+                    break
+        return list(expected_features) if expected_features is not None else None
+    
+    
+    def predict_transformed_array(self , transformed_array : np.ndarray) -> np.ndarray:
+        """
+        Predict using already transformed feature array.
+        """
+        logger.debug("Entered predict_array method of LaptopPriceEstimator class")
+        
+        try:
+            with span("estimator.predict" , method = "predict_transformed_array"):
+                predictions = self._predict(transformed_array)
+            logger.debug("Prediction completed on transformed array, shape=%s" , predictions.shape)
+            return predictions 
+        
+        except Exception as e:
+            raise LaptopException(e , sys)
+    
+    def predict_dataframe(self , input_df: "DataFrame" , acutal_price: bool = True) -> np.ndarray:
+        """
+        Transform raw input DataFrame and predict in one step.
+        Expects input_df to have a single row or multiple rows with same feature columns.
+        """
+        logger.debug("Entered predict_dataframe method with input shape: %s" , input_df.shape)
+        try:
+            df = input_df.copy()
+            
+            # Drop columns that were dropped in training
+            # df = df.drop(columns = [col for col in self.drop_cols if col in df.columns] , errors = "ignore" , axis = 1)
+            
+            with span("estimator.feature_engineering" , method = "predict_dataframe"):
+                df = self.feature_engineering_object.transform(df)
+            logger.debug("df features after feature engineering: %s" , df.columns)
+            # Align columns with the training schema
+            expected_features = getattr(self.preprocessing_object, "feature_names_in_", None)
+            if expected_features is not None:
+                missing_cols = [c for c in expected_features if c not in df.columns]
+                if missing_cols:
+                    logger.info("from LaptopPriceEstimator missing columns are:%s" , missing_cols)
+                for c in missing_cols:
+                    df[c] = 0
+                df = df[expected_features]
+            
+            # transform using preprocessing_object
+            with span("estimator.preprocessing" , method = "predict_dataframe"):
+                transformed_data = self.preprocessing_object.transform(df)
+            
+            # predict
+            with span("estimator.predict" , method = "predict_dataframe"):
+                predictions = self._predict(transformed_data)
+            
+            # do the mapping
+            if acutal_price:
+                mapper = TargetValueMapping()
+                predictions = [mapper.get_price(p) for p in predictions]
+            
+            return predictions
+            
+        except Exception as e:
+            raise LaptopException(e , sys)
+    
+    def predict_user_info(self , input_df: "DataFrame" , acutal_price: bool = True) -> np.ndarray:
+        """
+        Transform raw input DataFrame and predict in one step.
+        Expects input_df to have a single row or multiple rows with same feature columns.
+        """
+        logger.debug("Entered predict_user_info method with input shape: %s" , input_df.shape)
+        try:
+            # records may come with any key order(e.g. batch requests), use the column order of training
+            expected_features = self.get_expected_features()
+            if expected_features is not None:
+                input_df = input_df[expected_features]
+            
+            # transform using preprocessing_object
+            with span("estimator.preprocessing" , method = "predict_user_info"):
+                transformed_data = self.preprocessing_object.transform(input_df)
+            
+            # predict
+            with span("estimator.predict" , method = "predict_user_info"):
+                predictions = self._predict(transformed_data)
+            
+            # do the mapping
+            if acutal_price:
+                mapper = TargetValueMapping()
+                predictions = [mapper.get_price(p) for p in predictions]
+            
+            return predictions
+        except Exception as e:
+            raise LaptopException(e , sys)
+    
+    def compile_inference_plan(self) -> CompiledPreprocessingPlan:
+        """
+        Compile the preprocessing object into a flat lookup plan and keep it on the estimator.
+        Returns None if the preprocessing object can't be compiled, then predict_record uses the DataFrame path.
+        """
+        try:
+            self._inference_plan = CompiledPreprocessingPlan.from_preprocessing_object(
+                preprocessing_object = self.preprocessing_object,
+                feature_names = self.get_expected_features()
+            )
+            logger.info("Compiled the preprocessing object into an inference plan")
+        except Exception as e:
+            logger.info("Preprocessing object can't be compiled, using DataFrame path for records: %s" , e)
+            self._inference_plan = None
+        return self._inference_plan
+    
+    def predict_record(self , record , acutal_price: bool = True) -> float:
+        """
+        Predict a single feature engineered record without building a DataFrame.
+        
+        Args:
+            record (dict | np.ndarray): dict like CustomData.data_dict or a numpy row in the training column order
+            acutal_price (bool, optional): convert the log price to actual price. Defaults to True.
+        """
+        try:
+            # objects saved before the plan existed don't have the attribute
+            if not hasattr(self , "_inference_plan"):
+                self.compile_inference_plan()
+            
+            if self._inference_plan is None:
+                from pandas import DataFrame
+                
+                if isinstance(record , dict):
+                    input_df = DataFrame({key : [value] for key , value in record.items()})
+                else:
+                    input_df = DataFrame(np.asarray(record , dtype = object).reshape(1 , -1) , columns = self.get_expected_features())
+                return self.predict_user_info(input_df , acutal_price = acutal_price)[0]
+            
+            with span("estimator.preprocessing" , method = "predict_record"):
+                transformed_data = self._inference_plan.transform(record)
+            with span("estimator.predict" , method = "predict_record"):
+                prediction = self._predict(transformed_data)[0]
+            
+            if acutal_price:
+                prediction = TargetValueMapping().get_price(prediction)
+            return prediction
+        
+        except Exception as e:
+            raise LaptopException(e , sys)
+    
+    def __repr__(self):
+        return f"{self.trained_model_name}()"
+
+    def __str__(self):
+        return f"{self.trained_model_name}()"
@@ -0,0 +1,125 @@
+from typing import TYPE_CHECKING, Dict, List, Union
+
+import numpy as np
+
+# only needed to compile the plan, a loaded plan transforms records with numpy alone
+if TYPE_CHECKING:
+    from sklearn.pipeline import Pipeline
+
+
+class CompiledPreprocessingPlan:
+    """
+    Flat lookup version of the fitted preprocessing pipeline(MeanEncoder -> StandardScaler).
+
+    The mean encoding and the scaling of every categorical column are folded together into
+    one float64 vector per column, indexed by the category id. The last element of the vector
+    is the scaled fallback value used by MeanEncoder for unseen categories.
+    Numerical columns keep the scaler's mean and scale as arrays.
+    A dict or a numpy row is transformed directly, without building any DataFrame.
+    """
+    def __init__(self , feature_names: List[str] , categorical_columns: List[tuple] ,
+                 numerical_positions: np.ndarray , numerical_mean: np.ndarray , numerical_scale: np.ndarray):
+        """
+        Args:
+            feature_names (List[str]): feature engineered column names in the training order
+            categorical_columns (List[tuple]): (position , column name , category -> id dict , scaled values vector)
+            numerical_positions (np.ndarray): positions of the numerical columns
+            numerical_mean (np.ndarray): value subtracted from each numerical column
+            numerical_scale (np.ndarray): value each numerical column is divided by
+        """
+        self.feature_names = feature_names
+        self.categorical_columns = categorical_columns
+        self.numerical_positions = numerical_positions
+        self.numerical_names = [feature_names[position] for position in numerical_positions]
+        self.numerical_mean = numerical_mean
+        self.numerical_scale = numerical_scale
+
+    @classmethod
+    def from_preprocessing_object(cls , preprocessing_object: "Pipeline" , feature_names: List[str]) -> "CompiledPreprocessingPlan":
+        """
+        Compile the plan from a fitted Pipeline(('mean_encoding', MeanEncoder()), ('scaling', StandardScaler())).
+
+        Raises:
+            ValueError: If the preprocessing object has any other structure.
+        """
+        from sklearn.pipeline import Pipeline
+        from sklearn.preprocessing import StandardScaler
+        from laptopPrice.feature_engineering.mean_encoder import MeanEncoder
+
+        steps = [step for _ , step in preprocessing_object.steps] if isinstance(preprocessing_object , Pipeline) else []
+        if len(steps) != 2 or not isinstance(steps[0] , MeanEncoder) or not isinstance(steps[1] , StandardScaler):
+            raise ValueError("Only Pipeline(MeanEncoder , StandardScaler) preprocessing object can be compiled")
+
+        mean_encoder , scaler = steps
+        n_features = len(feature_names)
+        # same as StandardScaler.transform: mean is used only with with_mean and scale only with with_std
+        offset = scaler.mean_ if scaler.with_mean else np.zeros(n_features)
+        scale = scaler.scale_ if scaler.with_std else np.ones(n_features)
+
+        # encoded value of each category with the fallback for unseen categories as the last element
+        if not hasattr(mean_encoder , "means_"):
+            mean_encoder._build_arrays()
+
+        categorical_columns = []
+        numerical_positions = []
+        for position , column in enumerate(feature_names):
+            encoded = mean_encoder.means_.get(column)
+            if encoded is None:
+                numerical_positions.append(position)
+                continue
+
+            categories = {category : category_id for category_id , category in enumerate(mean_encoder.categories_[column])}
+            scaled = (encoded - offset[position]) / scale[position]
+            categorical_columns.append((position , column , categories , scaled))
+
+        numerical_positions = np.array(numerical_positions , dtype = np.intp)
+        return cls(
+            feature_names = list(feature_names),
+            categorical_columns = categorical_columns,
+            numerical_positions = numerical_positions,
+            numerical_mean = np.asarray(offset , dtype = np.float64)[numerical_positions],
+            numerical_scale = np.asarray(scale , dtype = np.float64)[numerical_positions]
+        )
+
+    def transform_record(self , record: Dict) -> np.ndarray:
+        """
+        Transform one feature engineered record(e.g. CustomData.data_dict).
+
+        Returns:
+            np.ndarray: array of shape (1 , n_features)
+        """
+        row = np.empty((1 , len(self.feature_names)) , dtype = np.float64)
+        numerical_values = np.array([record[name] for name in self.numerical_names] , dtype = np.float64)
+        row[0 , self.numerical_positions] = (numerical_values - self.numerical_mean) / self.numerical_scale
+
+        for position , column , categories , scaled in self.categorical_columns:
+            row[0 , position] = scaled[categories.get(record[column] , -1)]
+        return row
+
+    def transform_rows(self , rows: np.ndarray) -> np.ndarray:
+        """
+        Transform rows whose values are in the order of feature_names(1D for a single row).
+
+        Returns:
+            np.ndarray: array of shape (n_rows , n_features)
+        """
+        rows = np.asarray(rows , dtype = object)
+        if rows.ndim == 1:
+            rows = rows.reshape(1 , -1)
+
+        transformed = np.empty(rows.shape , dtype = np.float64)
+        numerical_values = rows[: , self.numerical_positions].astype(np.float64)
+        transformed[: , self.numerical_positions] = (numerical_values - self.numerical_mean) / self.numerical_scale
+
+        for position , column , categories , scaled in self.categorical_columns:
+            category_ids = np.fromiter(
+                (categories.get(value , -1) for value in rows[: , position]) , dtype = np.intp , count = len(rows)
+            )
+            transformed[: , position] = scaled.take(category_ids)
+        return transformed
+
+    def transform(self , data: Union[Dict, np.ndarray]) -> np.ndarray:
+        """Transform a single record dict or numpy row(s)."""
+        if isinstance(data , dict):
+            return self.transform_record(data)
+        return self.transform_rows(data)
@@ -0,0 +1,462 @@
+import os
+import sys
+import json
+import uuid
+import shutil
+import argparse
+import importlib
+import platform
+from datetime import datetime
+from functools import partial
+from typing import Optional
+
+import numpy as np
+
+from laptopPrice.logger import get_logger
+from laptopPrice.exception import LaptopException
+from laptopPrice.constants import SCHEMA_FILE_PATH
+from laptopPrice.entity.estimator import LaptopPriceEstimator
+from laptopPrice.entity.inference_plan import CompiledPreprocessingPlan
+from laptopPrice.entity.tree_ensemble import CompiledTreeEnsemble
+from laptopPrice.utils.common_utils import save_object , load_object , get_file_hash
+
+logger = get_logger(__name__)
+
+MODEL_BUNDLE_FORMAT = "laptop-price-estimator"
+MODEL_BUNDLE_FORMAT_VERSION = 1
+MODEL_BUNDLE_MANIFEST_FILE_NAME = "manifest.json"
+TREE_ENSEMBLE_DIR = "tree_ensemble"
+INFERENCE_PLAN_FILE_NAME = "inference_plan.npz"
+FEATURE_ENGINEERING_FILE_NAME = "feature_engineering.json"
+PREPROCESSING_FILE_NAME = "preprocessing.npz"
+
+# native model files of the libraries, other models(e.g. sklearn forests) are dill pickles
+TRAINED_MODEL_FORMATS = {
+    "xgboost" : ("xgboost_ubj" , "trained_model.ubj"),
+    "lightgbm" : ("lightgbm_text" , "trained_model.txt"),
+    "catboost" : ("catboost_cbm" , "trained_model.cbm"),
+}
+DILL_FORMAT = "dill"
+# extension of the estimator pickles pushed before the model bundles(e.g. Model/estimator.pkl)
+PICKLE_EXTENSION = ".pkl"
+
+
+def is_model_bundle(path: str) -> bool:
+    return os.path.isfile(os.path.join(path , MODEL_BUNDLE_MANIFEST_FILE_NAME))
+
+
+def get_model_path(path: str) -> str:
+    """
+    Path of the estimator to load. Until a bundle is pushed to a bundle directory path(e.g. Model/estimator),
+    the pickle next to it(Model/estimator.pkl) is used, so a deployment with only the pickle keeps working.
+    """
+    pickle_path = f"{path.rstrip(os.sep)}{PICKLE_EXTENSION}"
+    if not os.path.exists(path) and os.path.isfile(pickle_path):
+        return pickle_path
+    return path
+
+
+def _get_library_version(module_name: str) -> Optional[str]:
+    module = sys.modules.get(module_name)
+    return getattr(module , "__version__" , None)
+
+
+def _get_class(class_path: str) -> type:
+    module_name , class_name = class_path.rsplit("." , 1)
+    return getattr(importlib.import_module(module_name) , class_name)
+
+
+# 1. compiled tree ensemble: one .npy per node array, memory mapped on load
+def _save_tree_ensemble(tree_ensemble: CompiledTreeEnsemble , dir_path: str) -> dict:
+    os.makedirs(os.path.join(dir_path , TREE_ENSEMBLE_DIR))
+    files = {}
+    for name , array in tree_ensemble.get_arrays().items():
+        files[name] = os.path.join(TREE_ENSEMBLE_DIR , f"{name}.npy")
+        np.save(os.path.join(dir_path , files[name]) , np.ascontiguousarray(array) , allow_pickle = False)
+    return {"params" : tree_ensemble.get_params() , "files" : files}
+
+
+def _load_tree_ensemble(dir_path: str , section: dict , mmap_mode: Optional[str]) -> CompiledTreeEnsemble:
+    arrays = {
+        # plain ndarray views of the memmaps, so the results of the operations are not memmaps
+        name : np.asarray(np.load(os.path.join(dir_path , file_name) , mmap_mode = mmap_mode , allow_pickle = False))
+        for name , file_name in section["files"].items()
+    }
+    return CompiledTreeEnsemble.from_arrays(arrays = arrays , params = section["params"])
+
+
+# 2. inference plan: vectors in a .npz, the categories in the manifest
+def _save_inference_plan(inference_plan: CompiledPreprocessingPlan , dir_path: str) -> dict:
+    arrays = {
+        "numerical_positions" : inference_plan.numerical_positions,
+        "numerical_mean" : inference_plan.numerical_mean,
+        "numerical_scale" : inference_plan.numerical_scale,
+    }
+    categorical_columns = []
+    for index , (position , column , categories , scaled) in enumerate(inference_plan.categorical_columns):
+        arrays[f"scaled_{index}"] = scaled
+        # the category ids are the positions in the list
+        categorical_columns.append([int(position) , column , list(categories)])
+    np.savez(os.path.join(dir_path , INFERENCE_PLAN_FILE_NAME) , **arrays)
+    return {
+        "file" : INFERENCE_PLAN_FILE_NAME,
+        "feature_names" : list(inference_plan.feature_names),
+        "categorical_columns" : categorical_columns
+    }
+
+
+def _load_inference_plan(dir_path: str , section: dict) -> CompiledPreprocessingPlan:
+    with np.load(os.path.join(dir_path , section["file"]) , allow_pickle = False) as arrays:
+        return CompiledPreprocessingPlan(
+            feature_names = section["feature_names"],
+            categorical_columns = [
+                (position , column , {category : category_id for category_id , category in enumerate(categories)} , arrays[f"scaled_{index}"])
+                for index , (position , column , categories) in enumerate(section["categorical_columns"])
+            ],
+            numerical_positions = arrays["numerical_positions"],
+            numerical_mean = arrays["numerical_mean"],
+            numerical_scale = arrays["numerical_scale"]
+        )
+
+
+# 3. feature engineering: settings and lookup tables of FeatureEngineer as json
+def _save_feature_engineering(feature_engineering_object: object , dir_path: str) -> dict:
+    from laptopPrice.feature_engineering.feature_engineer import FeatureEngineer , DEFAULT_ENGINE
+
+    if type(feature_engineering_object) is not FeatureEngineer:
+        raise ValueError(f"[{type(feature_engineering_object).__name__}] has no native format")
+
+    lookup_tables = getattr(feature_engineering_object , "lookup_tables_" , None)
+    state = {
+        # objects saved before the engine option / shared schema config don't have the attributes
+        "engine" : getattr(feature_engineering_object , "engine" , DEFAULT_ENGINE),
+        "schema_file_path" : getattr(feature_engineering_object , "schema_file_path" , SCHEMA_FILE_PATH),
+        "drop_columns" : list(feature_engineering_object.drop_columns),
+        "lookup_tables" : None if lookup_tables is None else {
+            column : {
+                "values" : table.values.tolist(),
+                "parsed" : {name : {"dtype" : str(values.dtype) , "values" : values.tolist()} for name , values in table.parsed.items()}
+            }
+            for column , table in lookup_tables.items()
+        }
+    }
+    with open(os.path.join(dir_path , FEATURE_ENGINEERING_FILE_NAME) , "w") as file_obj:
+        json.dump(state , file_obj)
+    return {"format" : "feature_engineer_json" , "file" : FEATURE_ENGINEERING_FILE_NAME}
+
+
+def _load_feature_engineering(dir_path: str , section: dict) -> object:
+    import pandas as pd
+    from laptopPrice.feature_engineering.feature_engineer import FeatureEngineer , ParsedLookupTable
+
+    with open(os.path.join(dir_path , section["file"])) as file_obj:
+        state = json.load(file_obj)
+
+    lookup_tables = state.pop("lookup_tables")
+    if lookup_tables is not None:
+        state["lookup_tables_"] = {
+            column : ParsedLookupTable(
+                values = pd.Index(table["values"] , dtype = object),
+                parsed = {name : np.array(parsed["values"] , dtype = parsed["dtype"]) for name , parsed in table["parsed"].items()}
+            )
+            for column , table in lookup_tables.items()
+        }
+    feature_engineering_object = FeatureEngineer.__new__(FeatureEngineer)
+    feature_engineering_object.__setstate__(state)
+    return feature_engineering_object
+
+
+# 4. preprocessing: fitted values of Pipeline(MeanEncoder , StandardScaler) in a .npz, settings in the manifest
+def _save_preprocessing(preprocessing_object: object , dir_path: str) -> dict:
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    from laptopPrice.feature_engineering.mean_encoder import MeanEncoder
+
+    steps = [step for _ , step in preprocessing_object.steps] if isinstance(preprocessing_object , Pipeline) else []
+    if len(steps) != 2 or type(steps[0]) is not MeanEncoder or type(steps[1]) is not StandardScaler:
+        raise ValueError(f"[{type(preprocessing_object).__name__}] has no native format")
+
+    mean_encoder , scaler = steps
+    if not hasattr(mean_encoder , "means_"):
+        mean_encoder._build_arrays()
+
+    arrays = {f"means_{index}" : means for index , means in enumerate(mean_encoder.means_.values())}
+    for name in ("mean_" , "scale_" , "var_"):
+        if getattr(scaler , name , None) is not None:
+            arrays[f"scaler_{name.rstrip('_')}"] = getattr(scaler , name)
+    np.savez(os.path.join(dir_path , PREPROCESSING_FILE_NAME) , **arrays)
+
+    return {
+        "format" : "mean_encoder_standard_scaler",
+        "file" : PREPROCESSING_FILE_NAME,
+        "step_names" : [name for name , _ in preprocessing_object.steps],
+        "mean_encoder" : {
+            "params" : mean_encoder.get_params(),
+            "categorical_features" : list(getattr(mean_encoder , "categorical_features_" , mean_encoder.means_)),
+            "global_mean" : getattr(mean_encoder , "global_mean_" , None),
+            "columns" : [[column , mean_encoder.categories_[column].tolist()] for column in mean_encoder.means_]
+        },
+        "scaler" : {
+            "params" : scaler.get_params(),
+            "n_samples_seen" : np.asarray(scaler.n_samples_seen_).tolist(),
+            "feature_names" : list(scaler.feature_names_in_)
+        }
+    }
+
+
+def _load_preprocessing(dir_path: str , section: dict) -> object:
+    import pandas as pd
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    from laptopPrice.feature_engineering.mean_encoder import MeanEncoder
+
+    with np.load(os.path.join(dir_path , section["file"]) , allow_pickle = False) as npz_file:
+        arrays = {name : npz_file[name] for name in npz_file.files}
+
+    encoder_section = section["mean_encoder"]
+    mean_encoder = MeanEncoder(**encoder_section["params"])
+    mean_encoder.categorical_features_ = encoder_section["categorical_features"]
+    mean_encoder.global_mean_ = encoder_section["global_mean"]
+    mean_encoder.categories_ = {}
+    mean_encoder.means_ = {}
+    mean_encoder.encoding_maps = {}
+    for index , (column , categories) in enumerate(encoder_section["columns"]):
+        means = arrays[f"means_{index}"]
+        mean_encoder.categories_[column] = pd.Index(categories , dtype = object)
+        mean_encoder.means_[column] = means
+        mean_encoder.encoding_maps[column] = dict(zip(categories , means[: -1].tolist()))
+
+    scaler_section = section["scaler"]
+    scaler = StandardScaler(**scaler_section["params"])
+    scaler.mean_ = arrays.get("scaler_mean")
+    scaler.scale_ = arrays.get("scaler_scale")
+    scaler.var_ = arrays.get("scaler_var")
+    scaler.n_samples_seen_ = np.asarray(scaler_section["n_samples_seen"] , dtype = np.int64)
+    if scaler.n_samples_seen_.ndim == 0:
+        scaler.n_samples_seen_ = np.int64(scaler.n_samples_seen_)
+    scaler.feature_names_in_ = np.array(scaler_section["feature_names"] , dtype = object)
+    scaler.n_features_in_ = len(scaler.feature_names_in_)
+
+    encoder_step_name , scaler_step_name = section["step_names"]
+    return Pipeline([(encoder_step_name , mean_encoder) , (scaler_step_name , scaler)])
+
+
+# 5. trained model: native file of xgboost / lightgbm / catboost
+def _save_trained_model(trained_model_object: object , dir_path: str) -> dict:
+    module_name = type(trained_model_object).__module__.split(".")[0]
+    if module_name not in TRAINED_MODEL_FORMATS:
+        raise ValueError(f"[{type(trained_model_object).__name__}] has no native format")
+
+    model_format , file_name = TRAINED_MODEL_FORMATS[module_name]
+    file_path = os.path.join(dir_path , file_name)
+    if module_name == "lightgbm":
+        # the booster keeps only the trees up to the best iteration
+        getattr(trained_model_object , "booster_" , trained_model_object).save_model(file_path)
+    elif module_name == "catboost":
+        trained_model_object.save_model(file_path , format = "cbm")
+    else:
+        trained_model_object.save_model(file_path)
+    return {"format" : model_format , "file" : file_name}
+
+
+def _load_trained_model(dir_path: str , section: dict) -> object:
+    file_path = os.path.join(dir_path , section["file"])
+    if section["format"] == "lightgbm_text":
+        import lightgbm
+
+        # predicts the same as LGBMRegressor.predict, the sklearn wrapper can't be restored from the text file
+        return lightgbm.Booster(model_file = file_path)
+
+    trained_model_object = _get_class(section["class"])()
+    if section["format"] == "catboost_cbm":
+        trained_model_object.load_model(file_path , format = "cbm")
+    else:
+        trained_model_object.load_model(file_path)
+    return trained_model_object
+
+
+def _save_component(name: str , component: object , save_native , dir_path: str) -> dict:
+    """Save a component in its native format, or as a dill pickle if it has none."""
+    module_name = type(component).__module__.split(".")[0]
+    section = {"class" : f"{type(component).__module__}.{type(component).__name__}" , "library_version" : _get_library_version(module_name)}
+    try:
+        section.update(save_native(component , dir_path))
+    except Exception as e:
+        logger.info("Saving [%s] of the model bundle as a dill pickle: %s" , name , e)
+        save_object(file_path = os.path.join(dir_path , f"{name}.pkl") , obj = component)
+        section.update({"format" : DILL_FORMAT , "file" : f"{name}.pkl"})
+    return section
+
+
+def _load_component(dir_path: str , section: dict , load_native) -> object:
+    if section["format"] == DILL_FORMAT:
+        return load_object(os.path.join(dir_path , section["file"]))
+
+    module_name = section["class"].split(".")[0]
+    importlib.import_module(module_name)
+    library_version = _get_library_version(module_name)
+    if section["library_version"] not in (None , library_version):
+        logger.warning(
+            "[%s] was saved with %s %s , loading it with %s" ,
+            section["class"] , module_name , section["library_version"] , library_version
+        )
+    return load_native(dir_path , section)
+
+
+def save_model_bundle(dir_path: str , estimator: LaptopPriceEstimator) -> dict:
+    """
+    Save an estimator as a versioned model bundle directory instead of a single dill pickle:
+
+        manifest.json               format version , library versions , settings and file list(with sha256)
+        tree_ensemble/*.npy         compiled tree ensemble , memory mapped on load
+        inference_plan.npz          compiled preprocessing plan of single records
+        feature_engineering.json    FeatureEngineer settings and lookup tables
+        preprocessing.npz           fitted MeanEncoder / StandardScaler values
+        trained_model.ubj|txt|cbm   native xgboost / lightgbm / catboost model file
+
+    Components without a native format(e.g. sklearn forests , custom preprocessing) are saved as dill pickles.
+    The bundle is written next to dir_path and renamed into place, replacing an existing bundle.
+
+    Args:
+        dir_path (str): directory of the bundle, e.g. Model/estimator
+        estimator (LaptopPriceEstimator): estimator to save
+
+    Returns:
+        dict: manifest of the bundle
+
+    Raises:
+        LaptopException: If saving the bundle fails.
+    """
+    logger.info("Entered save_model_bundle with dir_path=%s" , dir_path)
+    dir_path = os.path.abspath(dir_path)
+    temp_dir_path = f"{dir_path}.tmp-{uuid.uuid4().hex}"
+    try:
+        os.makedirs(temp_dir_path)
+        # objects saved before the plan existed don't have the attribute
+        if not hasattr(estimator , "_inference_plan"):
+            estimator.compile_inference_plan()
+
+        components = {
+            "tree_ensemble" : None if estimator.tree_ensemble is None else _save_tree_ensemble(estimator.tree_ensemble , temp_dir_path),
+            "inference_plan" : None if estimator._inference_plan is None else _save_inference_plan(estimator._inference_plan , temp_dir_path),
+            "feature_engineering" : _save_component(
+                "feature_engineering" , estimator.feature_engineering_object , _save_feature_engineering , temp_dir_path
+            ),
+            "preprocessing" : _save_component("preprocessing" , estimator.preprocessing_object , _save_preprocessing , temp_dir_path),
+            "trained_model" : _save_component("trained_model" , estimator.trained_model_object , _save_trained_model , temp_dir_path),
+        }
+
+        files = {}
+        for root , _ , file_names in os.walk(temp_dir_path):
+            for file_name in sorted(file_names):
+                file_path = os.path.join(root , file_name)
+                relative_path = os.path.relpath(file_path , temp_dir_path).replace(os.sep , "/")
+                files[relative_path] = {"bytes" : os.path.getsize(file_path) , "sha256" : get_file_hash(file_path)}
+
+        manifest = {
+            "format" : MODEL_BUNDLE_FORMAT,
+            "format_version" : MODEL_BUNDLE_FORMAT_VERSION,
+            "created_at" : datetime.now().isoformat(timespec = "seconds"),
+            "trained_model_name" : estimator.trained_model_name,
+            "drop_columns" : list(estimator.drop_cols),
+            "library_versions" : {
+                "python" : platform.python_version(),
+                **{module_name : _get_library_version(module_name) for module_name in ("numpy" , "pandas" , "sklearn" , *TRAINED_MODEL_FORMATS)
+                   if _get_library_version(module_name) is not None}
+            },
+            "components" : components,
+            "files" : files
+        }
+        # written last, a directory without manifest is not a bundle
+        with open(os.path.join(temp_dir_path , MODEL_BUNDLE_MANIFEST_FILE_NAME) , "w") as file_obj:
+            json.dump(manifest , file_obj , indent = 2)
+
+        # swap the directories, the processes which mapped the old files keep reading them until they reload
+        old_dir_path = f"{dir_path}.old-{uuid.uuid4().hex}"
+        if os.path.exists(dir_path):
+            os.rename(dir_path , old_dir_path)
+        os.rename(temp_dir_path , dir_path)
+        shutil.rmtree(old_dir_path , ignore_errors = True)
+
+        logger.info(
+            "Model bundle saved at: %s , files: %s , bytes: %s" ,
+            dir_path , len(files) , sum(file_info["bytes"] for file_info in files.values())
+        )
+        return manifest
+    except Exception as e:
+        shutil.rmtree(temp_dir_path , ignore_errors = True)
+        raise LaptopException(e , sys)
+
+
+def load_model_bundle(dir_path: str , mmap_mode: Optional[str] = "r" , verify: bool = False) -> LaptopPriceEstimator:
+    """
+    Load an estimator saved by save_model_bundle.
+
+    Only the manifest, the inference plan and the tree ensemble(memory mapped) are read. Feature engineering,
+    preprocessing and trained model objects are loaded on their first use, so predicting records doesn't
+    import sklearn / pandas / xgboost / lightgbm / catboost.
+
+    Args:
+        dir_path (str): directory of the bundle
+        mmap_mode (str, optional): np.load mmap_mode of the tree ensemble arrays, None reads them into memory. Defaults to "r".
+        verify (bool, optional): check the sha256 of every file, not only the sizes. Defaults to False.
+
+    Raises:
+        LaptopException: If the directory is not a supported bundle or a file is missing / changed.
+    """
+    logger.info("Entered load_model_bundle with dir_path=%s" , dir_path)
+    try:
+        with open(os.path.join(dir_path , MODEL_BUNDLE_MANIFEST_FILE_NAME)) as file_obj:
+            manifest = json.load(file_obj)
+        if manifest.get("format") != MODEL_BUNDLE_FORMAT or manifest.get("format_version") != MODEL_BUNDLE_FORMAT_VERSION:
+            raise ValueError(f"Unsupported model bundle: format {manifest.get('format')} version {manifest.get('format_version')}")
+
+        for relative_path , file_info in manifest["files"].items():
+            file_path = os.path.join(dir_path , relative_path)
+            if os.path.getsize(file_path) != file_info["bytes"] or (verify and get_file_hash(file_path) != file_info["sha256"]):
+                raise ValueError(f"Model bundle file changed after saving: {relative_path}")
+
+        components = manifest["components"]
+        estimator = LaptopPriceEstimator.__new__(LaptopPriceEstimator)
+        estimator.__setstate__({
+            "trained_model_name" : manifest["trained_model_name"],
+            "drop_cols" : manifest["drop_columns"],
+            "tree_ensemble" : None if components["tree_ensemble"] is None else _load_tree_ensemble(dir_path , components["tree_ensemble"] , mmap_mode),
+            "_inference_plan" : None if components["inference_plan"] is None else _load_inference_plan(dir_path , components["inference_plan"])
+        })
+        for name , load_native in (("feature_engineering" , _load_feature_engineering) , ("preprocessing" , _load_preprocessing) ,
+                                   ("trained_model" , _load_trained_model)):
+            getattr(LaptopPriceEstimator , f"{name}_object").set_loader(
+                estimator , partial(_load_component , dir_path , components[name] , load_native)
+            )
+
+        logger.info("Model bundle loaded from: %s , model: %s , created at: %s" , dir_path , estimator , manifest["created_at"])
+        return estimator
+    except Exception as e:
+        raise LaptopException(e , sys)
+
+
+def load_estimator(file_path: str) -> LaptopPriceEstimator:
+    """
+    Load an estimator from a model bundle directory or a dill pickle file.
+    """
+    if is_model_bundle(file_path):
+        return load_model_bundle(file_path)
+    return load_object(file_path)
+
+
+def main(argv: list = None) -> None:
+    """
+    Convert a pickled estimator into a model bundle, e.g. python -m laptopPrice.entity.model_bundle Model/estimator.pkl Model/estimator
+    """
+    parser = argparse.ArgumentParser(description = "Convert a dill pickled estimator into a model bundle")
+    parser.add_argument("estimator_file_path" , help = "estimator pickle(or bundle) to convert")
+    parser.add_argument("bundle_dir_path" , help = "directory of the model bundle")
+    args = parser.parse_args(argv)
+
+    manifest = save_model_bundle(dir_path = args.bundle_dir_path , estimator = load_estimator(args.estimator_file_path))
+    print(f"Saved [{manifest['trained_model_name']}] bundle with {len(manifest['files'])} files into {args.bundle_dir_path}")
+
+
+if __name__ == "__main__":
+    main()
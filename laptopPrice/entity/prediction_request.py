@@ -0,0 +1,24 @@
+from pydantic import BaseModel, ConfigDict, Field
+
+
+class LaptopPriceRequest(BaseModel):
+    """
+    JSON body of a single prediction request(same fields as the form of templates/index.html).
+
+    Categorical values are not restricted, unseen categories get the fallback value of the mean encoder.
+    """
+    model_config = ConfigDict(extra = "ignore")
+
+    Company : str
+    TypeName : str
+    Ram : int = Field(gt = 0)
+    OpSys : str
+    Weight : float = Field(gt = 0)
+    ppi : float = Field(ge = 0)
+    is_ips : int = Field(ge = 0 , le = 1)
+    is_touchscreen : int = Field(ge = 0 , le = 1)
+    Cpu_name : str
+    CPU_Speed_GHz : float = Field(gt = 0)
+    SSD_GB : int = Field(ge = 0)
+    HDD_GB : int = Field(ge = 0)
+    gpu_brand : str
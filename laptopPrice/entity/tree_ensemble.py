@@ -0,0 +1,371 @@
+import os
+import json
+import tempfile
+from typing import List
+
+import numpy as np
+
+
+# objectives whose raw score is the prediction(identity link)
+XGBOOST_IDENTITY_OBJECTIVES = ("reg:squarederror" , "reg:linear" , "reg:absoluteerror" , "reg:pseudohubererror" , "reg:quantileerror")
+LIGHTGBM_IDENTITY_OBJECTIVES = ("regression" , "regression_l1" , "huber" , "fair" , "quantile")
+
+
+class _TreeBuilder:
+    """Collects the nodes of several trees into flat lists, leaves point to themselves."""
+    def __init__(self):
+        self.feature : List[int] = []
+        self.threshold : List[float] = []
+        self.left : List[int] = []
+        self.right : List[int] = []
+        self.value : List[float] = []
+        self.default_left : List[bool] = []
+        self.roots : List[int] = []
+
+    def add_node(self) -> int:
+        node_id = len(self.feature)
+        self.feature.append(0)
+        self.threshold.append(0.0)
+        self.left.append(node_id)
+        self.right.append(node_id)
+        self.value.append(0.0)
+        self.default_left.append(False)
+        return node_id
+
+    def set_split(self , node_id: int , feature: int , threshold: float , left: int , right: int , default_left: bool) -> None:
+        self.feature[node_id] = int(feature)
+        self.threshold[node_id] = float(threshold)
+        self.left[node_id] = left
+        self.right[node_id] = right
+        self.default_left[node_id] = bool(default_left)
+
+    def set_leaf(self , node_id: int , value: float) -> None:
+        self.value[node_id] = float(value)
+
+    def add_arrays(self , feature: np.ndarray , threshold: np.ndarray , left: np.ndarray , right: np.ndarray ,
+                   value: np.ndarray , default_left: np.ndarray) -> None:
+        """Add one tree given as node arrays, a child index of -1 marks a leaf."""
+        offset = len(self.feature)
+        is_leaf = left < 0
+        node_ids = np.arange(len(feature)) + offset
+        self.roots.append(offset)
+        self.feature.extend(np.where(is_leaf , 0 , feature).tolist())
+        self.threshold.extend(np.where(is_leaf , 0.0 , threshold).tolist())
+        self.left.extend(np.where(is_leaf , node_ids , left + offset).tolist())
+        self.right.extend(np.where(is_leaf , node_ids , right + offset).tolist())
+        self.value.extend(np.where(is_leaf , value , 0.0).tolist())
+        self.default_left.extend(np.asarray(default_left , dtype = bool).tolist())
+
+
+def _tree_depth(left: np.ndarray , right: np.ndarray , roots: np.ndarray) -> int:
+    """Longest root to leaf path of all the trees."""
+    depth = 0
+    nodes = roots
+    while True:
+        children = np.where(left[nodes] != nodes , left[nodes] , -1)
+        children = np.concatenate([children , np.where(right[nodes] != nodes , right[nodes] , -1)])
+        nodes = children[children >= 0]
+        if len(nodes) == 0:
+            return depth
+        depth += 1
+
+
+class CompiledTreeEnsemble:
+    """
+    Tree ensemble regressor flattened into packed numpy arrays with a vectorized traversal.
+
+    All the trees are stored in the same node arrays(feature index , threshold , left / right child , leaf value ,
+    missing value direction) and roots holds the first node of each tree. A row goes to the left child if
+    x <= threshold. Leaves point to themselves, so all the rows walk all the trees together for max_depth
+    steps without any branching.
+    The prediction is base_score + scale x (sum or mean of the leaf values).
+    """
+    def __init__(self , feature: np.ndarray , threshold: np.ndarray , left: np.ndarray , right: np.ndarray ,
+                 value: np.ndarray , default_left: np.ndarray , roots: np.ndarray , float32_input: bool = True ,
+                 average: bool = False , base_score: float = 0.0 , scale: float = 1.0 ,
+                 accumulate_dtype: str = "float64" , source: str = None):
+        """
+        Args:
+            feature , threshold , left , right , value , default_left (np.ndarray): node arrays of all the trees
+            roots (np.ndarray): root node of every tree
+            float32_input (bool): features are rounded to float32 before the comparison , as the library does
+            average (bool): mean of the trees(random forest) instead of the sum(boosting)
+            base_score (float): added to the aggregated leaf values
+            scale (float): aggregated leaf values are multiplied by it
+            accumulate_dtype (str): dtype the leaf values are summed in , tree by tree
+            source (str): class name of the compiled model
+        """
+        self.feature = np.ascontiguousarray(feature , dtype = np.int32)
+        self.threshold = np.ascontiguousarray(threshold , dtype = np.float64)
+        self.left = np.ascontiguousarray(left , dtype = np.int32)
+        self.right = np.ascontiguousarray(right , dtype = np.int32)
+        self.value = np.ascontiguousarray(value , dtype = np.float64)
+        self.default_left = np.ascontiguousarray(default_left , dtype = bool)
+        self.roots = np.ascontiguousarray(roots , dtype = np.int32)
+        self.float32_input = float32_input
+        self.average = average
+        self.base_score = float(base_score)
+        self.scale = float(scale)
+        self.accumulate_dtype = accumulate_dtype
+        self.source = source
+        self.max_depth = _tree_depth(self.left , self.right , self.roots)
+        # children[2 x node + go_left] is the next node , one lookup instead of a select between left and right
+        self.children = np.ascontiguousarray(np.column_stack([self.right , self.left]).ravel())
+
+    @classmethod
+    def _from_builder(cls , builder: _TreeBuilder , **kwargs) -> "CompiledTreeEnsemble":
+        return cls(
+            feature = np.array(builder.feature), threshold = np.array(builder.threshold , dtype = np.float64),
+            left = np.array(builder.left), right = np.array(builder.right), value = np.array(builder.value , dtype = np.float64),
+            default_left = np.array(builder.default_left , dtype = bool), roots = np.array(builder.roots), **kwargs
+        )
+
+    # array names of get_arrays / from_arrays
+    ARRAY_NAMES = ("feature" , "threshold" , "left" , "right" , "value" , "default_left" , "roots" , "children")
+
+    def get_params(self) -> dict:
+        """Scalar settings of the ensemble(json serializable), the counterpart of get_arrays."""
+        return {
+            "float32_input" : self.float32_input , "average" : self.average , "base_score" : self.base_score ,
+            "scale" : self.scale , "accumulate_dtype" : self.accumulate_dtype , "source" : self.source ,
+            "max_depth" : self.max_depth
+        }
+
+    def get_arrays(self) -> dict:
+        """Node arrays of the ensemble by name."""
+        return {name : getattr(self , name) for name in self.ARRAY_NAMES}
+
+    @classmethod
+    def from_arrays(cls , arrays: dict , params: dict) -> "CompiledTreeEnsemble":
+        """
+        Rebuild an ensemble from get_arrays / get_params without copying the arrays or walking the trees again,
+        so read only memory mapped arrays stay memory mapped.
+        """
+        tree_ensemble = cls.__new__(cls)
+        for name in cls.ARRAY_NAMES:
+            setattr(tree_ensemble , name , arrays[name])
+        for name , value in params.items():
+            setattr(tree_ensemble , name , value)
+        return tree_ensemble
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    @property
+    def n_nodes(self) -> int:
+        return len(self.feature)
+
+    # exporters of the supported libraries
+    @classmethod
+    def from_sklearn(cls , model: object) -> "CompiledTreeEnsemble":
+        """RandomForestRegressor , ExtraTreesRegressor , GradientBoostingRegressor or a single DecisionTreeRegressor."""
+        class_name = type(model).__name__
+        builder = _TreeBuilder()
+
+        if class_name == "GradientBoostingRegressor":
+            trees , scale , average = [estimator.tree_ for estimator in model.estimators_[: , 0]] , model.learning_rate , False
+            # prediction of the init estimator(constant) is the start of the boosting
+            base_score = float(model._raw_predict_init(np.zeros((1 , model.n_features_in_)))[0 , 0])
+        elif hasattr(model , "estimators_"):
+            trees , scale , average , base_score = [estimator.tree_ for estimator in model.estimators_] , 1.0 , True , 0.0
+        else:
+            trees , scale , average , base_score = [model.tree_] , 1.0 , False , 0.0
+
+        for tree in trees:
+            if tree.n_outputs != 1:
+                raise ValueError("Only single output trees can be compiled")
+            builder.add_arrays(
+                feature = tree.feature, threshold = tree.threshold, left = tree.children_left, right = tree.children_right,
+                # GradientBoosting adds learning_rate x leaf value of every stage
+                value = tree.value[: , 0 , 0] * scale,
+                default_left = getattr(tree , "missing_go_to_left" , np.zeros(tree.node_count , dtype = bool))
+            )
+        # sklearn trees predict on float32 features(x <= threshold)
+        return cls._from_builder(
+            builder , float32_input = True , average = average , base_score = base_score , source = class_name
+        )
+
+    @classmethod
+    def from_xgboost(cls , model: object) -> "CompiledTreeEnsemble":
+        """XGBRegressor(gbtree booster) , only the trees up to best_iteration when early stopping was used."""
+        model_json = json.loads(model.get_booster().save_raw(raw_format = "json"))
+        learner = model_json["learner"]
+        if learner["objective"]["name"] not in XGBOOST_IDENTITY_OBJECTIVES:
+            raise ValueError(f"xgboost objective [{learner['objective']['name']}] can not be compiled")
+        if learner["gradient_booster"]["name"] != "gbtree":
+            raise ValueError(f"xgboost booster [{learner['gradient_booster']['name']}] can not be compiled")
+
+        trees = learner["gradient_booster"]["model"]["trees"]
+        iteration_indptr = learner["gradient_booster"]["model"].get("iteration_indptr")
+        best_iteration = getattr(model , "best_iteration" , None) if hasattr(model , "best_score") else None
+        if best_iteration is not None:
+            n_trees = iteration_indptr[best_iteration + 1] if iteration_indptr else best_iteration + 1
+            trees = trees[: n_trees]
+
+        builder = _TreeBuilder()
+        for tree in trees:
+            if any(tree.get("split_type" , [])):
+                raise ValueError("xgboost categorical splits can not be compiled")
+            left = np.array(tree["left_children"])
+            # leaves keep their value in split_conditions
+            split_conditions = np.array(tree["split_conditions"] , dtype = np.float32).astype(np.float64)
+            builder.add_arrays(
+                # xgboost goes left if x < split , same as x <= the previous double of split
+                feature = np.array(tree["split_indices"]), threshold = np.nextafter(split_conditions , -np.inf), left = left,
+                right = np.array(tree["right_children"]), value = split_conditions,
+                default_left = np.array(tree["default_left"] , dtype = bool)
+            )
+
+        base_score = float(str(learner["learner_model_param"]["base_score"]).strip("[]"))
+        # xgboost rounds the features to float32 and sums the trees in float32
+        return cls._from_builder(
+            builder , float32_input = True , base_score = base_score ,
+            accumulate_dtype = "float32" , source = type(model).__name__
+        )
+
+    @classmethod
+    def from_lightgbm(cls , model: object) -> "CompiledTreeEnsemble":
+        """LGBMRegressor , the dump has only the trees up to the best iteration when early stopping was used."""
+        model_json = model.booster_.dump_model()
+        objective = str(model_json.get("objective" , "")).split(" ")[0]
+        if objective not in LIGHTGBM_IDENTITY_OBJECTIVES:
+            raise ValueError(f"lightgbm objective [{objective}] can not be compiled")
+        if model_json.get("average_output"):
+            raise ValueError("lightgbm random forest mode can not be compiled")
+
+        builder = _TreeBuilder()
+
+        def add_node(node: dict) -> int:
+            node_id = builder.add_node()
+            if "leaf_value" in node:
+                builder.set_leaf(node_id , node["leaf_value"])
+                return node_id
+
+            if node["decision_type"] != "<=":
+                raise ValueError(f"lightgbm decision type [{node['decision_type']}] can not be compiled")
+            if node["missing_type"] == "Zero":
+                raise ValueError("lightgbm missing type [Zero] can not be compiled")
+            # missing type None: a missing value is used as 0
+            default_left = node["default_left"] if node["missing_type"] == "NaN" else 0.0 <= node["threshold"]
+            left = add_node(node["left_child"])
+            right = add_node(node["right_child"])
+            builder.set_split(node_id , node["split_feature"] , node["threshold"] , left , right , default_left)
+            return node_id
+
+        for tree_info in model_json["tree_info"]:
+            builder.roots.append(add_node(tree_info["tree_structure"]))
+
+        # lightgbm compares the features as double(x <= threshold) , the init score is in the first tree
+        return cls._from_builder(builder , float32_input = False , source = type(model).__name__)
+
+    @classmethod
+    def from_catboost(cls , model: object) -> "CompiledTreeEnsemble":
+        """CatBoostRegressor with oblivious(symmetric) trees and float features only."""
+        file_descriptor , file_path = tempfile.mkstemp(suffix = ".json")
+        os.close(file_descriptor)
+        try:
+            model.save_model(file_path , format = "json")
+            with open(file_path) as file_obj:
+                model_json = json.load(file_obj)
+        finally:
+            os.remove(file_path)
+
+        if "oblivious_trees" not in model_json:
+            raise ValueError("only catboost models with oblivious trees can be compiled")
+
+        float_features = {info["feature_index"] : info for info in model_json["features_info"].get("float_features" , [])}
+        scale , bias = model_json.get("scale_and_bias" , [1.0 , [0.0]])
+
+        builder = _TreeBuilder()
+        for tree in model_json["oblivious_trees"]:
+            splits = tree.get("splits") or []
+            leaf_values = tree["leaf_values"]
+            depth = len(splits)
+            for split in splits:
+                if split.get("split_type" , "FloatFeature") != "FloatFeature":
+                    raise ValueError(f"catboost split type [{split.get('split_type')}] can not be compiled")
+
+            # level l of the tree uses splits[l] , the leaf index has the bit of splits[l] at position l
+            def add_level(level: int , leaf_index: int) -> int:
+                node_id = builder.add_node()
+                if level == depth:
+                    builder.set_leaf(node_id , leaf_values[leaf_index])
+                    return node_id
+                split = splits[level]
+                feature_info = float_features[split["float_feature_index"]]
+                left = add_level(level + 1 , leaf_index)
+                right = add_level(level + 1 , leaf_index | (1 << level))
+                # nan_value_treatment AsTrue sends missing values above every border
+                builder.set_split(
+                    node_id , feature_info["flat_feature_index"] , split["border"] , left , right ,
+                    feature_info.get("nan_value_treatment") != "AsTrue"
+                )
+                return node_id
+
+            builder.roots.append(add_level(0 , 0))
+
+        # catboost binarizes float32 features(x > border goes right) , prediction is scale x sum + bias
+        return cls._from_builder(
+            builder , float32_input = True , base_score = bias[0] if isinstance(bias , list) else bias ,
+            scale = scale , source = type(model).__name__
+        )
+
+    @classmethod
+    def from_model(cls , model: object) -> "CompiledTreeEnsemble":
+        """
+        Compile a fitted tree ensemble regressor of sklearn , xgboost , lightgbm or catboost.
+
+        Raises:
+            ValueError: If the model type or one of its settings is not supported.
+        """
+        module_name = type(model).__module__.split(".")[0]
+        if module_name == "sklearn" and (hasattr(model , "tree_") or hasattr(model , "estimators_")):
+            return cls.from_sklearn(model)
+        if module_name == "xgboost":
+            return cls.from_xgboost(model)
+        if module_name == "lightgbm":
+            return cls.from_lightgbm(model)
+        if module_name == "catboost":
+            return cls.from_catboost(model)
+        raise ValueError(f"Model [{type(model).__name__}] can not be compiled into a tree ensemble")
+
+    def predict(self , X: np.ndarray) -> np.ndarray:
+        """
+        Predict rows of already transformed features.
+
+        Args:
+            X (np.ndarray): array of shape (n_rows , n_features) or a single row
+
+        Returns:
+            np.ndarray: float64 predictions of shape (n_rows , )
+        """
+        X = np.asarray(X , dtype = np.float32 if self.float32_input else np.float64)
+        if X.ndim == 1:
+            X = X.reshape(1 , -1)
+        X = X.astype(np.float64 , copy = False)
+
+        n_rows , n_features = X.shape
+        X_flat = np.ascontiguousarray(X).ravel()
+        row_offset = (np.arange(n_rows) * n_features)[: , None]
+        has_missing = bool(np.isnan(X_flat).any())
+
+        # every row starts at the root of every tree
+        node = np.broadcast_to(self.roots , (n_rows , self.n_trees)).copy()
+        for _ in range(self.max_depth):
+            x = X_flat[row_offset + self.feature[node]]
+            go_left = x <= self.threshold[node]
+            if has_missing:
+                # comparisons with nan are False , missing values follow the default direction
+                go_left |= np.isnan(x) & self.default_left[node]
+            node = self.children[2 * node + go_left]
+
+        leaf_values = self.value[node]
+        if self.average:
+            return leaf_values.sum(axis = 1) / self.n_trees
+        if self.scale != 1.0:
+            return self.base_score + self.scale * leaf_values.sum(axis = 1)
+
+        # base score first , then tree by tree in the dtype of the library(float32 for xgboost) , so the rounding is the same
+        terms = np.column_stack([np.full(X.shape[0] , self.base_score) , leaf_values])
+        return np.cumsum(terms , axis = 1 , dtype = self.accumulate_dtype)[: , -1].astype(np.float64)
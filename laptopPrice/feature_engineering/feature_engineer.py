@@ -1,129 +1,373 @@
-import pandas as pd 
-import numpy as np
-import re
-from sklearn.base import BaseEstimator , TransformerMixin
-from laptopPrice.logger import logging
-from laptopPrice.exception import LaptopException
-from laptopPrice.constants import SCHEMA_FILE_PATH
-from laptopPrice.utils.common_utils import read_yaml_file
-
-
-class FeatureEngineer(BaseEstimator , TransformerMixin):
-    def __init__(self , schema_file_path: str = SCHEMA_FILE_PATH):
-        super().__init__()
-        self._schema_config = read_yaml_file(file_path = schema_file_path)
-        
-        
-    def fit(self , X , y = None):
-        return self
-    
-    def transform(self , X: pd.DataFrame , y = None):
-        X = X.copy()
-        
-        if y is not None:
-            y = y.copy()
-            
-        # columns need to drop
-        drop_cols_list = self._schema_config['drop_columns']
-        # drop the cols 
-        X.drop(columns = drop_cols_list , axis = 1 , inplace = True)
-        logging.info(f"Dropped cols: {drop_cols_list}")
-        
-        X['Weight']= X['Weight'].str.replace("kg" , "")
-        X['Weight'] = X['Weight'].astype(float) 
-        X['Ram'] = X['Ram'].str.replace("GB" , "")
-        X['Ram'] = X['Ram'].astype(int)
-        
-        # Extract resolution using regex
-        X['resX'] = X['ScreenResolution'].str.extract(r'(\d{3,4})x\d{3,4}').astype(int)
-        X['resY'] = X['ScreenResolution'].str.extract(r'\d{3,4}x(\d{3,4})').astype(int)
-        
-        # Using Inches , resX and resY make a single feature PPI(Pixel Per Inch)
-        X['ppi'] = np.sqrt(X['resX']**2 + X['resY']**2) / X['Inches']
-        
-        # drop resX , resY
-        X.drop(columns = ["resX" , "resY" , "Inches"] , axis = 1 , inplace = True)
-        
-        # make a new feature called is_ips
-        X['is_ips'] = X['ScreenResolution'].str.contains('IPS' , case = False , na = False).astype(int)
-        
-        X[X['ScreenResolution'].str.contains('Touchscreen' , case = False , na = False)]
-        
-        # make a new feature called is_touchscreen
-        X['is_touchscreen'] = X['ScreenResolution'].str.contains('Touchscreen' , case = False , na = False).astype(int)
-        
-        # make 5 features: Intel Core i7 , Intel Core i5 , Intel Core i3 , Other Intel Processor , AMD Processor
-        X['Cpu_name'] = X['Cpu'].apply(lambda x: ' '.join(x.split()[0 : 3]))
-        
-        X['Cpu_name'] = X['Cpu_name'].apply(self.fetch_cpu)
-        
-        # make clock speed(GHz)
-        X['CPU_Speed_GHz'] = X['Cpu'].str.split(" ").str[-1].str.replace("GHz" , "").astype(float)
-        # now drop both ScreenResolution and Cpu
-        X.drop(columns = ['ScreenResolution' , 'Cpu'] , axis = 1 , inplace = True)
-    
-        
-        # Apply to dataframe
-        X['SSD_GB'] = X['Memory'].apply(lambda x: self.extract_storage(x, 'SSD'))
-        X['HDD_GB'] = X['Memory'].apply(lambda x: self.extract_storage(x, 'HDD'))
-        X['Flash_GB'] = X['Memory'].apply(lambda x: self.extract_storage(x, 'FLASH'))
-        X['Hybrid_GB'] = X['Memory'].apply(lambda x: self.extract_storage(x, 'HYBRID'))
-        
-        X.drop(columns = ['Memory'] , axis = 1 , inplace = True)
-        
-        # as flash and hybrid dont have any high correlation so drop them 
-        X.drop(columns = ['Flash_GB' , 'Hybrid_GB'] , axis = 1 , inplace = True)
-
-        # extract gpu brand name 
-        X['gpu_brand'] = X['Gpu'].str.split().str[0]
-        # drop the gpu column
-        X.drop(columns = ['Gpu'] , axis = 1 , inplace = True)
-        X['OpSys'] = X['OpSys'].apply(self.cat_os)
-        
-        return X 
-            
-        
-        
-    def fetch_cpu(self , text): 
-            if text == "Intel Core i5" or text == "Intel Core i7" or text == "Intel Core i3": 
-                return text
-            if text.split()[0] == "Intel": 
-                return "other intel"
-            else:
-                return 'amd'
-                
-    
-    def extract_storage(self , mem_str, storage_type):
-        mem_str = str(mem_str).upper()
-        size_gb = 0
-        
-        # Patterns for each type
-        if storage_type == 'FLASH':
-            pattern = r'(\d+\.?\d*)\s*GB\s*FLASH STORAGE'
-        elif storage_type == 'HYBRID':
-            pattern = r'(\d+\.?\d*)\s*TB\s*HYBRID|(\d+\.?\d*)\s*GB\s*HYBRID'
-        else:
-            pattern = rf'(\d+\.?\d*)\s*TB\s*{storage_type}|(\d+\.?\d*)\s*GB\s*{storage_type}'
-        
-        for match in re.finditer(pattern, mem_str):
-            tb, gb = match.groups() if len(match.groups()) == 2 else (None, match.group(1))
-            if tb:
-                size_gb += float(tb) * 1024
-            elif gb:
-                size_gb += float(gb)
-                
-        return size_gb    
-    
-    # make os: windows , mac , Linux , other 
-    def cat_os(self , text: str): 
-        text = text.lower()
-        
-        if 'windows' in text: 
-            return 'windows' 
-        elif 'linux' in text: 
-            return 'linux' 
-        elif 'mac' in text: 
-            return 'mac' 
-        else:
-            return 'other'
-        
+import pandas as pd 
+import numpy as np
+import re
+import sys
+from typing import Callable, Dict
+from sklearn.base import BaseEstimator , TransformerMixin
+from laptopPrice.logger import logging
+from laptopPrice.exception import LaptopException
+from laptopPrice.constants import SCHEMA_FILE_PATH
+from laptopPrice.configuration.schema_config import get_schema_config
+
+
+# transform engines: "python" is the original row by row implementation,
+# "vectorized" gives the same output but parses only the distinct raw strings, each column in a single pass
+PYTHON_ENGINE = "python"
+VECTORIZED_ENGINE = "vectorized"
+DEFAULT_ENGINE = VECTORIZED_ENGINE
+
+CPU_NAMES_TO_KEEP = ["Intel Core i5" , "Intel Core i7" , "Intel Core i3"]
+# first word , next two words and the last space separated token(clock speed) of the Cpu string
+CPU_PATTERN = r'^(?=.*?(?P<speed>[^ ]*)$)\s*(?P<first>\S+)(?P<rest>(?:\s+\S+){0,2})'
+RESOLUTION_PATTERN = r'(?P<resX>\d{3,4})x(?P<resY>\d{3,4})'
+STORAGE_PATTERN = r'(?P<size>\d+\.?\d*)\s*(?P<unit>TB|GB)\s*(?P<kind>SSD|HDD)'
+
+# raw string column -> parser method of the vectorized engine, fit builds a lookup table for each of them
+LOOKUP_PARSERS = {
+    'Weight' : 'parse_weight',
+    'Ram' : 'parse_ram',
+    'ScreenResolution' : 'parse_screen_resolution',
+    'Cpu' : 'parse_cpu',
+    'Memory' : 'parse_memory',
+    'Gpu' : 'parse_gpu',
+    'OpSys' : 'parse_opsys',
+}
+
+
+class ParsedLookupTable:
+    """
+    Distinct raw strings of a column with their parsed features.
+
+    Works like a read only dict of raw string -> tuple of the parsed values, but the parsed features are
+    kept as one array per feature, so a whole column is mapped with the codes of its values in the table
+    and np.take instead of running the parser again.
+    """
+    def __init__(self , values: pd.Index , parsed: Dict[str , np.ndarray]):
+        """
+        Args:
+            values (pd.Index): distinct raw strings
+            parsed (Dict[str , np.ndarray]): parsed feature name -> values in the order of values
+        """
+        self.values = values
+        self.parsed = parsed
+
+    @classmethod
+    def from_values(cls , values: np.ndarray , parser: Callable) -> "ParsedLookupTable":
+        """
+        Parse the distinct values with parser(Series -> DataFrame with one row per value).
+        """
+        values = pd.Index(pd.unique(np.asarray(values , dtype = object)) , dtype = object)
+        parsed = parser(pd.Series(np.asarray(values , dtype = object) , dtype = object))
+        return cls(values = values , parsed = {name : parsed[name].to_numpy() for name in parsed.columns})
+
+    def __len__(self) -> int:
+        return len(self.values)
+
+    def __contains__(self , value: str) -> bool:
+        return value in self.values
+
+    def __getitem__(self , value: str) -> tuple:
+        position = self.values.get_loc(value)
+        return tuple(parsed_values[position] for parsed_values in self.parsed.values())
+
+    def get_codes(self , column: pd.Series) -> np.ndarray:
+        """Position of every value of column in the table , -1 for the unseen values."""
+        return self.values.get_indexer(column)
+
+    def extend(self , other: "ParsedLookupTable") -> "ParsedLookupTable":
+        """Returns a new table with the values of other appended , the table itself is not changed."""
+        return ParsedLookupTable(
+            values = self.values.append(other.values),
+            parsed = {name : np.concatenate([self.parsed[name] , other.parsed[name]]) for name in self.parsed}
+        )
+
+    def take(self , codes: np.ndarray , index: pd.Index) -> pd.DataFrame:
+        """Parsed features of the values at codes , as a DataFrame with the given index."""
+        # memory sizes are python ints / floats(object), infer_objects gives int64 only if every value is int
+        return pd.DataFrame(
+            {name : parsed_values.take(codes) for name , parsed_values in self.parsed.items()},
+            index = index
+        ).infer_objects()
+
+
+class FeatureEngineer(BaseEstimator , TransformerMixin):
+    def __init__(self , schema_file_path: str = SCHEMA_FILE_PATH , engine: str = DEFAULT_ENGINE):
+        super().__init__()
+        self.schema_file_path = schema_file_path
+        self.engine = engine
+        # only the drop list is kept(and pickled) from the shared schema config
+        self.drop_columns = list(get_schema_config(schema_file_path).drop_columns)
+        
+    def __setstate__(self , state: dict):
+        # objects saved before the shared schema config kept the whole parsed schema.yaml
+        schema = state.pop("_schema_config" , None)
+        if schema is not None:
+            state.setdefault("drop_columns" , list(schema["drop_columns"]))
+            state.setdefault("schema_file_path" , SCHEMA_FILE_PATH)
+        super().__setstate__(state)
+        
+        
+    def fit(self , X , y = None):
+        """
+        Build the lookup table of every raw string column, so transform parses only unseen strings.
+        """
+        try:
+            self.lookup_tables_ = {}
+            for column , parser_name in LOOKUP_PARSERS.items():
+                if column in X.columns:
+                    self.lookup_tables_[column] = ParsedLookupTable.from_values(X[column] , getattr(self , parser_name))
+            logging.info(f"FeatureEngineer lookup tables: { {column : len(table) for column , table in self.lookup_tables_.items()} }")
+            return self
+        except Exception as e:
+            raise LaptopException(e , sys)
+    
+    def transform(self , X: pd.DataFrame , y = None):
+        X = X.copy()
+        
+        if y is not None:
+            y = y.copy()
+        
+        # objects saved before the engine option existed don't have the attribute
+        engine = getattr(self , "engine" , DEFAULT_ENGINE)
+        
+        if engine == VECTORIZED_ENGINE:
+            return self.transform_vectorized(X)
+        if engine == PYTHON_ENGINE:
+            return self.transform_python(X)
+        
+        raise ValueError(f"Unknown FeatureEngineer engine: [{engine}]. Use [{PYTHON_ENGINE}] or [{VECTORIZED_ENGINE}]")
+    
+    def transform_python(self , X: pd.DataFrame) -> pd.DataFrame:
+        """Row by row implementation of the feature engineering. X is modified in place."""
+        # columns need to drop
+        drop_cols_list = self.drop_columns
+        # drop the cols 
+        X.drop(columns = drop_cols_list , axis = 1 , inplace = True)
+        logging.info(f"Dropped cols: {drop_cols_list}")
+        
+        X['Weight']= X['Weight'].str.replace("kg" , "")
+        X['Weight'] = X['Weight'].astype(float) 
+        X['Ram'] = X['Ram'].str.replace("GB" , "")
+        X['Ram'] = X['Ram'].astype(int)
+        
+        # Extract resolution using regex
+        X['resX'] = X['ScreenResolution'].str.extract(r'(\d{3,4})x\d{3,4}').astype(int)
+        X['resY'] = X['ScreenResolution'].str.extract(r'\d{3,4}x(\d{3,4})').astype(int)
+        
+        # Using Inches , resX and resY make a single feature PPI(Pixel Per Inch)
+        X['ppi'] = np.sqrt(X['resX']**2 + X['resY']**2) / X['Inches']
+        
+        # drop resX , resY
+        X.drop(columns = ["resX" , "resY" , "Inches"] , axis = 1 , inplace = True)
+        
+        # make a new feature called is_ips
+        X['is_ips'] = X['ScreenResolution'].str.contains('IPS' , case = False , na = False).astype(int)
+        
+        X[X['ScreenResolution'].str.contains('Touchscreen' , case = False , na = False)]
+        
+        # make a new feature called is_touchscreen
+        X['is_touchscreen'] = X['ScreenResolution'].str.contains('Touchscreen' , case = False , na = False).astype(int)
+        
+        # make 5 features: Intel Core i7 , Intel Core i5 , Intel Core i3 , Other Intel Processor , AMD Processor
+        X['Cpu_name'] = X['Cpu'].apply(lambda x: ' '.join(x.split()[0 : 3]))
+        
+        X['Cpu_name'] = X['Cpu_name'].apply(self.fetch_cpu)
+        
+        # make clock speed(GHz)
+        X['CPU_Speed_GHz'] = X['Cpu'].str.split(" ").str[-1].str.replace("GHz" , "").astype(float)
+        # now drop both ScreenResolution and Cpu
+        X.drop(columns = ['ScreenResolution' , 'Cpu'] , axis = 1 , inplace = True)
+    
+        
+        # Apply to dataframe
+        X['SSD_GB'] = X['Memory'].apply(lambda x: self.extract_storage(x, 'SSD'))
+        X['HDD_GB'] = X['Memory'].apply(lambda x: self.extract_storage(x, 'HDD'))
+        X['Flash_GB'] = X['Memory'].apply(lambda x: self.extract_storage(x, 'FLASH'))
+        X['Hybrid_GB'] = X['Memory'].apply(lambda x: self.extract_storage(x, 'HYBRID'))
+        
+        X.drop(columns = ['Memory'] , axis = 1 , inplace = True)
+        
+        # as flash and hybrid dont have any high correlation so drop them 
+        X.drop(columns = ['Flash_GB' , 'Hybrid_GB'] , axis = 1 , inplace = True)
+
+        # extract gpu brand name 
+        X['gpu_brand'] = X['Gpu'].str.split().str[0]
+        # drop the gpu column
+        X.drop(columns = ['Gpu'] , axis = 1 , inplace = True)
+        X['OpSys'] = X['OpSys'].apply(self.cat_os)
+        
+        return X 
+    
+    
+    def transform_vectorized(self , X: pd.DataFrame) -> pd.DataFrame:
+        """Vectorized implementation of the feature engineering with the same output as transform_python.
+        Every raw string column is factorized and only its distinct values are parsed, with single pass
+        string extraction and np.select. The parsed values are taken back to the rows by the codes.
+        X is modified in place.
+        """
+        # columns need to drop
+        drop_cols_list = self.drop_columns
+        X.drop(columns = drop_cols_list , axis = 1 , inplace = True)
+        logging.info(f"Dropped cols: {drop_cols_list}")
+        
+        X['Weight'] = self.lookup(X['Weight'] , self.parse_weight)['Weight']
+        X['Ram'] = self.lookup(X['Ram'] , self.parse_ram)['Ram']
+        
+        screen = self.lookup(X['ScreenResolution'] , self.parse_screen_resolution)
+        # Using Inches , resX and resY make a single feature PPI(Pixel Per Inch)
+        X['ppi'] = np.sqrt(screen['resX']**2 + screen['resY']**2) / X['Inches']
+        X.drop(columns = ["Inches"] , axis = 1 , inplace = True)
+        X['is_ips'] = screen['is_ips']
+        X['is_touchscreen'] = screen['is_touchscreen']
+        
+        cpu = self.lookup(X['Cpu'] , self.parse_cpu)
+        X['Cpu_name'] = cpu['Cpu_name']
+        X['CPU_Speed_GHz'] = cpu['CPU_Speed_GHz']
+        X.drop(columns = ['ScreenResolution' , 'Cpu'] , axis = 1 , inplace = True)
+        
+        storage = self.lookup(X['Memory'] , self.parse_memory)
+        X['SSD_GB'] = storage['SSD_GB']
+        X['HDD_GB'] = storage['HDD_GB']
+        X.drop(columns = ['Memory'] , axis = 1 , inplace = True)
+        
+        X['gpu_brand'] = self.lookup(X['Gpu'] , self.parse_gpu)['gpu_brand']
+        X.drop(columns = ['Gpu'] , axis = 1 , inplace = True)
+        
+        X['OpSys'] = self.lookup(X['OpSys'] , self.parse_opsys)['OpSys']
+        
+        return X
+    
+    
+    def lookup(self , column: pd.Series , parser) -> pd.DataFrame:
+        """Map every row of a column to its parsed features.
+
+        With a fitted lookup table of the column only the unseen values are parsed. They are used for this call only,
+        the fitted table is never changed by transform, so the output doesn't depend on the earlier calls and concurrent
+        transforms of a shared object don't write to it. Without a table(not fitted or objects saved before the tables
+        existed) the distinct values of the column are parsed.
+
+        Args:
+            column (pd.Series): raw column
+            parser (callable): takes a Series of distinct raw values and returns a DataFrame with one row per value
+
+        Returns:
+            pd.DataFrame: parsed features aligned with the index of column
+        """
+        table = getattr(self , "lookup_tables_" , {}).get(column.name)
+        if table is None:
+            codes , uniques = pd.factorize(column , use_na_sentinel = False)
+            return ParsedLookupTable.from_values(uniques , parser).take(codes , index = column.index)
+        
+        codes = table.get_codes(column)
+        is_unseen = codes == -1
+        if is_unseen.any():
+            unseen_table = ParsedLookupTable.from_values(column[is_unseen] , parser)
+            codes[is_unseen] = len(table) + unseen_table.get_codes(column[is_unseen])
+            table = table.extend(unseen_table)
+        return table.take(codes , index = column.index)
+    
+    def parse_weight(self , values: pd.Series) -> pd.DataFrame:
+        return pd.DataFrame({'Weight' : values.str.replace("kg" , "").astype(float)})
+    
+    def parse_ram(self , values: pd.Series) -> pd.DataFrame:
+        return pd.DataFrame({'Ram' : values.str.replace("GB" , "").astype(int)})
+    
+    def parse_screen_resolution(self , values: pd.Series) -> pd.DataFrame:
+        # both resolution values in one extraction
+        parsed = values.str.extract(RESOLUTION_PATTERN).astype(int)
+        parsed['is_ips'] = values.str.contains('IPS' , case = False , na = False).astype(int)
+        parsed['is_touchscreen'] = values.str.contains('Touchscreen' , case = False , na = False).astype(int)
+        return parsed
+    
+    def parse_cpu(self , values: pd.Series) -> pd.DataFrame:
+        # cpu name bucket and clock speed(GHz) from one extraction
+        cpu_parts = values.str.extract(CPU_PATTERN)
+        first_three_words = cpu_parts['first'] + cpu_parts['rest'].str.replace(r'\s+' , ' ' , regex = True)
+        cpu_name = np.select(
+            [first_three_words.isin(CPU_NAMES_TO_KEEP) , cpu_parts['first'] == "Intel"],
+            [first_three_words.to_numpy() , "other intel"],
+            default = "amd"
+        )
+        return pd.DataFrame({
+            'Cpu_name' : cpu_name,
+            'CPU_Speed_GHz' : cpu_parts['speed'].str.replace("GHz" , "").astype(float)
+        })
+    
+    def parse_memory(self , values: pd.Series) -> pd.DataFrame:
+        # all SSD and HDD parts of every Memory string in one extractall
+        storage = values.astype(str).str.upper().str.extractall(STORAGE_PATTERN)
+        row_position = storage.index.get_level_values(0).to_numpy(dtype = np.intp)
+        size_gb = storage['size'].astype(float).to_numpy() * np.where(storage['unit'] == "TB" , 1024 , 1)
+        
+        parsed = pd.DataFrame(index = values.index)
+        for storage_type , column in (("SSD" , "SSD_GB") , ("HDD" , "HDD_GB")):
+            is_type = (storage['kind'] == storage_type).to_numpy()
+            sizes = np.zeros(len(values))
+            np.add.at(sizes , row_position[is_type] , size_gb[is_type])
+            # extract_storage returns int 0 when nothing matched, so the values are python ints / floats
+            # and a column gets int dtype only if none of its values matched(ParsedLookupTable.take)
+            has_type = np.bincount(row_position[is_type] , minlength = len(values)) > 0
+            sizes = sizes.astype(object)
+            sizes[~has_type] = 0
+            parsed[column] = sizes
+        return parsed
+    
+    def parse_gpu(self , values: pd.Series) -> pd.DataFrame:
+        return pd.DataFrame({'gpu_brand' : values.str.extract(r'^\s*(\S+)' , expand = False)})
+    
+    def parse_opsys(self , values: pd.Series) -> pd.DataFrame:
+        os_name = values.str.lower()
+        return pd.DataFrame({'OpSys' : np.select(
+            [
+                os_name.str.contains('windows' , regex = False , na = False),
+                os_name.str.contains('linux' , regex = False , na = False),
+                os_name.str.contains('mac' , regex = False , na = False)
+            ],
+            ['windows' , 'linux' , 'mac'],
+            default = 'other'
+        ).astype(object)})
+        
+        
+    def fetch_cpu(self , text): 
+            if text == "Intel Core i5" or text == "Intel Core i7" or text == "Intel Core i3": 
+                return text
+            if text.split()[0] == "Intel": 
+                return "other intel"
+            else:
+                return 'amd'
+                
+    
+    def extract_storage(self , mem_str, storage_type):
+        mem_str = str(mem_str).upper()
+        size_gb = 0
+        
+        # Patterns for each type
+        if storage_type == 'FLASH':
+            pattern = r'(\d+\.?\d*)\s*GB\s*FLASH STORAGE'
+        elif storage_type == 'HYBRID':
+            pattern = r'(\d+\.?\d*)\s*TB\s*HYBRID|(\d+\.?\d*)\s*GB\s*HYBRID'
+        else:
+            pattern = rf'(\d+\.?\d*)\s*TB\s*{storage_type}|(\d+\.?\d*)\s*GB\s*{storage_type}'
+        
+        for match in re.finditer(pattern, mem_str):
+            tb, gb = match.groups() if len(match.groups()) == 2 else (None, match.group(1))
+            if tb:
+                size_gb += float(tb) * 1024
+            elif gb:
+                size_gb += float(gb)
+                
+        return size_gb    
+    
+    # make os: windows , mac , Linux , other 
+    def cat_os(self , text: str): 
+        text = text.lower()
+        
+        if 'windows' in text: 
+            return 'windows' 
+        elif 'linux' in text: 
+            return 'linux' 
+        elif 'mac' in text: 
+            return 'mac' 
+        else:
+            return 'other'
+        
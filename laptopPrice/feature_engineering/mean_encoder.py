@@ -1,33 +1,139 @@
-# laptopPrice/feature_engineering/mean_encoder.py
-import pandas as pd
-from sklearn.base import BaseEstimator, TransformerMixin
-
-class MeanEncoder(BaseEstimator, TransformerMixin):
-    def __init__(self, categorical_features=None):
-        self.categorical_features = categorical_features
-        self.encoding_maps = {}
-
-    def fit(self, X, y):
-        X = X.copy()
-        y = pd.Series(y).reset_index(drop=True)
-
-        # Auto-detect categorical features if not provided
-        if self.categorical_features is None:
-            self.categorical_features = X.select_dtypes(include=['object', 'category']).columns.tolist()
-
-        # Create mean encoding maps
-        for col in self.categorical_features:
-            df = pd.concat([X[col].reset_index(drop=True), y], axis=1)
-            df.columns = [col, 'target']
-            self.encoding_maps[col] = df.groupby(col)['target'].mean().to_dict()
-
-        return self
-
-    def transform(self, X):
-        X = X.copy()
-        for col, mapping in self.encoding_maps.items():
-            if col in X.columns:
-                X[col] = X[col].map(mapping)
-                # handle unseen categories
-                X[col].fillna(sum(mapping.values()) / len(mapping), inplace=True)
-        return X
+# laptopPrice/feature_engineering/mean_encoder.py
+import numpy as np
+import pandas as pd
+from sklearn.base import BaseEstimator, TransformerMixin
+
+
+def get_category_codes(column: pd.Series, categories: pd.Index) -> np.ndarray:
+    """
+    Position of every value of column in categories, -1 for unseen values and NaN.
+    """
+    if isinstance(column.dtype, pd.CategoricalDtype):
+        # only the categories of the column are matched, the codes are then taken for every row
+        category_positions = categories.get_indexer(column.cat.categories)
+        codes = column.cat.codes.to_numpy()
+        return np.where(codes == -1, -1, category_positions.take(codes))
+    return categories.get_indexer(column)
+
+
+class MeanEncoder(BaseEstimator, TransformerMixin):
+    """
+    Replace every categorical value with the mean target of its category.
+
+    After fit, each column has its categories(categories_) and an encoded value array(means_)
+    whose last element is the fallback of unseen categories, so transform is a hash lookup of the codes
+    and one np.take per column. Without smoothing the fallback is the mean of the category means.
+
+    Args:
+        categorical_features (list, optional): columns to encode. Defaults to None(object / category columns).
+        smoothing (float, optional): weight of the global target mean in the category means,
+            mean = (sum + smoothing * global_mean) / (count + smoothing). The fallback is then the global mean.
+            Defaults to 0.0(plain category means).
+        cv (int, optional): With cv folds, fit_transform encodes every training row with the means of the
+            other folds(out of fold) to reduce target leakage. transform always uses the means of all rows.
+            Defaults to None.
+        random_state (int, optional): seed of the fold split. Defaults to None.
+    """
+    def __init__(self, categorical_features=None, smoothing=0.0, cv=None, random_state=None):
+        self.categorical_features = categorical_features
+        self.smoothing = smoothing
+        self.cv = cv
+        self.random_state = random_state
+        self.encoding_maps = {}
+
+    def __setstate__(self, state):
+        # objects saved before smoothing / cv existed keep the plain category means
+        state.setdefault("smoothing", 0.0)
+        state.setdefault("cv", None)
+        state.setdefault("random_state", None)
+        super().__setstate__(state)
+
+    def _encode(self, sums: np.ndarray, counts: np.ndarray, fallback: float) -> np.ndarray:
+        # encoded value of every category, fallback for categories without rows
+        with np.errstate(invalid="ignore", divide="ignore"):
+            means = (sums + self.smoothing * self.global_mean_) / (counts + self.smoothing)
+        return np.where(counts > 0, means, fallback)
+
+    def fit(self, X, y):
+        y = np.asarray(y, dtype=np.float64)
+
+        # Auto-detect categorical features if not provided
+        categorical_features = self.categorical_features
+        if categorical_features is None:
+            categorical_features = X.select_dtypes(include=['object', 'category']).columns.tolist()
+
+        self.categorical_features_ = list(categorical_features)
+        self.global_mean_ = float(y.mean())
+        self.categories_ = {}
+        self.means_ = {}
+        self.encoding_maps = {}
+
+        for col in self.categorical_features_:
+            # sorted categories(same order as groupby), NaN gets -1 and is not a category
+            codes, categories = pd.factorize(X[col], sort=True)
+            is_valid = codes != -1
+            counts = np.bincount(codes[is_valid], minlength=len(categories)).astype(np.float64)
+            sums = np.bincount(codes[is_valid], weights=y[is_valid], minlength=len(categories))
+
+            means = self._encode(sums, counts, fallback=np.nan)
+            fallback = self.global_mean_ if self.smoothing else float(means.mean())
+
+            self.categories_[col] = pd.Index(categories, dtype=object)
+            # fallback as the last element, the -1 code of unseen categories takes it
+            self.means_[col] = np.append(means, fallback)
+            self.encoding_maps[col] = dict(zip(categories, means.tolist()))
+
+        return self
+
+    def _build_arrays(self):
+        # objects saved before the arrays existed only have encoding_maps
+        self.categories_ = {}
+        self.means_ = {}
+        for col, mapping in self.encoding_maps.items():
+            self.categories_[col] = pd.Index(list(mapping), dtype=object)
+            self.means_[col] = np.array(list(mapping.values()) + [sum(mapping.values()) / len(mapping)], dtype=np.float64)
+
+    def transform(self, X):
+        if not hasattr(self, "means_"):
+            self._build_arrays()
+
+        # shallow copy: the encoded columns are replaced, X and its other columns are not copied or changed
+        X = X.copy(deep=False)
+        for col, means in self.means_.items():
+            if col in X.columns:
+                X[col] = means.take(get_category_codes(X[col], self.categories_[col]))
+        return X
+
+    def fit_transform(self, X, y=None, **fit_params):
+        self.fit(X, y)
+        if not self.cv:
+            return self.transform(X)
+
+        from sklearn.model_selection import KFold
+
+        # out of fold encoding: the rows of a fold are encoded with the sums and counts of the other folds
+        y = np.asarray(y, dtype=np.float64)
+        folds = np.empty(len(X), dtype=np.intp)
+        splitter = KFold(n_splits=self.cv, shuffle=True, random_state=self.random_state)
+        for fold, (_, fold_positions) in enumerate(splitter.split(np.zeros((len(X), 1)))):
+            folds[fold_positions] = fold
+
+        X_encoded = X.copy(deep=False)
+        for col in self.categorical_features_:
+            categories = self.categories_[col]
+            codes = get_category_codes(X[col], categories)
+            is_valid = codes != -1
+            counts = np.bincount(codes[is_valid], minlength=len(categories)).astype(np.float64)
+            sums = np.bincount(codes[is_valid], weights=y[is_valid], minlength=len(categories))
+            fallback = self.means_[col][-1]
+
+            encoded = np.full(len(X), fallback)
+            for fold in range(self.cv):
+                in_fold = folds == fold
+                fold_valid = in_fold & is_valid
+                fold_counts = np.bincount(codes[fold_valid], minlength=len(categories))
+                fold_sums = np.bincount(codes[fold_valid], weights=y[fold_valid], minlength=len(categories))
+                out_of_fold_means = self._encode(sums - fold_sums, counts - fold_counts, fallback=fallback)
+                encoded[fold_valid] = out_of_fold_means.take(codes[fold_valid])
+            X_encoded[col] = encoded
+        return X_encoded
@@ -1,33 +1,164 @@
-import logging
-import os
-from datetime import datetime
-from from_root import from_root
-
-# make the log directory
-logs_dir = os.path.join(from_root() , "logs")
-os.makedirs(logs_dir , exist_ok = True)
-
-# Log filename
-LOG_FILE = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
-LOG_FILE_PATH = os.path.join(logs_dir, LOG_FILE)
-
-# create the log file format
-log_format = "[%(asctime)s] Line: %(lineno)d | %(name)s - %(levelname)s - %(message)s"
-date_format = "%Y-%m-%d %H:%M:%S"
-
-# configure basic logging to file
-logging.basicConfig(
-    filename = LOG_FILE_PATH,
-    format = log_format,
-    datefmt = date_format,
-    level = logging.INFO
-)
-
-# create console handler to also print logs to terminal
-console_handler = logging.StreamHandler()
-console_handler.setLevel(logging.INFO)
-formatter = logging.Formatter(log_format , datefmt = date_format)
-console_handler.setFormatter(formatter)
-
-# add the console handler to the root logger
-logging.getLogger().addHandler(console_handler)
\ No newline at end of file
+import logging
+import os
+import queue
+import atexit
+import itertools
+from datetime import datetime
+from logging.handlers import QueueHandler, QueueListener
+from from_root import from_root
+
+from laptopPrice.constants import (
+    LOGGING_LEVEL , LOGGING_ASYNC_ENABLED , LOGGING_QUEUE_MAX_SIZE , LOGGING_SUBSYSTEM_LEVELS , LOGGING_SAMPLE_RATES
+)
+
+# log directory, created with the log file on the first log record
+logs_dir = os.path.join(from_root() , "logs")
+
+# Log filename
+LOG_FILE = f"{datetime.now().strftime('%m_%d_%Y_%H_%M_%S')}.log"
+LOG_FILE_PATH = os.path.join(logs_dir, LOG_FILE)
+
+# create the log file format
+log_format = "[%(asctime)s] Line: %(lineno)d | %(name)s - %(levelname)s - %(message)s"
+date_format = "%Y-%m-%d %H:%M:%S"
+
+
+class DelayedFileHandler(logging.FileHandler):
+    """
+    FileHandler which creates the log directory and file on the first log record instead of at import,
+    so importing the package(e.g. at the cold start of a serving container) does not touch the disk.
+    """
+    def __init__(self , filename: str , **kwargs):
+        super().__init__(filename , delay = True , **kwargs)
+
+    def _open(self):
+        os.makedirs(os.path.dirname(self.baseFilename) , exist_ok = True)
+        return super()._open()
+
+
+class SamplingFilter(logging.Filter):
+    """
+    Keeps only a fraction of the records below WARNING of the configured loggers(and their children),
+    e.g. {"laptopPrice.pipeline.prediction_pipeline": 0.01} keeps 1 of every 100 of its INFO / DEBUG records.
+    Warnings and errors are always kept.
+    """
+    def __init__(self , sample_rates: dict):
+        super().__init__()
+        # longest logger name first, so the most specific rate is used
+        self.sample_rates = sorted(
+            ((name , max(int(round(1 / rate)) , 1) if rate > 0 else None) for name , rate in sample_rates.items()),
+            key = lambda item: len(item[0]) , reverse = True
+        )
+        self.counters = {name : itertools.count() for name , _ in self.sample_rates}
+
+    def filter(self , record: logging.LogRecord) -> bool:
+        if record.levelno >= logging.WARNING:
+            return True
+        for name , keep_every in self.sample_rates:
+            if record.name == name or record.name.startswith(name + "."):
+                # rate 0 drops all , next() of itertools.count is atomic, the filter is shared by the threads
+                return keep_every is not None and next(self.counters[name]) % keep_every == 0
+        return True
+
+
+class DroppingQueueHandler(QueueHandler):
+    """
+    QueueHandler which drops records when the queue is full instead of blocking the caller(or raising),
+    and leaves the formatting of the message to the listener thread.
+
+    The %-style args of a record are merged in the listener thread, so the caller only pays for the
+    LogRecord. Args are not copied, a mutable object logged as an arg should not be changed afterwards.
+    """
+    def __init__(self , log_queue: queue.Queue):
+        super().__init__(log_queue)
+        self.dropped = 0
+
+    def prepare(self , record: logging.LogRecord) -> logging.LogRecord:
+        # the traceback is rendered now, it is gone when the listener gets the record
+        if record.exc_info:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self , record: logging.LogRecord) -> None:
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            self.dropped += 1
+
+
+def parse_logger_settings(setting: str) -> dict:
+    """
+    "name=value,name=value" of LOGGING_SUBSYSTEM_LEVELS / LOGGING_SAMPLE_RATES as {name: value}.
+    """
+    settings = {}
+    for item in setting.split(","):
+        if "=" in item:
+            name , value = item.split("=" , 1)
+            settings[name.strip()] = value.strip()
+    return settings
+
+
+def get_logger(name: str) -> logging.Logger:
+    """
+    Logger of a module(pass __name__). Its level can be set per subsystem with LOGGING_SUBSYSTEM_LEVELS,
+    e.g. laptopPrice.pipeline=WARNING gates the logs of all the modules of laptopPrice.pipeline.
+    """
+    return logging.getLogger(name)
+
+
+def get_logging_stats() -> dict:
+    """
+    Records waiting in the queue and records dropped because it was full(async logging only).
+    """
+    if queue_handler is None:
+        return {"async" : False , "queued" : 0 , "dropped" : 0}
+    return {"async" : True , "queued" : queue_handler.queue.qsize() , "dropped" : queue_handler.dropped}
+
+
+def _restart_listener_in_child() -> None:
+    # a forked process(e.g. a process pool worker) has the queue handler but not the listener thread,
+    # it gets its own queue and listener writing to the same handlers
+    global queue_listener
+    queue_handler.queue = queue.Queue(maxsize = LOGGING_QUEUE_MAX_SIZE)
+    queue_listener = QueueListener(queue_handler.queue , *output_handlers , respect_handler_level = True)
+    queue_listener.start()
+    atexit.register(queue_listener.stop)
+
+
+# file handler and console handler to also print logs to terminal
+formatter = logging.Formatter(log_format , datefmt = date_format)
+file_handler = DelayedFileHandler(LOG_FILE_PATH)
+console_handler = logging.StreamHandler()
+output_handlers = [file_handler , console_handler]
+for handler in output_handlers:
+    handler.setFormatter(formatter)
+
+sample_rates = {name : float(rate) for name , rate in parse_logger_settings(LOGGING_SAMPLE_RATES).items()}
+
+root_logger = logging.getLogger()
+root_logger.setLevel(LOGGING_LEVEL)
+queue_handler = None
+queue_listener = None
+if LOGGING_ASYNC_ENABLED:
+    # the callers only put the records into a queue, a listener thread formats and writes them
+    queue_handler = DroppingQueueHandler(queue.Queue(maxsize = LOGGING_QUEUE_MAX_SIZE))
+    # sampled once before the queue, the listener writes the kept records to every output
+    queue_handler.addFilter(SamplingFilter(sample_rates))
+    root_logger.addHandler(queue_handler)
+    queue_listener = QueueListener(queue_handler.queue , *output_handlers , respect_handler_level = True)
+    queue_listener.start()
+    # the records still in the queue are written at exit
+    atexit.register(queue_listener.stop)
+    if hasattr(os , "register_at_fork"):
+        os.register_at_fork(after_in_child = _restart_listener_in_child)
+else:
+    for handler in output_handlers:
+        # a filter per output, a shared one would advance its counters once per output for every record.
+        # the filter of the root logger can't be used, the records of the child loggers don't pass it
+        handler.addFilter(SamplingFilter(sample_rates))
+        root_logger.addHandler(handler)
+
+# level gating per subsystem(logger name prefix)
+for name , level in parse_logger_settings(LOGGING_SUBSYSTEM_LEVELS).items():
+    logging.getLogger(name).setLevel(level.upper())
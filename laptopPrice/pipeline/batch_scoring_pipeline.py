@@ -0,0 +1,182 @@
+import sys
+import time
+import argparse
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from laptopPrice.exception import LaptopException
+from laptopPrice.logger import get_logger
+from laptopPrice.constants import SCHEMA_FILE_PATH , TARGET_COLUMN
+from laptopPrice.configuration.schema_config import get_schema_config
+from laptopPrice.entity.config_entity import BatchScoringConfig
+from laptopPrice.entity.artifact_entity import BatchScoringArtifact
+from laptopPrice.pipeline.model_registry import ModelRegistry
+from laptopPrice.utils.common_utils import iterate_dataframe_chunks , DataFrameFileWriter
+
+logger = get_logger(__name__)
+
+
+def load_worker_model(model_file_path: str) -> None:
+    """
+    Initializer of the worker processes, the estimator is loaded once per worker into its model registry.
+    """
+    ModelRegistry(model_file_path = model_file_path).get_model()
+
+
+def score_chunk(features: pd.DataFrame , model_file_path: str) -> np.ndarray:
+    """
+    Predict the actual prices of a chunk of raw listings with the estimator of the model registry.
+    Runs in the worker processes(or in the main process with a single worker).
+    """
+    model = ModelRegistry(model_file_path = model_file_path).get_model()
+    log_prices = model.predict_dataframe(features , acutal_price = False)
+    # the log prices are converted at once instead of one by one
+    return np.exp(np.asarray(log_prices , dtype = np.float64))
+
+
+class BatchScoringPipeline:
+    def __init__(self , batch_scoring_config: BatchScoringConfig):
+        """
+        Scores a large file of raw listings chunk by chunk.
+
+        The chunks are read in file order and predicted in a process pool(the estimator is loaded once per
+        worker). At most n_workers x max_pending_chunks_per_worker chunks are in flight, and every chunk is
+        written into the output file as soon as it and the chunks before it are scored, so the memory stays
+        bounded whatever the file size is and the output keeps the input row order.
+
+        Args:
+            batch_scoring_config (BatchScoringConfig): input / output files , model file and pool settings.
+        """
+        self.batch_scoring_config = batch_scoring_config
+        schema_config = get_schema_config(SCHEMA_FILE_PATH)
+        # raw columns the estimator reads. the ones it drops first(e.g. the index column) may be missing in the
+        # input, they are added empty
+        self.optional_columns = [column for column in schema_config.drop_columns if column not in schema_config.column_set]
+        self.feature_columns = self.optional_columns + [column for column in schema_config.columns if column != TARGET_COLUMN]
+
+    def get_features(self , chunk: pd.DataFrame) -> pd.DataFrame:
+        """
+        Raw feature columns of a chunk, other input columns(ids , current price ...) are only written to the output.
+
+        Raises:
+            ValueError: If a feature column is missing.
+        """
+        missing_columns = [
+            column for column in self.feature_columns if column not in chunk.columns and column not in self.optional_columns
+        ]
+        if missing_columns:
+            raise ValueError(f"Input file has missing columns: {missing_columns}. Expected the columns of {SCHEMA_FILE_PATH}")
+        return chunk.reindex(columns = self.feature_columns)
+
+    def iterate_scored_chunks(self , chunks: Iterator[pd.DataFrame]) -> Iterator[Tuple[pd.DataFrame , np.ndarray]]:
+        """
+        Yields (chunk , predictions) in the order of the chunks.
+        """
+        model_file_path = self.batch_scoring_config.model_file_path
+        n_workers = self.batch_scoring_config.n_workers
+
+        if n_workers <= 1:
+            load_worker_model(model_file_path)
+            for chunk in chunks:
+                yield chunk , score_chunk(self.get_features(chunk) , model_file_path)
+            return
+
+        max_pending = n_workers * self.batch_scoring_config.max_pending_chunks_per_worker
+        with ProcessPoolExecutor(
+            max_workers = n_workers , initializer = load_worker_model , initargs = (model_file_path , )
+        ) as executor:
+            pending = deque()
+            for chunk in chunks:
+                pending.append((chunk , executor.submit(score_chunk , self.get_features(chunk) , model_file_path)))
+                # wait for the oldest chunk before reading more, the chunks behind it keep the workers busy
+                if len(pending) >= max_pending:
+                    chunk , future = pending.popleft()
+                    yield chunk , future.result()
+            while pending:
+                chunk , future = pending.popleft()
+                yield chunk , future.result()
+
+    def initiate_batch_scoring(self) -> BatchScoringArtifact:
+        """
+        Score the input file into the output file.
+
+        Returns:
+            BatchScoringArtifact: output file , rows , chunks and the scoring speed.
+        """
+        try:
+            config = self.batch_scoring_config
+            logger.info(
+                "Batch scoring started. input: %s , output: %s , model: %s , chunk_size: %s , workers: %s" ,
+                config.input_file_path , config.output_file_path , config.model_file_path , config.chunk_size , config.n_workers
+            )
+            start_time = time.perf_counter()
+            n_chunks = 0
+
+            chunks = iterate_dataframe_chunks(file_path = config.input_file_path , chunk_size = config.chunk_size)
+            with DataFrameFileWriter(file_path = config.output_file_path , compression = config.compression) as writer:
+                for chunk , predictions in self.iterate_scored_chunks(chunks):
+                    chunk[config.prediction_column] = np.round(predictions , 2)
+                    writer.write(chunk)
+                    n_chunks += 1
+
+                    elapsed_seconds = time.perf_counter() - start_time
+                    logger.info(
+                        "Scored chunk %s. rows: %s , total rows: %s , %.0f rows/s" ,
+                        n_chunks , len(chunk) , writer.n_rows , writer.n_rows / elapsed_seconds
+                    )
+                n_rows = writer.n_rows
+
+            elapsed_seconds = time.perf_counter() - start_time
+            batch_scoring_artifact = BatchScoringArtifact(
+                output_file_path = config.output_file_path,
+                n_rows = n_rows,
+                n_chunks = n_chunks,
+                elapsed_seconds = elapsed_seconds,
+                rows_per_second = n_rows / elapsed_seconds if elapsed_seconds > 0 else 0.0
+            )
+            logger.info("Batch scoring completed. %s" , batch_scoring_artifact)
+            return batch_scoring_artifact
+
+        except Exception as e:
+            raise LaptopException(e , sys)
+
+
+def main(argv: List[str] = None) -> None:
+    """
+    Command line entry point, e.g. laptopPrice-batch-score catalog.parquet priced_catalog.parquet --workers 8
+    """
+    defaults = BatchScoringConfig(input_file_path = None , output_file_path = None)
+    parser = argparse.ArgumentParser(description = "Score a csv / parquet / feather file of raw laptop listings")
+    parser.add_argument("input_file_path" , help = "raw listings in the column format of config/schema.yaml")
+    parser.add_argument("output_file_path" , help = "input columns + the predicted price , csv / parquet / feather")
+    parser.add_argument("--model-file-path" , default = defaults.model_file_path)
+    parser.add_argument("--chunk-size" , type = int , default = defaults.chunk_size)
+    parser.add_argument("--workers" , type = int , default = defaults.n_workers)
+    parser.add_argument("--prediction-column" , default = defaults.prediction_column)
+    parser.add_argument("--compression" , default = defaults.compression , help = "parquet / feather codec, e.g. zstd")
+    args = parser.parse_args(argv)
+
+    batch_scoring_artifact = BatchScoringPipeline(
+        batch_scoring_config = BatchScoringConfig(
+            input_file_path = args.input_file_path,
+            output_file_path = args.output_file_path,
+            model_file_path = args.model_file_path,
+            chunk_size = args.chunk_size,
+            n_workers = args.workers,
+            prediction_column = args.prediction_column,
+            compression = args.compression
+        )
+    ).initiate_batch_scoring()
+
+    print(
+        f"Scored {batch_scoring_artifact.n_rows} rows in {batch_scoring_artifact.elapsed_seconds:.2f}s "
+        f"({batch_scoring_artifact.rows_per_second:.0f} rows/s) into {batch_scoring_artifact.output_file_path}"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,105 @@
+import sys
+import time
+import queue
+import threading
+from concurrent.futures import Future
+from typing import List, Tuple
+
+from laptopPrice.exception import LaptopException
+from laptopPrice.logger import get_logger
+from laptopPrice.entity.config_entity import MicroBatchConfig, LaptopPricePredictionConfig
+from laptopPrice.pipeline.prediction_pipeline import CustomData, CustomDataBatch, PredictPipeline
+
+logger = get_logger(__name__)
+
+
+class MicroBatcher:
+    """
+    Collects concurrent single record prediction requests and predicts them as one dataframe.
+
+    A background thread takes the first waiting request, then keeps collecting requests until
+    the batch has max_batch_size records or max_wait_ms is passed. The whole batch goes through
+    LaptopPriceEstimator.predict_user_info once and every caller gets its own prediction back.
+    """
+    def __init__(self , micro_batch_config: MicroBatchConfig = MicroBatchConfig() ,
+                 prediction_config: LaptopPricePredictionConfig = LaptopPricePredictionConfig()):
+        self.micro_batch_config = micro_batch_config
+        self.prediction_config = prediction_config
+        self._queue : "queue.Queue[Tuple[dict, Future]]" = queue.Queue()
+        self._worker = None
+        self._worker_lock = threading.Lock()
+
+    def _start_worker(self) -> None:
+        # the thread is started on the first request, so forked server workers each start their own thread
+        with self._worker_lock:
+            if self._worker is None or not self._worker.is_alive():
+                self._worker = threading.Thread(target = self._run , name = "prediction-micro-batcher" , daemon = True)
+                self._worker.start()
+                logger.info(
+                    "Micro batcher started. max_batch_size: %s , max_wait_ms: %s" ,
+                    self.micro_batch_config.max_batch_size , self.micro_batch_config.max_wait_ms
+                )
+
+    def _collect_batch(self) -> List[Tuple[dict, Future]]:
+        # block until the first request comes
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.micro_batch_config.max_wait_ms / 1000
+
+        while len(batch) < self.micro_batch_config.max_batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout = remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _predict_batch(self , batch: List[Tuple[dict, Future]]) -> None:
+        prediction_pipeline = PredictPipeline(prediction_config = self.prediction_config)
+        records = [data_dict for data_dict , _ in batch]
+
+        try:
+            predictions = prediction_pipeline.predict_batch(CustomDataBatch(records = records))['predictions']
+            for (_ , future) , prediction in zip(batch , predictions):
+                future.set_result({'prediction': prediction})
+            return
+        except Exception:
+            if len(batch) == 1:
+                raise
+            logger.info("Batch prediction of %s records failed. Predicting them one by one" , len(batch))
+
+        # one bad record should not fail the other requests of the batch
+        for data_dict , future in batch:
+            try:
+                future.set_result(prediction_pipeline.predict(custom_data = CustomData(data_dict = data_dict)))
+            except Exception as e:
+                future.set_exception(e)
+
+    def _run(self) -> None:
+        while True:
+            batch = self._collect_batch()
+            try:
+                self._predict_batch(batch)
+            except Exception as e:
+                for _ , future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+
+    def predict(self , custom_data: CustomData) -> dict:
+        """
+        Queue one record for the next batch and wait for its prediction.
+
+        Args:
+            custom_data (CustomData): the record to predict
+
+        Returns:
+            dict: same result as PredictPipeline.predict
+        """
+        try:
+            self._start_worker()
+            future = Future()
+            self._queue.put((custom_data.data_dict , future))
+            return future.result(timeout = self.micro_batch_config.request_timeout_seconds)
+        except Exception as e:
+            raise LaptopException(e , sys)
@@ -0,0 +1,239 @@
+import os
+import sys
+import time
+import shutil
+import threading
+from dataclasses import dataclass, asdict
+from typing import BinaryIO, Dict, Optional, Tuple
+
+import dill
+
+from laptopPrice.exception import LaptopException
+from laptopPrice.logger import get_logger
+from laptopPrice.constants import PRODUCTION_MODEL_PATH , SERVING_SHARED_MODEL_MIN_BYTES
+from laptopPrice.utils.common_utils import get_file_object_hash
+from laptopPrice.utils.shared_model import (
+    save_shared_object , load_shared_object , load_shared_manifest , is_shared_object_dir
+)
+from laptopPrice.entity.model_bundle import MODEL_BUNDLE_MANIFEST_FILE_NAME , load_model_bundle , get_model_path
+
+logger = get_logger(__name__)
+
+
+@dataclass
+class ModelRegistryStats:
+    """
+    Counters of a single registry entry.
+
+    Attributes:
+        hits (int): Number of requests served with the already loaded estimator
+        misses (int): Number of requests which had to (re)load the estimator from disk
+        reloads (int): Number of loads triggered by a changed model file (first load not counted)
+        last_load_seconds (float): Time spent on the most recent load
+        total_load_seconds (float): Time spent on all loads
+        model_version (str): sha256 of the currently loaded model file
+    """
+    hits : int = 0
+    misses : int = 0
+    reloads : int = 0
+    last_load_seconds : float = 0.0
+    total_load_seconds : float = 0.0
+    model_version : Optional[str] = None
+
+
+class _RegistryEntry:
+    def __init__(self):
+        self.model = None
+        self.file_signature = None # (st_mtime_ns , st_size) of the loaded file
+        self.stats = ModelRegistryStats()
+        self.lock = threading.Lock()
+
+
+class ModelRegistry:
+    """
+    Process wide cache of the production estimator.
+
+    The estimator is unpickled once per worker process and shared by every request.
+    On each lookup only the file stat is compared with the loaded one. If mtime or size changed,
+    the file hash is calculated and the estimator is reloaded only when the content really changed.
+
+    With shared_model_dir the estimator is saved once per model version as a shared object directory and
+    every worker memory maps its large arrays read only, so the workers share one copy of them.
+    A model bundle directory(see model_bundle.py) is watched by its manifest and is always memory mapped.
+    """
+    _entries : Dict[tuple , _RegistryEntry] = {} # one entry per (model file path , shared model dir)
+    _entries_lock = threading.Lock()
+
+    def __init__(self , model_file_path: str = PRODUCTION_MODEL_PATH , shared_model_dir: str = None):
+        self.model_file_path = os.path.abspath(model_file_path)
+        self.shared_model_dir = os.path.abspath(shared_model_dir) if shared_model_dir else None
+        self._entry_key = (self.model_file_path , self.shared_model_dir)
+
+    def _get_entry(self) -> _RegistryEntry:
+        entry = ModelRegistry._entries.get(self._entry_key)
+        if entry is None:
+            with ModelRegistry._entries_lock:
+                entry = ModelRegistry._entries.setdefault(self._entry_key , _RegistryEntry())
+        return entry
+
+    def _load_shared(self , model_version: str , model_file_obj: BinaryIO) -> object:
+        """
+        Memory map the shared object of this model version, saving it first if no worker did it yet.
+        """
+        version_dir_path = os.path.join(self.shared_model_dir , model_version[:16])
+        # the versions are hashes, the mtime of the model file tells which one was pushed later
+        model_file_mtime_ns = os.fstat(model_file_obj.fileno()).st_mtime_ns
+        if not is_shared_object_dir(version_dir_path):
+            model_file_obj.seek(0)
+            model = dill.load(model_file_obj)
+            # the library trees(e.g. sklearn Tree) copy their arrays while unpickling, only the compiled
+            # versions are used from the mapped files
+            if getattr(model , "tree_ensemble" , None) is None and hasattr(model , "compile_tree_ensemble"):
+                model.compile_tree_ensemble()
+            if getattr(model , "_inference_plan" , None) is None and hasattr(model , "compile_inference_plan"):
+                model.compile_inference_plan()
+            save_shared_object(
+                dir_path = version_dir_path,
+                obj = model,
+                min_bytes = SERVING_SHARED_MODEL_MIN_BYTES,
+                metadata = {
+                    "model_version" : model_version,
+                    "model_file_path" : self.model_file_path,
+                    "model_file_mtime_ns" : model_file_mtime_ns
+                }
+            )
+            del model
+
+        model = load_shared_object(version_dir_path)
+        self._remove_older_versions(version_dir_path = version_dir_path , model_file_mtime_ns = model_file_mtime_ns)
+        return model
+
+    def _remove_older_versions(self , version_dir_path: str , model_file_mtime_ns: int) -> None:
+        """
+        Remove the directories of the versions pushed before the served one. The workers still mapping them
+        keep their pages until they reload.
+
+        A worker which loaded an older file(e.g. before a push) must not remove the directory of the newer
+        version the other workers are loading, so a directory is only removed if its model file is older.
+        """
+        for dir_name in os.listdir(self.shared_model_dir):
+            dir_path = os.path.join(self.shared_model_dir , dir_name)
+            # ".tmp-" directories are being saved by other workers
+            if dir_path == version_dir_path or ".tmp-" in dir_name or not is_shared_object_dir(dir_path):
+                continue
+            try:
+                # directories saved without the mtime are older than this code
+                dir_mtime_ns = load_shared_manifest(dir_path).get("model_file_mtime_ns" , 0)
+            except LaptopException:
+                # removed by another worker meanwhile
+                continue
+            if dir_mtime_ns < model_file_mtime_ns:
+                shutil.rmtree(dir_path , ignore_errors = True)
+
+    def _get_version_file_path(self , model_path: str) -> str:
+        # the manifest of a bundle has the sha256 of every file, so it identifies the whole bundle
+        if os.path.isdir(model_path):
+            return os.path.join(model_path , MODEL_BUNDLE_MANIFEST_FILE_NAME)
+        return model_path
+
+    def _load(self , entry: _RegistryEntry , model_path: str , file_signature: tuple) -> None:
+        """Load the estimator from disk, unless the file content is the same as the loaded one."""
+        # the version is hashed from the same open file the estimator is loaded from, so a file pushed in
+        # between can't pair the version of one file with the estimator of the other
+        with open(self._get_version_file_path(model_path) , "rb") as model_file_obj:
+            model_version = get_file_object_hash(model_file_obj)
+
+            if entry.model is not None and model_version == entry.stats.model_version:
+                # only the mtime changed(e.g. same file pushed again) so keep the loaded estimator
+                logger.info("Model file touched but content unchanged: %s" , self.model_file_path)
+                entry.file_signature = file_signature
+                return
+
+            start_time = time.perf_counter()
+            if os.path.isdir(model_path):
+                # the arrays of a bundle are already memory mapped , shared_model_dir is not needed
+                model_format = "bundle"
+                model = load_model_bundle(model_path)
+            elif self.shared_model_dir is not None:
+                model_format = "shared"
+                model = self._load_shared(model_version , model_file_obj)
+            else:
+                model_format = "pickle"
+                model_file_obj.seek(0)
+                model = dill.load(model_file_obj)
+            load_seconds = time.perf_counter() - start_time
+
+        if entry.model is not None:
+            entry.stats.reloads += 1
+
+        entry.model = model
+        entry.file_signature = file_signature
+        entry.stats.model_version = model_version
+        entry.stats.last_load_seconds = load_seconds
+        entry.stats.total_load_seconds += load_seconds
+        logger.info(
+            "Loaded model [%s] from %s in %.4fs. version: %s , format: %s" ,
+            model , model_path , load_seconds , model_version , model_format
+        )
+
+    def get_model_with_version(self) -> Tuple[object , str]:
+        """
+        Returns the cached estimator with its version, loading or reloading it if the model file changed.
+
+        Both are read under the entry lock, so a reload in another thread can't pair the old estimator with
+        the new version(e.g. in the keys of the prediction cache).
+
+        Returns:
+            Tuple[object , str]: LaptopPriceEstimator object and the sha256 of its model file
+        """
+        try:
+            entry = self._get_entry()
+            # a bundle directory path falls back to the pickle next to it until a bundle is pushed
+            model_path = get_model_path(self.model_file_path)
+            try:
+                stat = os.stat(self._get_version_file_path(model_path))
+                file_signature = (stat.st_mtime_ns , stat.st_size)
+            except FileNotFoundError:
+                # the model is being replaced(or removed), keep serving the loaded one
+                file_signature = None
+
+            with entry.lock:
+                if entry.model is not None and (file_signature is None or entry.file_signature == file_signature):
+                    entry.stats.hits += 1
+                elif file_signature is None:
+                    raise FileNotFoundError(f"Model file not found: {self.model_file_path}")
+                else:
+                    entry.stats.misses += 1
+                    self._load(entry = entry , model_path = model_path , file_signature = file_signature)
+                return entry.model , entry.stats.model_version
+
+        except Exception as e:
+            raise LaptopException(e , sys)
+
+    def get_model(self) -> object:
+        """
+        Returns the cached estimator, loading or reloading it if the model file changed.
+
+        Returns:
+            object: LaptopPriceEstimator object
+        """
+        return self.get_model_with_version()[0]
+
+    def get_model_version(self) -> Optional[str]:
+        """
+        Returns the version(sha256) of the loaded estimator , None before the first get_model call.
+        """
+        return self._get_entry().stats.model_version
+
+    def get_stats(self) -> dict:
+        """
+        Returns the hit/miss and load time counters of this model file as dict.
+        """
+        return asdict(self._get_entry().stats)
+
+    def clear(self) -> None:
+        """
+        Drop the cached estimator so the next get_model call loads it again.
+        """
+        with ModelRegistry._entries_lock:
+            ModelRegistry._entries.pop(self._entry_key , None)
@@ -0,0 +1,294 @@
+import os
+import sys
+import json
+import time
+import sqlite3
+import hashlib
+import numbers
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, asdict
+from typing import Dict, Optional, Tuple
+
+from laptopPrice.exception import LaptopException
+from laptopPrice.logger import get_logger
+from laptopPrice.entity.config_entity import PredictionCacheConfig
+
+
+logger = get_logger(__name__)
+
+CACHE_BACKENDS = ("memory" , "sqlite")
+
+
+def _canonical_value(value: object) -> object:
+    # the inference plan casts numerical values to float64 and looks up categories with ==,
+    # so 8 , 8.0 and True / 1 give the same prediction. strings are kept as they are
+    if isinstance(value , numbers.Number):
+        return float(value)
+    return value
+
+
+def get_record_key(data_dict: dict) -> str:
+    """
+    sha256 of the canonical json of a record(sorted keys , numbers as float).
+    Records which differ only in the key order or number types get the same key.
+    """
+    canonical = json.dumps(
+        {str(key) : _canonical_value(value) for key , value in data_dict.items()},
+        sort_keys = True , separators = ("," , ":") , ensure_ascii = False , default = str
+    )
+    return hashlib.sha256(canonical.encode("utf-8")).hexdigest()
+
+
+@dataclass
+class PredictionCacheStats:
+    """
+    Counters of a prediction cache(of the current process).
+
+    Attributes:
+        hits (int): Lookups answered from the cache
+        misses (int): Lookups which needed a prediction
+        evictions (int): Entries dropped by the max_size limit(least recently used first)
+        expirations (int): Entries dropped because they were older than ttl_seconds
+        invalidations (int): Entries dropped because the model version changed
+        model_version (str): model version of the cached predictions
+    """
+    hits : int = 0
+    misses : int = 0
+    evictions : int = 0
+    expirations : int = 0
+    invalidations : int = 0
+    model_version : Optional[str] = None
+
+
+class PredictionCache:
+    """
+    In-process LRU cache of single record predictions with a TTL.
+
+    Entries are keyed on get_record_key of the CustomData.data_dict and belong to one model version.
+    When a lookup comes with another model version(the production model was replaced),
+    all the entries of the old version are dropped.
+    """
+    def __init__(self , max_size: int = 10000 , ttl_seconds: float = None):
+        """
+        Args:
+            max_size (int, optional): Max number of cached predictions. Defaults to 10000.
+            ttl_seconds (float, optional): Seconds an entry is valid for. Defaults to None(no expiry).
+        """
+        if max_size <= 0:
+            raise ValueError(f"max_size of the prediction cache must be positive , got {max_size}")
+
+        self.max_size = max_size
+        self.ttl_seconds = ttl_seconds or None
+        self.stats = PredictionCacheStats()
+        self._entries : "OrderedDict[str , Tuple[float , float]]" = OrderedDict() # key -> (created at , prediction)
+        self._lock = threading.Lock()
+
+    def _is_expired(self , created_at: float , now: float) -> bool:
+        return self.ttl_seconds is not None and now - created_at > self.ttl_seconds
+
+    # storage of the entries , SqlitePredictionCache replaces these methods
+
+    def _get(self , key: str , model_version: str) -> Optional[float]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        created_at , prediction = entry
+        if self._is_expired(created_at , time.monotonic()):
+            del self._entries[key]
+            self.stats.expirations += 1
+            return None
+        self._entries.move_to_end(key)
+        return prediction
+
+    def _put(self , key: str , model_version: str , prediction: float) -> None:
+        self._entries[key] = (time.monotonic() , prediction)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last = False)
+            self.stats.evictions += 1
+
+    def _invalidate(self , model_version: str) -> int:
+        n_entries = len(self._entries)
+        self._entries.clear()
+        return n_entries
+
+    def _size(self) -> int:
+        return len(self._entries)
+
+    def _check_model_version(self , model_version: str) -> None:
+        if model_version != self.stats.model_version:
+            if self.stats.model_version is not None:
+                invalidated = self._invalidate(model_version)
+                self.stats.invalidations += invalidated
+                logger.info("Model version changed to %s , %s cached predictions dropped" , model_version , invalidated)
+            self.stats.model_version = model_version
+
+    def get(self , data_dict: dict , model_version: str) -> Optional[float]:
+        """
+        Returns the cached prediction of the record for the model version , None if it is not cached.
+        """
+        key = get_record_key(data_dict)
+        with self._lock:
+            self._check_model_version(model_version)
+            prediction = self._get(key , model_version)
+            if prediction is None:
+                self.stats.misses += 1
+            else:
+                self.stats.hits += 1
+            return prediction
+
+    def put(self , data_dict: dict , model_version: str , prediction: float) -> None:
+        """
+        Cache the prediction of the record made with the model version.
+        """
+        key = get_record_key(data_dict)
+        with self._lock:
+            self._check_model_version(model_version)
+            self._put(key , model_version , float(prediction))
+
+    def get_stats(self) -> dict:
+        """
+        Returns the counters , size and hit rate of the cache as dict.
+        """
+        with self._lock:
+            stats = asdict(self.stats)
+            lookups = self.stats.hits + self.stats.misses
+            stats["hit_rate"] = self.stats.hits / lookups if lookups else 0.0
+            stats["size"] = self._size()
+            stats["max_size"] = self.max_size
+            return stats
+
+    def clear(self) -> None:
+        """
+        Drop every cached prediction.
+        """
+        with self._lock:
+            self._invalidate(model_version = None)
+
+
+class SqlitePredictionCache(PredictionCache):
+    """
+    Prediction cache stored in a local SQLite file, shared by all the worker processes of a host.
+
+    The LRU order is kept with the last access time of the entries. To keep the writes cheap,
+    entries above max_size are evicted once every max_size / 10 puts, so the table can be up to
+    10% larger than max_size in between. The counters of get_stats are of the current process.
+    """
+    def __init__(self , db_path: str , max_size: int = 10000 , ttl_seconds: float = None):
+        super().__init__(max_size = max_size , ttl_seconds = ttl_seconds)
+        self.db_path = db_path
+        self._evict_every = max(self.max_size // 10 , 1)
+        self._puts_since_eviction = 0
+        self._local = threading.local()
+
+        dir_path = os.path.dirname(db_path)
+        if dir_path:
+            os.makedirs(dir_path , exist_ok = True)
+        self._connection().execute(
+            "CREATE TABLE IF NOT EXISTS predictions("
+            "key TEXT PRIMARY KEY , model_version TEXT , prediction REAL , created_at REAL , last_access REAL)"
+        )
+
+    def _connection(self) -> sqlite3.Connection:
+        # one connection per thread , and a new one in a forked process
+        connection = getattr(self._local , "connection" , None)
+        if connection is None or self._local.pid != os.getpid():
+            connection = sqlite3.connect(self.db_path , timeout = 5 , isolation_level = None)
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+            self._local.connection = connection
+            self._local.pid = os.getpid()
+        return connection
+
+    def _get(self , key: str , model_version: str) -> Optional[float]:
+        connection = self._connection()
+        row = connection.execute(
+            "SELECT prediction , created_at FROM predictions WHERE key = ? AND model_version = ?" , (key , model_version)
+        ).fetchone()
+        if row is None:
+            return None
+
+        prediction , created_at = row
+        now = time.time()
+        if self._is_expired(created_at , now):
+            connection.execute("DELETE FROM predictions WHERE key = ?" , (key , ))
+            self.stats.expirations += 1
+            return None
+        connection.execute("UPDATE predictions SET last_access = ? WHERE key = ?" , (now , key))
+        return prediction
+
+    def _put(self , key: str , model_version: str , prediction: float) -> None:
+        connection = self._connection()
+        now = time.time()
+        connection.execute(
+            "INSERT OR REPLACE INTO predictions VALUES (? , ? , ? , ? , ?)" , (key , model_version , prediction , now , now)
+        )
+        self._puts_since_eviction += 1
+        if self._puts_since_eviction >= self._evict_every:
+            self._puts_since_eviction = 0
+            cursor = connection.execute(
+                "DELETE FROM predictions WHERE key IN "
+                "(SELECT key FROM predictions ORDER BY last_access DESC LIMIT -1 OFFSET ?)" , (self.max_size , )
+            )
+            self.stats.evictions += max(cursor.rowcount , 0)
+
+    def _invalidate(self , model_version: str) -> int:
+        # entries of the other versions , another worker may already have cached the new version
+        cursor = self._connection().execute(
+            "DELETE FROM predictions WHERE model_version IS NOT ?" , (model_version , )
+        )
+        return max(cursor.rowcount , 0)
+
+    def _size(self) -> int:
+        return self._connection().execute("SELECT COUNT(*) FROM predictions").fetchone()[0]
+
+
+_prediction_caches : Dict[tuple , PredictionCache] = {} # one cache per config in a process
+_prediction_caches_lock = threading.Lock()
+
+
+def get_prediction_cache(prediction_cache_config: PredictionCacheConfig = PredictionCacheConfig()) -> Optional[PredictionCache]:
+    """
+    Returns the process wide prediction cache of the config , None if the cache is disabled.
+
+    Raises:
+        LaptopException: If the backend is unknown or the sqlite file can't be opened.
+    """
+    if not prediction_cache_config.enabled:
+        return None
+
+    key = (
+        prediction_cache_config.backend , prediction_cache_config.sqlite_path ,
+        prediction_cache_config.max_size , prediction_cache_config.ttl_seconds
+    )
+    prediction_cache = _prediction_caches.get(key)
+    if prediction_cache is not None:
+        return prediction_cache
+
+    try:
+        with _prediction_caches_lock:
+            prediction_cache = _prediction_caches.get(key)
+            if prediction_cache is None:
+                backend = prediction_cache_config.backend
+                if backend == "memory":
+                    prediction_cache = PredictionCache(
+                        max_size = prediction_cache_config.max_size , ttl_seconds = prediction_cache_config.ttl_seconds
+                    )
+                elif backend == "sqlite":
+                    prediction_cache = SqlitePredictionCache(
+                        db_path = prediction_cache_config.sqlite_path,
+                        max_size = prediction_cache_config.max_size,
+                        ttl_seconds = prediction_cache_config.ttl_seconds
+                    )
+                else:
+                    raise ValueError(f"Unknown prediction cache backend: [{backend}]. Expected one of {CACHE_BACKENDS}")
+
+                _prediction_caches[key] = prediction_cache
+                logger.info(
+                    "Prediction cache created. backend: %s , max_size: %s , ttl_seconds: %s" ,
+                    backend , prediction_cache_config.max_size , prediction_cache_config.ttl_seconds
+                )
+            return prediction_cache
+    except Exception as e:
+        raise LaptopException(e , sys)
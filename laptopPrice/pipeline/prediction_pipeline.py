@@ -1,39 +1,130 @@
-from laptopPrice.exception import LaptopException
-from laptopPrice.constants import PRODUCTION_MODEL_PATH
-from laptopPrice.utils.common_utils import load_object
-from laptopPrice.logger import logging
-import pandas as pd 
-import sys 
-
-class CustomData:
-    def __init__(self , data_dict: dict):
-        self.data_dict = data_dict
-        
-    def to_dataframe(self):
-        # convert scalar values into single element lists
-        row = {key : [value] for key , value in self.data_dict.items()}
-        return pd.DataFrame(row) # return the dataframe
-    
-
-class PredictPipeline:
-    def __init__(self):
-        # store the path of the production model
-        self.model = load_object(PRODUCTION_MODEL_PATH)
-    
-    def predict(self , custom_data: CustomData):
-        try:
-            logging.info("Prediction pipeline started")
-            # convert the custom data into a dataframe
-            df = custom_data.to_dataframe()
-            # logging.info(f"---------------\n {df.info()} \n --------------")
-            # Make prediction
-            laptop_price = self.model.predict_user_info(df)[0]
-            
-            print(f"Predicted price: ${laptop_price:.2f}")
-            
-            # Return the prediction 
-            return {
-                'prediction': round(laptop_price, 2)
-            } 
-        except Exception as e:
-            raise LaptopException(e , sys)
\ No newline at end of file
+from laptopPrice.exception import LaptopException
+from laptopPrice.entity.config_entity import LaptopPricePredictionConfig , PredictionCacheConfig
+from laptopPrice.pipeline.model_registry import ModelRegistry
+from laptopPrice.pipeline.prediction_cache import get_prediction_cache
+from laptopPrice.utils.instrumentation import instrumentation , instrumented
+from laptopPrice.logger import get_logger , get_logging_stats
+import sys 
+
+logger = get_logger(__name__)
+
+class CustomData:
+    def __init__(self , data_dict: dict):
+        self.data_dict = data_dict
+        
+    def to_dataframe(self):
+        # convert scalar values into single element lists
+        # pandas is imported here, single records are predicted without it
+        import pandas as pd
+        
+        row = {key : [value] for key , value in self.data_dict.items()}
+        return pd.DataFrame(row) # return the dataframe
+    
+
+class CustomDataBatch:
+    def __init__(self , records: list):
+        # list of data_dict, one for each laptop
+        self.records = records
+    
+    def to_dataframe(self):
+        import pandas as pd
+        
+        # one row for each record
+        return pd.DataFrame.from_records(self.records)
+    
+
+class PredictPipeline:
+    def __init__(self , prediction_config: LaptopPricePredictionConfig = LaptopPricePredictionConfig() ,
+                 prediction_cache_config: PredictionCacheConfig = PredictionCacheConfig()):
+        # the estimator is loaded once per process and shared by all the pipelines
+        self.prediction_config = prediction_config
+        self.model_registry = ModelRegistry(
+            model_file_path = self.prediction_config.model_file_path,
+            shared_model_dir = self.prediction_config.shared_model_dir
+        )
+        # cached predictions belong to the version of the loaded estimator, a new model doesn't use the old ones
+        self.model , self.model_version = self.model_registry.get_model_with_version()
+        self.prediction_cache = get_prediction_cache(prediction_cache_config)
+    
+    @instrumented("prediction_pipeline.predict")
+    def predict(self , custom_data: CustomData):
+        try:
+            logger.debug("Prediction pipeline started")
+            if self.prediction_cache is not None:
+                laptop_price = self.prediction_cache.get(custom_data.data_dict , self.model_version)
+                if laptop_price is not None:
+                    return {'prediction': laptop_price}
+            
+            # single record is predicted with the compiled plan of the estimator, no dataframe needed
+            laptop_price = round(self.model.predict_record(custom_data.data_dict) , 2)
+            if self.prediction_cache is not None:
+                self.prediction_cache.put(custom_data.data_dict , self.model_version , laptop_price)
+            logger.debug("Predicted price: %.2f" , laptop_price)
+            
+            # Return the prediction 
+            return {
+                'prediction': laptop_price
+            } 
+        except Exception as e:
+            raise LaptopException(e , sys)
+    
+    @instrumented("prediction_pipeline.predict_batch")
+    def predict_batch(self , custom_data_batch: CustomDataBatch):
+        try:
+            logger.info("Batch prediction pipeline started for %s records" , len(custom_data_batch.records))
+            records = custom_data_batch.records
+            laptop_prices = [None] * len(records)
+            if self.prediction_cache is not None:
+                laptop_prices = [self.prediction_cache.get(record , self.model_version) for record in records]
+            
+            # only the records which are not cached are predicted, in one dataframe so the model is called once
+            missing_positions = [position for position , laptop_price in enumerate(laptop_prices) if laptop_price is None]
+            if missing_positions:
+                df = CustomDataBatch(records = [records[position] for position in missing_positions]).to_dataframe()
+                for position , laptop_price in zip(missing_positions , self.model.predict_user_info(df)):
+                    laptop_prices[position] = round(float(laptop_price) , 2)
+                    if self.prediction_cache is not None:
+                        self.prediction_cache.put(records[position] , self.model_version , laptop_prices[position])
+            
+            return {
+                'predictions': laptop_prices
+            }
+        except Exception as e:
+            raise LaptopException(e , sys)
+
+
+def render_serving_metrics(prediction_config: LaptopPricePredictionConfig = LaptopPricePredictionConfig()) -> str:
+    """
+    Prometheus text of the prediction spans , the model registry and the prediction cache of this process.
+    """
+    model_registry_stats = ModelRegistry(
+        model_file_path = prediction_config.model_file_path , shared_model_dir = prediction_config.shared_model_dir
+    ).get_stats()
+    extra_metrics = {
+        "model_registry_hits_total" : {"help" : "Requests served with the already loaded estimator" , "type" : "counter" ,
+                                       "value" : model_registry_stats["hits"]},
+        "model_registry_misses_total" : {"help" : "Requests which loaded the estimator" , "type" : "counter" ,
+                                         "value" : model_registry_stats["misses"]},
+        "model_registry_reloads_total" : {"help" : "Loads of a changed model file" , "type" : "counter" ,
+                                          "value" : model_registry_stats["reloads"]},
+        "model_registry_last_load_seconds" : {"help" : "Time of the last estimator load" ,
+                                              "value" : model_registry_stats["last_load_seconds"]}
+    }
+    
+    logging_stats = get_logging_stats()
+    if logging_stats["async"]:
+        extra_metrics["log_records_dropped_total"] = {"help" : "Log records dropped because the log queue was full" , "type" : "counter" ,
+                                                      "value" : logging_stats["dropped"]}
+        extra_metrics["log_queue_size"] = {"help" : "Log records waiting to be written" , "value" : logging_stats["queued"]}
+    
+    prediction_cache = get_prediction_cache()
+    if prediction_cache is not None:
+        cache_stats = prediction_cache.get_stats()
+        for name in ("hits" , "misses" , "evictions" , "expirations" , "invalidations"):
+            extra_metrics[f"prediction_cache_{name}_total"] = {
+                "help" : f"Prediction cache {name}" , "type" : "counter" , "value" : cache_stats[name]
+            }
+        extra_metrics["prediction_cache_size"] = {"help" : "Entries in the prediction cache" , "value" : cache_stats["size"]}
+        extra_metrics["prediction_cache_hit_rate"] = {"help" : "Hits / lookups of the prediction cache" , "value" : cache_stats["hit_rate"]}
+    
+    return instrumentation.render_prometheus(extra_metrics = extra_metrics)
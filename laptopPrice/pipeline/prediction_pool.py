@@ -0,0 +1,111 @@
+import sys
+import asyncio
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+
+from laptopPrice.exception import LaptopException
+from laptopPrice.logger import get_logger
+from laptopPrice.entity.config_entity import AsgiServingConfig, LaptopPricePredictionConfig
+from laptopPrice.pipeline.prediction_pipeline import CustomData, PredictPipeline
+
+
+logger = get_logger(__name__)
+
+POOL_KINDS = ("thread" , "process")
+
+
+class PredictionPoolFull(Exception):
+    """Raised when max_pending requests are already waiting for the prediction pool."""
+
+
+def preload_model(prediction_config: LaptopPricePredictionConfig) -> str:
+    """
+    Load the estimator into the model registry of the current process and compile its inference plan.
+
+    Returns:
+        str: version(sha256) of the loaded model file
+    """
+    prediction_pipeline = PredictPipeline(prediction_config = prediction_config)
+    prediction_pipeline.model.compile_inference_plan()
+    return prediction_pipeline.model_version
+
+
+def get_model_version(prediction_config: LaptopPricePredictionConfig) -> str:
+    # version of the model preloaded by the initializer of a worker process
+    return PredictPipeline(prediction_config = prediction_config).model_version
+
+
+def predict_record(data_dict: dict , prediction_config: LaptopPricePredictionConfig) -> dict:
+    # module level function, so it can be sent to the worker processes of a process pool
+    return PredictPipeline(prediction_config = prediction_config).predict(custom_data = CustomData(data_dict = data_dict))
+
+
+class PredictionWorkerPool:
+    """
+    Bounded pool running the CPU bound predictions out of the event loop of the ASGI app.
+
+    At most max_pending requests are accepted at the same time(running or waiting for a free worker),
+    requests above that are rejected at once with PredictionPoolFull, so the queue and the latency
+    of the accepted requests stay bounded under overload.
+    """
+    def __init__(self , serving_config: AsgiServingConfig = AsgiServingConfig() ,
+                 prediction_config: LaptopPricePredictionConfig = LaptopPricePredictionConfig()):
+        if serving_config.pool_kind not in POOL_KINDS:
+            raise ValueError(f"Unknown prediction pool kind: [{serving_config.pool_kind}]. Expected one of {POOL_KINDS}")
+
+        self.serving_config = serving_config
+        self.prediction_config = prediction_config
+        self._executor : Executor = None
+        self._pending = 0 # only changed from the event loop thread
+
+    @property
+    def pending(self) -> int:
+        return self._pending
+
+    def start(self) -> None:
+        """
+        Create the pool and preload the model in every worker.
+        """
+        try:
+            pool_size = self.serving_config.pool_size
+            if self.serving_config.pool_kind == "process":
+                # each worker process loads the model once in its initializer
+                self._executor = ProcessPoolExecutor(
+                    max_workers = pool_size , initializer = preload_model , initargs = (self.prediction_config , )
+                )
+                # workers are started on demand, so start all of them now instead of on the first requests
+                model_versions = set(
+                    self._executor.map(get_model_version , [self.prediction_config] * pool_size)
+                )
+            else:
+                # threads share the model registry of this process
+                self._executor = ThreadPoolExecutor(max_workers = pool_size , thread_name_prefix = "prediction")
+                model_versions = {preload_model(self.prediction_config)}
+
+            logger.info(
+                "Prediction pool started. kind: %s , size: %s , max_pending: %s , model version: %s" ,
+                self.serving_config.pool_kind , pool_size , self.serving_config.max_pending , model_versions
+            )
+        except Exception as e:
+            raise LaptopException(e , sys)
+
+    def shutdown(self) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait = True , cancel_futures = True)
+            self._executor = None
+
+    async def predict(self , data_dict: dict) -> dict:
+        """
+        Predict one record in the pool.
+
+        Raises:
+            PredictionPoolFull: If max_pending requests are already in the pool.
+        """
+        if self._pending >= self.serving_config.max_pending:
+            raise PredictionPoolFull(f"{self._pending} prediction requests are already pending")
+
+        self._pending += 1
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor , predict_record , data_dict , self.prediction_config)
+        finally:
+            self._pending -= 1
@@ -0,0 +1,276 @@
+import os
+import ast
+import sys
+import json
+import shutil
+import hashlib
+import importlib.util
+import dataclasses
+from datetime import datetime
+from importlib import metadata
+from typing import Callable, Dict, Iterable, List, Optional
+
+from laptopPrice.logger import logging
+from laptopPrice.exception import LaptopException
+from laptopPrice.entity.config_entity import StageCacheConfig
+from laptopPrice.utils.common_utils import get_file_hash , save_object , load_object
+
+
+ARTIFACT_DIR_PLACEHOLDER = "<artifact_dir>"
+
+
+def _is_relative_to(path: str , directory: str) -> bool:
+    relative_path = os.path.relpath(os.path.abspath(path) , os.path.abspath(directory))
+    return relative_path != os.pardir and not relative_path.startswith(os.pardir + os.sep)
+
+
+def _relocate(path: str , old_dir: str , new_dir: str) -> str:
+    # path inside old_dir -> same relative path inside new_dir , other paths are kept
+    if not _is_relative_to(path , old_dir):
+        return path
+    return os.path.join(new_dir , os.path.relpath(os.path.abspath(path) , os.path.abspath(old_dir)))
+
+
+def _relocate_artifact(artifact: object , old_dir: str , new_dir: str) -> object:
+    # copy of the artifact(dataclass , may be nested) with the paths inside old_dir moved into new_dir
+    changes = {}
+    for field in dataclasses.fields(artifact):
+        value = getattr(artifact , field.name)
+        if dataclasses.is_dataclass(value):
+            changes[field.name] = _relocate_artifact(value , old_dir , new_dir)
+        elif isinstance(value , str):
+            changes[field.name] = _relocate(value , old_dir , new_dir)
+    return dataclasses.replace(artifact , **changes)
+
+
+def _get_artifact_file_paths(artifact: object) -> List[str]:
+    file_paths = []
+    for field in dataclasses.fields(artifact):
+        value = getattr(artifact , field.name)
+        if dataclasses.is_dataclass(value):
+            file_paths.extend(_get_artifact_file_paths(value))
+        elif isinstance(value , str) and os.path.splitext(value)[1]:
+            file_paths.append(value)
+    return file_paths
+
+
+def _link_or_copy(src: str , dst: str) -> str:
+    # hard link the unchanged output, copy when the file system doesn't support it
+    try:
+        os.link(src , dst)
+    except OSError:
+        shutil.copy2(src , dst)
+    return dst
+
+
+def get_module_source_files(module_name: str) -> List[str]:
+    """
+    Source files of the module and of every laptopPrice module it imports(also the imports inside functions), recursively.
+    """
+    package_name = module_name.split(".")[0]
+    source_files = set()
+    pending = [module_name]
+    seen = set()
+    while pending:
+        name = pending.pop()
+        if name in seen:
+            continue
+        seen.add(name)
+        try:
+            spec = importlib.util.find_spec(name)
+        except (ImportError , AttributeError , ValueError):
+            spec = None
+        if spec is None or not spec.origin or not spec.origin.endswith(".py"):
+            continue # `from package.module import name` where name is not a module
+        source_files.add(spec.origin)
+
+        with open(spec.origin , "rb") as source_file:
+            tree = ast.parse(source_file.read())
+        for node in ast.walk(tree):
+            if isinstance(node , ast.Import):
+                pending.extend(alias.name for alias in node.names if alias.name.split(".")[0] == package_name)
+            elif isinstance(node , ast.ImportFrom) and node.level == 0 and node.module and node.module.split(".")[0] == package_name:
+                pending.append(node.module)
+                pending.extend(f"{node.module}.{alias.name}" for alias in node.names)
+    return sorted(source_files)
+
+
+def get_code_fingerprint(module_name: str) -> str:
+    """
+    sha256 of the source files used by the module(see get_module_source_files).
+    """
+    sha256 = hashlib.sha256()
+    for file_path in get_module_source_files(module_name):
+        with open(file_path , "rb") as source_file:
+            sha256.update(os.path.basename(file_path).encode("utf-8"))
+            sha256.update(source_file.read())
+    return sha256.hexdigest()
+
+
+def get_package_versions(packages: Iterable[str]) -> Dict[str , str]:
+    versions = {}
+    for package in packages:
+        try:
+            versions[package] = metadata.version(package)
+        except metadata.PackageNotFoundError:
+            versions[package] = None
+    return versions
+
+
+@dataclasses.dataclass
+class StageCacheEntry:
+    stage_name : str
+    fingerprint : str
+    artifact_dir : str # artifact directory of the run which computed the stage
+    stage_dir : str
+    artifact : object
+    created_at : str
+
+
+class StageCache:
+    """
+    Content addressed cache of the training pipeline stages.
+
+    The fingerprint of a stage is the sha256 of its input artifact files(content , not path), its config dataclass
+    (with the run directory replaced by a placeholder and the content of the config files like params.yaml),
+    the source code of its component(and every laptopPrice module it imports) and the versions of the ML libraries.
+    When a previous run computed the same fingerprint and its outputs still exist, the stage directory of that run is
+    hard linked(or copied) into the current run directory and its artifact is returned with the paths moved into the
+    current run, the stage is not computed again.
+    """
+    def __init__(self , stage_cache_config: StageCacheConfig , artifact_dir: str):
+        """
+        Args:
+            stage_cache_config (StageCacheConfig): cache directory , enabled flag and the fingerprinted packages.
+            artifact_dir (str): artifact directory of the current run(artifacts/<timestamp>).
+        """
+        self.stage_cache_config = stage_cache_config
+        self.artifact_dir = artifact_dir
+        self.stage_status : Dict[str , str] = {} # stage name -> "hit" | "miss" | "disabled"
+        self._package_versions = None
+
+    def _get_package_versions(self) -> Dict[str , str]:
+        if self._package_versions is None:
+            self._package_versions = get_package_versions(self.stage_cache_config.packages)
+        return self._package_versions
+
+    def _describe_config(self , config: object) -> dict:
+        described = {}
+        for name , value in dataclasses.asdict(config).items():
+            if isinstance(value , str) and value and _is_relative_to(value , self.artifact_dir):
+                # output paths of this run
+                value = ARTIFACT_DIR_PLACEHOLDER + "/" + os.path.relpath(value , self.artifact_dir).replace(os.sep , "/")
+            elif isinstance(value , str) and os.path.isfile(value):
+                value = {"path" : value , "sha256" : get_file_hash(value)}
+            described[name] = value
+        return described
+
+    def _describe_artifact(self , artifact: object) -> dict:
+        described = {}
+        for name , value in dataclasses.asdict(artifact).items():
+            if isinstance(value , str) and value and os.path.isfile(value):
+                value = get_file_hash(value)
+            described[name] = value
+        return described
+
+    def get_fingerprint(self , stage_name: str , config: object , input_artifact: object = None ,
+                        code_module: str = None , extra_files: Iterable[str] = ()) -> str:
+        """
+        Fingerprint of a stage(see StageCache).
+
+        Args:
+            stage_name (str): name of the stage.
+            config (object): config dataclass of the stage.
+            input_artifact (object, optional): artifact dataclass of the previous stage. Defaults to None.
+            code_module (str, optional): module of the stage component. Defaults to None.
+            extra_files (Iterable[str], optional): other files read by the stage(e.g. schema.yaml). Defaults to ().
+        """
+        description = {
+            "stage_name" : stage_name,
+            "config" : self._describe_config(config),
+            "input_artifact" : self._describe_artifact(input_artifact) if input_artifact is not None else None,
+            "code" : get_code_fingerprint(code_module) if code_module else None,
+            "extra_files" : {file_path : get_file_hash(file_path) for file_path in extra_files},
+            "packages" : self._get_package_versions(),
+        }
+        return hashlib.sha256(json.dumps(description , sort_keys = True , default = str).encode("utf-8")).hexdigest()
+
+    def _get_entry_file_path(self , stage_name: str , fingerprint: str) -> str:
+        return os.path.join(self.stage_cache_config.cache_dir , stage_name , f"{fingerprint}.pkl")
+
+    def _reuse(self , entry: StageCacheEntry , stage_dir: str) -> Optional[object]:
+        # the artifact of the entry moved into the current run , None when the outputs of the entry are gone
+        old_stage_dir = entry.stage_dir
+        old_file_paths = _get_artifact_file_paths(entry.artifact)
+        missing = [
+            file_path for file_path in old_file_paths
+            if _is_relative_to(file_path , old_stage_dir) and not os.path.exists(file_path)
+        ]
+        if missing:
+            logging.info(f"Outputs of the cached stage {entry.stage_name} are missing: {missing}")
+            return None
+
+        # a stage may write nothing into its directory(e.g. no drift report when the validation failed)
+        if os.path.isdir(old_stage_dir) and os.path.abspath(old_stage_dir) != os.path.abspath(stage_dir):
+            shutil.copytree(old_stage_dir , stage_dir , copy_function = _link_or_copy , dirs_exist_ok = True)
+        artifact = _relocate_artifact(entry.artifact , entry.artifact_dir , self.artifact_dir)
+
+        # files of the earlier stages must be in the current run as well
+        missing = [file_path for file_path in _get_artifact_file_paths(artifact) if not os.path.exists(file_path)]
+        if missing:
+            logging.info(f"Inputs of the cached stage {entry.stage_name} are not in the current run: {missing}")
+            return None
+        return artifact
+
+    def run_stage(self , stage_name: str , run_stage: Callable[[] , object] , stage_dir: str , config: object ,
+                  input_artifact: object = None , code_module: str = None , extra_files: Iterable[str] = ()) -> object:
+        """
+        Return the artifact of the stage from the cache, or run the stage and cache its artifact.
+
+        Args:
+            stage_name (str): name of the stage.
+            run_stage (Callable[[] , object]): computes the stage and returns its artifact.
+            stage_dir (str): output directory of the stage in the current run.
+            config (object): config dataclass of the stage.
+            input_artifact (object, optional): artifact of the previous stage. Defaults to None.
+            code_module (str, optional): module of the stage component. Defaults to None.
+            extra_files (Iterable[str], optional): other files read by the stage. Defaults to ().
+
+        Returns:
+            object: artifact of the stage
+        """
+        try:
+            if not self.stage_cache_config.enabled:
+                self.stage_status[stage_name] = "disabled"
+                return run_stage()
+
+            fingerprint = self.get_fingerprint(
+                stage_name = stage_name , config = config , input_artifact = input_artifact ,
+                code_module = code_module , extra_files = extra_files
+            )
+            entry_file_path = self._get_entry_file_path(stage_name , fingerprint)
+            if os.path.exists(entry_file_path):
+                try:
+                    artifact = self._reuse(load_object(file_path = entry_file_path) , stage_dir = stage_dir)
+                except Exception as e:
+                    logging.info(f"Cache entry {entry_file_path} can't be used: {e}")
+                    artifact = None
+                if artifact is not None:
+                    self.stage_status[stage_name] = "hit"
+                    logging.info(f"Stage {stage_name} reused from the cache. fingerprint: {fingerprint}")
+                    return artifact
+
+            self.stage_status[stage_name] = "miss"
+            logging.info(f"Stage {stage_name} is not in the cache, running it. fingerprint: {fingerprint}")
+            artifact = run_stage()
+
+            save_object(
+                file_path = entry_file_path,
+                obj = StageCacheEntry(
+                    stage_name = stage_name , fingerprint = fingerprint , artifact_dir = self.artifact_dir ,
+                    stage_dir = stage_dir , artifact = artifact , created_at = datetime.now().isoformat()
+                )
+            )
+            return artifact
+        except Exception as e:
+            raise LaptopException(e , sys)
@@ -1,192 +1,258 @@
-import sys 
-import warnings
-warnings.filterwarnings("ignore")
-
-from laptopPrice.logger import logging
-from laptopPrice.exception import LaptopException
-
-from laptopPrice.entity.config_entity import (
-    DataIngestionConfig , DataValidationConfig , DataTransformationConfig , ModelTrainerConfig , ModelEvaluationConfig , ModelPusherConfig
-)
-
-from laptopPrice.entity.artifact_entity import (
-    DataIngestionArtifact , DataValidationArtifact , DataTransformationArtifact , ModelTrainerArtifact , ModelEvaluationArtifact , ModelPusherArtifact
-)
-
-from laptopPrice.components.data_ingestion import DataIngestion
-from laptopPrice.components.data_validation import DataValidation
-from laptopPrice.components.data_transformation import DataTransformation 
-from laptopPrice.components.model_trainer import ModelTrainer
-from laptopPrice.components.model_evaluation import ModelEvaluation
-from laptopPrice.components.model_pusher import ModelPusher
-
-
-class TrainingPipeline:
-    def __init__(self):
-        """This class is responsible to run the full training pipeline.
-        """
-        # 1. do the data ingestion
-        self.data_ingestion_config = DataIngestionConfig()
-        # 2. do the data validation
-        self.data_validation_config = DataValidationConfig()
-        # 3. do the data transformation
-        self.data_transformation_config = DataTransformationConfig()
-        # 4. do the model training
-        self.model_trainer_config = ModelTrainerConfig()
-        # 5. do the model evaluation
-        self.model_evaluation_config = ModelEvaluationConfig()
-        # 6. do the model pushing
-        self.model_pusher_config = ModelPusherConfig()
-    
-    def start_data_ingestion(self) -> DataIngestionArtifact:
-        """ 
-        This will start the data ingestion component and return DataIngestionArtifact
-        """
-        try:
-            logging.info("Entered start_data_ingestion method from TrainingPipeline class")
-            
-            data_ingestion = DataIngestion(
-                data_ingestion_config = self.data_ingestion_config
-            ) 
-            
-            logging.info("Calling initiate data ingestion from start_data_ingestion method of TrainingPipeline class")
-            
-            data_ingestion_artifact = data_ingestion.initiate_data_ingestion() 
-            logging.info(f"data_ingestion_artifact is received from start_data_ingestion method. {data_ingestion_artifact}")
-            return data_ingestion_artifact
-        except Exception as e:
-            raise LaptopException(e , sys)
-    
-    def start_data_validation(self , data_ingestion_artifact: DataIngestionArtifact) -> DataValidationArtifact:
-        """This will start the data validation component. 
-        Returns:
-            DataValidationArtifact: 
-        """
-        
-        try:
-            logging.info("Entered start_data_validation method from TrainingPipeline class")
-            
-            data_validation = DataValidation(
-                data_ingestion_artifact = data_ingestion_artifact ,
-                data_validation_config = self.data_validation_config
-            )
-            
-            logging.info("Calling initiate data validation from start_data_validation method of TrainingPipeline class")
-            
-            data_validation_artifact = data_validation.initiate_data_validation()
-            logging.info("Performed the data validation operation")
-            
-            return data_validation_artifact
-        
-        except Exception as e:
-            raise LaptopException(e , sys)
-    
-    def start_data_transformation(self , data_validation_artifact: DataIngestionArtifact) -> DataTransformationArtifact:
-        """
-        This method of TrainPipeline class is responsible for starting data transformation component
-        """
-        
-        try:
-            logging.info("Entered start_data_transformation method from TrainingPipeline class")
-            
-            data_transformation = DataTransformation(
-                data_transformation_config = self.data_transformation_config,
-                data_validation_artifact = data_validation_artifact
-            )
-            data_transformation_artifact = data_transformation.initiate_data_transformation()
-            return data_transformation_artifact
-        except Exception as e:
-            raise LaptopException(e , sys)
-        
-    def start_model_trainer(self , data_transformation_artifact: DataTransformationArtifact) -> ModelTrainerArtifact:
-        """
-        This method of TrainPipeline class is responsible for starting model training
-        """
-        try:
-            model_trainer = ModelTrainer(
-                model_trainer_config = self.model_trainer_config,
-                data_transformation_artifact = data_transformation_artifact
-            ) 
-            
-            model_trainer_artifact = model_trainer.initiate_model_trainer()
-            return model_trainer_artifact
-        
-        except Exception as e:
-            raise LaptopException(e , sys)
-    
-    def start_model_evaluation(self , model_trainer_artifact: ModelTrainerArtifact , test_file_path: str):
-        """ 
-        This method of TrainingPipeline class is responsible for starting model evaluation
-        """    
-        try:
-            logging.info("Entered into start_model_evaluation from training pipeline")
-            
-            model_evaluation = ModelEvaluation(
-                model_evaluation_config = self.model_evaluation_config,
-                model_trainer_artifact = model_trainer_artifact,
-                test_file_path = test_file_path
-            )
-            
-            model_evaluation_artifact = model_evaluation.initiate_model_evaluation()
-            return model_evaluation_artifact
-        except Exception as e:
-            raise LaptopException(e , sys)
-        
-    def start_model_pusher(self , model_evaluation_artifact: ModelEvaluationArtifact) -> ModelPusherArtifact:
-        """ 
-        This method of TrainingPipeline class is responsible for pushing the model into production.
-        """
-        try:
-            logging.info("Entered into start_model_pusher from training pipeline")
-            
-            model_pusher = ModelPusher(
-                model_pusher_config = self.model_pusher_config , model_evaluation_artifact = model_evaluation_artifact
-            )
-            model_pusher_artifact = model_pusher.initiate_model_pusher()
-            return model_pusher_artifact
-         
-        except Exception as e:
-            raise LaptopException(e , sys)
-        
-        
-    def run_training_pipeline(self):
-        """ 
-        This method of TrainingPipeline class is responsible for running complete training pipeline
-        """
-        
-        try:
-            # 1. Run the data ingestion  
-            data_ingestion_artifact = self.start_data_ingestion()
-            logging.info("Data Ingestion Completed")
-            
-            # 2. Run the data validation
-            data_validation_artifact = self.start_data_validation(
-                data_ingestion_artifact = data_ingestion_artifact
-            )
-            logging.info("Data Validation Completed")
-            
-            # 3. Run the data transformation
-            data_transformation_artifact = self.start_data_transformation(data_validation_artifact = data_validation_artifact)
-            logging.info("Data transformation is Done!!")
-            
-            # 4. Run the model trainer
-            model_trainer_artifact = self.start_model_trainer(data_transformation_artifact = data_transformation_artifact)
-            logging.info("Model Trainer Done!")
-            
-            # 5. Run the model evaluation
-            model_evaluation_artifact = self.start_model_evaluation(
-                model_trainer_artifact = model_trainer_artifact , test_file_path = data_ingestion_artifact.test_file_path
-            )
-            logging.info("Model Evaluation Done!")
-            logging.info(f"{model_evaluation_artifact.improved_score} || {model_evaluation_artifact.is_model_accepted}")
-            
-            # 6. Run the model pusher
-            model_pusher_artifact = self.start_model_pusher(
-                model_evaluation_artifact = model_evaluation_artifact
-            )
-            
-            logging.info("Training Pipeline Completed")
-            logging.info(f"Model Pusher Status: {model_pusher_artifact.is_model_pushed}")
-            logging.info(f"Production Estimator: {model_pusher_artifact.production_model_path}")
-        except Exception as e:
-            raise LaptopException(e , sys)
\ No newline at end of file
+import sys 
+import time
+import warnings
+warnings.filterwarnings("ignore")
+
+from laptopPrice.logger import logging
+from laptopPrice.exception import LaptopException
+
+from laptopPrice.constants import SCHEMA_FILE_PATH
+from laptopPrice.entity.config_entity import (
+    DataIngestionConfig , DataValidationConfig , DataTransformationConfig , ModelTrainerConfig , ModelEvaluationConfig , ModelPusherConfig ,
+    StageCacheConfig , training_pipeline_config
+)
+
+from laptopPrice.entity.artifact_entity import (
+    DataIngestionArtifact , DataValidationArtifact , DataTransformationArtifact , ModelTrainerArtifact , ModelEvaluationArtifact , ModelPusherArtifact
+)
+
+from laptopPrice.components.data_ingestion import DataIngestion
+from laptopPrice.components.data_validation import DataValidation
+from laptopPrice.components.data_transformation import DataTransformation 
+from laptopPrice.components.model_trainer import ModelTrainer
+from laptopPrice.components.model_evaluation import ModelEvaluation
+from laptopPrice.components.model_pusher import ModelPusher
+from laptopPrice.pipeline.stage_cache import StageCache
+from laptopPrice.utils.instrumentation import instrumentation , instrumented , write_run_report
+
+
+class TrainingPipeline:
+    def __init__(self):
+        """This class is responsible to run the full training pipeline.
+        """
+        # 1. do the data ingestion
+        self.data_ingestion_config = DataIngestionConfig()
+        # 2. do the data validation
+        self.data_validation_config = DataValidationConfig()
+        # 3. do the data transformation
+        self.data_transformation_config = DataTransformationConfig()
+        # 4. do the model training
+        self.model_trainer_config = ModelTrainerConfig()
+        # 5. do the model evaluation
+        self.model_evaluation_config = ModelEvaluationConfig()
+        # 6. do the model pushing
+        self.model_pusher_config = ModelPusherConfig()
+        # validation , transformation and model training are reused from an earlier run when nothing they use changed.
+        # ingestion always runs(the data is in mongodb), evaluation and pushing depend on the production model and are cheap
+        self.stage_cache = StageCache(
+            stage_cache_config = StageCacheConfig() , artifact_dir = training_pipeline_config.artifact_dir
+        )
+    
+    @instrumented("training.data_ingestion")
+    def start_data_ingestion(self) -> DataIngestionArtifact:
+        """ 
+        This will start the data ingestion component and return DataIngestionArtifact
+        """
+        try:
+            logging.info("Entered start_data_ingestion method from TrainingPipeline class")
+            
+            data_ingestion = DataIngestion(
+                data_ingestion_config = self.data_ingestion_config
+            ) 
+            
+            logging.info("Calling initiate data ingestion from start_data_ingestion method of TrainingPipeline class")
+            
+            data_ingestion_artifact = data_ingestion.initiate_data_ingestion() 
+            logging.info(f"data_ingestion_artifact is received from start_data_ingestion method. {data_ingestion_artifact}")
+            return data_ingestion_artifact
+        except Exception as e:
+            raise LaptopException(e , sys)
+    
+    @instrumented("training.data_validation")
+    def start_data_validation(self , data_ingestion_artifact: DataIngestionArtifact) -> DataValidationArtifact:
+        """This will start the data validation component. 
+        Returns:
+            DataValidationArtifact: 
+        """
+        
+        try:
+            logging.info("Entered start_data_validation method from TrainingPipeline class")
+            
+            data_validation = DataValidation(
+                data_ingestion_artifact = data_ingestion_artifact ,
+                data_validation_config = self.data_validation_config
+            )
+            
+            logging.info("Calling initiate data validation from start_data_validation method of TrainingPipeline class")
+            
+            data_validation_artifact = self.stage_cache.run_stage(
+                stage_name = "data_validation",
+                run_stage = data_validation.initiate_data_validation,
+                stage_dir = self.data_validation_config.data_validation_dir,
+                config = self.data_validation_config,
+                input_artifact = data_ingestion_artifact,
+                code_module = DataValidation.__module__
+            )
+            logging.info("Performed the data validation operation")
+            
+            return data_validation_artifact
+        
+        except Exception as e:
+            raise LaptopException(e , sys)
+    
+    @instrumented("training.data_transformation")
+    def start_data_transformation(self , data_validation_artifact: DataIngestionArtifact) -> DataTransformationArtifact:
+        """
+        This method of TrainPipeline class is responsible for starting data transformation component
+        """
+        
+        try:
+            logging.info("Entered start_data_transformation method from TrainingPipeline class")
+            
+            data_transformation = DataTransformation(
+                data_transformation_config = self.data_transformation_config,
+                data_validation_artifact = data_validation_artifact
+            )
+            data_transformation_artifact = self.stage_cache.run_stage(
+                stage_name = "data_transformation",
+                run_stage = data_transformation.initiate_data_transformation,
+                stage_dir = self.data_transformation_config.data_transformation_dir,
+                config = self.data_transformation_config,
+                input_artifact = data_validation_artifact,
+                code_module = DataTransformation.__module__,
+                extra_files = [SCHEMA_FILE_PATH]
+            )
+            return data_transformation_artifact
+        except Exception as e:
+            raise LaptopException(e , sys)
+        
+    @instrumented("training.model_trainer")
+    def start_model_trainer(self , data_transformation_artifact: DataTransformationArtifact) -> ModelTrainerArtifact:
+        """
+        This method of TrainPipeline class is responsible for starting model training
+        """
+        try:
+            model_trainer = ModelTrainer(
+                model_trainer_config = self.model_trainer_config,
+                data_transformation_artifact = data_transformation_artifact
+            ) 
+            
+            model_trainer_artifact = self.stage_cache.run_stage(
+                stage_name = "model_trainer",
+                run_stage = model_trainer.initiate_model_trainer,
+                stage_dir = self.model_trainer_config.model_trainer_dir,
+                config = self.model_trainer_config,
+                input_artifact = data_transformation_artifact,
+                code_module = ModelTrainer.__module__,
+                extra_files = [SCHEMA_FILE_PATH]
+            )
+            return model_trainer_artifact
+        
+        except Exception as e:
+            raise LaptopException(e , sys)
+    
+    @instrumented("training.model_evaluation")
+    def start_model_evaluation(self , model_trainer_artifact: ModelTrainerArtifact , test_file_path: str):
+        """ 
+        This method of TrainingPipeline class is responsible for starting model evaluation
+        """    
+        try:
+            logging.info("Entered into start_model_evaluation from training pipeline")
+            
+            model_evaluation = ModelEvaluation(
+                model_evaluation_config = self.model_evaluation_config,
+                model_trainer_artifact = model_trainer_artifact,
+                test_file_path = test_file_path
+            )
+            
+            model_evaluation_artifact = model_evaluation.initiate_model_evaluation()
+            return model_evaluation_artifact
+        except Exception as e:
+            raise LaptopException(e , sys)
+        
+    @instrumented("training.model_pusher")
+    def start_model_pusher(self , model_evaluation_artifact: ModelEvaluationArtifact) -> ModelPusherArtifact:
+        """ 
+        This method of TrainingPipeline class is responsible for pushing the model into production.
+        """
+        try:
+            logging.info("Entered into start_model_pusher from training pipeline")
+            
+            model_pusher = ModelPusher(
+                model_pusher_config = self.model_pusher_config , model_evaluation_artifact = model_evaluation_artifact
+            )
+            model_pusher_artifact = model_pusher.initiate_model_pusher()
+            return model_pusher_artifact
+         
+        except Exception as e:
+            raise LaptopException(e , sys)
+        
+        
+    def run_training_pipeline(self):
+        """ 
+        This method of TrainingPipeline class is responsible for running complete training pipeline
+        """
+        
+        # the spans of the stages(and of the models tuned in them) are written into the run report
+        instrumentation.start_recording()
+        run_start , status = time.perf_counter() , "failed"
+        try:
+            # 1. Run the data ingestion  
+            data_ingestion_artifact = self.start_data_ingestion()
+            logging.info("Data Ingestion Completed")
+            
+            # 2. Run the data validation
+            data_validation_artifact = self.start_data_validation(
+                data_ingestion_artifact = data_ingestion_artifact
+            )
+            logging.info("Data Validation Completed")
+            
+            # 3. Run the data transformation
+            data_transformation_artifact = self.start_data_transformation(data_validation_artifact = data_validation_artifact)
+            logging.info("Data transformation is Done!!")
+            
+            # 4. Run the model trainer
+            model_trainer_artifact = self.start_model_trainer(data_transformation_artifact = data_transformation_artifact)
+            logging.info("Model Trainer Done!")
+            
+            # 5. Run the model evaluation
+            model_evaluation_artifact = self.start_model_evaluation(
+                model_trainer_artifact = model_trainer_artifact , test_file_path = data_ingestion_artifact.test_file_path
+            )
+            logging.info("Model Evaluation Done!")
+            logging.info(f"{model_evaluation_artifact.improved_score} || {model_evaluation_artifact.is_model_accepted}")
+            
+            # 6. Run the model pusher
+            model_pusher_artifact = self.start_model_pusher(
+                model_evaluation_artifact = model_evaluation_artifact
+            )
+            status = "completed"
+            
+            logging.info("Training Pipeline Completed")
+            logging.info(f"Stage cache: {self.stage_cache.stage_status}")
+            logging.info(f"Model Pusher Status: {model_pusher_artifact.is_model_pushed}")
+            logging.info(f"Production Estimator: {model_pusher_artifact.production_model_path}")
+        except Exception as e:
+            raise LaptopException(e , sys)
+        finally:
+            self.save_run_report(
+                records = instrumentation.stop_recording() , status = status , wall_seconds = time.perf_counter() - run_start
+            )
+    
+    def save_run_report(self , records: list , status: str , wall_seconds: float) -> None:
+        """ 
+        Write the stage timings of the run into artifact/timestamp/run_report.json.
+        A report which can't be written is only logged, so it doesn't hide the result of the run.
+        """
+        try:
+            write_run_report(
+                file_path = training_pipeline_config.run_report_file_path,
+                records = records,
+                pipeline_name = training_pipeline_config.pipeline_name,
+                timestamp = training_pipeline_config.timestamp,
+                status = status,
+                wall_seconds = wall_seconds,
+                stage_cache = self.stage_cache.stage_status
+            )
+        except Exception as e:
+            logging.info(f"Run report could not be saved: {e}")
@@ -1,255 +1,559 @@
-import os 
-import sys 
-
-import numpy as np
-import dill
-import yaml
-from pandas import DataFrame
-import pandas as pd 
-from laptopPrice.exception import LaptopException
-from laptopPrice.logger import logging
-
-
-
-def read_csv(file_path: str) -> DataFrame:
-    """
-    Read a CSV file into a Pandas DataFrame.
-
-    Args:
-        file_path (str): Path to the CSV file.
-
-    Returns:
-        DataFrame: Pandas DataFrame containing the data from the CSV file.
-
-    Raises:
-        LaptopException: If reading the CSV file fails.
-    """
-    logging.info(f"Entered read_csv with file_path={file_path}")
-    try:
-        df = pd.read_csv(file_path)
-        logging.info(f"CSV file loaded successfully: {file_path}, shape={df.shape}")
-        return df
-    except Exception as e:
-        logging.error(f"Error occurred while reading CSV file: {file_path}")
-        raise LaptopException(e, sys)  
-    
-
-def read_yaml_file(file_path: str) -> dict:
-    """
-    Read a YAML file and return its content as a dictionary.
-
-    Args:
-        file_path (str): Path to the YAML file.
-
-    Returns:
-        dict: Parsed content of the YAML file.
-
-    Raises:
-        LaptopException: If reading the YAML file fails.
-    """
-    
-    logging.info(f"Entered read_yaml_file with file_path={file_path}")
-    try:
-        with open(file_path, "rb") as yaml_file:
-            data = yaml.safe_load(yaml_file)
-        logging.info(f"YAML file loaded successfully: {file_path}")
-        return data
-    except Exception as e:
-        logging.error(f"Error occurred while reading YAML file: {file_path}")
-        raise LaptopException(e, sys)  
-    
-
-def write_yaml_file(file_path: str, content: object, replace: bool = False) -> None:
-    """
-    Write content to a YAML file.
-
-    Args:
-        file_path (str): Path where the YAML file should be saved.
-        content (object): The content to write (usually a dict).
-        replace (bool, optional): Whether to replace an existing file. Defaults to False.
-
-    Raises:
-        LaptopException: If writing the YAML file fails.
-    """
-    
-    logging.info(f"Entered write_yaml_file with file_path={file_path}, replace={replace}")
-    try:
-        if replace and os.path.exists(file_path):
-            os.remove(file_path)
-            logging.info(f"Existing file removed: {file_path}")
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, "w") as file:
-            yaml.dump(content, file)
-        logging.info(f"YAML file written successfully: {file_path}")
-    except Exception as e:
-        logging.error(f"Error occurred while writing YAML file: {file_path}")
-        raise LaptopException(e, sys)  
-    
-
-def save_object(file_path: str, obj: object) -> None:
-    """
-    Save a Python object to disk using dill.
-
-    Args:
-        file_path (str): Path where the object should be saved.
-        obj (object): Python object to save.
-
-    Raises:
-        LaptopException: If saving the object fails.
-    """
-    
-    logging.info(f"Entered save_object with file_path={file_path}")
-    try:
-        os.makedirs(os.path.dirname(file_path), exist_ok=True)
-        with open(file_path, "wb") as file_obj:
-            dill.dump(obj, file_obj)
-        logging.info(f"Object saved successfully at: {file_path}")
-    except Exception as e:
-        logging.error(f"Error occurred while saving object: {file_path}")
-        raise LaptopException(e, sys)  
-        
-
-def load_object(file_path: str) -> object:
-    """
-    Load a Python object from disk using dill.
-
-    Args:
-        file_path (str): Path to the object file.
-
-    Returns:
-        object: Loaded Python object.
-
-    Raises:
-        LaptopException: If loading the object fails.
-    """
-    
-    logging.info(f"Entered load_object with file_path={file_path}")
-    try:
-        with open(file_path, "rb") as file_obj:
-            obj = dill.load(file_obj)
-        logging.info(f"Object loaded successfully from: {file_path}")
-        return obj
-    except Exception as e:
-        logging.error(f"Error occurred while loading object: {file_path}")
-        raise LaptopException(e, sys)  
-        
-
-def save_numpy_array_data(file_path: str, array: np.array):
-    """
-    Save a NumPy array to disk.
-
-    Args:
-        file_path (str): Path where the array should be saved.
-        array (np.ndarray): NumPy array to save.
-
-    Raises:
-        LaptopException: If saving the array fails.
-    """
-    
-    logging.info(f"Entered save_numpy_array_data with file_path={file_path}, array_shape={array.shape}")
-    try:
-        dir_path = os.path.dirname(file_path)
-        if dir_path:
-            os.makedirs(dir_path, exist_ok=True)
-        with open(file_path, 'wb') as file_obj:
-            np.save(file_obj, array)
-        logging.info(f"NumPy array saved successfully at: {file_path}")
-    except Exception as e:
-        logging.error(f"Error occurred while saving numpy array: {file_path}")
-        raise LaptopException(e, sys)  
-    
-
-def load_numpy_array_data(file_path: str) -> np.array:
-    """
-    Load a NumPy array from disk.
-
-    Args:
-        file_path (str): Path to the NumPy file.
-
-    Returns:
-        np.ndarray: Loaded NumPy array.
-
-    Raises:
-        LaptopException: If loading the array fails.
-    """
-    
-    logging.info(f"Entered load_numpy_array_data with file_path={file_path}")
-    try:
-        with open(file_path, 'rb') as file_obj:
-            array = np.load(file_obj)
-        logging.info(f"NumPy array loaded successfully from: {file_path}, array_shape={array.shape}")
-        return array
-    except Exception as e:
-        logging.error(f"Error occurred while loading numpy array: {file_path}")
-        raise LaptopException(e, sys)  
-    
-
-def drop_columns(df: DataFrame, cols: list)-> DataFrame:
-    """
-    Drop specific columns from a Pandas DataFrame.
-
-    Args:
-        df (DataFrame): Input Pandas DataFrame.
-        cols (list): List of column names to drop.
-
-    Returns:
-        DataFrame: DataFrame with specified columns removed.
-
-    Raises:
-        LaptopException: If dropping columns fails.
-    """
-    
-    logging.info(f"Entered drop_columns with cols={cols}")
-    try:
-        df = df.drop(columns=cols, axis=1)
-        logging.info(f"Dropped columns: {cols}, new_shape={df.shape}")
-        return df
-    except Exception as e:
-        logging.error(f"Error occurred while dropping columns: {cols}")
-        raise LaptopException(e, sys)  
-    
-
-def save_yaml_file(file_path: str, data: dict):
-    """
-    Save dictionary data to a YAML file.
-
-    Args:
-        file_path (str): Path where the YAML file should be saved.
-        data (dict): Dictionary data to save.
-
-    Raises:
-        LaptopException: If saving the YAML file fails.
-    """
-    logging.info(f"Entered save_yaml_file with file_path={file_path}")
-    try:
-        dir_path = os.path.dirname(file_path)
-        if dir_path:
-            os.makedirs(dir_path, exist_ok=True)
-        with open(file_path, 'w') as file_obj:
-            yaml.dump(data, file_obj)
-        logging.info(f"YAML file saved successfully: {file_path}")
-    except Exception as e:
-        logging.error(f"Error occurred while saving YAML file: {file_path}")
-        raise LaptopException(e, sys)  
-
-def save_csv_file(file_path: str, data: pd.DataFrame , index = False , header = True):
-    """
-    Save a pandas DataFrame to a CSV file.
-
-    Args:
-        file_path (str): Path where the CSV file should be saved.
-        data (pd.DataFrame): DataFrame to save.
-
-    Raises:
-        LaptopException: If saving the CSV file fails.
-    """
-    logging.info(f"Entered save_csv_file with file_path={file_path}")
-    try:
-        dir_path = os.path.dirname(file_path)
-        if dir_path:
-            os.makedirs(dir_path, exist_ok = True)
-        data.to_csv(file_path, index = index , header = header)
-        logging.info(f"CSV file saved successfully: {file_path}")
-    except Exception as e:
-        logging.error(f"Error occurred while saving CSV file: {file_path}")
-        raise LaptopException(e, sys) 
\ No newline at end of file
+import os 
+import sys 
+import hashlib
+from typing import TYPE_CHECKING, BinaryIO, Iterator
+
+import numpy as np
+import dill
+from laptopPrice.exception import LaptopException
+from laptopPrice.logger import logging
+
+# pandas and yaml are imported where they are used, the serving path only needs load_object
+if TYPE_CHECKING:
+    import pandas as pd
+    from pandas import DataFrame
+
+
+
+def read_csv(file_path: str) -> "DataFrame":
+    """
+    Read a CSV file into a Pandas DataFrame.
+
+    Args:
+        file_path (str): Path to the CSV file.
+
+    Returns:
+        DataFrame: Pandas DataFrame containing the data from the CSV file.
+
+    Raises:
+        LaptopException: If reading the CSV file fails.
+    """
+    logging.info(f"Entered read_csv with file_path={file_path}")
+    try:
+        import pandas as pd
+        
+        df = pd.read_csv(file_path)
+        logging.info(f"CSV file loaded successfully: {file_path}, shape={df.shape}")
+        return df
+    except Exception as e:
+        logging.error(f"Error occurred while reading CSV file: {file_path}")
+        raise LaptopException(e, sys)  
+    
+
+def read_yaml_file(file_path: str) -> dict:
+    """
+    Read a YAML file and return its content as a dictionary.
+
+    Args:
+        file_path (str): Path to the YAML file.
+
+    Returns:
+        dict: Parsed content of the YAML file.
+
+    Raises:
+        LaptopException: If reading the YAML file fails.
+    """
+    
+    logging.info(f"Entered read_yaml_file with file_path={file_path}")
+    try:
+        import yaml
+        
+        with open(file_path, "rb") as yaml_file:
+            data = yaml.safe_load(yaml_file)
+        logging.info(f"YAML file loaded successfully: {file_path}")
+        return data
+    except Exception as e:
+        logging.error(f"Error occurred while reading YAML file: {file_path}")
+        raise LaptopException(e, sys)  
+    
+
+def write_yaml_file(file_path: str, content: object, replace: bool = False) -> None:
+    """
+    Write content to a YAML file.
+
+    Args:
+        file_path (str): Path where the YAML file should be saved.
+        content (object): The content to write (usually a dict).
+        replace (bool, optional): Whether to replace an existing file. Defaults to False.
+
+    Raises:
+        LaptopException: If writing the YAML file fails.
+    """
+    
+    logging.info(f"Entered write_yaml_file with file_path={file_path}, replace={replace}")
+    try:
+        import yaml
+        
+        if replace and os.path.exists(file_path):
+            os.remove(file_path)
+            logging.info(f"Existing file removed: {file_path}")
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "w") as file:
+            yaml.dump(content, file)
+        logging.info(f"YAML file written successfully: {file_path}")
+    except Exception as e:
+        logging.error(f"Error occurred while writing YAML file: {file_path}")
+        raise LaptopException(e, sys)  
+    
+
+def save_object(file_path: str, obj: object) -> None:
+    """
+    Save a Python object to disk using dill.
+
+    Args:
+        file_path (str): Path where the object should be saved.
+        obj (object): Python object to save.
+
+    Raises:
+        LaptopException: If saving the object fails.
+    """
+    
+    logging.info(f"Entered save_object with file_path={file_path}")
+    try:
+        os.makedirs(os.path.dirname(file_path), exist_ok=True)
+        with open(file_path, "wb") as file_obj:
+            dill.dump(obj, file_obj)
+        logging.info(f"Object saved successfully at: {file_path}")
+    except Exception as e:
+        logging.error(f"Error occurred while saving object: {file_path}")
+        raise LaptopException(e, sys)  
+        
+
+def load_object(file_path: str) -> object:
+    """
+    Load a Python object from disk using dill.
+
+    Args:
+        file_path (str): Path to the object file.
+
+    Returns:
+        object: Loaded Python object.
+
+    Raises:
+        LaptopException: If loading the object fails.
+    """
+    
+    logging.info(f"Entered load_object with file_path={file_path}")
+    try:
+        with open(file_path, "rb") as file_obj:
+            obj = dill.load(file_obj)
+        logging.info(f"Object loaded successfully from: {file_path}")
+        return obj
+    except Exception as e:
+        logging.error(f"Error occurred while loading object: {file_path}")
+        raise LaptopException(e, sys)  
+        
+
+def save_numpy_array_data(file_path: str, array: np.array):
+    """
+    Save a NumPy array to disk.
+
+    Args:
+        file_path (str): Path where the array should be saved.
+        array (np.ndarray): NumPy array to save.
+
+    Raises:
+        LaptopException: If saving the array fails.
+    """
+    
+    logging.info(f"Entered save_numpy_array_data with file_path={file_path}, array_shape={array.shape}")
+    try:
+        dir_path = os.path.dirname(file_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        with open(file_path, 'wb') as file_obj:
+            np.save(file_obj, array)
+        logging.info(f"NumPy array saved successfully at: {file_path}")
+    except Exception as e:
+        logging.error(f"Error occurred while saving numpy array: {file_path}")
+        raise LaptopException(e, sys)  
+    
+
+def load_numpy_array_data(file_path: str, mmap_mode: str = None) -> np.array:
+    """
+    Load a NumPy array from disk.
+
+    Args:
+        file_path (str): Path to the NumPy file.
+        mmap_mode (str, optional): If given(e.g. 'r'), the array is memory mapped instead of read into memory.
+            joblib workers then share the pages of the file instead of receiving copies. Defaults to None.
+
+    Returns:
+        np.ndarray: Loaded NumPy array.
+
+    Raises:
+        LaptopException: If loading the array fails.
+    """
+    
+    logging.info(f"Entered load_numpy_array_data with file_path={file_path}, mmap_mode={mmap_mode}")
+    try:
+        if mmap_mode is not None:
+            array = np.load(file_path, mmap_mode=mmap_mode)
+        else:
+            with open(file_path, 'rb') as file_obj:
+                array = np.load(file_obj)
+        logging.info(f"NumPy array loaded successfully from: {file_path}, array_shape={array.shape}")
+        return array
+    except Exception as e:
+        logging.error(f"Error occurred while loading numpy array: {file_path}")
+        raise LaptopException(e, sys)  
+    
+
+def get_file_object_hash(file_obj: BinaryIO, chunk_size: int = 1024 * 1024) -> str:
+    """
+    sha256 hex digest of the rest of an open binary file, read chunk by chunk
+    (e.g. to hash and load the same open file).
+    """
+    sha256 = hashlib.sha256()
+    for chunk in iter(lambda: file_obj.read(chunk_size), b""):
+        sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+def get_file_hash(file_path: str, chunk_size: int = 1024 * 1024) -> str:
+    """
+    sha256 hex digest of the content of a file, read chunk by chunk.
+
+    Args:
+        file_path (str): Path to the file.
+        chunk_size (int, optional): Bytes read at a time. Defaults to 1 MiB.
+
+    Returns:
+        str: sha256 hex digest.
+
+    Raises:
+        LaptopException: If reading the file fails.
+    """
+    try:
+        with open(file_path, 'rb') as file_obj:
+            return get_file_object_hash(file_obj, chunk_size = chunk_size)
+    except Exception as e:
+        logging.error(f"Error occurred while hashing file: {file_path}")
+        raise LaptopException(e, sys)
+
+
+def drop_columns(df: "DataFrame", cols: list)-> "DataFrame":
+    """
+    Drop specific columns from a Pandas DataFrame.
+
+    Args:
+        df (DataFrame): Input Pandas DataFrame.
+        cols (list): List of column names to drop.
+
+    Returns:
+        DataFrame: DataFrame with specified columns removed.
+
+    Raises:
+        LaptopException: If dropping columns fails.
+    """
+    
+    logging.info(f"Entered drop_columns with cols={cols}")
+    try:
+        df = df.drop(columns=cols, axis=1)
+        logging.info(f"Dropped columns: {cols}, new_shape={df.shape}")
+        return df
+    except Exception as e:
+        logging.error(f"Error occurred while dropping columns: {cols}")
+        raise LaptopException(e, sys)  
+    
+
+def save_yaml_file(file_path: str, data: dict):
+    """
+    Save dictionary data to a YAML file.
+
+    Args:
+        file_path (str): Path where the YAML file should be saved.
+        data (dict): Dictionary data to save.
+
+    Raises:
+        LaptopException: If saving the YAML file fails.
+    """
+    logging.info(f"Entered save_yaml_file with file_path={file_path}")
+    try:
+        import yaml
+        
+        dir_path = os.path.dirname(file_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok=True)
+        with open(file_path, 'w') as file_obj:
+            yaml.dump(data, file_obj)
+        logging.info(f"YAML file saved successfully: {file_path}")
+    except Exception as e:
+        logging.error(f"Error occurred while saving YAML file: {file_path}")
+        raise LaptopException(e, sys)  
+
+def save_csv_file(file_path: str, data: "pd.DataFrame" , index = False , header = True):
+    """
+    Save a pandas DataFrame to a CSV file.
+
+    Args:
+        file_path (str): Path where the CSV file should be saved.
+        data (pd.DataFrame): DataFrame to save.
+
+    Raises:
+        LaptopException: If saving the CSV file fails.
+    """
+    logging.info(f"Entered save_csv_file with file_path={file_path}")
+    try:
+        dir_path = os.path.dirname(file_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok = True)
+        data.to_csv(file_path, index = index , header = header)
+        logging.info(f"CSV file saved successfully: {file_path}")
+    except Exception as e:
+        logging.error(f"Error occurred while saving CSV file: {file_path}")
+        raise LaptopException(e, sys)
+
+
+# columnar formats are read/written with pyarrow(optional dependency, imported by pandas when needed)
+DATAFRAME_FILE_FORMATS = ("csv" , "parquet" , "feather")
+
+
+def get_dataframe_file_format(file_path: str) -> str:
+    """
+    Get the dataframe file format(csv / parquet / feather) from the file extension.
+
+    Raises:
+        ValueError: If the extension is not a supported dataframe format.
+    """
+    file_format = os.path.splitext(file_path)[1].lstrip(".").lower()
+    if file_format not in DATAFRAME_FILE_FORMATS:
+        raise ValueError(f"Unsupported dataframe file format [{file_format}] of file: {file_path}. Supported: {DATAFRAME_FILE_FORMATS}")
+    return file_format
+
+
+def change_file_format(file_name: str , file_format: str) -> str:
+    """
+    Replace the extension of file_name with the given dataframe file format. e.g. (train.csv , parquet) -> train.parquet
+    """
+    if file_format not in DATAFRAME_FILE_FORMATS:
+        raise ValueError(f"Unsupported dataframe file format [{file_format}]. Supported: {DATAFRAME_FILE_FORMATS}")
+    return f"{os.path.splitext(file_name)[0]}.{file_format}"
+
+
+def read_dataframe(file_path: str) -> "DataFrame":
+    """
+    Read a csv , parquet or feather file into a Pandas DataFrame. The format is taken from the file extension.
+
+    Args:
+        file_path (str): Path to the file.
+
+    Returns:
+        DataFrame: Pandas DataFrame containing the data of the file.
+
+    Raises:
+        LaptopException: If reading the file fails.
+    """
+    logging.info(f"Entered read_dataframe with file_path={file_path}")
+    try:
+        file_format = get_dataframe_file_format(file_path)
+        if file_format == "csv":
+            return read_csv(file_path)
+        
+        import pandas as pd
+        
+        if file_format == "parquet":
+            df = pd.read_parquet(file_path)
+        else:
+            df = pd.read_feather(file_path)
+        logging.info(f"{file_format} file loaded successfully: {file_path}, shape={df.shape}")
+        return df
+    except Exception as e:
+        logging.error(f"Error occurred while reading dataframe file: {file_path}")
+        raise LaptopException(e, sys)
+
+
+def iterate_dataframe_chunks(file_path: str , chunk_size: int , columns: list = None) -> Iterator["DataFrame"]:
+    """
+    Read a csv , parquet or feather file as DataFrames of at most chunk_size rows, without loading the whole file.
+
+    Args:
+        file_path (str): Path to the file, the format is taken from the extension.
+        chunk_size (int): max rows of a chunk.
+        columns (list, optional): read only these columns. Defaults to all the columns.
+
+    Yields:
+        DataFrame: the chunks in the file order.
+
+    Raises:
+        LaptopException: If reading the file fails.
+    """
+    logging.info(f"Entered iterate_dataframe_chunks with file_path={file_path} , chunk_size={chunk_size}")
+    try:
+        file_format = get_dataframe_file_format(file_path)
+        if file_format == "csv":
+            import pandas as pd
+            
+            with pd.read_csv(file_path , chunksize = chunk_size , usecols = columns) as reader:
+                yield from reader
+            return
+        
+        import pyarrow as pa
+        
+        if file_format == "parquet":
+            import pyarrow.parquet as pq
+            
+            for record_batch in pq.ParquetFile(file_path).iter_batches(batch_size = chunk_size , columns = columns):
+                yield record_batch.to_pandas()
+            return
+        
+        # feather(arrow ipc) files are memory mapped, their record batches may be larger than chunk_size
+        with pa.memory_map(file_path , "r") as source:
+            reader = pa.ipc.open_file(source)
+            for batch_index in range(reader.num_record_batches):
+                record_batch = reader.get_batch(batch_index)
+                if columns is not None:
+                    record_batch = record_batch.select(columns)
+                for offset in range(0 , record_batch.num_rows , chunk_size):
+                    yield record_batch.slice(offset , chunk_size).to_pandas()
+    except Exception as e:
+        logging.error(f"Error occurred while reading dataframe file in chunks: {file_path}")
+        raise LaptopException(e, sys)
+
+
+def save_dataframe(file_path: str , data: "pd.DataFrame" , compression: str = None) -> None:
+    """
+    Save a pandas DataFrame as csv , parquet or feather file. The format is taken from the file extension.
+
+    Args:
+        file_path (str): Path where the file should be saved.
+        data (pd.DataFrame): DataFrame to save.
+        compression (str, optional): compression codec of parquet/feather files(e.g. zstd , snappy , lz4). Ignored for csv.
+
+    Raises:
+        LaptopException: If saving the file fails.
+    """
+    logging.info(f"Entered save_dataframe with file_path={file_path}")
+    try:
+        file_format = get_dataframe_file_format(file_path)
+        if file_format == "csv":
+            return save_csv_file(file_path = file_path , data = data)
+        
+        dir_path = os.path.dirname(file_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok = True)
+        
+        # index is not saved, same as csv files
+        data = data.reset_index(drop = True)
+        if file_format == "parquet":
+            data.to_parquet(file_path , index = False , compression = compression)
+        else:
+            data.to_feather(file_path , compression = compression)
+        logging.info(f"{file_format} file saved successfully: {file_path}")
+    except Exception as e:
+        logging.error(f"Error occurred while saving dataframe file: {file_path}")
+        raise LaptopException(e, sys)
+
+
+def get_arrow_type(dtype: str) -> object:
+    """
+    Arrow type of a schema.yaml dtype(str , int64 , float64 ...).
+    """
+    import pyarrow as pa
+    
+    if dtype in ("str" , "string" , "object"):
+        return pa.string()
+    return pa.from_numpy_dtype(np.dtype(dtype))
+
+
+class DataFrameFileWriter:
+    """
+    Write a dataframe file chunk by chunk(csv , parquet or feather by the file extension).
+    
+    The columns of the first chunk are the columns of the file. A chunk without some of them gets NaN values,
+    a chunk with a column that is not in the file raises ValueError because the file can't get a new column.
+    The dtypes(column -> schema.yaml dtype , e.g. from config/schema.yaml) fix the type of those columns in every chunk,
+    the other columns keep the type of the first chunk(all missing in the first chunk -> string)
+    and a later chunk that can't be converted into it raises an error.
+
+    Usage:
+        with DataFrameFileWriter(file_path , dtypes = {"Inches" : "float64" , "Ram" : "str"}) as writer:
+            for chunk in chunks:
+                writer.write(chunk)
+    """
+    def __init__(self , file_path: str , compression: str = None , dtypes: dict = None):
+        self.file_path = file_path
+        self.file_format = get_dataframe_file_format(file_path)
+        self.compression = compression
+        self.dtypes = dict(dtypes or {})
+        self.n_rows = 0
+        self.columns = None
+        self._schema = None
+        self._writer = None
+        self._sink = None
+
+    def __enter__(self):
+        dir_path = os.path.dirname(self.file_path)
+        if dir_path:
+            os.makedirs(dir_path, exist_ok = True)
+        return self
+
+    def _get_schema(self , chunk: "pd.DataFrame") -> object:
+        import pyarrow as pa
+        
+        fields = []
+        for field in pa.Schema.from_pandas(chunk , preserve_index = False):
+            if field.name in self.dtypes:
+                field_type = get_arrow_type(self.dtypes[field.name])
+            elif pa.types.is_null(field.type) or chunk[field.name].isna().all():
+                field_type = pa.string()
+            else:
+                field_type = field.type
+            fields.append(pa.field(field.name , field_type))
+        return pa.schema(fields)
+
+    def write(self , chunk: "pd.DataFrame") -> None:
+        try:
+            if self.columns is None:
+                self.columns = chunk.columns.to_list()
+            
+            new_columns = [column for column in chunk.columns if column not in self.columns]
+            if new_columns:
+                raise ValueError(
+                    f"Columns {new_columns} first appeared after {self.n_rows} rows, they are not in the columns of {self.file_path}: {self.columns}"
+                )
+            chunk = chunk.reindex(columns = self.columns)
+            
+            # str columns: numbers stored by some of the documents become strings , missing values stay missing
+            for column , dtype in self.dtypes.items():
+                if column in chunk.columns and dtype in ("str" , "string"):
+                    values = chunk[column]
+                    is_not_str = values.notna() & ~values.map(lambda value: isinstance(value , str))
+                    if is_not_str.any():
+                        chunk[column] = values.astype(object).where(~is_not_str , values.astype(str))
+            
+            if self.file_format == "csv":
+                chunk.to_csv(self.file_path , mode = "w" if self.n_rows == 0 else "a" , index = False , header = self.n_rows == 0)
+            else:
+                import pyarrow as pa
+                
+                if self._schema is None:
+                    self._schema = self._get_schema(chunk)
+                table = pa.Table.from_pandas(chunk , schema = self._schema , preserve_index = False)
+                if self._writer is None:
+                    if self.file_format == "parquet":
+                        import pyarrow.parquet as pq
+                        self._writer = pq.ParquetWriter(self.file_path , self._schema , compression = self.compression or "none")
+                    else:
+                        self._sink = pa.OSFile(self.file_path , "wb")
+                        self._writer = pa.ipc.new_file(
+                            self._sink , self._schema , options = pa.ipc.IpcWriteOptions(compression = self.compression)
+                        )
+                self._writer.write_table(table)
+            
+            self.n_rows += len(chunk)
+        except Exception as e:
+            logging.error(f"Error occurred while writing chunk into: {self.file_path}")
+            raise LaptopException(e, sys)
+
+    def close(self) -> None:
+        if self._writer is not None:
+            self._writer.close()
+            self._writer = None
+        if self._sink is not None:
+            self._sink.close()
+            self._sink = None
+
+    def __exit__(self , exc_type , exc_value , traceback):
+        self.close()
+        return False
@@ -0,0 +1,321 @@
+import os
+import sys
+import json
+import time
+import threading
+from bisect import bisect_left
+from functools import wraps
+from dataclasses import dataclass, field, asdict
+from typing import Callable, Dict, List, Optional
+
+from laptopPrice.logger import logging
+from laptopPrice.exception import LaptopException
+from laptopPrice.constants import INSTRUMENTATION_ENABLED , INSTRUMENTATION_METRICS_PREFIX , INSTRUMENTATION_HISTOGRAM_BUCKETS
+
+# peak RSS of the process, resource on linux / macos , psutil(if installed) on windows
+try:
+    import resource
+except ImportError:
+    resource = None
+
+
+def get_peak_rss_mb() -> Optional[float]:
+    """
+    Peak resident memory(high water mark) of the current process in MB , None if it can't be read.
+    """
+    if resource is not None:
+        max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        # bytes on macos , kilobytes on linux
+        return max_rss / (1024 * 1024) if sys.platform == "darwin" else max_rss / 1024
+    try:
+        import psutil
+        memory_info = psutil.Process().memory_info()
+        return getattr(memory_info , "peak_wset" , memory_info.rss) / (1024 * 1024)
+    except Exception:
+        return None
+
+
+@dataclass
+class SpanRecord:
+    """
+    Timing of one run of an instrumented block.
+
+    Attributes:
+        name (str): span name, e.g. training.data_transformation
+        labels (dict): labels of the span(e.g. model name), also the labels of the prometheus metrics
+        parent (str): name of the enclosing span of the same thread , None for a top level span
+        started_at (float): start time(unix time)
+        wall_seconds (float): elapsed wall clock time
+        cpu_seconds (float): cpu time of the process(all its threads , not the child processes) while the span was open
+        peak_rss_mb (float): peak resident memory of the process at the end of the span
+        peak_rss_increase_mb (float): how much the span raised the peak resident memory of the process
+        error (str): exception type if the block failed
+        attributes (dict): extra values set by the instrumented code(e.g. stage cache status)
+    """
+    name : str
+    labels : dict = field(default_factory = dict)
+    parent : Optional[str] = None
+    started_at : Optional[float] = None
+    wall_seconds : float = 0.0
+    cpu_seconds : float = 0.0
+    peak_rss_mb : Optional[float] = None
+    peak_rss_increase_mb : Optional[float] = None
+    error : Optional[str] = None
+    attributes : dict = field(default_factory = dict)
+
+
+class _SpanMetric:
+    # aggregated runs of a span name + labels, exported on /metrics
+    def __init__(self , n_buckets: int):
+        self.count = 0
+        self.errors = 0
+        self.wall_seconds = 0.0
+        self.cpu_seconds = 0.0
+        self.max_wall_seconds = 0.0
+        # spans per histogram bucket(not cumulative) , the last one is above the highest bucket
+        self.bucket_counts = [0] * (n_buckets + 1)
+
+    def to_dict(self) -> dict:
+        return {
+            "count" : self.count,
+            "errors" : self.errors,
+            "wall_seconds" : self.wall_seconds,
+            "cpu_seconds" : self.cpu_seconds,
+            "max_wall_seconds" : self.max_wall_seconds,
+            "mean_wall_seconds" : self.wall_seconds / self.count if self.count else 0.0
+        }
+
+
+class Span:
+    """
+    One timed run of a block, made by Instrumentation.span. A class instead of a generator context manager,
+    as the prediction steps it times take only some microseconds.
+    """
+    __slots__ = ("instrumentation" , "record" , "peak_rss_before" , "wall_start" , "cpu_start")
+
+    def __init__(self , instrumentation: "Instrumentation" , name: str , labels: dict):
+        self.instrumentation = instrumentation
+        self.record = SpanRecord(name = name , labels = {key : str(value) for key , value in labels.items()} if labels else {})
+
+    def __enter__(self) -> SpanRecord:
+        if self.instrumentation.enabled:
+            stack = self.instrumentation._get_stack()
+            self.record.parent = stack[-1] if stack else None
+            stack.append(self.record.name)
+            self.peak_rss_before = get_peak_rss_mb()
+            self.record.started_at = time.time()
+            self.wall_start = time.perf_counter()
+            self.cpu_start = time.process_time()
+        return self.record
+
+    def __exit__(self , exc_type , exc_value , traceback) -> bool:
+        if not self.instrumentation.enabled or self.record.started_at is None:
+            return False
+        record = self.record
+        record.wall_seconds = time.perf_counter() - self.wall_start
+        record.cpu_seconds = time.process_time() - self.cpu_start
+        record.peak_rss_mb = get_peak_rss_mb()
+        if record.peak_rss_mb is not None and self.peak_rss_before is not None:
+            record.peak_rss_increase_mb = record.peak_rss_mb - self.peak_rss_before
+        if exc_type is not None:
+            record.error = exc_type.__name__
+        self.instrumentation._get_stack().pop()
+        self.instrumentation._add(record)
+        # exceptions of the block are not swallowed
+        return False
+
+
+class Instrumentation:
+    """
+    Records the wall time , cpu time and peak memory of instrumented blocks(spans).
+
+    Every span is aggregated per name and labels(count , sums and a wall time histogram) for the prometheus
+    /metrics endpoint of the apps. Between start_recording and stop_recording the single span records are
+    kept as well, the training pipeline writes them into its run report.
+
+    The counters are per process, with several worker processes each process reports its own spans.
+    """
+    def __init__(self , enabled: bool = INSTRUMENTATION_ENABLED , buckets: tuple = INSTRUMENTATION_HISTOGRAM_BUCKETS):
+        self.enabled = enabled
+        self.buckets = tuple(sorted(buckets))
+        self._metrics : Dict[tuple , _SpanMetric] = {}
+        self._records : Optional[List[SpanRecord]] = None
+        self._lock = threading.Lock()
+        # stack of the open span names of each thread, for the parent of the nested spans
+        self._local = threading.local()
+
+    def _get_stack(self) -> list:
+        stack = getattr(self._local , "stack" , None)
+        if stack is None:
+            stack = self._local.stack = []
+        return stack
+
+    def _add(self , record: SpanRecord) -> None:
+        key = (record.name , tuple(sorted(record.labels.items())))
+        with self._lock:
+            metric = self._metrics.get(key)
+            if metric is None:
+                metric = self._metrics[key] = _SpanMetric(n_buckets = len(self.buckets))
+            metric.count += 1
+            metric.errors += record.error is not None
+            metric.wall_seconds += record.wall_seconds
+            metric.cpu_seconds += record.cpu_seconds
+            if record.wall_seconds > metric.max_wall_seconds:
+                metric.max_wall_seconds = record.wall_seconds
+            metric.bucket_counts[bisect_left(self.buckets , record.wall_seconds)] += 1
+            if self._records is not None:
+                self._records.append(record)
+
+    def span(self , name: str , **labels) -> "Span":
+        """
+        Context manager which times the block as span `name`.
+
+        Args:
+            name (str): span name, dotted like training.model_trainer or estimator.predict
+            **labels: labels of the span(e.g. model = "XGBRegressor")
+
+        Returns:
+            Span: `with` gives the SpanRecord of the span, the block may set its attributes. Exceptions of the
+                block are recorded and raised again.
+        """
+        return Span(instrumentation = self , name = name , labels = labels)
+
+    def instrumented(self , name: str , **labels) -> Callable:
+        """
+        Decorator version of span, every call of the function is a span.
+        """
+        def decorator(function: Callable) -> Callable:
+            @wraps(function)
+            def wrapper(*args , **kwargs):
+                with self.span(name , **labels):
+                    return function(*args , **kwargs)
+            return wrapper
+        return decorator
+
+    def start_recording(self) -> None:
+        """
+        Keep the records of the spans which end from now on(until stop_recording).
+        """
+        with self._lock:
+            self._records = []
+
+    def stop_recording(self) -> List[SpanRecord]:
+        """
+        Stop keeping the span records and return the ones kept since start_recording.
+        """
+        with self._lock:
+            records , self._records = self._records or [] , None
+        return records
+
+    def get_summary(self) -> Dict[str , dict]:
+        """
+        Aggregated spans as {"name{label=value}": {"count": ... , "wall_seconds": ... , ...}}.
+        """
+        with self._lock:
+            return {
+                name + ("{" + ",".join(f"{key}={value}" for key , value in labels) + "}" if labels else "") : metric.to_dict()
+                for (name , labels) , metric in self._metrics.items()
+            }
+
+    def reset(self) -> None:
+        with self._lock:
+            self._metrics.clear()
+
+    def render_prometheus(self , extra_metrics: Dict[str , dict] = None) -> str:
+        """
+        Spans(and extra metrics) in the prometheus text exposition format.
+
+        Args:
+            extra_metrics (Dict[str , dict], optional): {metric name: {"help": str , "type": "gauge" | "counter" , "value": float}}
+                of other components, e.g. the prediction cache counters. None values are skipped. Defaults to None.
+
+        Returns:
+            str: metrics text for a /metrics endpoint.
+        """
+        prefix = INSTRUMENTATION_METRICS_PREFIX
+        with self._lock:
+            metrics = [(name , labels , metric.count , metric.errors , metric.wall_seconds , metric.cpu_seconds , list(metric.bucket_counts))
+                       for (name , labels) , metric in sorted(self._metrics.items())]
+
+        lines = [
+            f"# HELP {prefix}_span_seconds Wall clock time of the instrumented spans",
+            f"# TYPE {prefix}_span_seconds histogram"
+        ]
+        for name , labels , count , _ , wall_seconds , _ , bucket_counts in metrics:
+            label_text = _format_labels(span = name , **dict(labels))
+            cumulative_count = 0
+            for bucket , bucket_count in zip(self.buckets , bucket_counts):
+                cumulative_count += bucket_count
+                lines.append(f'{prefix}_span_seconds_bucket{_format_labels(span = name , le = repr(float(bucket)) , **dict(labels))} {cumulative_count}')
+            lines.append(f'{prefix}_span_seconds_bucket{_format_labels(span = name , le = "+Inf" , **dict(labels))} {count}')
+            lines.append(f"{prefix}_span_seconds_sum{label_text} {wall_seconds!r}")
+            lines.append(f"{prefix}_span_seconds_count{label_text} {count}")
+
+        lines += [
+            f"# HELP {prefix}_span_cpu_seconds_total Process cpu time while the instrumented spans were open",
+            f"# TYPE {prefix}_span_cpu_seconds_total counter"
+        ]
+        lines += [f"{prefix}_span_cpu_seconds_total{_format_labels(span = name , **dict(labels))} {cpu_seconds!r}"
+                  for name , labels , _ , _ , _ , cpu_seconds , _ in metrics]
+
+        lines += [
+            f"# HELP {prefix}_span_errors_total Instrumented spans which raised an exception",
+            f"# TYPE {prefix}_span_errors_total counter"
+        ]
+        lines += [f"{prefix}_span_errors_total{_format_labels(span = name , **dict(labels))} {errors}"
+                  for name , labels , _ , errors , _ , _ , _ in metrics]
+
+        extra_metrics = dict(extra_metrics or {})
+        extra_metrics["process_peak_rss_megabytes"] = {"help" : "Peak resident memory of the process" , "value" : get_peak_rss_mb()}
+        for metric_name , metric in extra_metrics.items():
+            if metric.get("value") is None:
+                continue
+            lines += [
+                f"# HELP {prefix}_{metric_name} {metric.get('help' , metric_name)}",
+                f"# TYPE {prefix}_{metric_name} {metric.get('type' , 'gauge')}",
+                f"{prefix}_{metric_name} {float(metric['value'])!r}"
+            ]
+        return "\n".join(lines) + "\n"
+
+
+def _escape_label_value(value: object) -> str:
+    return str(value).replace("\\" , "\\\\").replace('"' , '\\"').replace("\n" , "\\n")
+
+
+def _format_labels(**labels) -> str:
+    # {key="value",...} of a prometheus sample
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape_label_value(value)}"' for key , value in labels.items()) + "}"
+
+
+def write_run_report(file_path: str , records: List[SpanRecord] , **report) -> None:
+    """
+    Write the span records and the extra report values(status , stage cache , ...) as json.
+
+    Args:
+        file_path (str): report file path, e.g. artifacts/<timestamp>/run_report.json
+        records (List[SpanRecord]): records returned by Instrumentation.stop_recording
+        **report: extra top level values of the report
+
+    Raises:
+        LaptopException: If the report can't be written.
+    """
+    try:
+        os.makedirs(os.path.dirname(file_path) or "." , exist_ok = True)
+        content = {
+            **report,
+            "peak_rss_mb" : get_peak_rss_mb(),
+            "spans" : [asdict(record) for record in records]
+        }
+        with open(file_path , "w") as file_obj:
+            json.dump(content , file_obj , indent = 2 , default = str)
+        logging.info(f"Run report saved at: {file_path}")
+    except Exception as e:
+        raise LaptopException(e , sys)
+
+
+# process wide instrumentation used by the training pipeline , the estimator and the apps
+instrumentation = Instrumentation()
+span = instrumentation.span
+instrumented = instrumentation.instrumented
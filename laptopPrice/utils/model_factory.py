@@ -1,355 +1,818 @@
-import os
-import sys 
-import yaml
-from importlib import import_module
-from typing import Any, Dict, Tuple, List
-import numpy as np 
-import pandas as pd
-from dataclasses import dataclass 
-
-from sklearn.model_selection import GridSearchCV, RandomizedSearchCV
-from sklearn.metrics import r2_score , mean_squared_error , mean_absolute_error
-
-from laptopPrice.logger import logging
-from laptopPrice.exception import LaptopException
-from laptopPrice.utils.common_utils import read_yaml_file , save_yaml_file , load_object
-
-
-@dataclass
-class BestModelDetails:
-    """
-    Dataclass to store information about the best model.
-    
-    Attributes:
-        best_model (Any): Trained model object (fitted with best parameters)
-        best_score (float): Test accuracy score of the best model
-        best_params (Dict): Best hyperparameters found during tuning
-        model_name (str): Name of the model
-        module_name (str): Module path of the model class
-    """
-    best_model : Any
-    best_score : float
-    best_params : Dict
-    model_name : str
-    module_name : str
-    
-
-class ModelFactory:
-    """
-    ModelFactory class is responsible for:
-        1. Reading models and hyperparameters from a YAML configuration file.
-        2. Initializing model objects dynamically.
-        3. Performing hyperparameter tuning (GridSearchCV / RandomizedSearchCV).
-        4. Evaluating models on training and test datasets.
-        5. Saving all model performance and best parameters to a YAML report.
-        6. Returning the best model object based on highest test accuracy.
-    """
-    def __init__(self , model_config_path: str , tuned_model_report_path: str):
-        """
-        Initialize ModelFactory instance.
-        
-        Args:
-            model_config_path (str): Path to model YAML configuration file.
-            tuned_model_report_path (str): Path to save all tuned models report.
-        """
-        try:
-            self.model_config_path = model_config_path
-            self.tuned_model_report_file_path = tuned_model_report_path
-            self.model_config = None # content will be the content of model.yaml
-            self.tuned_model_report = {} # store the result of all tuned model after gridsearch cv 
-        except Exception as e:
-            raise LaptopException(e , sys)
-    
-    
-    def read_model_config(self) -> Dict:
-        """
-        Reads the model YAML configuration file and returns a dictionary.
-        
-        Returns:
-            Dict: Dictionary containing all models, their modules, default parameters, 
-                and hyperparameter search grids. Also save the model_config
-        """
-        try:
-            if self.model_config is None:
-                self.model_config = read_yaml_file(self.model_config_path)
-            return self.model_config
-        
-        except Exception as e:
-            raise LaptopException(e , sys)
-    
-    def initialize_model(self, model_info: Dict) -> Tuple[str, object, Dict]:
-        """
-        Dynamically imports the module and class, then instantiates the model object with default parameters.
-
-        Args:
-            model_info (Dict): Dictionary containing:
-                - "module": module path (e.g., "sklearn.ensemble")
-                - "class": class name (e.g., "RandomForestClassifier")
-                - "params": default parameters for initialization
-                - "search_param_grid": hyperparameter grid for tuning
-
-        Returns:
-            Tuple[str, object, Dict]: 
-                - model_name (str)
-                - instantiated model object (object)
-                - hyperparameter grid (Dict)
-        """
-        try:
-            module_name = model_info['module']
-            class_name = model_info['class']
-            model_name = class_name  
-            params = model_info.get('params', {})
-            param_grid = model_info.get('search_param_grid', {})
-
-            # Dynamically import module and get class
-            module = import_module(module_name)
-            model_class = getattr(module, class_name)
-
-            # Instantiate model with default parameters
-            model_obj = model_class(**params)
-
-            return model_name, model_obj, param_grid
-        except Exception as e:
-            raise LaptopException(e , sys) 
-    
-    
-    def tune_model(self , X_train: np.ndarray , y_train: np.ndarray , model_name: str , model_obj: object , param_grid: Dict) -> Dict:
-        """
-        Performs GridSearchCV / RandomizedSearchCV to find the best hyperparameters on training data.
-        
-        Args:
-            X_train (np.ndarray): Training features
-            y_train (np.ndarray): Training target
-            model_name (str): Name of the model
-            model_obj (object): Instantiated model object
-            param_grid (Dict): Hyperparameter search space
-        
-        Returns:
-            Dict: Dictionary containing 'best_params', 'train_score', and fitted 'model_obj'
-        """
-        
-        #Task: Take a model object(sklearn object) and model_obj params , and train on data
-        
-        logging.info(f"Starting hyperparameter tuning for model: {model_name}")
-        
-        # read the search strategy from the yaml content
-        search_config = self.model_config.get("grid_search" , {})
-        
-        # read the search method(GridSearchCV / RandomizedSearchCV) if not given then defeault is GridSearchCV
-        search_class_name = search_config.get("class", "GridSearchCV")
-        
-        # read class sklearn import module part
-        search_module_name = search_config.get("module", "sklearn.model_selection")
-        
-        # read the search params dict
-        search_params = search_config.get("params", {"cv": 3, "verbose": 2, "n_jobs": -1}) # if not set then use defult
-        
-        # import search class from sklearn.model_selection (GridSearchCV / RandomizedSearchCV)
-        SearchClass = getattr(__import__(search_module_name, fromlist = [search_class_name]), search_class_name)
-        
-        # make the object of search class(object of GridSearchCV / RandomizedSearchCV)
-        # check which tuning class needs to use
-        if search_class_name == "RandomizedSearchCV":
-            search_obj = SearchClass(
-                estimator = model_obj,
-                param_distributions = param_grid, 
-                **search_params
-            )
-        else:  
-            search_obj = SearchClass(
-                estimator = model_obj,
-                param_grid = param_grid,
-                **search_params
-            )
-        
-        logging.info(f"Starting tuning [{model_name}] Using search strategy: {search_class_name}")
-        
-        
-        # fit the (GridSearchCV / RandomizedSearchCV) on train data
-        search_obj.fit(X_train , y_train)
-        
-        # find the best estimator , params and train_score
-        best_model = search_obj.best_estimator_
-        best_params = search_obj.best_params_
-        train_score = r2_score(y_train, best_model.predict(X_train))
-        
-        logging.info(
-          f"[{model_name}] => Completed tuning | Best Params: {best_params}, Train Accuracy: {train_score:.4f}"
-        )
-        
-        return {
-            "model_name": model_name,
-            "best_model": best_model,
-            "best_params": best_params,
-            "train_score": train_score
-        }
-    
-    
-    def evaluate_model(self, model_obj: object, X: np.ndarray, y: np.ndarray) -> Dict:
-        """
-        Evaluates a trained model on a dataset and returns classification metrics.
-        
-        Args:
-            model_obj (object): Trained model object
-            X (np.ndarray): Features
-            y (np.ndarray): Target
-        
-        Returns:
-            Dict: Dictionary containing 'r2_score', 'mean_absolute_error', 'mean_squared_error'
-        """
-        
-        try:
-           logging.info(f"started evaluating from evaluate_model method of ModeFactory [{model_obj.__class__.__name__}]")
-           
-           # predict on given X data
-           y_pred = model_obj.predict(X)
-           
-           # Calculate metrics
-           r2 = r2_score(y , y_pred)
-           mae = mean_absolute_error(y , y_pred)  
-           mse = mean_squared_error(y , y_pred)
-           
-           metrics = {
-                "r2_score": r2,
-                "mean_absolute_error": mae,
-                "mean_squared_error": mse,
-            }
-           
-           logging.info(f"Evaluation metrics for model [{model_obj.__class__.__name__}]: {metrics}")
-           return metrics
-       
-        except Exception as e:
-            raise LaptopException(e , sys)
-
-
-    def run_model_factory(self , X_train: np.ndarray , y_train: np.ndarray , X_test: np.ndarray , y_test: np.ndarray) -> Dict[str, Dict]:
-            """
-            Runs hyperparameter tuning for all models from YAML and evaluates train & test performance.
-            Saves results to tuned_model_report_path.
-            
-            Args:
-                X_train (np.ndarray): Training features
-                y_train (np.ndarray): Training target
-                X_test (np.ndarray): Test features
-                y_test (np.ndarray): Test target
-            
-            Returns:
-                Dict[str, Dict]: Dictionary containing all models' train/test metrics and best parameters
-            """
-            try:
-                logging.info("Entered into run_model_factory method of class ModelFactory")
-                
-                # 1. read the model.yaml file
-                self.read_model_config()
-                logging.info(f"after reading the yaml file len of self.model_config: [{len(self.model_config)}]")
-                
-                # get the model info part from model config
-                models_info = self.model_config.get("model_selection" , {})
-                logging.info(f"Len of models_info: [{len(models_info)}]")
-                
-                # 2. clear tuned model report if any
-                self.tuned_model_report = {}
-                logging.info("clear tuned model report")
-                
-                # 3. read the yaml content and train each model
-                for model_key , model_info in models_info.items():
-                    # initialize the model
-                    model_name, model_obj, param_grid = self.initialize_model(model_info)
-                    logging.info(f"initialized model [name = {model_name}]")
-                    
-                    # tune the model
-                    tuned_result = self.tune_model(
-                        X_train = X_train, 
-                        y_train = y_train,
-                        model_name = model_name,
-                        model_obj = model_obj,
-                        param_grid = param_grid
-                    )
-                    
-                    # evaluate the model
-                    train_metrics = self.evaluate_model(tuned_result["best_model"], X_train, y_train)
-                    test_metrics = self.evaluate_model(tuned_result["best_model"], X_test, y_test)
-                    
-                    # Store results in report
-                    self.tuned_model_report[model_name] = {
-                        "best_params": tuned_result["best_params"],
-                        "train_score": tuned_result["train_score"],
-                        "train_metrics": train_metrics,
-                        "test_metrics": test_metrics,
-                        "module_name": model_info["module"]
-                    }
-                
-                # save the report
-                save_yaml_file(
-                    file_path = self.tuned_model_report_file_path,
-                    data = self.tuned_model_report 
-                )
-                logging.info(f"Tuned model report saved at {self.tuned_model_report_file_path}")
-                
-                return self.tuned_model_report
-            
-            except Exception as e:
-                raise LaptopException(e , sys)
-    
-    def get_best_model(self ) -> BestModelDetails:
-        """
-        Returns the best model object based on highest test accuracy.If tuned report exists, loads it; otherwise, runs model factory.
-        
-        Returns:
-            BestModelDetail: Dataclass object containing best_model_object, best_params, best_score, model_name
-        """
-        try:
-            if not self.tuned_model_report:
-                raise Exception("Tuned model report is empty. Please run run_model_factory first.")
-            
-            # find the best model based on highest test accuracy
-            best_score = -1
-            best_model_name = None
-             
-            
-            for model_name , result in self.tuned_model_report.items():
-                
-                test_accuracy = result.get("test_metrics", {}).get("r2_score", 0)
-                
-                if test_accuracy > best_score:
-                    best_score = test_accuracy
-                    best_model_name = model_name
-                    
-            
-            # if no best model found
-            if best_model_name is None:
-                raise Exception("No model found in tuned model report.")
-            
-            # get the best model metadata from model report
-            model_result = self.tuned_model_report[best_model_name]
-            
-            # get the model module
-            module_name = model_result["module_name"]
-            class_name = best_model_name
-            best_params = model_result["best_params"]
-            logging.info(f"Best model: {class_name} | Test Accuracy: {best_score:.4f}")
-            
-            # Dynamically recreate the model object
-            logging.info(f"Dynamically recreating the model object [{class_name}] from get_best_model method")
-            
-            module = import_module(module_name)
-            ModelClass = getattr(module , class_name)
-            best_model_obj = ModelClass(**best_params)
-            
-            logging.info("Dynamically recreation the model object done")
-            
-            logging.info("Constructing the BestModelDetail from get_best_model method")
-            best_model_detail = BestModelDetails(
-                best_model = best_model_obj,
-                best_score = best_score,
-                best_params = best_params,
-                model_name = best_model_name,
-                module_name = module_name
-            )
-            logging.info("Exiting from get_best_model method")
-            return best_model_detail
-        
-        
-        except Exception as e:
-            raise LaptopException(e , sys)
+import os
+import sys 
+import yaml
+import inspect
+from importlib import import_module
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import nullcontext
+from typing import Any, Dict, Tuple, List
+import numpy as np 
+import pandas as pd
+from dataclasses import dataclass 
+
+from joblib import cpu_count , parallel_config
+from sklearn.experimental import enable_halving_search_cv # noqa: F401 , makes HalvingRandomSearchCV / HalvingGridSearchCV importable
+from sklearn.model_selection import GridSearchCV, RandomizedSearchCV, ParameterGrid, train_test_split
+from sklearn.base import clone
+from sklearn.metrics import r2_score , mean_squared_error , mean_absolute_error
+
+from laptopPrice.logger import logging
+from laptopPrice.exception import LaptopException
+from laptopPrice.utils.common_utils import read_yaml_file , save_yaml_file , load_object
+from laptopPrice.utils.model_store import FittedModelStore
+from laptopPrice.utils.instrumentation import span
+
+
+# constructor params used by the supported estimators for their own thread count
+# (sklearn / xgboost / lightgbm -> n_jobs , catboost -> thread_count , old xgboost -> nthread)
+ESTIMATOR_THREAD_PARAMS = ("n_jobs" , "thread_count" , "nthread")
+
+# resource name in the search config which is replaced by the budget_param(n_estimators / iterations) of each model
+BUDGET_RESOURCE = "budget"
+
+# supported values of early_stopping in the model config
+EARLY_STOPPING_METHODS = ("sklearn" , "xgboost" , "lightgbm" , "catboost")
+
+
+def to_builtin(value: Any) -> Any:
+    """Convert numpy scalars to python values, so they can be saved in the yaml report."""
+    return value.item() if isinstance(value , np.generic) else value
+
+
+@dataclass
+class BestModelDetails:
+    """
+    Dataclass to store information about the best model.
+    
+    Attributes:
+        best_model (Any): Trained model object (fitted with best parameters)
+        best_score (float): Test accuracy score of the best model
+        best_params (Dict): Best hyperparameters found during tuning
+        model_name (str): Name of the model
+        module_name (str): Module path of the model class
+        is_fitted (bool): True if best_model is the fitted estimator of the search, False if it was recreated unfitted
+    """
+    best_model : Any
+    best_score : float
+    best_params : Dict
+    model_name : str
+    module_name : str
+    is_fitted : bool = False
+    
+
+class ModelFactory:
+    """
+    ModelFactory class is responsible for:
+        1. Reading models and hyperparameters from a YAML configuration file.
+        2. Initializing model objects dynamically.
+        3. Performing hyperparameter tuning (GridSearchCV / RandomizedSearchCV).
+        4. Evaluating models on training and test datasets.
+        5. Saving all model performance and best parameters to a YAML report.
+        6. Returning the best model object based on highest test accuracy.
+    """
+    def __init__(self , model_config_path: str , tuned_model_report_path: str):
+        """
+        Initialize ModelFactory instance.
+        
+        Args:
+            model_config_path (str): Path to model YAML configuration file.
+            tuned_model_report_path (str): Path to save all tuned models report.
+        """
+        try:
+            self.model_config_path = model_config_path
+            self.tuned_model_report_file_path = tuned_model_report_path
+            self.model_config = None # content will be the content of model.yaml
+            self.tuned_model_report = {} # store the result of all tuned model after gridsearch cv 
+            self.model_store = None # fitted best estimators of the searches, created by run_model_factory
+        except Exception as e:
+            raise LaptopException(e , sys)
+    
+    
+    def read_model_config(self) -> Dict:
+        """
+        Reads the model YAML configuration file and returns a dictionary.
+        
+        Returns:
+            Dict: Dictionary containing all models, their modules, default parameters, 
+                and hyperparameter search grids. Also save the model_config
+        """
+        try:
+            if self.model_config is None:
+                self.model_config = read_yaml_file(self.model_config_path)
+            return self.model_config
+        
+        except Exception as e:
+            raise LaptopException(e , sys)
+    
+    def initialize_model(self, model_info: Dict) -> Tuple[str, object, Dict]:
+        """
+        Dynamically imports the module and class, then instantiates the model object with default parameters.
+
+        Args:
+            model_info (Dict): Dictionary containing:
+                - "module": module path (e.g., "sklearn.ensemble")
+                - "class": class name (e.g., "RandomForestClassifier")
+                - "params": default parameters for initialization
+                - "search_param_distributions": hyperparameter search space for tuning(older configs: "search_param_grid")
+
+        Returns:
+            Tuple[str, object, Dict]: 
+                - model_name (str)
+                - instantiated model object (object)
+                - hyperparameter grid (Dict)
+        """
+        try:
+            module_name = model_info['module']
+            class_name = model_info['class']
+            model_name = class_name  
+            params = model_info.get('params', {})
+            param_grid = self.get_search_space(model_info)
+
+            # Dynamically import module and get class
+            module = import_module(module_name)
+            model_class = getattr(module, class_name)
+
+            # Instantiate model with default parameters
+            model_obj = model_class(**params)
+
+            return model_name, model_obj, param_grid
+        except Exception as e:
+            raise LaptopException(e , sys) 
+    
+    
+    def get_model_store(self) -> FittedModelStore:
+        """
+        Creates the store of the fitted best estimators from the model_store part of the model config.
+        Spilled models go next to the tuned model report unless spill_dir is given.
+        """
+        if self.model_store is None:
+            store_config = self.model_config.get("model_store") or {}
+            max_models_in_memory = store_config.get("max_models_in_memory")
+            spill_dir = store_config.get("spill_dir") or os.path.join(
+                os.path.dirname(self.tuned_model_report_file_path) , "fitted_models"
+            )
+            self.model_store = FittedModelStore(
+                max_models_in_memory = max_models_in_memory,
+                spill_dir = spill_dir if max_models_in_memory is not None else None
+            )
+        return self.model_store
+    
+    
+    def get_search_strategy(self) -> str:
+        """
+        Name of the search section of the model config used to tune the models.
+        search_strategy when it is set , otherwise random_search(grid_search in older configs).
+        """
+        search_strategy = self.model_config.get("search_strategy")
+        if search_strategy is None:
+            search_strategy = "grid_search" if "grid_search" in self.model_config and "random_search" not in self.model_config else "random_search"
+        return search_strategy
+    
+    
+    def get_search_space(self , model_info: Dict) -> Dict:
+        """
+        Hyperparameter search space of one model_selection entry(search_param_distributions , search_param_grid in older configs).
+        """
+        if "search_param_distributions" in model_info:
+            return model_info["search_param_distributions"] or {}
+        return model_info.get("search_param_grid") or {}
+    
+    
+    def get_search_config(self) -> Tuple[str , str , Dict]:
+        """
+        Reads the search section selected by search_strategy of the model config.
+        
+        Returns:
+            Tuple[str, str, Dict]: search class name , search class module and a copy of the search params
+        """
+        search_strategy = self.get_search_strategy()
+        search_config = self.model_config.get(search_strategy , {})
+        
+        # read the search method(GridSearchCV / RandomizedSearchCV) if not given then defeault is GridSearchCV
+        search_class_name = search_config.get("class", "GridSearchCV")
+        
+        # read class sklearn import module part
+        search_module_name = search_config.get("module", "sklearn.model_selection")
+        
+        # read the search params dict
+        search_params = dict(search_config.get("params", {"cv": 3, "verbose": 2, "n_jobs": -1})) # if not set then use defult
+        
+        return search_class_name , search_module_name , search_params
+    
+    
+    def get_search_fit_count(self , param_grid: Dict) -> int:
+        """
+        Number of fits(candidates x cv folds) one search of the given search space runs.
+        """
+        search_class_name , _ , search_params = self.get_search_config()
+        
+        cv = search_params.get("cv" , 5)
+        n_splits = cv if isinstance(cv , int) else getattr(cv , "n_splits" , 5)
+        
+        try:
+            n_candidates = len(ParameterGrid(param_grid))
+        except TypeError:
+            # distributions(e.g. scipy.stats) are not countable, only sampled
+            n_candidates = None
+        
+        if search_class_name == "RandomizedSearchCV":
+            n_iter = search_params.get("n_iter" , 10)
+            n_candidates = n_iter if n_candidates is None else min(n_iter , n_candidates)
+        elif search_class_name.startswith("Halving"):
+            # the first iteration of successive halving has the most candidates
+            halving_candidates = search_params.get("n_candidates")
+            if isinstance(halving_candidates , int):
+                n_candidates = halving_candidates if n_candidates is None else min(halving_candidates , n_candidates)
+        
+        return max(n_candidates or 1 , 1) * n_splits
+    
+    
+    def get_parallel_search_plan(self) -> Dict:
+        """
+        Reads the parallel_search part of the model config and resolves the cpu budget.
+        
+        Returns:
+            Dict: 'enabled', 'cpu_budget'(number of cores) and 'max_parallel_models'
+        """
+        parallel_config = self.model_config.get("parallel_search" , {})
+        
+        cpu_budget = parallel_config.get("cpu_budget" , -1)
+        if cpu_budget is None or cpu_budget < 0:
+            # same meaning as n_jobs = -1 , -2 ...
+            cpu_budget = cpu_count() + 1 + (cpu_budget if cpu_budget is not None else -1)
+        cpu_budget = max(int(cpu_budget) , 1)
+        
+        return {
+            "enabled": bool(parallel_config.get("enabled" , False)),
+            "cpu_budget": cpu_budget,
+            "max_parallel_models": max(int(parallel_config.get("max_parallel_models" , 1)) , 1)
+        }
+    
+    
+    def set_estimator_threads(self , model_obj: object , n_threads: int) -> str:
+        """
+        Sets the own thread count of an estimator(n_jobs / thread_count / nthread) if it has one.
+        
+        Returns:
+            str: name of the param which was set, None if the estimator has no thread count
+        """
+        # catboost get_params only returns the explicitly given params, so check the constructor too
+        param_names = set(model_obj.get_params()) | set(inspect.signature(type(model_obj).__init__).parameters)
+        for param_name in ESTIMATOR_THREAD_PARAMS:
+            if param_name in param_names:
+                model_obj.set_params(**{param_name : n_threads})
+                return param_name
+        return None
+    
+    
+    def get_early_stopping_config(self) -> Dict:
+        """
+        Reads the early_stopping part of the model config.
+        
+        Returns:
+            Dict: 'enabled' , 'rounds' , 'holdout_fraction' and 'random_state'
+        """
+        early_stopping_config = self.model_config.get("early_stopping" , {})
+        return {
+            "enabled": bool(early_stopping_config.get("enabled" , False)),
+            "rounds": int(early_stopping_config.get("rounds" , 30)),
+            "holdout_fraction": float(early_stopping_config.get("holdout_fraction" , 0.1)),
+            "random_state": early_stopping_config.get("random_state" , 42)
+        }
+    
+    
+    def prepare_early_stopping(self , model_obj: object , method: str , X_train: np.ndarray ,
+                               y_train: np.ndarray) -> Tuple[np.ndarray , np.ndarray , Dict]:
+        """
+        Sets up the built-in early stopping of a boosting model.
+        
+        sklearn models hold out validation_fraction of every fit by themselves(n_iter_no_change).
+        xgboost / lightgbm / catboost get a fixed held-out part of the train data as eval_set, this part is
+        not used by the search , so every cv fit and the refit of the best candidate stop on the same data.
+        
+        Args:
+            model_obj (object): Instantiated model object
+            method (str): one of EARLY_STOPPING_METHODS
+            X_train (np.ndarray): Training features
+            y_train (np.ndarray): Training target
+        
+        Returns:
+            Tuple[np.ndarray, np.ndarray, Dict]: features and target for the search and the fit params
+        """
+        if method not in EARLY_STOPPING_METHODS:
+            raise ValueError(f"Unknown early_stopping method: [{method}]. Expected one of {EARLY_STOPPING_METHODS}")
+        
+        early_stopping_config = self.get_early_stopping_config()
+        rounds = early_stopping_config["rounds"]
+        
+        if method == "sklearn":
+            model_obj.set_params(n_iter_no_change = rounds , validation_fraction = early_stopping_config["holdout_fraction"])
+            return X_train , y_train , {}
+        
+        X_search , X_holdout , y_search , y_holdout = train_test_split(
+            X_train , y_train,
+            test_size = early_stopping_config["holdout_fraction"],
+            random_state = early_stopping_config["random_state"]
+        )
+        
+        if method == "xgboost":
+            model_obj.set_params(early_stopping_rounds = rounds)
+            fit_params = {"eval_set": [(X_holdout , y_holdout)] , "verbose": False}
+        elif method == "lightgbm":
+            import lightgbm
+            fit_params = {"eval_set": [(X_holdout , y_holdout)] , "callbacks": [lightgbm.early_stopping(rounds , verbose = False)]}
+        else:
+            fit_params = {"eval_set": (X_holdout , y_holdout) , "early_stopping_rounds": rounds}
+        
+        return X_search , y_search , fit_params
+    
+    
+    def refit_without_early_stopping(self , model_obj: object , method: str , refit_params: Dict , X_train: np.ndarray ,
+                                     y_train: np.ndarray) -> object:
+        """
+        Fits a copy of an early stopped model on the full train data with a fixed number of iterations and without early stopping.
+        
+        Args:
+            model_obj (object): best estimator of the search
+            method (str): one of EARLY_STOPPING_METHODS
+            refit_params (Dict): params set before the fit(e.g. the used iterations as the budget param)
+            X_train (np.ndarray): Training features
+            y_train (np.ndarray): Training target
+        
+        Returns:
+            object: fitted copy of the model
+        """
+        refit_model = clone(model_obj)
+        if method == "sklearn":
+            refit_model.set_params(n_iter_no_change = None)
+        elif method == "xgboost":
+            refit_model.set_params(early_stopping_rounds = None)
+        refit_model.set_params(**refit_params)
+        logging.info(f"Refitting [{model_obj.__class__.__name__}] on the full train data without early stopping. params: {refit_params}")
+        return refit_model.fit(X_train , y_train)
+    
+    
+    def get_used_iterations(self , model_obj: object) -> int:
+        """
+        Number of boosting iterations an early stopped model really kept , None if it is not known.
+        """
+        # sklearn gradient boosting
+        if hasattr(model_obj , "n_estimators_"):
+            return int(model_obj.n_estimators_)
+        # lightgbm(0 when it did not stop early)
+        if getattr(model_obj , "best_iteration_" , None):
+            return int(model_obj.best_iteration_)
+        # catboost keeps only the trees up to the best iteration
+        if hasattr(model_obj , "tree_count_"):
+            return int(model_obj.tree_count_)
+        # xgboost , best_iteration is 0 based and missing without early stopping
+        try:
+            return int(model_obj.best_iteration) + 1
+        except (AttributeError , TypeError , ValueError):
+            return None
+    
+    
+    def get_search_resources_report(self , search_obj: object , model_obj: object , resource: str) -> Tuple[Dict , List[Dict]]:
+        """
+        Collects the resources consumed by every candidate of a finished search.
+        
+        Args:
+            search_obj (object): fitted search object
+            model_obj (object): the base estimator of the search
+            resource (str): n_samples or the budget_param of the model
+        
+        Returns:
+            Tuple[Dict, List[Dict]]: summary of the search and one entry per candidate(params , n_resources , iteration , 
+                mean_test_score , fit_seconds)
+        """
+        cv_results = search_obj.cv_results_
+        n_splits = search_obj.n_splits_
+        default_resource = model_obj.get_params().get(resource)
+        
+        candidates = []
+        for index , params in enumerate(cv_results["params"]):
+            if "n_resources" in cv_results:
+                n_resources = cv_results["n_resources"][index]
+            else:
+                # every candidate is fitted with its full budget(or all the training samples of the fold)
+                n_resources = params.get(resource , default_resource)
+            candidates.append({
+                "params": {name : to_builtin(value) for name , value in params.items()},
+                "n_resources": to_builtin(n_resources),
+                "iteration": to_builtin(cv_results["iter"][index]) if "iter" in cv_results else 0,
+                "mean_test_score": to_builtin(cv_results["mean_test_score"][index]),
+                "fit_seconds": float(cv_results["mean_fit_time"][index] * n_splits)
+            })
+        
+        summary = {
+            "resource": resource,
+            "n_candidates": len(candidates),
+            "n_fits": len(candidates) * n_splits,
+            "fit_seconds": float(sum(candidate["fit_seconds"] for candidate in candidates))
+        }
+        return summary , candidates
+    
+    
+    def tune_model(self , X_train: np.ndarray , y_train: np.ndarray , model_name: str , model_obj: object , param_grid: Dict ,
+                   search_n_jobs: int = None , budget_param: str = None , early_stopping: str = None) -> Dict:
+        """
+        Performs GridSearchCV / RandomizedSearchCV to find the best hyperparameters on training data.
+        
+        Args:
+            X_train (np.ndarray): Training features
+            y_train (np.ndarray): Training target
+            model_name (str): Name of the model
+            model_obj (object): Instantiated model object
+            param_grid (Dict): Hyperparameter search space
+            search_n_jobs (int, optional): n_jobs of the search object, overrides the configured one. Defaults to None.
+            budget_param (str, optional): n_estimators / iterations param , the resource of the budget search. Defaults to None.
+            early_stopping (str, optional): early stopping method of the model(EARLY_STOPPING_METHODS). Defaults to None.
+        
+        Returns:
+            Dict: Dictionary containing 'best_params', 'refit_params'(params of the final fit on top of best_params),
+                fitted 'best_model' , 'search_resources' and 'candidates'
+        """
+        
+        #Task: Take a model object(sklearn object) and model_obj params , and train on data
+        
+        logging.info(f"Starting hyperparameter tuning for model: {model_name}")
+        
+        # read the search strategy from the yaml content
+        search_class_name , search_module_name , search_params = self.get_search_config()
+        if search_n_jobs is not None:
+            search_params["n_jobs"] = search_n_jobs
+        
+        # budget search: n_estimators / iterations is the resource of successive halving instead of a searched param
+        param_grid = dict(param_grid)
+        if search_params.get("resource") == BUDGET_RESOURCE:
+            if budget_param is None:
+                raise ValueError(f"[{model_name}] has no budget_param, it can not be tuned with the {BUDGET_RESOURCE} resource")
+            budget_values = param_grid.pop(budget_param , None)
+            search_params["resource"] = budget_param
+            if search_params.get("max_resources" , "auto") == "auto":
+                search_params["max_resources"] = int(max(budget_values)) if budget_values else int(model_obj.get_params()[budget_param])
+            # the resource must be a param of the estimator(catboost only lists the explicitly given ones)
+            model_obj.set_params(**{budget_param : search_params["max_resources"]})
+        resource = search_params.get("resource" , budget_param or "n_samples")
+        
+        # hold out data for the built-in early stopping of boosting models
+        X_search , y_search , fit_params = X_train , y_train , {}
+        early_stopping_config = self.get_early_stopping_config()
+        if early_stopping is not None and early_stopping_config["enabled"]:
+            X_search , y_search , fit_params = self.prepare_early_stopping(
+                model_obj = model_obj , method = early_stopping , X_train = X_train , y_train = y_train
+            )
+        else:
+            early_stopping = None
+        
+        # import search class from sklearn.model_selection (GridSearchCV / RandomizedSearchCV / HalvingRandomSearchCV ...)
+        SearchClass = getattr(__import__(search_module_name, fromlist = [search_class_name]), search_class_name)
+        
+        # make the object of search class
+        # random searches take param_distributions , grid searches take param_grid
+        if "param_distributions" in inspect.signature(SearchClass).parameters:
+            search_obj = SearchClass(
+                estimator = model_obj,
+                param_distributions = param_grid, 
+                **search_params
+            )
+        else:  
+            search_obj = SearchClass(
+                estimator = model_obj,
+                param_grid = param_grid,
+                **search_params
+            )
+        
+        logging.info(
+            f"Starting tuning [{model_name}] Using search strategy: {search_class_name} , resource: {resource} , "
+            f"early stopping: {early_stopping} , n_jobs: {search_params.get('n_jobs')}"
+        )
+        
+        
+        # fit the search object on train data
+        search_obj.fit(X_search , y_search , **fit_params)
+        
+        # find the best estimator and params(train score is calculated by evaluate_model with the cached predictions)
+        best_model = search_obj.best_estimator_
+        best_params = {name : to_builtin(value) for name , value in search_obj.best_params_.items()}
+        
+        # resources consumed by the candidates of the search
+        search_resources , candidates = self.get_search_resources_report(
+            search_obj = search_obj , model_obj = model_obj , resource = resource
+        )
+        search_resources["search_strategy"] = self.get_search_strategy()
+        search_resources["early_stopping"] = early_stopping
+        
+        refit_params = {}
+        if early_stopping is not None:
+            used_iterations = self.get_used_iterations(best_model)
+            search_resources["best_model_iterations"] = used_iterations
+            # best_params keep the searched budget , the refit uses the iterations the early stopped model really kept
+            if used_iterations is not None and budget_param is not None:
+                refit_params[budget_param] = used_iterations
+            # the search refitted the best candidate without the held-out part , fit it on the full train data
+            best_model = self.refit_without_early_stopping(
+                model_obj = best_model , method = early_stopping , refit_params = refit_params , X_train = X_train , y_train = y_train
+            )
+        
+        logging.info(
+          f"[{model_name}] => Completed tuning | Best Params: {best_params} , "
+          f"fits: {search_resources['n_fits']} , fit seconds: {search_resources['fit_seconds']:.2f}"
+        )
+        
+        return {
+            "model_name": model_name,
+            "best_model": best_model,
+            "best_params": best_params,
+            "refit_params": refit_params,
+            "search_resources": search_resources,
+            "candidates": candidates
+        }
+    
+    
+    def evaluate_model(self, model_obj: object, X: np.ndarray, y: np.ndarray , model_name: str = None , split_name: str = None) -> Dict:
+        """
+        Evaluates a trained model on a dataset and returns classification metrics.
+        
+        Args:
+            model_obj (object): Trained model object
+            X (np.ndarray): Features
+            y (np.ndarray): Target
+            model_name (str, optional): Name of the model in the model store. Defaults to None.
+            split_name (str, optional): Name of the data split(train / test), with model_name the predictions are
+                taken from the model store cache. Defaults to None.
+        
+        Returns:
+            Dict: Dictionary containing 'r2_score', 'mean_absolute_error', 'mean_squared_error'
+        """
+        
+        try:
+           logging.info(f"started evaluating from evaluate_model method of ModeFactory [{model_obj.__class__.__name__}]")
+           
+           # predict on given X data
+           if model_name is not None and split_name is not None and self.model_store is not None and model_name in self.model_store:
+               y_pred = self.model_store.predict(model_name = model_name , split_name = split_name , X = X)
+           else:
+               y_pred = model_obj.predict(X)
+           
+           # Calculate metrics
+           r2 = r2_score(y , y_pred)
+           mae = mean_absolute_error(y , y_pred)  
+           mse = mean_squared_error(y , y_pred)
+           
+           metrics = {
+                "r2_score": r2,
+                "mean_absolute_error": mae,
+                "mean_squared_error": mse,
+            }
+           
+           logging.info(f"Evaluation metrics for model [{model_obj.__class__.__name__}]: {metrics}")
+           return metrics
+       
+        except Exception as e:
+            raise LaptopException(e , sys)
+
+
+    def run_model_factory(self , X_train: np.ndarray , y_train: np.ndarray , X_test: np.ndarray , y_test: np.ndarray) -> Dict[str, Dict]:
+            """
+            Runs hyperparameter tuning for all models from YAML and evaluates train & test performance.
+            Saves results to tuned_model_report_path.
+            
+            Args:
+                X_train (np.ndarray): Training features
+                y_train (np.ndarray): Training target
+                X_test (np.ndarray): Test features
+                y_test (np.ndarray): Test target
+            
+            Returns:
+                Dict[str, Dict]: Dictionary containing all models' train/test metrics and best parameters
+            """
+            try:
+                logging.info("Entered into run_model_factory method of class ModelFactory")
+                
+                # 1. read the model.yaml file
+                self.read_model_config()
+                logging.info(f"after reading the yaml file len of self.model_config: [{len(self.model_config)}]")
+                
+                # get the model info part from model config
+                models_info = self.model_config.get("model_selection" , {})
+                logging.info(f"Len of models_info: [{len(models_info)}]")
+                
+                # 2. clear tuned model report and fitted models if any
+                self.tuned_model_report = {}
+                self.get_model_store().clear()
+                logging.info("clear tuned model report")
+                
+                # 3. read the yaml content and train each model
+                parallel_plan = self.get_parallel_search_plan()
+                if parallel_plan["enabled"] and len(models_info) > 1:
+                    model_reports = self.run_parallel_search(
+                        models_info = models_info , parallel_plan = parallel_plan,
+                        X_train = X_train , y_train = y_train , X_test = X_test , y_test = y_test
+                    )
+                else:
+                    model_reports = [
+                        self.tune_and_evaluate_model(
+                            model_info = model_info , X_train = X_train , y_train = y_train , X_test = X_test , y_test = y_test
+                        )
+                        for model_info in models_info.values()
+                    ]
+                
+                # Store results in report(in the order of the model config)
+                for model_name , model_report in model_reports:
+                    self.tuned_model_report[model_name] = model_report
+                
+                # save the report
+                save_yaml_file(
+                    file_path = self.tuned_model_report_file_path,
+                    data = self.tuned_model_report 
+                )
+                logging.info(f"Tuned model report saved at {self.tuned_model_report_file_path}")
+                
+                return self.tuned_model_report
+            
+            except Exception as e:
+                raise LaptopException(e , sys)
+    
+    def tune_and_evaluate_model(self , model_info: Dict , X_train: np.ndarray , y_train: np.ndarray , X_test: np.ndarray ,
+                                y_test: np.ndarray , search_n_jobs: int = None , estimator_threads: int = None ,
+                                search_backend: str = None) -> Tuple[str , Dict]:
+        """
+        Initializes , tunes and evaluates one model of the model config.
+        
+        Args:
+            model_info (Dict): one entry of model_selection
+            X_train , y_train , X_test , y_test (np.ndarray): train and test data
+            search_n_jobs (int, optional): n_jobs of the search object. Defaults to the configured one.
+            estimator_threads (int, optional): own thread count of the estimator. Defaults to the configured one.
+            search_backend (str, optional): joblib backend of the cv fits of the search. Defaults to None(joblib default).
+        
+        Returns:
+            Tuple[str, Dict]: model name and its tuned model report entry
+        """
+        try:
+            # initialize the model
+            model_name, model_obj, param_grid = self.initialize_model(model_info)
+            logging.info(f"initialized model [name = {model_name}]")
+            
+            if estimator_threads is not None:
+                thread_param = self.set_estimator_threads(model_obj , estimator_threads)
+                logging.info(f"[{model_name}] estimator threads: {thread_param} = {estimator_threads if thread_param else 1}")
+            
+            # tune the model
+            backend_config = parallel_config(backend = search_backend) if search_backend is not None else nullcontext()
+            with span("model_factory.tune_model" , model = model_name) as tuning_span , backend_config:
+                tuned_result = self.tune_model(
+                    X_train = X_train, 
+                    y_train = y_train,
+                    model_name = model_name,
+                    model_obj = model_obj,
+                    param_grid = param_grid,
+                    search_n_jobs = search_n_jobs,
+                    budget_param = model_info.get("budget_param"),
+                    early_stopping = model_info.get("early_stopping")
+                )
+                tuning_span.attributes["n_fits"] = tuned_result["search_resources"]["n_fits"]
+                tuning_span.attributes["fit_seconds"] = tuned_result["search_resources"]["fit_seconds"]
+            
+            # keep the fitted best estimator, get_best_model returns it without fitting again
+            self.get_model_store().put(model_name , tuned_result["best_model"])
+            
+            # evaluate the model(every split is predicted only once)
+            train_metrics = self.evaluate_model(tuned_result["best_model"], X_train, y_train , model_name = model_name , split_name = "train")
+            test_metrics = self.evaluate_model(tuned_result["best_model"], X_test, y_test , model_name = model_name , split_name = "test")
+            
+            return model_name , {
+                "best_params": tuned_result["best_params"],
+                "refit_params": tuned_result["refit_params"],
+                "params": model_info.get("params" , {}),
+                "train_score": train_metrics["r2_score"],
+                "train_metrics": train_metrics,
+                "test_metrics": test_metrics,
+                "module_name": model_info["module"],
+                "search_resources": tuned_result["search_resources"],
+                "candidates": tuned_result["candidates"]
+            }
+        
+        except Exception as e:
+            raise LaptopException(e , sys)
+    
+    
+    def run_parallel_search(self , models_info: Dict , parallel_plan: Dict , X_train: np.ndarray , y_train: np.ndarray ,
+                            X_test: np.ndarray , y_test: np.ndarray) -> List[Tuple[str , Dict]]:
+        """
+        Runs the searches of several models at the same time without using more cores than the cpu budget.
+        
+        The cpu budget is split explicitly. Every running search gets cpu_budget // max_parallel_models cores(its model budget):
+        n_jobs = min(model budget , fits of the search) cv fits at a time , and every fit runs the estimator with its own
+        thread count set to model budget // n_jobs(at least 1). The cv fits run on the threading backend of joblib, so every
+        search has its own workers(the loky process pool is one pool shared by all the searches of the process and
+        sized by the n_jobs of the last search).
+        
+        Args:
+            models_info (Dict): model_selection part of the model config
+            parallel_plan (Dict): output of get_parallel_search_plan
+            X_train , y_train , X_test , y_test (np.ndarray): train and test data
+        
+        Returns:
+            List[Tuple[str, Dict]]: (model name , report entry) in the order of models_info
+        """
+        try:
+            cpu_budget = parallel_plan["cpu_budget"]
+            max_parallel_models = min(parallel_plan["max_parallel_models"] , len(models_info))
+            model_cpu_budget = max(cpu_budget // max_parallel_models , 1)
+            logging.info(
+                f"Parallel model search. cpu_budget: {cpu_budget} , max_parallel_models: {max_parallel_models} , "
+                f"cores per model: {model_cpu_budget}"
+            )
+            
+            with ThreadPoolExecutor(max_workers = max_parallel_models , thread_name_prefix = "model-search") as executor:
+                futures = []
+                for model_info in models_info.values():
+                    n_fits = self.get_search_fit_count(self.get_search_space(model_info))
+                    search_n_jobs = min(model_cpu_budget , n_fits)
+                    estimator_threads = max(model_cpu_budget // search_n_jobs , 1)
+                    futures.append(
+                        executor.submit(
+                            self.tune_and_evaluate_model,
+                            model_info = model_info , X_train = X_train , y_train = y_train , X_test = X_test , y_test = y_test,
+                            search_n_jobs = search_n_jobs , estimator_threads = estimator_threads , search_backend = "threading"
+                        )
+                    )
+                return [future.result() for future in futures]
+        
+        except Exception as e:
+            raise LaptopException(e , sys)
+    
+    
+    def get_best_model(self ) -> BestModelDetails:
+        """
+        Returns the best model object based on highest test accuracy.If tuned report exists, loads it; otherwise, runs model factory.
+        
+        Returns:
+            BestModelDetail: Dataclass object containing best_model_object, best_params, best_score, model_name
+        """
+        try:
+            if not self.tuned_model_report:
+                raise Exception("Tuned model report is empty. Please run run_model_factory first.")
+            
+            # find the best model based on highest test accuracy
+            best_score = -1
+            best_model_name = None
+             
+            
+            for model_name , result in self.tuned_model_report.items():
+                
+                test_accuracy = result.get("test_metrics", {}).get("r2_score", 0)
+                
+                if test_accuracy > best_score:
+                    best_score = test_accuracy
+                    best_model_name = model_name
+                    
+            
+            # if no best model found
+            if best_model_name is None:
+                raise Exception("No model found in tuned model report.")
+            
+            # get the best model metadata from model report
+            model_result = self.tuned_model_report[best_model_name]
+            
+            # get the model module
+            module_name = model_result["module_name"]
+            class_name = best_model_name
+            best_params = model_result["best_params"]
+            logging.info(f"Best model: {class_name} | Test Accuracy: {best_score:.4f}")
+            
+            if self.model_store is not None and best_model_name in self.model_store:
+                # the fitted best estimator of the search
+                logging.info(f"Using the fitted model object [{class_name}] from the model store")
+                best_model_obj = self.model_store.get(best_model_name)
+                is_fitted = True
+            else:
+                # Dynamically recreate the model object(e.g. report loaded without the fitted models)
+                logging.info(f"Dynamically recreating the model object [{class_name}] from get_best_model method")
+                
+                module = import_module(module_name)
+                ModelClass = getattr(module , class_name)
+                # configured params(random_state , verbose ...) first, then the tuned ones and the params of the final fit
+                best_model_obj = ModelClass(**{**model_result.get("params" , {}) , **best_params , **(model_result.get("refit_params") or {})})
+                is_fitted = False
+                
+                logging.info("Dynamically recreation the model object done")
+            
+            logging.info("Constructing the BestModelDetail from get_best_model method")
+            best_model_detail = BestModelDetails(
+                best_model = best_model_obj,
+                best_score = best_score,
+                best_params = best_params,
+                model_name = best_model_name,
+                module_name = module_name,
+                is_fitted = is_fitted
+            )
+            logging.info("Exiting from get_best_model method")
+            return best_model_detail
+        
+        
+        except Exception as e:
+            raise LaptopException(e , sys)
         
\ No newline at end of file
@@ -0,0 +1,124 @@
+import os
+import sys
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+
+import numpy as np
+
+from laptopPrice.logger import logging
+from laptopPrice.exception import LaptopException
+from laptopPrice.utils.common_utils import save_object , load_object
+
+
+class FittedModelStore:
+    """
+    In-memory store of the fitted best estimators of the model search.
+
+    ModelFactory puts the refitted best estimator of every search here, so the best model does not have to be
+    created and fitted again. Predictions are cached per (model name , split name), the train and test
+    predictions of a model are calculated only once.
+    With max_models_in_memory set, the least recently used models above the limit are spilled to spill_dir
+    and loaded back on the next get.
+    """
+    def __init__(self , max_models_in_memory: Optional[int] = None , spill_dir: Optional[str] = None):
+        """
+        Args:
+            max_models_in_memory (int, optional): Number of models kept in memory. Defaults to None(no limit).
+            spill_dir (str, optional): Directory of the spilled models. Required with max_models_in_memory.
+        """
+        if max_models_in_memory is not None and spill_dir is None:
+            raise ValueError("spill_dir is required when max_models_in_memory is set")
+
+        self.max_models_in_memory = max_models_in_memory
+        self.spill_dir = spill_dir
+        self._models : "OrderedDict[str , object]" = OrderedDict()
+        self._spilled : Dict[str , str] = {} # model name -> spilled file path
+        self._predictions : Dict[Tuple[str , str] , np.ndarray] = {}
+        self._lock = threading.RLock()
+
+    def _remove_spilled(self , model_name: str) -> None:
+        file_path = self._spilled.pop(model_name , None)
+        if file_path is not None and os.path.exists(file_path):
+            os.remove(file_path)
+
+    def _spill(self) -> None:
+        # move the least recently used models to disk until the limit is reached
+        while self.max_models_in_memory is not None and len(self._models) > self.max_models_in_memory:
+            model_name , model = self._models.popitem(last = False)
+            file_path = os.path.join(self.spill_dir , f"{model_name}.pkl")
+            save_object(file_path = file_path , obj = model)
+            self._spilled[model_name] = file_path
+            logging.info(f"Spilled fitted model [{model_name}] to {file_path}")
+
+    def put(self , model_name: str , model: object) -> None:
+        """
+        Store a fitted model. Cached predictions of an older model with the same name are dropped.
+        """
+        try:
+            with self._lock:
+                self._remove_spilled(model_name)
+                self._predictions = {key : value for key , value in self._predictions.items() if key[0] != model_name}
+                self._models[model_name] = model
+                self._models.move_to_end(model_name)
+                self._spill()
+        except Exception as e:
+            raise LaptopException(e , sys)
+
+    def get(self , model_name: str) -> object:
+        """
+        Returns the fitted model , loading it back if it was spilled to disk.
+
+        Raises:
+            KeyError: If the model is not in the store.
+        """
+        with self._lock:
+            if model_name in self._models:
+                self._models.move_to_end(model_name)
+                return self._models[model_name]
+
+            if model_name not in self._spilled:
+                raise KeyError(f"Fitted model [{model_name}] is not in the model store")
+
+            model = load_object(self._spilled[model_name])
+            self._remove_spilled(model_name)
+            self._models[model_name] = model
+            self._spill()
+            return model
+
+    def __contains__(self , model_name: str) -> bool:
+        with self._lock:
+            return model_name in self._models or model_name in self._spilled
+
+    def predict(self , model_name: str , split_name: str , X: np.ndarray) -> np.ndarray:
+        """
+        Predictions of a stored model on a named data split(e.g. train / test), calculated only once.
+
+        Args:
+            model_name (str): Name of the stored model
+            split_name (str): Name of the data split , X must always be the same data for the same name
+            X (np.ndarray): Features of the split
+
+        Returns:
+            np.ndarray: predictions
+        """
+        key = (model_name , split_name)
+        with self._lock:
+            y_pred = self._predictions.get(key)
+        if y_pred is not None and len(y_pred) == len(X):
+            return y_pred
+
+        y_pred = self.get(model_name).predict(X)
+        with self._lock:
+            self._predictions[key] = y_pred
+        return y_pred
+
+    def clear(self) -> None:
+        """
+        Drop every model(spilled files too) and cached prediction.
+        """
+        with self._lock:
+            for model_name in list(self._spilled):
+                self._remove_spilled(model_name)
+            self._models.clear()
+            self._predictions.clear()
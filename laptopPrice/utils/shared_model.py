@@ -0,0 +1,149 @@
+import os
+import io
+import sys
+import mmap
+import json
+import shutil
+import uuid
+from typing import List
+
+import dill
+import numpy as np
+
+from laptopPrice.logger import logging
+from laptopPrice.exception import LaptopException
+
+SHARED_OBJECT_FILE_NAME = "object.pkl"
+SHARED_MANIFEST_FILE_NAME = "manifest.json"
+SHARED_ARRAYS_DIR = "arrays"
+SHARED_FORMAT_VERSION = 1
+
+
+class _SharedPickler(dill.Pickler):
+    # large numpy arrays and bytes(the deferred library objects of the estimator) are written into their own
+    # files and only their file names go into the pickle
+    def __init__(self , file_obj: io.BufferedWriter , dir_path: str , min_bytes: int):
+        super().__init__(file_obj)
+        self.dir_path = dir_path
+        self.min_bytes = min_bytes
+        self.file_names : List[str] = []
+
+    def _next_file_name(self , extension: str) -> str:
+        file_name = os.path.join(SHARED_ARRAYS_DIR , f"{len(self.file_names):05d}.{extension}")
+        self.file_names.append(file_name)
+        return file_name
+
+    def persistent_id(self , obj: object):
+        if type(obj) is np.ndarray and obj.dtype != object and obj.nbytes >= self.min_bytes:
+            file_name = self._next_file_name("npy")
+            np.save(os.path.join(self.dir_path , file_name) , obj , allow_pickle = False)
+            return ("npy" , file_name)
+        if type(obj) is bytes and len(obj) >= self.min_bytes:
+            file_name = self._next_file_name("bin")
+            with open(os.path.join(self.dir_path , file_name) , "wb") as file_obj:
+                file_obj.write(obj)
+            return ("bin" , file_name)
+        return None
+
+
+class _SharedUnpickler(dill.Unpickler):
+    # the array files are memory mapped read only, the pages are shared by all the processes mapping them
+    def __init__(self , file_obj: io.BufferedReader , dir_path: str):
+        super().__init__(file_obj)
+        self.dir_path = dir_path
+
+    def persistent_load(self , persistent_id: tuple) -> object:
+        kind , file_name = persistent_id
+        file_path = os.path.join(self.dir_path , file_name)
+        if kind == "npy":
+            # plain ndarray view of the memmap, so the results of the operations are not memmaps
+            return np.asarray(np.load(file_path , mmap_mode = "r"))
+        with open(file_path , "rb") as file_obj:
+            if os.fstat(file_obj.fileno()).st_size == 0:
+                return b""
+            return mmap.mmap(file_obj.fileno() , 0 , access = mmap.ACCESS_READ)
+
+
+def save_shared_object(dir_path: str , obj: object , min_bytes: int = 4096 , metadata: dict = None) -> None:
+    """
+    Save an object as a directory which load_shared_object memory maps: the pickle of the object plus one
+    .npy file per numpy array(and one file per bytes object) of at least min_bytes.
+
+    The directory is written next to dir_path and renamed into place, so a process loading it never sees
+    a half written directory. If dir_path already exists(e.g. saved by another worker) it is kept.
+
+    Args:
+        dir_path (str): directory of the shared object.
+        obj (object): object to save, e.g. LaptopPriceEstimator.
+        min_bytes (int, optional): smaller arrays stay in the pickle. Defaults to 4096.
+        metadata (dict, optional): extra values of manifest.json(e.g. the model version). Defaults to None.
+
+    Raises:
+        LaptopException: If saving the object fails.
+    """
+    logging.info(f"Entered save_shared_object with dir_path={dir_path}")
+    temp_dir_path = f"{dir_path.rstrip(os.sep)}.tmp-{uuid.uuid4().hex}"
+    try:
+        os.makedirs(os.path.join(temp_dir_path , SHARED_ARRAYS_DIR))
+        with open(os.path.join(temp_dir_path , SHARED_OBJECT_FILE_NAME) , "wb") as file_obj:
+            pickler = _SharedPickler(file_obj , dir_path = temp_dir_path , min_bytes = min_bytes)
+            pickler.dump(obj)
+
+        manifest = {
+            "format_version" : SHARED_FORMAT_VERSION,
+            "object_type" : type(obj).__name__,
+            "files" : pickler.file_names,
+            "mapped_bytes" : sum(os.path.getsize(os.path.join(temp_dir_path , file_name)) for file_name in pickler.file_names),
+            **(metadata or {})
+        }
+        with open(os.path.join(temp_dir_path , SHARED_MANIFEST_FILE_NAME) , "w") as file_obj:
+            json.dump(manifest , file_obj , indent = 2)
+
+        try:
+            os.rename(temp_dir_path , dir_path)
+        except OSError:
+            if not os.path.exists(os.path.join(dir_path , SHARED_MANIFEST_FILE_NAME)):
+                raise
+            # another process saved it first
+            shutil.rmtree(temp_dir_path , ignore_errors = True)
+        logging.info(f"Shared object saved at: {dir_path} , mapped files: {len(pickler.file_names)} , bytes: {manifest['mapped_bytes']}")
+    except Exception as e:
+        shutil.rmtree(temp_dir_path , ignore_errors = True)
+        raise LaptopException(e , sys)
+
+
+def load_shared_object(dir_path: str) -> object:
+    """
+    Load an object saved by save_shared_object. Its large arrays are read only memory maps of the files.
+
+    Raises:
+        LaptopException: If the directory is not a shared object or loading fails.
+    """
+    logging.info(f"Entered load_shared_object with dir_path={dir_path}")
+    try:
+        manifest = load_shared_manifest(dir_path)
+        if manifest.get("format_version") != SHARED_FORMAT_VERSION:
+            raise ValueError(f"Unsupported shared object format version: {manifest.get('format_version')}")
+
+        with open(os.path.join(dir_path , SHARED_OBJECT_FILE_NAME) , "rb") as file_obj:
+            return _SharedUnpickler(file_obj , dir_path = dir_path).load()
+    except Exception as e:
+        raise LaptopException(e , sys)
+
+
+def load_shared_manifest(dir_path: str) -> dict:
+    """
+    Returns manifest.json of a shared object directory, with the metadata given to save_shared_object.
+
+    Raises:
+        LaptopException: If the manifest can't be read.
+    """
+    try:
+        with open(os.path.join(dir_path , SHARED_MANIFEST_FILE_NAME)) as file_obj:
+            return json.load(file_obj)
+    except Exception as e:
+        raise LaptopException(e , sys)
+
+
+def is_shared_object_dir(dir_path: str) -> bool:
+    return os.path.exists(os.path.join(dir_path , SHARED_MANIFEST_FILE_NAME))
@@ -1,8 +1,8 @@
-import warnings
-warnings.filterwarnings("ignore")
-
-from laptopPrice.pipeline.training_pipeline import TrainingPipeline
-
-# Run the training pipeline
-training_pipeline_obj = TrainingPipeline()
+import warnings
+warnings.filterwarnings("ignore")
+
+from laptopPrice.pipeline.training_pipeline import TrainingPipeline
+
+# Run the training pipeline
+training_pipeline_obj = TrainingPipeline()
 training_pipeline_obj.run_training_pipeline()
\ No newline at end of file
@@ -0,0 +1,85 @@
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+PROJECT_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+LAPTOP_DATA_FILE_PATH = os.path.join(PROJECT_DIR , "notebooks" , "laptop_data.csv")
+
+
+@pytest.fixture(autouse = True)
+def project_dir(monkeypatch):
+    # config/schema.yaml and config/params.yaml are relative to the project directory
+    monkeypatch.chdir(PROJECT_DIR)
+
+
+@pytest.fixture(scope = "session")
+def laptop_df() -> pd.DataFrame:
+    """Raw listings of notebooks/laptop_data.csv with the "Unnamed: 0" index column."""
+    return pd.read_csv(LAPTOP_DATA_FILE_PATH)
+
+
+@pytest.fixture(scope = "session")
+def raw_features(laptop_df) -> pd.DataFrame:
+    return laptop_df.drop(columns = ["Price"])
+
+
+@pytest.fixture(scope = "session")
+def fitted_components(laptop_df):
+    """(FeatureEngineer , preprocessing Pipeline , feature engineered X , transformed X , log price) of the csv."""
+    os.chdir(PROJECT_DIR)
+    from sklearn.pipeline import Pipeline
+    from sklearn.preprocessing import StandardScaler
+    from laptopPrice.feature_engineering.feature_engineer import FeatureEngineer
+    from laptopPrice.feature_engineering.mean_encoder import MeanEncoder
+
+    feature_engineer = FeatureEngineer()
+    raw_features = laptop_df.drop(columns = ["Price"])
+    feature_engineer.fit(raw_features)
+    features = feature_engineer.transform(raw_features)
+    target = np.log(laptop_df["Price"].to_numpy())
+
+    preprocessor = Pipeline(steps = [('mean_encoding' , MeanEncoder()) , ('scaling' , StandardScaler())])
+    transformed = preprocessor.fit_transform(features , target)
+    return feature_engineer , preprocessor , features , transformed , target
+
+
+def make_estimator(fitted_components , trained_model_object , compile_tree_ensemble: bool = True):
+    """LaptopPriceEstimator of a model fitted on the transformed csv."""
+    from laptopPrice.entity.estimator import LaptopPriceEstimator
+
+    feature_engineer , preprocessor , _ , transformed , target = fitted_components
+    trained_model_object.fit(transformed , target)
+    estimator = LaptopPriceEstimator(
+        feature_engineering_object = feature_engineer,
+        preprocessing_object = preprocessor,
+        trained_model_object = trained_model_object
+    )
+    if compile_tree_ensemble:
+        estimator.compile_tree_ensemble(validation_array = transformed)
+    estimator.compile_inference_plan()
+    return estimator
+
+
+@pytest.fixture(scope = "session")
+def forest_estimator(fitted_components):
+    from sklearn.ensemble import RandomForestRegressor
+    return make_estimator(fitted_components , RandomForestRegressor(n_estimators = 10 , max_depth = 8 , random_state = 42))
+
+
+@pytest.fixture
+def mongo_collection(monkeypatch):
+    """Empty in-memory collection served to LaptopData by MongoDbClient."""
+    mongomock = pytest.importorskip("mongomock")
+    from laptopPrice.configuration.mongo_connection import MongoDbClient
+    from laptopPrice.constants import DATABASE_NAME , COLLECTION_NAME
+
+    client = mongomock.MongoClient()
+
+    def connect(self , *args , **kwargs):
+        self.client = client
+        self.database = client[DATABASE_NAME]
+
+    monkeypatch.setattr(MongoDbClient , "__init__" , connect)
+    return client[DATABASE_NAME][COLLECTION_NAME]
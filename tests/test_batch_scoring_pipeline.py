@@ -0,0 +1,75 @@
+import dill
+import numpy as np
+import pandas as pd
+import pytest
+
+from laptopPrice.entity.config_entity import BatchScoringConfig
+from laptopPrice.exception import LaptopException
+from laptopPrice.pipeline.batch_scoring_pipeline import BatchScoringPipeline
+from laptopPrice.pipeline.model_registry import ModelRegistry
+from laptopPrice.utils.common_utils import read_dataframe
+
+
+@pytest.fixture
+def model_file_path(tmp_path , forest_estimator):
+    model_file_path = str(tmp_path / "estimator.pkl")
+    with open(model_file_path , "wb") as model_file:
+        dill.dump(forest_estimator , model_file)
+    yield model_file_path
+    ModelRegistry(model_file_path = model_file_path).clear()
+
+
+@pytest.fixture
+def listings(laptop_df) -> pd.DataFrame:
+    # shuffled listings with an id column which is only copied to the output
+    listings = laptop_df.drop(columns = ["Price"]).sample(frac = 1 , random_state = 42).reset_index(drop = True)
+    listings.insert(0 , "listing_id" , [f"listing-{i}" for i in range(len(listings))])
+    return listings
+
+
+@pytest.mark.parametrize("n_workers" , [1 , 2])
+@pytest.mark.parametrize("input_extension" , ["csv" , "parquet"])
+def test_scored_file_keeps_row_order_and_matches_estimator(tmp_path , model_file_path , forest_estimator , listings ,
+                                                           n_workers , input_extension):
+    input_file_path = str(tmp_path / f"listings.{input_extension}")
+    if input_extension == "csv":
+        listings.to_csv(input_file_path , index = False)
+    else:
+        listings.to_parquet(input_file_path , index = False)
+    output_file_path = str(tmp_path / "scored.parquet")
+
+    batch_scoring_artifact = BatchScoringPipeline(
+        batch_scoring_config = BatchScoringConfig(
+            input_file_path = input_file_path,
+            output_file_path = output_file_path,
+            model_file_path = model_file_path,
+            chunk_size = 97,
+            n_workers = n_workers,
+            max_pending_chunks_per_worker = 2
+        )
+    ).initiate_batch_scoring()
+
+    scored = read_dataframe(output_file_path)
+    assert batch_scoring_artifact.n_rows == len(listings)
+    assert batch_scoring_artifact.n_chunks == int(np.ceil(len(listings) / 97))
+    assert scored["listing_id"].tolist() == listings["listing_id"].tolist()
+
+    log_prices = forest_estimator.predict_dataframe(listings.drop(columns = ["listing_id"]) , acutal_price = False)
+    expected = np.round(np.exp(np.asarray(log_prices , dtype = np.float64)) , 2)
+    np.testing.assert_allclose(scored[BatchScoringConfig.prediction_column].to_numpy() , expected)
+
+
+def test_missing_feature_column_raises(tmp_path , model_file_path , listings):
+    input_file_path = str(tmp_path / "listings.csv")
+    listings.drop(columns = ["Ram"]).to_csv(input_file_path , index = False)
+
+    batch_scoring_pipeline = BatchScoringPipeline(
+        batch_scoring_config = BatchScoringConfig(
+            input_file_path = input_file_path,
+            output_file_path = str(tmp_path / "scored.csv"),
+            model_file_path = model_file_path,
+            n_workers = 1
+        )
+    )
+    with pytest.raises(LaptopException , match = "Ram"):
+        batch_scoring_pipeline.initiate_batch_scoring()
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from laptopPrice.configuration.schema_config import get_schema_config
+from laptopPrice.data_access import LaptopData
+from laptopPrice.exception import LaptopException
+from laptopPrice.utils.common_utils import DataFrameFileWriter , read_dataframe
+
+
+def write_chunks(file_path , chunks , dtypes = None) -> int:
+    with DataFrameFileWriter(file_path = str(file_path) , dtypes = dtypes) as writer:
+        for chunk in chunks:
+            writer.write(chunk)
+    return writer.n_rows
+
+
+@pytest.mark.parametrize("file_format" , ["csv" , "parquet" , "feather"])
+def test_writer_keeps_dtypes_across_chunks(tmp_path , file_format):
+    chunks = [
+        pd.DataFrame({"Unnamed: 0" : [0 , 1] , "Ram" : [np.nan , np.nan] , "Inches" : [13 , 15]}),
+        pd.DataFrame({"Unnamed: 0" : [2.0 , np.nan] , "Ram" : ["8GB" , 16] , "Inches" : [15.6 , np.nan]}),
+    ]
+    file_path = tmp_path / f"laptop.{file_format}"
+    assert write_chunks(file_path , chunks , dtypes = {"Unnamed: 0" : "int64" , "Ram" : "str" , "Inches" : "float64"}) == 4
+
+    df = read_dataframe(str(file_path))
+    assert df["Ram"].tolist()[2:] == ["8GB" , "16"]
+    assert df["Inches"].tolist()[:3] == [13.0 , 15.0 , 15.6]
+    if file_format != "csv":
+        assert df["Unnamed: 0"].tolist()[:3] == [0 , 1 , 2]
+
+
+@pytest.mark.parametrize("file_format" , ["parquet" , "feather"])
+def test_writer_casts_columns_without_dtype_into_first_chunk_type(tmp_path , file_format):
+    chunks = [
+        pd.DataFrame({"Weight" : [np.nan , np.nan] , "Inches" : [13.3 , 15.6]}),
+        pd.DataFrame({"Weight" : ["1.37kg" , np.nan] , "Inches" : [14 , 17]}),
+    ]
+    file_path = tmp_path / f"laptop.{file_format}"
+    write_chunks(file_path , chunks)
+
+    df = read_dataframe(str(file_path))
+    assert df["Weight"].tolist()[2] == "1.37kg"
+    assert df["Inches"].tolist() == [13.3 , 15.6 , 14.0 , 17.0]
+
+
+@pytest.mark.parametrize("file_format" , ["csv" , "parquet" , "feather"])
+def test_writer_fails_on_a_new_column(tmp_path , file_format):
+    chunks = [pd.DataFrame({"Company" : ["HP"]}) , pd.DataFrame({"Company" : ["Dell"] , "Touchscreen" : ["Yes"]})]
+    with pytest.raises(LaptopException , match = "Touchscreen"):
+        write_chunks(tmp_path / f"laptop.{file_format}" , chunks)
+
+
+def test_writer_fills_missing_columns(tmp_path):
+    chunks = [pd.DataFrame({"Company" : ["HP"] , "Inches" : [15.6]}) , pd.DataFrame({"Company" : ["Dell"]})]
+    file_path = tmp_path / "laptop.parquet"
+    write_chunks(file_path , chunks)
+    assert read_dataframe(str(file_path))["Inches"].isna().tolist() == [False , True]
+
+
+@pytest.mark.parametrize("file_format" , ["csv" , "parquet"])
+def test_streaming_export_matches_full_export(tmp_path , mongo_collection , laptop_df , file_format):
+    records = laptop_df.to_dict("records")
+    # late rows with missing values and a number instead of a string
+    records[1000]["Weight"] = "na"
+    records[1100]["Ram"] = 8
+    mongo_collection.insert_many(records)
+
+    file_path = tmp_path / f"laptop.{file_format}"
+    n_rows = LaptopData().export_collection_to_file(
+        collection_name = mongo_collection.name , file_path = str(file_path) , batch_size = 100 , chunk_size = 250 ,
+        dtypes = get_schema_config().dtypes
+    )
+    assert n_rows == len(laptop_df)
+
+    expected = LaptopData().export_collection_data_as_dataframe(collection_name = mongo_collection.name)
+    expected["Ram"] = expected["Ram"].astype(str)
+    df = read_dataframe(str(file_path))
+    pd.testing.assert_frame_equal(df.where(df.notna() , np.nan) , expected , check_dtype = False)
@@ -0,0 +1,76 @@
+from datetime import datetime , timedelta
+
+import pytest
+
+from laptopPrice.components.data_ingestion import DataIngestion
+from laptopPrice.entity.config_entity import DataIngestionConfig
+from laptopPrice.exception import LaptopException
+from laptopPrice.utils.common_utils import read_dataframe
+
+UPDATED_AT = datetime(2025 , 1 , 1)
+
+
+@pytest.fixture
+def data_ingestion_config(tmp_path , mongo_collection) -> DataIngestionConfig:
+    return DataIngestionConfig(
+        data_ingestion_dir = str(tmp_path),
+        file_format = "parquet",
+        feature_store_file_path = str(tmp_path / "feature_store" / "laptop.parquet"),
+        training_file_path = str(tmp_path / "ingested" / "train.parquet"),
+        testing_file_path = str(tmp_path / "ingested" / "test.parquet"),
+        validation_file_path = str(tmp_path / "ingested" / "validation.parquet"),
+        collection_name = mongo_collection.name,
+        incremental_export = True,
+        incremental_store_dir = str(tmp_path / "store"),
+        watermark_field = "updated_at",
+        watermark_lag_seconds = 60,
+        export_chunk_size = 40,
+    )
+
+
+def insert(mongo_collection , records: list , updated_at: datetime) -> None:
+    mongo_collection.insert_many([{**record , "updated_at" : updated_at} for record in records])
+
+
+def test_incremental_export_pulls_new_changed_and_late_documents(data_ingestion_config , mongo_collection , laptop_df):
+    records = laptop_df.to_dict("records")
+    insert(mongo_collection , records[:100] , UPDATED_AT)
+    data_ingestion = DataIngestion(data_ingestion_config)
+    assert len(data_ingestion.export_data_into_feature_store()) == 100
+
+    # a changed document , new documents and a late write with an update time before the watermark
+    changed_id = mongo_collection.find_one({"Unnamed: 0" : 5})["_id"]
+    mongo_collection.update_one({"_id" : changed_id} , {"$set" : {"Price" : 1.0 , "updated_at" : UPDATED_AT + timedelta(hours = 1)}})
+    insert(mongo_collection , records[100:110] , UPDATED_AT + timedelta(hours = 1))
+    insert(mongo_collection , records[110:111] , UPDATED_AT - timedelta(seconds = 30))
+
+    dataframe = DataIngestion(data_ingestion_config).export_data_into_feature_store()
+    assert len(dataframe) == 111
+    assert dataframe["_id"].is_unique
+    assert dataframe.loc[dataframe["_id"] == str(changed_id) , "Price"].tolist() == [1.0]
+
+    # nothing new , the watermark stays at the last update
+    assert len(DataIngestion(data_ingestion_config).export_data_into_feature_store()) == 111
+
+
+def test_split_by_document_id_is_stable(data_ingestion_config , mongo_collection , laptop_df):
+    records = laptop_df.to_dict("records")
+    insert(mongo_collection , records[:600] , UPDATED_AT)
+
+    def test_rows() -> set:
+        DataIngestion(data_ingestion_config).initiate_data_ingestion()
+        return set(read_dataframe(data_ingestion_config.testing_file_path)["Unnamed: 0"])
+
+    first_test_rows = test_rows()
+    insert(mongo_collection , records[600:] , UPDATED_AT + timedelta(hours = 1))
+    second_test_rows = test_rows()
+
+    assert first_test_rows and first_test_rows <= second_test_rows
+    train = read_dataframe(data_ingestion_config.training_file_path)
+    assert not {"_id" , "updated_at"} & set(train.columns)
+
+
+def test_incremental_export_needs_an_update_time_watermark(data_ingestion_config):
+    data_ingestion_config.watermark_field = "_id"
+    with pytest.raises(LaptopException , match = "update time"):
+        DataIngestion(data_ingestion_config).export_data_into_feature_store()
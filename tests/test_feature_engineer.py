@@ -0,0 +1,100 @@
+import dill
+import pandas as pd
+import pytest
+
+from laptopPrice.feature_engineering.feature_engineer import FeatureEngineer , PYTHON_ENGINE , VECTORIZED_ENGINE
+
+# raw strings the notebook data has few or none of
+EDGE_CASE_ROWS = {
+    "Memory" : [
+        "1TB HDD" , "256GB SSD +  1TB HDD" , "1.0TB Hybrid" , "512GB SSD +  512GB SSD" , "64GB Flash Storage" ,
+        "2TB HDD" , "128GB SSD +  2TB HDD" , "1TB SSD +  1TB HDD" , "32GB Flash Storage" , "508GB Hybrid"
+    ],
+    "Cpu" : [
+        "Intel Core i7 7700HQ 2.8GHz" , "AMD A9-Series 9420 3GHz" , "Intel Celeron Dual Core N3350 1.1GHz" ,
+        "Intel Core M m3 1.2GHz" , "Samsung Cortex A72&A53 2.0GHz" , "Intel Core i3 6006U 2GHz" ,
+        "Intel Atom x5-Z8350 1.44GHz" , "AMD Ryzen 1700 3GHz" , "Intel Xeon E3-1505M V6 3GHz" , "Intel Core i5 7200U 2.5GHz"
+    ],
+    "Gpu" : [
+        "Nvidia GeForce GTX 1050" , "AMD Radeon 530" , "Intel HD Graphics 620" , "ARM Mali T860 MP4" , "Nvidia Quadro M1200" ,
+        "AMD FirePro W4190M" , "Intel Iris Plus Graphics 640" , "Nvidia GeForce MX150" , "AMD R4 Graphics" , "Intel UHD Graphics 620"
+    ],
+    "OpSys" : [
+        "Windows 10" , "No OS" , "Linux" , "Mac OS X" , "macOS" , "Windows 7" , "Chrome OS" , "Android" , "Windows 10 S" , "windows 10"
+    ],
+    "ScreenResolution" : [
+        "IPS Panel Full HD / Touchscreen 1920x1080" , "1366x768" , "Touchscreen 2256x1504" , "4K Ultra HD 3840x2160" ,
+        "IPS Panel Retina Display 2880x1800" , "Full HD 1920x1080" , "IPS Panel 4K Ultra HD / Touchscreen 3840x2160" ,
+        "1440x900" , "Touchscreen / Quad HD+ 3200x1800" , "IPS Panel Quad HD+ 2560x1440"
+    ],
+}
+
+
+def transform(raw_df: pd.DataFrame , engine: str , fit_df: pd.DataFrame = None) -> pd.DataFrame:
+    feature_engineer = FeatureEngineer(engine = engine)
+    if fit_df is not None:
+        feature_engineer.fit(fit_df)
+    return feature_engineer.transform(raw_df)
+
+
+def assert_same_output(raw_df: pd.DataFrame , fit_df: pd.DataFrame = None) -> None:
+    expected = transform(raw_df , engine = PYTHON_ENGINE)
+    actual = transform(raw_df , engine = VECTORIZED_ENGINE , fit_df = fit_df)
+    pd.testing.assert_frame_equal(actual , expected)
+
+
+def test_vectorized_engine_matches_python_engine(raw_features):
+    assert_same_output(raw_features)
+
+
+def test_vectorized_engine_matches_python_engine_fitted(raw_features):
+    assert_same_output(raw_features , fit_df = raw_features)
+
+
+@pytest.mark.parametrize("position" , [0 , 1 , 500])
+def test_single_row(raw_features , position):
+    single_row = raw_features.iloc[[position]]
+    assert_same_output(single_row)
+    assert_same_output(single_row , fit_df = raw_features)
+
+
+def test_fit_on_subset_then_transform_all_rows(raw_features):
+    # most raw strings of the other rows are unseen by the lookup tables
+    assert_same_output(raw_features , fit_df = raw_features.head(50))
+
+
+def test_edge_case_strings(raw_features):
+    edge_case_df = raw_features.head(len(EDGE_CASE_ROWS["Memory"])).copy()
+    for column , values in EDGE_CASE_ROWS.items():
+        edge_case_df[column] = values
+    assert_same_output(edge_case_df)
+    assert_same_output(edge_case_df , fit_df = raw_features)
+    assert_same_output(pd.concat([raw_features , edge_case_df] , ignore_index = True) , fit_df = raw_features.head(100))
+
+
+def test_transform_does_not_change_input(raw_features):
+    raw_df = raw_features.head(20).copy()
+    transform(raw_df , engine = VECTORIZED_ENGINE , fit_df = raw_features)
+    pd.testing.assert_frame_equal(raw_df , raw_features.head(20))
+
+
+def test_unknown_engine(raw_features):
+    with pytest.raises(ValueError):
+        transform(raw_features.head(1) , engine = "spark")
+
+
+def test_transform_does_not_change_the_fitted_lookup_tables(raw_features):
+    feature_engineer = FeatureEngineer(engine = VECTORIZED_ENGINE).fit(raw_features.head(50))
+    lookup_tables = dict(feature_engineer.lookup_tables_)
+    table_sizes = {column : len(table) for column , table in lookup_tables.items()}
+    pickled_size = len(dill.dumps(feature_engineer))
+
+    first = feature_engineer.transform(raw_features.copy())
+    assert {column : len(table) for column , table in feature_engineer.lookup_tables_.items()} == table_sizes
+    assert all(feature_engineer.lookup_tables_[column] is table for column , table in lookup_tables.items())
+    assert len(dill.dumps(feature_engineer)) == pickled_size
+
+    # the output of a batch doesn't depend on the batches transformed before
+    pd.testing.assert_frame_equal(feature_engineer.transform(raw_features.copy()) , first)
+    tail = raw_features.tail(100)
+    pd.testing.assert_frame_equal(feature_engineer.transform(tail.copy()) , first.tail(100))
@@ -0,0 +1,38 @@
+import os
+import subprocess
+import sys
+
+import pytest
+
+from tests.conftest import PROJECT_DIR
+
+# logs 6 INFO records and 1 WARNING of the "demo" logger into the file handler(moved to a tmp file) and stderr
+LOGGING_SCRIPT = """
+import logging
+import sys
+from laptopPrice import logger
+
+logger.file_handler.baseFilename = sys.argv[1]
+demo_logger = logger.get_logger("demo")
+for index in range(6):
+    demo_logger.info("record %s" , index)
+demo_logger.warning("warning record")
+"""
+
+
+@pytest.mark.parametrize("async_enabled" , ["false" , "true"])
+def test_every_output_keeps_the_sampled_fraction(tmp_path , async_enabled):
+    log_file_path = str(tmp_path / "sampled.log")
+    env = {**os.environ , "LOGGING_SAMPLE_RATES" : "demo=0.5" , "LOGGING_ASYNC_ENABLED" : async_enabled , "LOGGING_LEVEL" : "INFO"}
+    completed = subprocess.run(
+        [sys.executable , "-c" , LOGGING_SCRIPT , log_file_path] ,
+        cwd = PROJECT_DIR , env = env , capture_output = True , text = True , check = True
+    )
+    with open(log_file_path) as log_file:
+        file_lines = [line for line in log_file.read().splitlines() if " demo - " in line]
+    console_lines = [line for line in completed.stderr.splitlines() if " demo - " in line]
+
+    # every second INFO record is kept, warnings are never sampled
+    expected = ["record 0" , "record 2" , "record 4" , "warning record"]
+    assert [line.split(" - ")[-1] for line in file_lines] == expected
+    assert [line.split(" - ")[-1] for line in console_lines] == expected
@@ -0,0 +1,71 @@
+from concurrent.futures import ThreadPoolExecutor
+
+import dill
+import pytest
+
+from laptopPrice.entity.config_entity import LaptopPricePredictionConfig , MicroBatchConfig
+from laptopPrice.exception import LaptopException
+from laptopPrice.pipeline.micro_batcher import MicroBatcher
+from laptopPrice.pipeline.model_registry import ModelRegistry
+from laptopPrice.pipeline.prediction_pipeline import CustomData , PredictPipeline
+
+
+@pytest.fixture
+def prediction_config(tmp_path , forest_estimator):
+    model_file_path = str(tmp_path / "estimator.pkl")
+    with open(model_file_path , "wb") as model_file:
+        dill.dump(forest_estimator , model_file)
+    yield LaptopPricePredictionConfig(model_file_path = model_file_path , shared_model_dir = None)
+    ModelRegistry(model_file_path = model_file_path).clear()
+
+
+@pytest.fixture
+def records(fitted_components) -> list:
+    """Feature engineered rows, like the ones the form posts to the app."""
+    features = fitted_components[2]
+    return features.head(6).to_dict("records")
+
+
+def predict_concurrently(micro_batcher: MicroBatcher , records: list) -> list:
+    def predict(record):
+        try:
+            return micro_batcher.predict(CustomData(data_dict = record))
+        except LaptopException as e:
+            return e
+
+    with ThreadPoolExecutor(max_workers = len(records)) as executor:
+        return list(executor.map(predict , records))
+
+
+def micro_batcher_of(prediction_config) -> MicroBatcher:
+    micro_batch_config = MicroBatchConfig(enabled = True , max_batch_size = 8 , max_wait_ms = 200 , request_timeout_seconds = 30)
+    return MicroBatcher(micro_batch_config = micro_batch_config , prediction_config = prediction_config)
+
+
+def test_batched_predictions_match_single_predictions(prediction_config , records):
+    predict_pipeline = PredictPipeline(prediction_config = prediction_config)
+    expected = [predict_pipeline.predict(CustomData(data_dict = record)) for record in records]
+
+    results = predict_concurrently(micro_batcher_of(prediction_config) , records)
+    assert [result["prediction"] for result in results] == pytest.approx([result["prediction"] for result in expected])
+
+
+def test_bad_record_fails_only_its_own_request(prediction_config , records , monkeypatch):
+    batch_sizes = []
+    predict_batch = PredictPipeline.predict_batch
+
+    def spy_predict_batch(self , custom_data_batch):
+        batch_sizes.append(len(custom_data_batch.records))
+        return predict_batch(self , custom_data_batch)
+
+    monkeypatch.setattr(PredictPipeline , "predict_batch" , spy_predict_batch)
+    bad_record = {**records[2] , "Ram" : "lots"}
+    results = predict_concurrently(micro_batcher_of(prediction_config) , records[:2] + [bad_record] + records[3:])
+
+    # the bad record failed a shared batch, the others were predicted one by one after it
+    assert max(batch_sizes) > 1
+    assert isinstance(results[2] , LaptopException)
+    predict_pipeline = PredictPipeline(prediction_config = prediction_config)
+    for position in (0 , 1 , 3 , 4 , 5):
+        expected = predict_pipeline.predict(CustomData(data_dict = records[position]))["prediction"]
+        assert results[position]["prediction"] == pytest.approx(expected)
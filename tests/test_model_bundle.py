@@ -0,0 +1,89 @@
+import os
+
+import dill
+import numpy as np
+import pytest
+
+from laptopPrice.entity.model_bundle import (
+    MODEL_BUNDLE_MANIFEST_FILE_NAME , get_model_path , is_model_bundle , load_model_bundle , save_model_bundle
+)
+from laptopPrice.exception import LaptopException
+from laptopPrice.pipeline.model_registry import ModelRegistry
+from tests.conftest import make_estimator
+from tests.test_tree_ensemble import MODELS
+
+TOLERANCE = 1e-6
+
+
+@pytest.fixture(scope = "module" , params = list(MODELS))
+def estimator(request , fitted_components):
+    module_name , class_name , params = MODELS[request.param]
+    model_class = getattr(pytest.importorskip(module_name) , class_name)
+    return make_estimator(fitted_components , model_class(**params))
+
+
+def test_bundle_round_trip(tmp_path , estimator , fitted_components , raw_features):
+    _ , _ , features , transformed , _ = fitted_components
+    dir_path = str(tmp_path / "estimator")
+    manifest = save_model_bundle(dir_path = dir_path , estimator = estimator)
+    assert is_model_bundle(dir_path)
+    assert set(manifest["files"]) == {
+        os.path.relpath(os.path.join(root , file_name) , dir_path)
+        for root , _ , file_names in os.walk(dir_path) for file_name in file_names
+    } - {MODEL_BUNDLE_MANIFEST_FILE_NAME}
+
+    loaded = load_model_bundle(dir_path , verify = True)
+    np.testing.assert_allclose(
+        loaded.predict_dataframe(raw_features , acutal_price = False) ,
+        estimator.predict_dataframe(raw_features , acutal_price = False) , rtol = 0 , atol = TOLERANCE
+    )
+    for record in features.head(5).to_dict("records"):
+        assert loaded.predict_record(record) == pytest.approx(estimator.predict_record(record) , abs = TOLERANCE)
+    # the library model is loaded from its own file on the first use
+    np.testing.assert_allclose(
+        loaded.trained_model_object.predict(transformed) , estimator.trained_model_object.predict(transformed) ,
+        rtol = 0 , atol = TOLERANCE
+    )
+
+
+def test_changed_bundle_file_raises(tmp_path , forest_estimator):
+    dir_path = str(tmp_path / "estimator")
+    manifest = save_model_bundle(dir_path = dir_path , estimator = forest_estimator)
+    relative_path = next(iter(manifest["files"]))
+    with open(os.path.join(dir_path , relative_path) , "r+b") as file_obj:
+        file_obj.seek(-1 , os.SEEK_END)
+        last_byte = file_obj.read(1)
+        file_obj.seek(-1 , os.SEEK_END)
+        file_obj.write(bytes([last_byte[0] ^ 0xFF]))
+
+    with pytest.raises(LaptopException , match = "changed after saving"):
+        load_model_bundle(dir_path , verify = True)
+
+
+def test_registry_serves_pickle_until_bundle_is_pushed(tmp_path , forest_estimator , raw_features):
+    dir_path = str(tmp_path / "estimator")
+    with open(f"{dir_path}.pkl" , "wb") as model_file:
+        dill.dump(forest_estimator , model_file)
+    assert get_model_path(dir_path) == f"{dir_path}.pkl"
+
+    model_registry = ModelRegistry(model_file_path = dir_path)
+    try:
+        pickle_model , pickle_version = model_registry.get_model_with_version()
+        assert not is_model_bundle(dir_path)
+
+        save_model_bundle(dir_path = dir_path , estimator = forest_estimator)
+        assert get_model_path(dir_path) == dir_path
+        bundle_model , bundle_version = model_registry.get_model_with_version()
+        assert bundle_version != pickle_version and bundle_model is not pickle_model
+        np.testing.assert_allclose(
+            bundle_model.predict_dataframe(raw_features) , pickle_model.predict_dataframe(raw_features) , rtol = 1e-9
+        )
+    finally:
+        model_registry.clear()
+
+
+def test_missing_model_raises(tmp_path):
+    dir_path = str(tmp_path / "estimator")
+    assert get_model_path(dir_path) == dir_path
+    with pytest.raises(LaptopException , match = "not found"):
+        ModelRegistry(model_file_path = dir_path).get_model()
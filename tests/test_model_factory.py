@@ -0,0 +1,127 @@
+import numpy as np
+import pytest
+import yaml
+
+from laptopPrice.utils.model_factory import ModelFactory
+
+MODEL_CONFIG = {
+    "search_strategy" : "random_search",
+    "random_search" : {
+        "class" : "RandomizedSearchCV",
+        "module" : "sklearn.model_selection",
+        "params" : {"cv" : 2 , "n_iter" : 2 , "random_state" : 42},
+    },
+    "parallel_search" : {"enabled" : True , "cpu_budget" : 8 , "max_parallel_models" : 2},
+    "model_selection" : {
+        "RandomForest" : {
+            "module" : "sklearn.ensemble",
+            "class" : "RandomForestRegressor",
+            "params" : {"random_state" : 42},
+            "search_param_distributions" : {"n_estimators" : [5 , 10] , "max_depth" : [4 , 6]},
+        },
+        "ExtraTrees" : {
+            "module" : "sklearn.ensemble",
+            "class" : "ExtraTreesRegressor",
+            "params" : {"random_state" : 42},
+            "search_param_distributions" : {"n_estimators" : [5 , 10] , "max_depth" : [4 , 6]},
+        },
+    },
+}
+
+
+@pytest.fixture
+def model_factory(tmp_path):
+    def make(model_config = MODEL_CONFIG):
+        model_config_path = tmp_path / "params.yaml"
+        model_config_path.write_text(yaml.safe_dump(model_config , sort_keys = False))
+        return ModelFactory(model_config_path = str(model_config_path) , tuned_model_report_path = str(tmp_path / "report.yaml"))
+    return make
+
+
+def split(fitted_components):
+    _ , _ , _ , transformed , target = fitted_components
+    return transformed[:1000] , target[:1000] , transformed[1000:] , target[1000:]
+
+
+def test_parallel_search_splits_the_cpu_budget(model_factory , fitted_components , monkeypatch):
+    factory = model_factory()
+    calls = []
+    tune_and_evaluate_model = factory.tune_and_evaluate_model
+
+    def record(**kwargs):
+        calls.append({key : kwargs[key] for key in ("search_n_jobs" , "estimator_threads" , "search_backend")})
+        return tune_and_evaluate_model(**kwargs)
+
+    monkeypatch.setattr(factory , "tune_and_evaluate_model" , record)
+    report = factory.run_model_factory(*split(fitted_components))
+
+    assert list(report) == ["RandomForestRegressor" , "ExtraTreesRegressor"]
+    # 8 cores for 2 searches: 4 cores per search , 2 candidates x 2 folds = 4 cv fits with 1 thread each
+    assert calls == [{"search_n_jobs" : 4 , "estimator_threads" : 1 , "search_backend" : "threading"}] * 2
+
+
+def test_parallel_search_gives_spare_cores_to_the_estimator(model_factory , fitted_components , monkeypatch):
+    model_config = {**MODEL_CONFIG , "parallel_search" : {"enabled" : True , "cpu_budget" : 16 , "max_parallel_models" : 2}}
+    factory = model_factory(model_config)
+    calls = []
+    monkeypatch.setattr(factory , "tune_and_evaluate_model" , lambda **kwargs: calls.append(kwargs) or (kwargs["model_info"]["class"] , {}))
+    factory.run_model_factory(*split(fitted_components))
+
+    # 8 cores per search but only 4 cv fits: 2 estimator threads per fit
+    assert [(call["search_n_jobs"] , call["estimator_threads"]) for call in calls] == [(4 , 2)] * 2
+
+
+def test_parallel_and_sequential_search_give_the_same_report(model_factory , fitted_components):
+    parallel_report = model_factory().run_model_factory(*split(fitted_components))
+    sequential_config = {**MODEL_CONFIG , "parallel_search" : {"enabled" : False}}
+    sequential_report = model_factory(sequential_config).run_model_factory(*split(fitted_components))
+
+    for model_name , model_report in sequential_report.items():
+        assert parallel_report[model_name]["best_params"] == model_report["best_params"]
+        assert parallel_report[model_name]["test_metrics"] == pytest.approx(model_report["test_metrics"])
+
+
+def test_search_config_keys(model_factory):
+    factory = model_factory()
+    factory.read_model_config()
+    assert factory.get_search_config()[0] == "RandomizedSearchCV"
+    assert factory.get_search_space(factory.model_config["model_selection"]["RandomForest"]) == {"n_estimators" : [5 , 10] , "max_depth" : [4 , 6]}
+
+    # configs written for the old keys
+    old_config = {key : value for key , value in MODEL_CONFIG.items() if key not in ("search_strategy" , "random_search")}
+    old_config["grid_search"] = {"class" : "GridSearchCV" , "module" : "sklearn.model_selection" , "params" : {"cv" : 2}}
+    factory = model_factory(old_config)
+    factory.read_model_config()
+    assert factory.get_search_config()[0] == "GridSearchCV"
+    assert factory.get_search_space({"search_param_grid" : {"max_depth" : [4]}}) == {"max_depth" : [4]}
+
+
+@pytest.mark.parametrize("model_info" , [
+    {"module" : "sklearn.ensemble" , "class" : "GradientBoostingRegressor" , "budget_param" : "n_estimators" , "early_stopping" : "sklearn" ,
+     "params" : {"random_state" : 42} , "search_param_distributions" : {"n_estimators" : [300] , "learning_rate" : [0.2 , 0.3]}},
+    {"module" : "lightgbm" , "class" : "LGBMRegressor" , "budget_param" : "n_estimators" , "early_stopping" : "lightgbm" ,
+     "params" : {"random_state" : 42 , "verbose" : -1} , "search_param_distributions" : {"n_estimators" : [300] , "learning_rate" : [0.2 , 0.3]}},
+])
+def test_early_stopped_model_is_refitted_on_full_train_data(model_factory , fitted_components , model_info):
+    pytest.importorskip(model_info["module"])
+    model_config = {
+        **MODEL_CONFIG,
+        "parallel_search" : {"enabled" : False},
+        "early_stopping" : {"enabled" : True , "rounds" : 5 , "holdout_fraction" : 0.2 , "random_state" : 42},
+        "model_selection" : {"Model" : model_info},
+    }
+    factory = model_factory(model_config)
+    X_train , y_train , X_test , y_test = split(fitted_components)
+    model_report = factory.run_model_factory(X_train , y_train , X_test , y_test)[model_info["class"]]
+
+    # best_params keep the searched budget , the used iterations are reported apart
+    used_iterations = model_report["search_resources"]["best_model_iterations"]
+    assert model_report["best_params"]["n_estimators"] == 300
+    assert model_report["refit_params"] == {"n_estimators" : used_iterations}
+    assert used_iterations < 300
+
+    # the model of the report is the same as the recreated one fitted on all the train rows
+    best_model_detail = factory.get_best_model()
+    factory.model_store = None
+    recreated = factory.get_best_model().best_model.fit(X_train , y_train)
+    np.testing.assert_allclose(best_model_detail.best_model.predict(X_test) , recreated.predict(X_test))
@@ -0,0 +1,123 @@
+import os
+import threading
+
+import dill
+import numpy as np
+
+from laptopPrice.pipeline.model_registry import ModelRegistry
+from laptopPrice.utils.common_utils import get_file_hash
+from laptopPrice.utils.shared_model import load_shared_manifest
+
+
+class VersionedModel:
+    def __init__(self , name: str):
+        self.name = name
+
+
+def save_model(file_path , name: str , versions: dict = None , model: object = None) -> str:
+    # written next to the model file and renamed into place, as a push replaces the production model
+    temp_file_path = f"{file_path}.tmp"
+    with open(temp_file_path , "wb") as file_obj:
+        dill.dump(VersionedModel(name) if model is None else model , file_obj)
+    version = get_file_hash(temp_file_path)
+    if versions is not None:
+        versions[name] = version
+    os.replace(temp_file_path , file_path)
+    return version
+
+
+def test_reload_returns_new_model_with_its_version(tmp_path):
+    model_file_path = tmp_path / "estimator.pkl"
+    first_version = save_model(model_file_path , "first")
+    model_registry = ModelRegistry(model_file_path = str(model_file_path))
+    try:
+        model , version = model_registry.get_model_with_version()
+        assert (model.name , version) == ("first" , first_version)
+        assert model_registry.get_model() is model
+
+        second_version = save_model(model_file_path , "second-model")
+        model , version = model_registry.get_model_with_version()
+        assert (model.name , version) == ("second-model" , second_version)
+        assert model_registry.get_stats()["reloads"] == 1
+    finally:
+        model_registry.clear()
+
+
+def test_model_and_version_stay_paired_during_reloads(tmp_path):
+    model_file_path = tmp_path / "estimator.pkl"
+    versions = {"model-0" : save_model(model_file_path , "model-0")}
+    model_registry = ModelRegistry(model_file_path = str(model_file_path))
+    mismatches = []
+    stop = threading.Event()
+
+    def read_pairs():
+        while not stop.is_set():
+            model , version = model_registry.get_model_with_version()
+            if versions.get(model.name) != version:
+                mismatches.append((model.name , version))
+
+    readers = [threading.Thread(target = read_pairs) for _ in range(4)]
+    try:
+        for reader in readers:
+            reader.start()
+        for index in range(1 , 30):
+            name = f"model-{index}" + "x" * index # a different size, so every write changes the signature
+            save_model(model_file_path , name , versions = versions)
+    finally:
+        stop.set()
+        for reader in readers:
+            reader.join()
+        model_registry.clear()
+    assert mismatches == []
+
+
+def test_shared_model_is_memory_mapped_and_saved_once(tmp_path , forest_estimator , raw_features):
+    model_file_path = tmp_path / "estimator.pkl"
+    shared_model_dir = tmp_path / "shared"
+    version = save_model(model_file_path , "forest" , model = forest_estimator)
+    model_registry = ModelRegistry(model_file_path = str(model_file_path) , shared_model_dir = str(shared_model_dir))
+    try:
+        model = model_registry.get_model()
+        assert os.listdir(shared_model_dir) == [version[:16]]
+        version_dir_path = shared_model_dir / version[:16]
+        manifest = load_shared_manifest(str(version_dir_path))
+        assert manifest["model_version"] == version and manifest["files"]
+
+        # the node arrays of the compiled trees are read only maps of the version directory files
+        assert not model.tree_ensemble.threshold.flags.writeable
+        np.testing.assert_allclose(
+            model.predict_dataframe(raw_features , acutal_price = False) ,
+            forest_estimator.predict_dataframe(raw_features , acutal_price = False)
+        )
+
+        # another worker maps the saved directory instead of saving it again
+        manifest_mtime_ns = os.stat(version_dir_path / "manifest.json").st_mtime_ns
+        model_registry.clear()
+        model_registry.get_model()
+        assert os.stat(version_dir_path / "manifest.json").st_mtime_ns == manifest_mtime_ns
+    finally:
+        model_registry.clear()
+
+
+def test_shared_model_keeps_directories_of_newer_versions(tmp_path):
+    model_file_path = tmp_path / "estimator.pkl"
+    shared_model_dir = tmp_path / "shared"
+    model_registry = ModelRegistry(model_file_path = str(model_file_path) , shared_model_dir = str(shared_model_dir))
+    try:
+        new_version = save_model(model_file_path , "new-model")
+        model_registry.get_model()
+
+        # a worker which still reads the file pushed before(an older mtime) doesn't remove the newer version
+        old_version = save_model(model_file_path , "old")
+        os.utime(model_file_path , ns = (1_000_000_000 , 1_000_000_000))
+        model_registry.clear()
+        assert model_registry.get_model().name == "old"
+        assert sorted(os.listdir(shared_model_dir)) == sorted([new_version[:16] , old_version[:16]])
+
+        # the newer version removes the older one
+        save_model(model_file_path , "new-model")
+        model_registry.clear()
+        assert model_registry.get_model().name == "new-model"
+        assert os.listdir(shared_model_dir) == [new_version[:16]]
+    finally:
+        model_registry.clear()
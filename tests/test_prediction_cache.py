@@ -0,0 +1,117 @@
+import os
+
+import dill
+import pytest
+
+from laptopPrice.entity.config_entity import LaptopPricePredictionConfig , PredictionCacheConfig
+from laptopPrice.pipeline import prediction_cache as prediction_cache_module
+from laptopPrice.pipeline.model_registry import ModelRegistry
+from laptopPrice.pipeline.prediction_cache import PredictionCache , SqlitePredictionCache , get_record_key
+from laptopPrice.pipeline.prediction_pipeline import CustomData , PredictPipeline
+
+RECORD = {"Company" : "HP" , "TypeName" : "Notebook" , "Inches" : 15.6 , "Ram" : "8GB" , "Weight" : "1.86kg"}
+
+
+class FixedPriceModel:
+    def __init__(self , price: float):
+        self.price = price
+        self.n_predictions = 0
+
+    def predict_record(self , data_dict: dict) -> float:
+        self.n_predictions += 1
+        return self.price
+
+
+@pytest.fixture(params = ["memory" , "sqlite"])
+def prediction_cache(request , tmp_path) -> PredictionCache:
+    if request.param == "memory":
+        return PredictionCache(max_size = 3)
+    return SqlitePredictionCache(db_path = str(tmp_path / "predictions.sqlite3") , max_size = 3)
+
+
+def test_record_key_ignores_key_order_and_number_types():
+    reordered = {key : RECORD[key] for key in reversed(list(RECORD))}
+    assert get_record_key(reordered) == get_record_key(RECORD)
+    assert get_record_key({**RECORD , "Inches" : 15}) == get_record_key({**RECORD , "Inches" : 15.0})
+    assert get_record_key({**RECORD , "Ram" : "16GB"}) != get_record_key(RECORD)
+
+
+def test_hit_and_miss(prediction_cache):
+    assert prediction_cache.get(RECORD , "v1") is None
+    prediction_cache.put(RECORD , "v1" , 51234.5)
+    assert prediction_cache.get(dict(RECORD) , "v1") == 51234.5
+
+    stats = prediction_cache.get_stats()
+    assert (stats["hits"] , stats["misses"] , stats["size"]) == (1 , 1 , 1)
+
+
+def test_new_model_version_invalidates_the_cache(prediction_cache):
+    prediction_cache.put(RECORD , "v1" , 51234.5)
+    prediction_cache.put({**RECORD , "Ram" : "16GB"} , "v1" , 61234.5)
+
+    assert prediction_cache.get(RECORD , "v2") is None
+    stats = prediction_cache.get_stats()
+    assert (stats["invalidations"] , stats["size"] , stats["model_version"]) == (2 , 0 , "v2")
+
+    prediction_cache.put(RECORD , "v2" , 40000.0)
+    assert prediction_cache.get(RECORD , "v2") == 40000.0
+
+
+def test_least_recently_used_entry_is_evicted():
+    prediction_cache = PredictionCache(max_size = 2)
+    records = [{**RECORD , "Inches" : inches} for inches in (13.3 , 14.0 , 15.6)]
+    prediction_cache.put(records[0] , "v1" , 1.0)
+    prediction_cache.put(records[1] , "v1" , 2.0)
+    prediction_cache.get(records[0] , "v1")
+    prediction_cache.put(records[2] , "v1" , 3.0)
+
+    assert prediction_cache.get(records[1] , "v1") is None
+    assert prediction_cache.get(records[0] , "v1") == 1.0
+    assert prediction_cache.get_stats()["evictions"] == 1
+
+
+def test_expired_entry_is_dropped(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(prediction_cache_module.time , "monotonic" , lambda: now[0])
+    prediction_cache = PredictionCache(max_size = 2 , ttl_seconds = 60)
+    prediction_cache.put(RECORD , "v1" , 1.0)
+
+    now[0] += 61
+    assert prediction_cache.get(RECORD , "v1") is None
+    assert prediction_cache.get_stats()["expirations"] == 1
+
+
+def test_sqlite_cache_is_shared_by_the_workers_of_a_host(tmp_path):
+    db_path = str(tmp_path / "predictions.sqlite3")
+    SqlitePredictionCache(db_path = db_path).put(RECORD , "v1" , 51234.5)
+    assert SqlitePredictionCache(db_path = db_path).get(RECORD , "v1") == 51234.5
+
+
+def test_prediction_pipeline_does_not_serve_predictions_of_the_old_model(tmp_path):
+    model_file_path = str(tmp_path / "estimator.pkl")
+
+    def push(price: float) -> None:
+        with open(f"{model_file_path}.tmp" , "wb") as file_obj:
+            dill.dump(FixedPriceModel(price) , file_obj)
+        os.replace(f"{model_file_path}.tmp" , model_file_path)
+
+    prediction_config = LaptopPricePredictionConfig(model_file_path = model_file_path , shared_model_dir = None)
+    prediction_cache_config = PredictionCacheConfig(
+        enabled = True , backend = "sqlite" , sqlite_path = str(tmp_path / "predictions.sqlite3") , max_size = 10 , ttl_seconds = 0
+    )
+    push(50000.0)
+    try:
+        predict_pipeline = PredictPipeline(prediction_config = prediction_config , prediction_cache_config = prediction_cache_config)
+        assert predict_pipeline.predict(CustomData(RECORD)) == {"prediction" : 50000.0}
+        # cached , the model is not called again
+        assert PredictPipeline(prediction_config , prediction_cache_config).predict(CustomData(RECORD)) == {"prediction" : 50000.0}
+        assert predict_pipeline.model.n_predictions == 1
+
+        push(60000.0)
+        assert PredictPipeline(prediction_config , prediction_cache_config).predict(CustomData(RECORD)) == {"prediction" : 60000.0}
+    finally:
+        ModelRegistry(model_file_path = model_file_path).clear()
+
+
+def test_disabled_prediction_cache():
+    assert prediction_cache_module.get_prediction_cache(PredictionCacheConfig(enabled = False)) is None
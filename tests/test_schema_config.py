@@ -0,0 +1,52 @@
+import dataclasses
+import os
+import shutil
+
+import pytest
+
+from laptopPrice.configuration.schema_config import get_schema_config
+from laptopPrice.constants import SCHEMA_FILE_PATH
+from laptopPrice.exception import LaptopException
+
+
+@pytest.fixture
+def schema_file_path(tmp_path) -> str:
+    file_path = str(tmp_path / "schema.yaml")
+    shutil.copy(SCHEMA_FILE_PATH , file_path)
+    return file_path
+
+
+def test_schema_config_is_shared(schema_file_path):
+    schema_config = get_schema_config(schema_file_path)
+    assert get_schema_config(schema_file_path) is schema_config
+    assert get_schema_config(os.path.relpath(schema_file_path)) is schema_config
+    assert schema_config.drop_columns == ("Unnamed: 0" ,)
+    assert "Apple" in schema_config.allowed_values["Company"]
+    assert schema_config.dtypes["Inches"] == "float64"
+
+
+def test_schema_config_is_reloaded_when_the_file_changes(schema_file_path):
+    schema_config = get_schema_config(schema_file_path)
+    with open(schema_file_path , "a") as schema_file:
+        schema_file.write("\ndrop_columns:\n  - Weight\n")
+    os.utime(schema_file_path , ns = (0 , os.stat(schema_file_path).st_mtime_ns + 1))
+
+    reloaded = get_schema_config(schema_file_path)
+    assert reloaded is not schema_config
+    assert reloaded.drop_columns == ("Weight" ,)
+    assert schema_config.drop_columns == ("Unnamed: 0" ,)
+
+
+def test_schema_config_is_immutable(schema_file_path):
+    schema_config = get_schema_config(schema_file_path)
+    with pytest.raises(dataclasses.FrozenInstanceError):
+        schema_config.columns = ()
+    with pytest.raises(TypeError):
+        schema_config.pandera_columns["Company"]["nullable"] = True
+    with pytest.raises(AttributeError):
+        schema_config.columns.append("Touchscreen")
+
+
+def test_missing_schema_file(tmp_path):
+    with pytest.raises(LaptopException):
+        get_schema_config(str(tmp_path / "missing.yaml"))
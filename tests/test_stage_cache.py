@@ -0,0 +1,89 @@
+import os
+from dataclasses import dataclass
+
+import pytest
+
+from laptopPrice.entity.config_entity import StageCacheConfig
+from laptopPrice.pipeline.stage_cache import StageCache
+
+
+@dataclass
+class CountConfig:
+    input_file_path : str
+    output_file_path : str
+
+
+@dataclass
+class CountArtifact:
+    output_file_path : str
+
+
+class CountStage:
+    """Toy stage: counts the lines of the input file."""
+    def __init__(self , config: CountConfig):
+        self.config = config
+        self.n_runs = 0
+
+    def __call__(self) -> CountArtifact:
+        self.n_runs += 1
+        with open(self.config.input_file_path) as input_file:
+            n_lines = len(input_file.readlines())
+        os.makedirs(os.path.dirname(self.config.output_file_path) , exist_ok = True)
+        with open(self.config.output_file_path , "w") as output_file:
+            output_file.write(str(n_lines))
+        return CountArtifact(output_file_path = self.config.output_file_path)
+
+
+@pytest.fixture
+def input_file_path(tmp_path) -> str:
+    file_path = tmp_path / "input.txt"
+    file_path.write_text("a\nb\n")
+    return str(file_path)
+
+
+def run(tmp_path , run_name: str , input_file_path: str , enabled: bool = True):
+    artifact_dir = str(tmp_path / "artifacts" / run_name)
+    stage_cache = StageCache(
+        stage_cache_config = StageCacheConfig(enabled = enabled , cache_dir = str(tmp_path / "stage_cache")) , artifact_dir = artifact_dir
+    )
+    stage_dir = os.path.join(artifact_dir , "count")
+    stage = CountStage(CountConfig(input_file_path = input_file_path , output_file_path = os.path.join(stage_dir , "count.txt")))
+    artifact = stage_cache.run_stage(
+        stage_name = "count" , run_stage = stage , stage_dir = stage_dir , config = stage.config , code_module = "laptopPrice.pipeline.stage_cache"
+    )
+    return stage_cache.stage_status["count"] , stage.n_runs , artifact
+
+
+def test_unchanged_stage_is_reused(tmp_path , input_file_path):
+    assert run(tmp_path , "run_1" , input_file_path)[:2] == ("miss" , 1)
+
+    status , n_runs , artifact = run(tmp_path , "run_2" , input_file_path)
+    assert (status , n_runs) == ("hit" , 0)
+    # the outputs are moved into the current run
+    assert artifact.output_file_path == str(tmp_path / "artifacts" / "run_2" / "count" / "count.txt")
+    with open(artifact.output_file_path) as output_file:
+        assert output_file.read() == "2"
+
+
+def test_changed_input_is_a_miss(tmp_path , input_file_path):
+    run(tmp_path , "run_1" , input_file_path)
+    with open(input_file_path , "a") as input_file:
+        input_file.write("c\n")
+
+    status , n_runs , artifact = run(tmp_path , "run_2" , input_file_path)
+    assert (status , n_runs) == ("miss" , 1)
+    with open(artifact.output_file_path) as output_file:
+        assert output_file.read() == "3"
+    assert run(tmp_path , "run_3" , input_file_path)[:2] == ("hit" , 0)
+
+
+def test_deleted_outputs_are_a_miss(tmp_path , input_file_path):
+    artifact = run(tmp_path , "run_1" , input_file_path)[2]
+    os.remove(artifact.output_file_path)
+    assert run(tmp_path , "run_2" , input_file_path)[:2] == ("miss" , 1)
+
+
+def test_disabled_cache_always_runs_the_stage(tmp_path , input_file_path):
+    assert run(tmp_path , "run_1" , input_file_path , enabled = False)[:2] == ("disabled" , 1)
+    assert run(tmp_path , "run_2" , input_file_path , enabled = False)[:2] == ("disabled" , 1)
+    assert not os.path.exists(tmp_path / "stage_cache")
@@ -0,0 +1,86 @@
+import logging
+
+import numpy as np
+import pytest
+
+from laptopPrice.entity.tree_ensemble import CompiledTreeEnsemble
+from tests.conftest import make_estimator
+
+TOLERANCE = 1e-6
+
+# (module , class , params) of every model of config/params.yaml , small enough for a test
+MODELS = {
+    "RandomForest" : ("sklearn.ensemble" , "RandomForestRegressor" , {"n_estimators" : 20 , "max_depth" : 10 , "random_state" : 42}),
+    "ExtraTrees" : ("sklearn.ensemble" , "ExtraTreesRegressor" , {"n_estimators" : 20 , "max_depth" : 10 , "random_state" : 42}),
+    "GradientBoosting" : ("sklearn.ensemble" , "GradientBoostingRegressor" , {"n_estimators" : 50 , "max_depth" : 4 , "random_state" : 42}),
+    "XGB" : ("xgboost" , "XGBRegressor" , {"n_estimators" : 50 , "max_depth" : 5 , "random_state" : 42 , "verbosity" : 0}),
+    "LGBM" : ("lightgbm" , "LGBMRegressor" , {"n_estimators" : 50 , "num_leaves" : 31 , "random_state" : 42 , "verbose" : -1}),
+    "CatBoost" : ("catboost" , "CatBoostRegressor" , {"iterations" : 50 , "depth" : 6 , "random_state" : 42 , "verbose" : 0 ,
+                                                      "allow_writing_files" : False}),
+}
+
+
+@pytest.fixture(scope = "module" , params = list(MODELS))
+def fitted_model(request , fitted_components):
+    module_name , class_name , params = MODELS[request.param]
+    model_class = getattr(pytest.importorskip(module_name) , class_name)
+    _ , _ , _ , transformed , target = fitted_components
+    return model_class(**params).fit(transformed , target)
+
+
+def with_missing_values(X: np.ndarray , fraction: float = 0.1) -> np.ndarray:
+    X = X.copy()
+    X[np.random.default_rng(42).random(X.shape) < fraction] = np.nan
+    return X
+
+
+def assert_same_predictions(model , X: np.ndarray) -> None:
+    tree_ensemble = CompiledTreeEnsemble.from_model(model)
+    assert np.max(np.abs(tree_ensemble.predict(X) - model.predict(X))) <= TOLERANCE
+
+
+def test_compiled_predictions_match(fitted_model , fitted_components):
+    assert_same_predictions(fitted_model , fitted_components[3])
+
+
+def test_compiled_predictions_match_on_a_single_row(fitted_model , fitted_components):
+    for position in (0 , 700):
+        assert_same_predictions(fitted_model , fitted_components[3][position : position + 1])
+
+
+def test_compiled_predictions_match_with_missing_values(fitted_model , fitted_components):
+    X = with_missing_values(fitted_components[3])
+    try:
+        fitted_model.predict(X[:1])
+    except ValueError:
+        pytest.skip(f"{type(fitted_model).__name__} does not predict missing values")
+    assert_same_predictions(fitted_model , X)
+    assert_same_predictions(fitted_model , X[:1])
+
+
+def test_compiled_round_trip(fitted_model , fitted_components):
+    tree_ensemble = CompiledTreeEnsemble.from_model(fitted_model)
+    loaded = CompiledTreeEnsemble.from_arrays(tree_ensemble.get_arrays() , tree_ensemble.get_params())
+    np.testing.assert_array_equal(loaded.predict(fitted_components[3]) , tree_ensemble.predict(fitted_components[3]))
+
+
+def test_estimator_uses_compiled_ensemble(fitted_components):
+    from sklearn.ensemble import RandomForestRegressor
+
+    estimator = make_estimator(fitted_components , RandomForestRegressor(n_estimators = 5 , max_depth = 6 , random_state = 42))
+    assert estimator.tree_ensemble is not None
+
+
+def test_mismatch_is_logged_as_warning(fitted_components , monkeypatch , caplog):
+    from sklearn.ensemble import RandomForestRegressor
+
+    estimator = make_estimator(
+        fitted_components , RandomForestRegressor(n_estimators = 5 , max_depth = 6 , random_state = 42) , compile_tree_ensemble = False
+    )
+    predict = CompiledTreeEnsemble.predict
+    monkeypatch.setattr(CompiledTreeEnsemble , "predict" , lambda self , X: predict(self , X) + 1.0)
+
+    with caplog.at_level(logging.INFO):
+        assert estimator.compile_tree_ensemble(validation_array = fitted_components[3]) is None
+    assert [record.levelno for record in caplog.records if "doesn't match" in record.getMessage()] == [logging.WARNING]
+    assert estimator.tree_ensemble is None